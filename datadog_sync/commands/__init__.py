@@ -9,6 +9,7 @@ from datadog_sync.commands.diffs import diffs
 from datadog_sync.commands.migrate import migrate
 from datadog_sync.commands.prune import prune
 from datadog_sync.commands.reset import reset
+from datadog_sync.commands.convert_state import convert_state
 
 
 ALL_COMMANDS = [
@@ -18,4 +19,5 @@ ALL_COMMANDS = [
     migrate,
     prune,
     reset,
+    convert_state,
 ]
@@ -0,0 +1,78 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+from click import Choice, command, option, UsageError
+
+from datadog_sync.commands.shared.options import CustomOptionClass, storage_options
+from datadog_sync.constants import (
+    Command,
+    DESTINATION_PATH_PARAM,
+    SOURCE_PATH_PARAM,
+    STATE_LAYOUTS,
+)
+from datadog_sync.utils.configuration import build_storage_settings
+from datadog_sync.utils.log import Log
+from datadog_sync.utils.storage.state_convert import convert_state_layout
+
+
+@command(Command.CONVERT_STATE.value, short_help="Rewrite stored state files in another --state-layout.")
+@storage_options
+@option(
+    "--from-layout",
+    required=True,
+    type=Choice(STATE_LAYOUTS, case_sensitive=False),
+    help="Layout the state is currently stored in.",
+    cls=CustomOptionClass,
+)
+@option(
+    "--to-layout",
+    required=True,
+    type=Choice(STATE_LAYOUTS, case_sensitive=False),
+    help="Layout to rewrite the state in.",
+    cls=CustomOptionClass,
+)
+@option(
+    "--remove-old",
+    required=False,
+    is_flag=True,
+    default=False,
+    show_default=True,
+    help="Delete the old layout's files once the new layout has been written and read back.",
+    cls=CustomOptionClass,
+)
+@option(
+    "--verbose",
+    "-v",
+    required=False,
+    is_flag=True,
+    default=False,
+    help="Enable verbose logging.",
+    cls=CustomOptionClass,
+)
+def convert_state(**kwargs):
+    """Rewrite the source and destination state from one --state-layout to another.
+
+    Without --remove-old both layouts are left side by side, so the command
+    can be re-run or undone by pointing --state-layout back at the old one.
+    """
+    from_layout = kwargs["from_layout"].lower()
+    to_layout = kwargs["to_layout"].lower()
+    if from_layout == to_layout:
+        raise UsageError("--from-layout and --to-layout must differ")
+
+    logger = Log(kwargs.get("verbose"))
+    storage_type, source_resources_path, destination_resources_path, config = build_storage_settings(logger, **kwargs)
+    summary = convert_state_layout(
+        storage_type,
+        from_layout,
+        to_layout,
+        remove_old=kwargs.get("remove_old", False),
+        config=config,
+        **{SOURCE_PATH_PARAM: source_resources_path, DESTINATION_PATH_PARAM: destination_resources_path},
+    )
+    logger.info(
+        f"Converted {summary['resources_source']} source and {summary['resources_destination']} destination "
+        f"resources from {from_layout} to {to_layout} layout; removed {summary['removed']} old files"
+    )
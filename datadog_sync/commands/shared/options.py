@@ -141,6 +141,60 @@ _common_options = [
         "enable this for a trusted proxy.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--rate-limit-pacing",
+        envvar=constants.DD_RATE_LIMIT_PACING,
+        required=False,
+        type=bool,
+        default=True,
+        show_default=True,
+        help="Pace requests from the x-ratelimit-* headers Datadog returns on every response: "
+        "each rate-limit bucket of the source and destination orgs gets a shared token bucket "
+        "that requests wait on before being sent, instead of each worker hitting 429 and "
+        "sleeping on its own.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--http-pool-limit",
+        envvar=constants.DD_HTTP_POOL_LIMIT,
+        required=False,
+        type=int,
+        default=100,
+        show_default=True,
+        help="Max open HTTP connections per client connection pool (0 = unlimited).",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--http-pool-limit-per-host",
+        envvar=constants.DD_HTTP_POOL_LIMIT_PER_HOST,
+        required=False,
+        type=int,
+        default=0,
+        show_default=True,
+        help="Max open HTTP connections per host in each connection pool (0 = unlimited).",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--http-dns-cache-ttl",
+        envvar=constants.DD_HTTP_DNS_CACHE_TTL,
+        required=False,
+        type=int,
+        default=300,
+        show_default=True,
+        help="Seconds to cache DNS lookups in the HTTP connection pools.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--http-keepalive-timeout",
+        envvar=constants.DD_HTTP_KEEPALIVE_TIMEOUT,
+        required=False,
+        type=float,
+        default=30,
+        show_default=True,
+        help="Seconds an idle HTTP connection is kept open for reuse. Connection reuse and TLS "
+        "handshake counts are logged per client as sync-cli-timing phase=http_connections.",
+        cls=CustomOptionClass,
+    ),
     option(
         "--verify-ddr-status",
         envvar=constants.DD_VERIFY_DDR_STATUS,
@@ -197,6 +251,34 @@ _common_options = [
         help="Max number of workers when running operations in multi-threads.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--worker-scheduler",
+        envvar=constants.DD_WORKER_SCHEDULER,
+        default=constants.WORKER_SCHEDULER_EVENT,
+        show_default=True,
+        required=False,
+        type=Choice(constants.WORKER_SCHEDULERS, case_sensitive=False),
+        help="How the worker pool waits for work. 'event' parks idle workers on the "
+        "queue and wakes them on new work or shutdown (near-zero idle CPU), and pushes "
+        "dependency-graph nodes to workers as soon as their dependencies finish. "
+        "'polling' is the legacy busy-polling loop and TopologicalSorter feeder, kept "
+        "as an escape hatch.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--adaptive-concurrency",
+        envvar=constants.DD_ADAPTIVE_CONCURRENCY,
+        required=False,
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Adapt concurrency per API endpoint and per resource type instead of using "
+        "fixed limits. Limits start at a quarter of --max-workers (or the type's "
+        "max_concurrent), grow while responses are healthy and halve on 429, 5xx "
+        "overload or rising latency. Adjustments and final limits are logged as "
+        "sync-cli-timing lines.",
+        cls=CustomOptionClass,
+    ),
     option(
         "--max-workers-per-type",
         envvar=constants.MAX_WORKERS_PER_TYPE,
@@ -229,8 +311,8 @@ _common_options = [
         default=30,
         type=int,
         help="Concurrency cap for --id-file per-ID GETs. Separate from --max-workers. "
-        "Default 30. Capped at 200; values above 100 may not yield more concurrency "
-        "due to aiohttp's default TCPConnector limit.",
+        "Default 30. Capped at 200; values above --http-pool-limit may not yield more "
+        "concurrency.",
         cls=CustomOptionClass,
     ),
     option(
@@ -242,6 +324,18 @@ _common_options = [
         "fetch that triggers a rate-limit-shaped exit. Default 5.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--streaming-import",
+        envvar=constants.DD_STREAMING_IMPORT,
+        required=False,
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Import: start importing each listed resource as soon as its page arrives "
+        "instead of after every resource type has been listed. Bounds how many listed "
+        "resources are held in memory. Ignored with --id-file and --worker-scheduler=polling.",
+        cls=CustomOptionClass,
+    ),
     option(
         "--filter-operator",
         envvar=constants.DD_FILTER_OPERATOR,
@@ -296,6 +390,18 @@ _common_options = [
         "will create a resource file for each individual resource.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--state-layout",
+        envvar=constants.DD_STATE_LAYOUT,
+        required=False,
+        type=Choice(constants.STATE_LAYOUTS, case_sensitive=False),
+        default=None,
+        help=f"How state files are laid out in storage. '{constants.STATE_LAYOUT_JSON}' (default) keeps one JSON "
+        f"file per resource type, '{constants.STATE_LAYOUT_RESOURCE_PER_FILE}' is the same as --resource-per-file "
+        f"and '{constants.STATE_LAYOUT_PACK}' keeps one gzip-compressed NDJSON pack plus an ID index per resource "
+        "type. Use the convert-state command to move existing state between layouts.",
+        cls=CustomOptionClass,
+    ),
     option(
         "--json",
         "emit_json",
@@ -411,6 +517,28 @@ _storage_options = [
         help=f"AWS session token, only used if --storage-type is '{constants.S3_STORAGE_TYPE}'",
         cls=CustomOptionClass,
     ),
+    option(
+        "--aws-download-concurrency",
+        envvar=constants.AWS_DOWNLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files downloaded in parallel while loading state from S3, "
+        f"only used if --storage-type is '{constants.S3_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--aws-upload-concurrency",
+        envvar=constants.AWS_UPLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files uploaded in parallel while saving state to S3, "
+        f"only used if --storage-type is '{constants.S3_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
     # GCS options
     option(
         "--gcs-bucket-name",
@@ -444,6 +572,28 @@ _storage_options = [
         help=f"Path to GCS service account key file, only used if --storage-type is '{constants.GCS_STORAGE_TYPE}'",
         cls=CustomOptionClass,
     ),
+    option(
+        "--gcs-download-concurrency",
+        envvar=constants.GCS_DOWNLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files downloaded in parallel while loading state from GCS, "
+        f"only used if --storage-type is '{constants.GCS_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--gcs-upload-concurrency",
+        envvar=constants.GCS_UPLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files uploaded in parallel while saving state to GCS, "
+        f"only used if --storage-type is '{constants.GCS_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
     # Azure options
     option(
         "--azure-container-name",
@@ -491,6 +641,61 @@ _storage_options = [
         help=f"Azure storage connection string, only used if --storage-type is '{constants.AZURE_STORAGE_TYPE}'",
         cls=CustomOptionClass,
     ),
+    option(
+        "--azure-download-concurrency",
+        envvar=constants.AZURE_DOWNLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files downloaded in parallel while loading state from Azure Blob Storage, "
+        f"only used if --storage-type is '{constants.AZURE_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--azure-upload-concurrency",
+        envvar=constants.AZURE_UPLOAD_CONCURRENCY,
+        required=False,
+        type=int,
+        default=10,
+        show_default=True,
+        help="Number of state files uploaded in parallel while saving state to Azure Blob Storage, "
+        f"only used if --storage-type is '{constants.AZURE_STORAGE_TYPE}'",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--state-cache-dir",
+        envvar=constants.DD_STATE_CACHE_DIR,
+        required=False,
+        type=Path(file_okay=False),
+        default=None,
+        help="Directory of the local cache of state files downloaded from S3, GCS or Azure. Files whose "
+        "ETag/generation is unchanged since they were cached are read from here instead of being downloaded. "
+        "Defaults to $XDG_CACHE_HOME/datadog-sync-cli/state (~/.cache/datadog-sync-cli/state). "
+        "The cache is on by default, so cloud state is copied to this local directory (owner-only "
+        "permissions) unless --disable-state-cache is set.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--state-cache-max-mb",
+        envvar=constants.DD_STATE_CACHE_MAX_MB,
+        required=False,
+        type=IntRange(min=1),
+        default=512,
+        show_default=True,
+        help="Size cap of the local state cache; least recently used files are evicted beyond it.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--disable-state-cache",
+        envvar=constants.DD_DISABLE_STATE_CACHE,
+        required=False,
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Always download state files from cloud storage instead of using the local state cache.",
+        cls=CustomOptionClass,
+    ),
 ]
 
 
@@ -518,6 +723,17 @@ _diffs_options = [
         "the destination resource may be unrestricted. Off by default.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--cache-dependency-graph",
+        required=False,
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Keep the dependency edges computed for each source resource next to the destination "
+        "state, and reuse them on later runs for resources whose content, and the set of destination "
+        "IDs they may connect to, are unchanged. Not used with --minimize-reads or --skip-unchanged.",
+        cls=CustomOptionClass,
+    ),
     option(
         "--cleanup",
         default="False",
@@ -603,6 +819,30 @@ _sync_options = [
         help="Allow self-lockout when syncing restriction policies.",
         cls=CustomOptionClass,
     ),
+    option(
+        "--apply-priority",
+        required=False,
+        default=constants.APPLY_PRIORITY_NONE,
+        show_default=True,
+        type=Choice(constants.APPLY_PRIORITIES, case_sensitive=False),
+        help="Order in which ready resources are handed to workers. 'critical-path' runs "
+        "resources heading the longest chain of dependents first (e.g. private locations "
+        "before thousands of leaf host tags); 'dependents' runs resources with the most "
+        "direct dependents first. Requires --worker-scheduler=event.",
+        cls=CustomOptionClass,
+    ),
+    option(
+        "--skip-unchanged",
+        required=False,
+        is_flag=True,
+        default=False,
+        show_default=True,
+        help="Leave out of the apply run every resource whose source, with its dependencies "
+        "remapped, is unchanged since it was last applied successfully, as recorded next to the "
+        "destination state. Such resources are neither diffed nor updated, so changes made "
+        "directly in the destination are not reverted for them.",
+        cls=CustomOptionClass,
+    ),
 ]
 
 
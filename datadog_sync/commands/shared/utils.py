@@ -17,15 +17,25 @@ def run_cmd(cmd: Command, **kwargs):
         asyncio.run(run_cmd_async(cfg, handler, cmd))
     except KeyboardInterrupt:
         cfg.logger.error("Process interrupted by user")
-        if cmd in [Command.SYNC, Command.MIGRATE, Command.RESET]:
-            cfg.logger.info("Writing synced resources to disk before exit...")
-            cfg.state.dump_state()
-            exit(0)
+        try:
+            if cmd in [Command.SYNC, Command.MIGRATE, Command.RESET]:
+                cfg.logger.info("Writing synced resources to disk before exit...")
+                cfg.state.dump_state()
+                exit(0)
+        finally:
+            _flush_metrics_after_interrupt(cfg)
 
     if cfg.logger.exception_logged:
         exit(1)
 
 
+def _flush_metrics_after_interrupt(cfg: Configuration):
+    try:
+        asyncio.run(cfg.flush_pending_metrics())
+    except (Exception, KeyboardInterrupt) as e:
+        cfg.logger.warning(f"Could not flush buffered metrics before exit: {e}")
+
+
 async def run_cmd_async(cfg: Configuration, handler: ResourcesHandler, cmd: Command):
     try:
         # Initiate async items
@@ -31,6 +31,30 @@ DD_VERIFY_SSL_CERTIFICATES = "DD_VERIFY_SSL_CERTIFICATES"
 DD_ALLOW_PARTIAL_PERMISSIONS_ROLES = "DD_ALLOW_PARTIAL_PERMISSIONS_ROLES"
 DD_SYNC_JSON = "DD_SYNC_JSON"
 DD_DATADOG_HOST_OVERRIDE = "DD_DATADOG_HOST_OVERRIDE"
+DD_WORKER_SCHEDULER = "DD_WORKER_SCHEDULER"
+DD_ADAPTIVE_CONCURRENCY = "DD_ADAPTIVE_CONCURRENCY"
+DD_STREAMING_IMPORT = "DD_STREAMING_IMPORT"
+DD_RATE_LIMIT_PACING = "DD_RATE_LIMIT_PACING"
+DD_HTTP_POOL_LIMIT = "DD_HTTP_POOL_LIMIT"
+DD_HTTP_POOL_LIMIT_PER_HOST = "DD_HTTP_POOL_LIMIT_PER_HOST"
+DD_HTTP_DNS_CACHE_TTL = "DD_HTTP_DNS_CACHE_TTL"
+DD_HTTP_KEEPALIVE_TIMEOUT = "DD_HTTP_KEEPALIVE_TIMEOUT"
+
+WORKER_SCHEDULER_EVENT = "event"
+WORKER_SCHEDULER_POLLING = "polling"
+WORKER_SCHEDULERS = [
+    WORKER_SCHEDULER_EVENT,
+    WORKER_SCHEDULER_POLLING,
+]
+
+APPLY_PRIORITY_NONE = "none"
+APPLY_PRIORITY_CRITICAL_PATH = "critical-path"
+APPLY_PRIORITY_DEPENDENTS = "dependents"
+APPLY_PRIORITIES = [
+    APPLY_PRIORITY_NONE,
+    APPLY_PRIORITY_CRITICAL_PATH,
+    APPLY_PRIORITY_DEPENDENTS,
+]
 
 LOCAL_STORAGE_TYPE = "local"
 S3_STORAGE_TYPE = "s3"
@@ -54,6 +78,8 @@ AWS_BUCKET_KEY_PREFIX_DESTINATION = "AWS_BUCKET_KEY_PREFIX_DESTINATION"
 AWS_REGION_NAME = "AWS_REGION_NAME"
 AWS_SECRET_ACCESS_KEY = "AWS_SECRET_ACCESS_KEY"
 AWS_SESSION_TOKEN = "AWS_SESSION_TOKEN"
+AWS_DOWNLOAD_CONCURRENCY = "AWS_DOWNLOAD_CONCURRENCY"
+AWS_UPLOAD_CONCURRENCY = "AWS_UPLOAD_CONCURRENCY"
 AWS_CONFIG_PROPERTIES = [
     "aws_bucket_name",
     "aws_region_name",
@@ -67,6 +93,8 @@ GCS_BUCKET_NAME = "GCS_BUCKET_NAME"
 GCS_BUCKET_KEY_PREFIX_SOURCE = "GCS_BUCKET_KEY_PREFIX_SOURCE"
 GCS_BUCKET_KEY_PREFIX_DESTINATION = "GCS_BUCKET_KEY_PREFIX_DESTINATION"
 GCS_SERVICE_ACCOUNT_KEY_FILE = "GCS_SERVICE_ACCOUNT_KEY_FILE"
+GCS_DOWNLOAD_CONCURRENCY = "GCS_DOWNLOAD_CONCURRENCY"
+GCS_UPLOAD_CONCURRENCY = "GCS_UPLOAD_CONCURRENCY"
 GCS_CONFIG_PROPERTIES = [
     "gcs_bucket_name",
     "gcs_service_account_key_file",
@@ -79,6 +107,8 @@ AZURE_CONTAINER_KEY_PREFIX_DESTINATION = "AZURE_CONTAINER_KEY_PREFIX_DESTINATION
 AZURE_STORAGE_ACCOUNT_NAME = "AZURE_STORAGE_ACCOUNT_NAME"
 AZURE_STORAGE_ACCOUNT_KEY = "AZURE_STORAGE_ACCOUNT_KEY"
 AZURE_STORAGE_CONNECTION_STRING = "AZURE_STORAGE_CONNECTION_STRING"
+AZURE_DOWNLOAD_CONCURRENCY = "AZURE_DOWNLOAD_CONCURRENCY"
+AZURE_UPLOAD_CONCURRENCY = "AZURE_UPLOAD_CONCURRENCY"
 AZURE_CONFIG_PROPERTIES = [
     "azure_container_name",
     "azure_storage_account_name",
@@ -86,6 +116,11 @@ AZURE_CONFIG_PROPERTIES = [
     "azure_storage_connection_string",
 ]
 
+# Local read-through cache of cloud state blobs
+DD_STATE_CACHE_DIR = "DD_STATE_CACHE_DIR"
+DD_STATE_CACHE_MAX_MB = "DD_STATE_CACHE_MAX_MB"
+DD_DISABLE_STATE_CACHE = "DD_DISABLE_STATE_CACHE"
+
 # Default variables
 DEFAULT_API_URL = "https://api.datadoghq.com"
 
@@ -104,6 +139,21 @@ DESTINATION_PATH_PARAM = "destination_resources_path"
 DESTINATION_PATH_DEFAULT = "resources/destination"
 RESOURCE_PER_FILE = "resource_per_file"
 
+# State file layouts (--state-layout). "json" is one {type}.json per type,
+# "resource-per-file" one {type}.{id}.json per resource (same as
+# --resource-per-file) and "pack" a compressed {type}.pack.gz plus
+# {type}.pack.idx per type (storage/state_pack.py).
+STATE_LAYOUT = "state_layout"
+STATE_LAYOUT_JSON = "json"
+STATE_LAYOUT_RESOURCE_PER_FILE = "resource-per-file"
+STATE_LAYOUT_PACK = "pack"
+STATE_LAYOUTS = [
+    STATE_LAYOUT_JSON,
+    STATE_LAYOUT_RESOURCE_PER_FILE,
+    STATE_LAYOUT_PACK,
+]
+DD_STATE_LAYOUT = "DD_STATE_LAYOUT"
+
 
 # Commands
 class Command(Enum):
@@ -113,6 +163,7 @@ class Command(Enum):
     MIGRATE = "migrate"
     RESET = "reset"
     PRUNE = "prune"
+    CONVERT_STATE = "convert-state"
 
 
 # Origin
@@ -5,7 +5,6 @@
 
 from __future__ import annotations
 from collections import defaultdict
-from copy import deepcopy
 from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, cast
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig, ResourceConnectionResult
@@ -14,7 +13,7 @@ from datadog_sync.utils.resource_utils import (
     SkipResource,
     check_diff,
     find_attr,
-    prep_resource,
+    prepped_copy,
 )
 
 if TYPE_CHECKING:
@@ -60,6 +59,7 @@ class Dashboards(BaseResource):
         # this, a positive filter on widgets.* would silently no-op against
         # the widget-less LIST item.
         list_omitted_attr_prefixes=["widgets"],
+        copy_on_write_apply=True,
     )
     # Additional Dashboards specific attributes
 
@@ -169,8 +169,7 @@ class Dashboards(BaseResource):
         # handler saw a diff (that's why update_resource was invoked), and
         # check_diff still sees a diff after prep, the customer forked the
         # preset — fall through to clone.
-        destination_copy = deepcopy(destination_state)
-        prep_resource(cls.resource_config, destination_copy)
+        destination_copy = prepped_copy(cls.resource_config, destination_state)
         return not check_diff(cls.resource_config, source, destination_copy)
 
     async def delete_resource(self, _id: str) -> None:
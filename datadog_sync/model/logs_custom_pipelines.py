@@ -20,6 +20,7 @@ class LogsCustomPipelines(BaseResource):
         base_path="/api/v1/logs/config/pipelines",
         excluded_attributes=["id", "type", "is_read_only"],
         skip_resource_mapping=True,
+        copy_on_write_apply=True,
     )
     # Additional LogsCustomPipelines specific attributes
 
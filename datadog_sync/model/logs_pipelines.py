@@ -54,6 +54,7 @@ class LogsPipelines(BaseResource):
         ],
         null_values={"tags": [[]], "description": [""]},
         skip_resource_mapping=True,
+        copy_on_write_apply=True,
     )
     # Additional LogsPipelines specific attributes
     destination_integration_pipelines: Dict[str, Dict] = dict()
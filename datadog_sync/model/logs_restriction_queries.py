@@ -4,7 +4,7 @@
 # Copyright 2019 Datadog, Inc.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Optional, List, Dict, Tuple
+from typing import AsyncIterator, TYPE_CHECKING, Any, Optional, List, Dict, Tuple
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
 from datadog_sync.utils.custom_client import PaginationConfig
@@ -40,6 +40,12 @@ class LogsRestrictionQueries(BaseResource):
         )
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(
         self, _id: Optional[str] = None, resource: Optional[Dict[str, Any]] = None
     ) -> Tuple[str, Dict]:
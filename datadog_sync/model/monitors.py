@@ -7,7 +7,7 @@ from __future__ import annotations
 from collections import defaultdict
 import logging
 import re
-from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, cast
+from typing import AsyncIterator, TYPE_CHECKING, Optional, List, Dict, Tuple, cast
 
 from datadog_sync.constants import LOGGER_NAME
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig, ResourceConnectionResult, TaggingConfig
@@ -104,6 +104,12 @@ class Monitors(BaseResource):
 
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(self, _id: Optional[str] = None, resource: Optional[Dict] = None) -> Tuple[str, Dict]:
         if _id:
             source_client = self.config.source_client
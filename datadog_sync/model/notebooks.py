@@ -4,10 +4,10 @@
 # Copyright 2019 Datadog, Inc.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, cast
+from typing import AsyncIterator, TYPE_CHECKING, Optional, List, Dict, Tuple, cast
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
-from datadog_sync.utils.custom_client import PaginationConfig
+from datadog_sync.utils.custom_client import CONCURRENT_PAGES, PaginationConfig, total_count_func
 from datadog_sync.utils.resource_utils import CustomClientHTTPError, SkipResource
 
 if TYPE_CHECKING:
@@ -41,6 +41,7 @@ class Notebooks(BaseResource):
         # would silently no-op against the cell-less LIST item (missing path
         # → False at filter.py:_is_match_helper).
         list_omitted_attr_prefixes=["attributes.cells"],
+        copy_on_write_apply=True,
     )
     # Additional Notebooks specific attributes
     pagination_config = PaginationConfig(
@@ -50,6 +51,8 @@ class Notebooks(BaseResource):
         remaining_func=lambda idx, resp, page_size, page_number: (resp["meta"]["page"]["total_count"])
         - (page_size * (idx + 1)),
         page_number_func=lambda idx, page_size, page_number: page_size * (idx + 1),
+        max_concurrent_pages=CONCURRENT_PAGES,
+        total_count_func=total_count_func,
     )
 
     async def get_resources(self, client: CustomClient) -> List[Dict]:
@@ -65,6 +68,12 @@ class Notebooks(BaseResource):
 
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(self, _id: Optional[str] = None, resource: Optional[Dict] = None) -> Tuple[str, Dict]:
         source_client = self.config.source_client
         import_id = _id if _id is not None else (resource or {}).get("id")
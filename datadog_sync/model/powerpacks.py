@@ -2,7 +2,7 @@
 # under the 3-clause BSD style license (see LICENSE).
 # This product includes software developed at Datadog (https://www.datadoghq.com/).
 # Copyright 2019 Datadog, Inc.
-from typing import Optional, List, Dict, Tuple
+from typing import AsyncIterator, Optional, List, Dict, Tuple
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
 from datadog_sync.utils.custom_client import CustomClient, PaginationConfig
@@ -18,6 +18,7 @@ class Powerpacks(BaseResource):
             "service_level_objectives": ["widgets.definition.slo_id", "widgets.definition.widgets.definition.slo_id"],
         },
         skip_resource_mapping=True,
+        copy_on_write_apply=True,
     )
     # Additional Powerpacks specific attributes
     pagination_config = PaginationConfig(
@@ -36,6 +37,12 @@ class Powerpacks(BaseResource):
 
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(self, _id: Optional[str] = None, resource: Optional[Dict] = None) -> Tuple[str, Dict]:
         if _id:
             source_client = self.config.source_client
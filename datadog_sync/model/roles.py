@@ -445,6 +445,8 @@ class Roles(BaseResource):
             for p in source_perms
             if isinstance(p, dict) and (p.get("id") in destination_ids or p.get("id") in kept_names)
         ]
+        # Re-assign so the in-place trim is picked up by dump_state's dirty tracking.
+        self.config.state.source[self.resource_type][_id] = source_state
 
     def _reconcile_persisted_permissions(self, _id: str, requested: Dict, persisted: Dict) -> None:
         """Reconcile the source state with the permissions the destination actually persisted.
@@ -8,7 +8,7 @@
 from __future__ import annotations
 import copy
 import json
-from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, cast
+from typing import AsyncIterator, TYPE_CHECKING, Optional, List, Dict, Tuple, cast
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
 from datadog_sync.utils.custom_client import PaginationConfig
@@ -76,6 +76,12 @@ class SecurityMonitoringRules(BaseResource):
 
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(self, _id: Optional[str] = None, resource: Optional[Dict] = None) -> Tuple[str, Dict]:
         if _id:
             source_client = self.config.source_client
@@ -5,11 +5,8 @@
 
 from __future__ import annotations
 
-import aiohttp
 import base64
-import certifi
 import hashlib
-import ssl
 from typing import Optional, List, Dict, Tuple, cast
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
@@ -76,12 +73,8 @@ class SyntheticsMobileApplicationsVersions(BaseResource):
         self.config.logger.debug(f"downloading from: {presigned_download_url}")
 
         # download the blob the blob
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_context), trust_env=source_client.trust_env
-        ) as download_session:
-            async with download_session.get(presigned_download_url) as response:
-                blob = await response.read()
+        async with source_client.external_session().get(presigned_download_url) as response:
+            blob = await response.read()
         app_size = len(blob)
         self.config.logger.debug(f"app_size: {app_size}")
 
@@ -123,9 +116,7 @@ class SyntheticsMobileApplicationsVersions(BaseResource):
         self.config.logger.debug(f"file_name: {file_name}")
 
         # post to multipart presigned urls
-        session = aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_context), trust_env=source_client.trust_env
-        )
+        session = self.config.destination_client.external_session()
         try:
             complete_parts = []
             for part in parts["parts"]:
@@ -155,8 +146,6 @@ class SyntheticsMobileApplicationsVersions(BaseResource):
         except Exception as err:
             self.config.logger.error(f"Error duing mobile app upload: {err}")
             raise err
-        finally:
-            await session.close()
         self.config.logger.debug("all parts uploaded")
 
         # complete multipart upload
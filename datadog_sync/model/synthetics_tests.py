@@ -5,10 +5,7 @@
 
 from __future__ import annotations
 
-import aiohttp
-import certifi
 import json
-import ssl
 from collections import defaultdict
 from copy import deepcopy
 from typing import TYPE_CHECKING, Optional, List, Dict, Tuple, cast
@@ -332,12 +329,8 @@ class SyntheticsTests(BaseResource):
         else:
             presigned_url = resp.strip('"')
 
-        ssl_context = ssl.create_default_context(cafile=certifi.where())
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_context), trust_env=source_client.trust_env
-        ) as session:
-            async with session.get(URL(presigned_url, encoded=True)) as response:
-                return await response.read()
+        async with source_client.external_session().get(URL(presigned_url, encoded=True)) as response:
+            return await response.read()
 
     async def _replicate_files(self, source_public_id: str, resource: Dict) -> None:
         """Download files from source and inject content inline.
@@ -4,10 +4,10 @@
 # Copyright 2019 Datadog, Inc.
 
 from __future__ import annotations
-from typing import TYPE_CHECKING, Any, Optional, List, Dict, Tuple, cast
+from typing import AsyncIterator, TYPE_CHECKING, Any, Optional, List, Dict, Tuple, cast
 
 from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
-from datadog_sync.utils.custom_client import PaginationConfig
+from datadog_sync.utils.custom_client import CONCURRENT_PAGES, PaginationConfig, total_count_func
 from datadog_sync.utils.resource_utils import CustomClientHTTPError, SkipResource, check_diff
 
 if TYPE_CHECKING:
@@ -68,6 +68,8 @@ class Users(BaseResource):
     # Additional Users specific attributes
     pagination_config = PaginationConfig(
         page_size=500,
+        max_concurrent_pages=CONCURRENT_PAGES,
+        total_count_func=total_count_func,
     )
     roles_path: str = "/api/v2/roles/{}/users"
     service_accounts_path: str = "/api/v2/service_accounts"
@@ -79,6 +81,12 @@ class Users(BaseResource):
 
         return resp
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        async for page in client.iter_pages(client.get)(
+            self.resource_config.base_path, pagination_config=self.pagination_config
+        ):
+            yield page
+
     async def import_resource(
         self, _id: Optional[str] = None, resource: Optional[Dict[str, Any]] = None
     ) -> Tuple[str, Dict]:
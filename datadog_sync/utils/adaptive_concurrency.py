@@ -0,0 +1,255 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""AIMD concurrency limits driven by what request_with_retry observes.
+
+Opt-in via --adaptive-concurrency. Two families of limiters share one
+AdaptiveConcurrency registry:
+
+- per resource type ("type:monitors"), held around _apply_resource_cb in
+  place of the static ResourceConfig.max_concurrent semaphore, with that
+  value (or --max-workers) as the ceiling. Only reacts to 429 / overload,
+  since one apply mixes fast GETs and slow writes;
+- per endpoint ("endpoint:<host> POST /api/v1/monitor"), held around each
+  HTTP attempt in request_with_retry, with --max-workers as the ceiling.
+
+Every finished HTTP attempt feeds its endpoint limiter and, through a
+ContextVar set by _apply_resource_cb, the limiter of the resource type
+being applied. 429s, _OVERLOAD_STATUSES and transport errors halve the
+limit (at most once per in-flight window); a smoothed latency above
+LATENCY_TOLERANCE x the observed floor trims an endpoint limit by 10%;
+healthy responses grow it by one per window (doubling until the first
+back-off, like TCP slow start).
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import re
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Deque, Dict, Optional
+
+from datadog_sync.constants import LOGGER_NAME
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+OUTCOME_OK = "ok"
+OUTCOME_THROTTLED = "throttled"
+OUTCOME_OVERLOADED = "overloaded"
+OUTCOME_NEUTRAL = "neutral"
+
+# Multiplicative decrease on 429 / overload / transport error.
+BACKOFF_RATIO = 0.5
+# Multiplicative decrease when smoothed latency exceeds the tolerance.
+LATENCY_BACKOFF_RATIO = 0.9
+LATENCY_TOLERANCE = 2.0
+# EWMA weight for the smoothed latency, and per-sample upward drift of the
+# latency floor so the floor can recover after an unusually fast response.
+LATENCY_EWMA_ALPHA = 0.1
+LATENCY_FLOOR_DRIFT = 0.01
+
+_ID_SEGMENT = re.compile(r"^(?!v\d+$).*\d|^[a-z0-9]{3}-[a-z0-9]{3}-[a-z0-9]{3}$")
+
+current_type_limiter: ContextVar[Optional["AdaptiveLimiter"]] = ContextVar("current_type_limiter", default=None)
+
+
+def endpoint_template(method: str, path: str) -> str:
+    """`post`, `/api/v1/monitor/123` -> `POST /api/v1/monitor/{id}`.
+
+    Absolute URLs are reduced to their path, query strings are dropped and
+    id-like segments (anything with a digit other than an API version, or a
+    synthetics/dashboard `abc-def-ghi` id) are collapsed so one endpoint
+    maps to one limiter.
+    """
+    path = path.split("?", 1)[0]
+    if "://" in path:
+        path = "/" + path.split("://", 1)[1].split("/", 1)[-1]
+    segments = ["{id}" if _ID_SEGMENT.search(seg) else seg for seg in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+class AdaptiveLimiter:
+    """Resizable async semaphore with an AIMD limit in [min_limit, max_limit]."""
+
+    def __init__(
+        self,
+        key: str,
+        max_limit: int,
+        min_limit: int = 1,
+        initial_limit: Optional[int] = None,
+        latency_aware: bool = True,
+    ) -> None:
+        self.key = key
+        self.latency_aware = latency_aware
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        if initial_limit is None:
+            initial_limit = self.max_limit // 4
+        self.limit: float = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self.peak_limit: int = int(self.limit)
+        self.in_use: int = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._slow_start: bool = True
+        self._last_decrease_at: float = 0.0
+        self._latency_floor: Optional[float] = None
+        self._latency_ewma: Optional[float] = None
+        self.requests = 0
+        self.throttled = 0
+        self.overloaded = 0
+        self.increases = 0
+        self.decreases = 0
+
+    @property
+    def current_limit(self) -> int:
+        return int(self.limit)
+
+    async def acquire(self) -> None:
+        if not self._waiters and self.in_use < self.current_limit:
+            self.in_use += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        self._waiters.append(fut)
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                # Slot was handed over just as we were cancelled: give it back.
+                self.release()
+            raise
+
+    def release(self) -> None:
+        self.in_use -= 1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self._waiters and self.in_use < self.current_limit:
+            fut = self._waiters.popleft()
+            if not fut.done():
+                self.in_use += 1
+                fut.set_result(None)
+
+    def observe(self, outcome: str, latency_s: float, started_at: float) -> None:
+        self.requests += 1
+        if outcome in (OUTCOME_THROTTLED, OUTCOME_OVERLOADED):
+            if outcome == OUTCOME_THROTTLED:
+                self.throttled += 1
+            else:
+                self.overloaded += 1
+            self._decrease(BACKOFF_RATIO, outcome, started_at)
+            return
+        if outcome != OUTCOME_OK:
+            return
+        if self.latency_aware and self._latency_exceeded(latency_s):
+            self._decrease(LATENCY_BACKOFF_RATIO, "latency", started_at)
+            return
+
+        if self.limit >= self.max_limit:
+            return
+        old = self.current_limit
+        # +1 per success in slow start (doubles per window), +1/limit after.
+        self.limit = min(float(self.max_limit), self.limit + (1.0 if self._slow_start else 1.0 / self.limit))
+        if self.current_limit != old:
+            self.increases += 1
+            self.peak_limit = max(self.peak_limit, self.current_limit)
+            log.debug("adaptive_concurrency: %s limit %d -> %d", self.key, old, self.current_limit)
+            self._wake()
+
+    def _latency_exceeded(self, latency_s: float) -> bool:
+        self._latency_floor = (
+            latency_s
+            if self._latency_floor is None
+            else min(latency_s, self._latency_floor * (1 + LATENCY_FLOOR_DRIFT))
+        )
+        self._latency_ewma = (
+            latency_s
+            if self._latency_ewma is None
+            else (1 - LATENCY_EWMA_ALPHA) * self._latency_ewma + LATENCY_EWMA_ALPHA * latency_s
+        )
+        return self._latency_ewma > LATENCY_TOLERANCE * self._latency_floor
+
+    def _decrease(self, ratio: float, reason: str, started_at: float) -> None:
+        # One decrease per window: a burst of failures from requests that were
+        # already in flight before the last decrease is the same congestion
+        # event, not a new one.
+        if started_at < self._last_decrease_at:
+            return
+        self._slow_start = False
+        self._last_decrease_at = time.monotonic()
+        old = self.current_limit
+        self.limit = max(float(self.min_limit), self.limit * ratio)
+        if self.current_limit != old:
+            self.decreases += 1
+            log.info(
+                "sync-cli-timing phase=adaptive_concurrency_adjust key=%s reason=%s limit_from=%d limit_to=%d",
+                self.key,
+                reason,
+                old,
+                self.current_limit,
+            )
+
+
+class RequestSample:
+    """One HTTP attempt's hold on its endpoint limiter. finish() is idempotent."""
+
+    def __init__(self, endpoint: Optional[AdaptiveLimiter], type_limiter: Optional[AdaptiveLimiter]) -> None:
+        self._endpoint = endpoint
+        self._type_limiter = type_limiter
+        self._started_at = time.monotonic()
+        self._finished = False
+
+    def finish(self, outcome: Optional[str]) -> None:
+        """Release the endpoint slot and report `outcome` (None: release only)."""
+        if self._finished:
+            return
+        self._finished = True
+        if outcome is not None:
+            latency_s = time.monotonic() - self._started_at
+            for limiter in (self._endpoint, self._type_limiter):
+                if limiter is not None:
+                    limiter.observe(outcome, latency_s, self._started_at)
+        if self._endpoint is not None:
+            self._endpoint.release()
+
+
+class AdaptiveConcurrency:
+    """Registry of AdaptiveLimiters for one CLI invocation."""
+
+    def __init__(self, max_workers: int) -> None:
+        self.max_workers = max_workers
+        self._limiters: Dict[str, AdaptiveLimiter] = {}
+
+    def limiter(self, key: str, max_limit: Optional[int] = None, latency_aware: bool = True) -> AdaptiveLimiter:
+        if key not in self._limiters:
+            self._limiters[key] = AdaptiveLimiter(key, max_limit or self.max_workers, latency_aware=latency_aware)
+        return self._limiters[key]
+
+    def type_limiter(self, resource_type: str, max_concurrent: Optional[int]) -> AdaptiveLimiter:
+        return self.limiter(f"type:{resource_type}", max_concurrent, latency_aware=False)
+
+    async def start_request(self, host: str, method: str, path: str) -> RequestSample:
+        endpoint = self.limiter(f"endpoint:{host} {endpoint_template(method, path)}")
+        await endpoint.acquire()
+        return RequestSample(endpoint, current_type_limiter.get())
+
+    def emit_summary(self) -> None:
+        for key in sorted(self._limiters):
+            limiter = self._limiters[key]
+            log.info(
+                "sync-cli-timing phase=adaptive_concurrency key=%s limit=%d min=%d max=%d peak=%d "
+                "requests=%d throttled=%d overloaded=%d increases=%d decreases=%d",
+                key,
+                limiter.current_limit,
+                limiter.min_limit,
+                limiter.max_limit,
+                limiter.peak_limit,
+                limiter.requests,
+                limiter.throttled,
+                limiter.overloaded,
+                limiter.increases,
+                limiter.decreases,
+            )
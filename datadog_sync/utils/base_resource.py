@@ -9,7 +9,7 @@ import asyncio
 from asyncio import Lock, Semaphore
 from collections import defaultdict
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Callable, ClassVar, Optional, Dict, List, Tuple, Union
+from typing import TYPE_CHECKING, AsyncIterator, Callable, ClassVar, Optional, Dict, List, Tuple, Union
 
 from datadog_sync.utils.custom_client import CustomClient
 from datadog_sync.utils.resource_utils import (
@@ -106,6 +106,12 @@ class ResourceConfig:
     # When both are set, `concurrent=False` wins (serial behavior).
     max_concurrent: Optional[int] = None
     async_semaphore: Optional[Semaphore] = None
+    # Set when pre_resource_action_hook and connect_resources change nothing
+    # but the resource_connections attributes of the resource they are given.
+    # _apply_resource_cb then starts from a connection_copy() of the source
+    # entry, which shares every other subtree with state, and only takes a
+    # full copy once the resource is going to be created or updated.
+    copy_on_write_apply: bool = False
 
     async def init_async(self) -> None:
         # Both Lock and Semaphore bind to the current running event loop on
@@ -214,6 +220,15 @@ class BaseResource(abc.ABC):
         r = self.get_resources(client)
         return await r
 
+    async def iter_resources(self, client: CustomClient) -> AsyncIterator[List[Dict]]:
+        """Yield the resources get_resources() returns, in batches.
+
+        Default is a single batch from get_resources(). Models whose listing
+        is a plain paginated_request override this with client.iter_pages so
+        the streaming import can start on the first page.
+        """
+        yield await self._get_resources(client)
+
     async def get_resources_by_ids(
         self,
         client: CustomClient,
@@ -8,7 +8,7 @@ from dataclasses import dataclass, field, replace
 import logging
 import sys
 import time
-from typing import Any, Optional, TYPE_CHECKING, Union, Dict, List
+from typing import Any, Optional, TYPE_CHECKING, Union, Dict, List, Tuple
 
 import click
 
@@ -26,25 +26,38 @@ from datadog_sync.constants import (
     LOCAL_STORAGE_TYPE,
     LOGGER_NAME,
     RESOURCE_PER_FILE,
+    STATE_LAYOUT,
+    STATE_LAYOUT_JSON,
+    STATE_LAYOUT_PACK,
+    STATE_LAYOUT_RESOURCE_PER_FILE,
     S3_STORAGE_TYPE,
     SOURCE_PATH_DEFAULT,
     SOURCE_PATH_PARAM,
     TRUE,
     VALIDATE_ENDPOINT,
     VALID_DDR_STATES,
+    WORKER_SCHEDULER_EVENT,
+    APPLY_PRIORITY_NONE,
 )
 from datadog_sync import models
 from datadog_sync.model.logs_pipelines import LogsPipelines
 from datadog_sync.model.logs_custom_pipelines import LogsCustomPipelines
 from datadog_sync.model.downtimes import Downtimes
 from datadog_sync.model.downtime_schedules import DowntimeSchedules
-from datadog_sync.utils.custom_client import CustomClient
+from datadog_sync.utils.adaptive_concurrency import AdaptiveConcurrency
+from datadog_sync.utils.custom_client import ConnectionPoolConfig, CustomClient
 from datadog_sync.utils.base_resource import BaseResource
 from datadog_sync.utils.log import Log
 from datadog_sync.utils.filter import Filter, process_filters, EXACT_MATCH_OPERATOR
 from datadog_sync.utils.resource_utils import CustomClientHTTPError
 from datadog_sync.utils.import_state import ImportState
 from datadog_sync.utils.state import State
+from datadog_sync.utils.storage.blob_cache import (
+    STATE_CACHE_DIR,
+    STATE_CACHE_MAX_BYTES,
+    STATE_CACHE_MAX_MB_DEFAULT,
+    default_state_cache_dir,
+)
 from datadog_sync.utils.storage.storage_types import StorageType
 
 if TYPE_CHECKING:
@@ -108,6 +121,28 @@ class Configuration(object):
     # wins unconditionally over any hard-coded model default so operators
     # retain a page-time escape hatch.
     max_workers_per_type: Dict[str, int] = field(default_factory=dict)
+    # --worker-scheduler. "event" (default) parks idle workers on the work
+    # queue and drives apply/cleanup with the push-based DependencyDispatcher;
+    # "polling" restores the legacy get_nowait()/sleep(0) loop and the
+    # run_sorter feeder. Read once by Workers.__init__.
+    worker_scheduler: str = WORKER_SCHEDULER_EVENT
+    # --apply-priority. Order in which ready apply-graph nodes are handed to
+    # workers: "none" (release order), "critical-path" (longest downstream
+    # chain first) or "dependents" (most direct dependents first). Only
+    # honored by the event-driven scheduler's DependencyDispatcher.
+    apply_priority: str = APPLY_PRIORITY_NONE
+    # --skip-unchanged. Drop from the apply graph the resources whose
+    # connected source fingerprint matches the one recorded when they were
+    # last applied (State.applied_fingerprints).
+    skip_unchanged: bool = False
+    # --cache-dependency-graph. Reuse the dependency graph edges cached by
+    # earlier runs (State.dependency_cache) for unchanged source resources.
+    cache_dependency_graph: bool = False
+    # --adaptive-concurrency. Shared by both CustomClients and the apply
+    # loop: per-endpoint and per-resource-type AIMD limits that start below
+    # --max-workers / max_concurrent and move with observed 429/5xx rates
+    # and latency. None = static limits only.
+    adaptive_concurrency: Optional[AdaptiveConcurrency] = None
     command: str = ""
     allow_partial_permissions_roles: List[str] = field(default_factory=list)
     resources: Dict[str, BaseResource] = field(default_factory=dict)
@@ -121,8 +156,13 @@ class Configuration(object):
     id_payload: Optional[Dict[str, List[str]]] = None
     max_concurrent_reads: int = 30
     transient_failure_threshold_pct: int = 5
+    # --streaming-import: overlap source listing with per-resource import
+    # (ResourcesHandler._import_resources_streaming).
+    streaming_import: bool = False
     fatal_error: bool = False
     resource_per_file: bool = False
+    # --state-layout: json, resource-per-file or pack (storage/state_pack.py).
+    state_layout: str = STATE_LAYOUT_JSON
     prune_force: bool = False
     prune_dry_run: bool = False
     destination_logs_intake_url: Optional[str] = None
@@ -185,7 +225,20 @@ class Configuration(object):
             await self.source_client.send_metric(f"{cmd.value}.start")
             await self.destination_client.send_metric(f"{cmd.value}.start")
 
+    async def flush_pending_metrics(self):
+        """Post metrics still buffered after an interrupted run.
+
+        Only needed when the interrupt skipped exit_async; the interrupted
+        loop's sessions are gone, so each client opens a fresh one.
+        """
+        for client in (self.source_client, self.destination_client):
+            if client.metrics_buffer is not None and client.metrics_buffer.pending:
+                await client._init_session()
+                await client._end_session()
+
     async def exit_async(self):
+        if self.adaptive_concurrency is not None:
+            self.adaptive_concurrency.emit_summary()
         await self.source_client._end_session()
         await self.destination_client._end_session()
 
@@ -433,6 +486,79 @@ def _parse_max_workers_per_type(raw: Optional[str], known_types: List[str]) -> D
     return result
 
 
+def build_storage_settings(logger: Log, **kwargs: Optional[Any]) -> Tuple[StorageType, str, str, Dict[str, Any]]:
+    """Resolve the storage options into (storage type, source path, destination path, backend config)."""
+    storage_type = kwargs.get("storage_type", "local").lower()
+    config = {}
+
+    if storage_type == S3_STORAGE_TYPE:
+        logger.info("Using AWS S3 to store state files")
+        storage_type = StorageType.AWS_S3_BUCKET
+
+        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
+        source_resources_path = kwargs.get("aws_bucket_key_prefix_source", local_source_resources_path)
+
+        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
+        destination_resources_path = kwargs.get("aws_bucket_key_prefix_destination", local_destination_resources_path)
+
+        for aws_config_property in AWS_CONFIG_PROPERTIES:
+            property_value = kwargs.get(aws_config_property, None)
+            if not property_value:
+                logger.warning(f"Missing AWS configuration parameter: {aws_config_property}")
+            config[aws_config_property] = property_value
+        config["aws_download_concurrency"] = kwargs.get("aws_download_concurrency")
+        config["aws_upload_concurrency"] = kwargs.get("aws_upload_concurrency")
+    elif storage_type == GCS_STORAGE_TYPE:
+        logger.info("Using GCS to store state files")
+        storage_type = StorageType.GCS_BUCKET
+
+        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
+        source_resources_path = kwargs.get("gcs_bucket_key_prefix_source", local_source_resources_path)
+
+        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
+        destination_resources_path = kwargs.get("gcs_bucket_key_prefix_destination", local_destination_resources_path)
+
+        for gcs_config_property in GCS_CONFIG_PROPERTIES:
+            property_value = kwargs.get(gcs_config_property, None)
+            if not property_value:
+                logger.warning(f"Missing GCS configuration parameter: {gcs_config_property}")
+            config[gcs_config_property] = property_value
+        config["gcs_download_concurrency"] = kwargs.get("gcs_download_concurrency")
+        config["gcs_upload_concurrency"] = kwargs.get("gcs_upload_concurrency")
+    elif storage_type == AZURE_STORAGE_TYPE:
+        logger.info("Using Azure Blob Storage to store state files")
+        storage_type = StorageType.AZURE_BLOB_CONTAINER
+
+        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
+        source_resources_path = kwargs.get("azure_container_key_prefix_source", local_source_resources_path)
+
+        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
+        destination_resources_path = kwargs.get(
+            "azure_container_key_prefix_destination", local_destination_resources_path
+        )
+
+        for azure_config_property in AZURE_CONFIG_PROPERTIES:
+            property_value = kwargs.get(azure_config_property, None)
+            if not property_value:
+                logger.warning(f"Missing Azure configuration parameter: {azure_config_property}")
+            config[azure_config_property] = property_value
+        config["azure_download_concurrency"] = kwargs.get("azure_download_concurrency")
+        config["azure_upload_concurrency"] = kwargs.get("azure_upload_concurrency")
+    elif storage_type == LOCAL_STORAGE_TYPE:
+        logger.info("Using local filesystem to store state files")
+        storage_type = StorageType.LOCAL_FILE
+        source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
+        destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
+    else:
+        raise ValueError("Unsupported storage type")
+
+    if storage_type != StorageType.LOCAL_FILE and not kwargs.get("disable_state_cache"):
+        config[STATE_CACHE_DIR] = kwargs.get("state_cache_dir") or default_state_cache_dir()
+        config[STATE_CACHE_MAX_BYTES] = (kwargs.get("state_cache_max_mb") or STATE_CACHE_MAX_MB_DEFAULT) * 1024 * 1024
+
+    return storage_type, source_resources_path, destination_resources_path, config
+
+
 def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
     # configure logger — in JSON mode, Log writes NDJSON to stdout and silences stderr
     emit_json = kwargs.get("emit_json", False)
@@ -452,6 +578,16 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
     send_metrics = kwargs.get("send_metrics")
     verify_ssl = kwargs.get("verify_ssl_certificates", True)
     trust_env = kwargs.get("http_client_trust_env", False)
+    rate_limit_pacing = kwargs.get("rate_limit_pacing", True)
+    connection_pool = ConnectionPoolConfig()
+    for field_name, kwarg in (
+        ("limit", "http_pool_limit"),
+        ("limit_per_host", "http_pool_limit_per_host"),
+        ("ttl_dns_cache", "http_dns_cache_ttl"),
+        ("keepalive_timeout", "http_keepalive_timeout"),
+    ):
+        if kwargs.get(kwarg) is not None:
+            setattr(connection_pool, field_name, kwargs[kwarg])
 
     # JWT takes precedence over API keys, so warn if user provided both
     if (kwargs.get("source_jwt") and kwargs.get("source_api_key")) or (
@@ -459,6 +595,10 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
     ):
         logger.warning("Both a JWT and an API key were found, the JWT will take precedence.")
 
+    adaptive_concurrency = None
+    if kwargs.get("adaptive_concurrency"):
+        adaptive_concurrency = AdaptiveConcurrency(kwargs.get("max_workers") or 100)
+
     source_auth = {}
     # JWT takes precedence over API keys
     if jwt := kwargs.get("source_jwt"):
@@ -480,6 +620,9 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         send_metrics,
         verify_ssl=verify_ssl,
         trust_env=trust_env,
+        adaptive_concurrency=adaptive_concurrency,
+        rate_limit_pacing=rate_limit_pacing,
+        connection_pool=connection_pool,
     )
 
     destination_auth = {}
@@ -503,6 +646,9 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         send_metrics,
         verify_ssl=verify_ssl,
         trust_env=trust_env,
+        adaptive_concurrency=adaptive_concurrency,
+        rate_limit_pacing=rate_limit_pacing,
+        connection_pool=connection_pool,
     )
 
     # Additional settings
@@ -511,6 +657,10 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
     drop_unresolvable_principals = kwargs.get("drop_unresolvable_principals") or False
     refresh_destination_state_before_apply = kwargs.get("refresh_destination_state_before_apply") or False
     max_workers = kwargs.get("max_workers")
+    worker_scheduler = (kwargs.get("worker_scheduler") or WORKER_SCHEDULER_EVENT).lower()
+    apply_priority = (kwargs.get("apply_priority") or APPLY_PRIORITY_NONE).lower()
+    skip_unchanged = bool(kwargs.get("skip_unchanged", False))
+    cache_dependency_graph = bool(kwargs.get("cache_dependency_graph", False))
     max_workers_per_type_raw = kwargs.get("max_workers_per_type")
     # Parse --max-workers-per-type early so malformed input fails BEFORE any
     # storage read or client init. Uses the same model-registry predicate as
@@ -546,63 +696,7 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         }[cleanup.lower()]
 
     # determine where the states are stored
-    storage_type = kwargs.get("storage_type", "local").lower()
-    config = {}
-
-    if storage_type == S3_STORAGE_TYPE:
-        logger.info("Using AWS S3 to store state files")
-        storage_type = StorageType.AWS_S3_BUCKET
-
-        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
-        source_resources_path = kwargs.get("aws_bucket_key_prefix_source", local_source_resources_path)
-
-        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
-        destination_resources_path = kwargs.get("aws_bucket_key_prefix_destination", local_destination_resources_path)
-
-        for aws_config_property in AWS_CONFIG_PROPERTIES:
-            property_value = kwargs.get(aws_config_property, None)
-            if not property_value:
-                logger.warning(f"Missing AWS configuration parameter: {aws_config_property}")
-            config[aws_config_property] = property_value
-    elif storage_type == GCS_STORAGE_TYPE:
-        logger.info("Using GCS to store state files")
-        storage_type = StorageType.GCS_BUCKET
-
-        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
-        source_resources_path = kwargs.get("gcs_bucket_key_prefix_source", local_source_resources_path)
-
-        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
-        destination_resources_path = kwargs.get("gcs_bucket_key_prefix_destination", local_destination_resources_path)
-
-        for gcs_config_property in GCS_CONFIG_PROPERTIES:
-            property_value = kwargs.get(gcs_config_property, None)
-            if not property_value:
-                logger.warning(f"Missing GCS configuration parameter: {gcs_config_property}")
-            config[gcs_config_property] = property_value
-    elif storage_type == AZURE_STORAGE_TYPE:
-        logger.info("Using Azure Blob Storage to store state files")
-        storage_type = StorageType.AZURE_BLOB_CONTAINER
-
-        local_source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
-        source_resources_path = kwargs.get("azure_container_key_prefix_source", local_source_resources_path)
-
-        local_destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
-        destination_resources_path = kwargs.get(
-            "azure_container_key_prefix_destination", local_destination_resources_path
-        )
-
-        for azure_config_property in AZURE_CONFIG_PROPERTIES:
-            property_value = kwargs.get(azure_config_property, None)
-            if not property_value:
-                logger.warning(f"Missing Azure configuration parameter: {azure_config_property}")
-            config[azure_config_property] = property_value
-    elif storage_type == LOCAL_STORAGE_TYPE:
-        logger.info("Using local filesystem to store state files")
-        storage_type = StorageType.LOCAL_FILE
-        source_resources_path = kwargs.get(SOURCE_PATH_PARAM, SOURCE_PATH_DEFAULT)
-        destination_resources_path = kwargs.get(DESTINATION_PATH_PARAM, DESTINATION_PATH_DEFAULT)
-    else:
-        raise ValueError("Unsupported storage type")
+    storage_type, source_resources_path, destination_resources_path, config = build_storage_settings(logger, **kwargs)
 
     # Confusing, but the source for the import needs to be the destination of the reset
     # If a destination is going to be reset then a backup needs to be preformed. A back up
@@ -617,6 +711,9 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
             send_metrics,
             verify_ssl=verify_ssl,
             trust_env=trust_env,
+            adaptive_concurrency=adaptive_concurrency,
+            rate_limit_pacing=rate_limit_pacing,
+            connection_pool=connection_pool,
         )
         source_resources_path = f"{destination_resources_path}/.backup/{str(time.time())}"
 
@@ -630,6 +727,13 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         )
 
     resource_per_file = kwargs.get(RESOURCE_PER_FILE, False)
+    state_layout = kwargs.get(STATE_LAYOUT) or STATE_LAYOUT_JSON
+    if state_layout == STATE_LAYOUT_RESOURCE_PER_FILE:
+        resource_per_file = True
+    elif state_layout == STATE_LAYOUT_PACK and resource_per_file:
+        raise click.UsageError("--state-layout pack cannot be combined with --resource-per-file")
+    elif resource_per_file:
+        state_layout = STATE_LAYOUT_RESOURCE_PER_FILE
     minimize_reads = kwargs.get("minimize_reads", False)
     skip_state_load = kwargs.get("skip_state_load", False)
 
@@ -750,6 +854,7 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
             destination_resources_path=destination_resources_path,
             config=config,
             resource_per_file=resource_per_file,
+            state_layout=state_layout,
         )
         logger.info("skip-state-load: ImportState constructed (no preload)")
     else:
@@ -759,6 +864,7 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
             destination_resources_path=destination_resources_path,
             config=config,
             resource_per_file=resource_per_file,
+            state_layout=state_layout,
             resource_types=_state_resource_types,  # None = full load or ID-targeted
             exact_ids=_state_exact_ids,  # None = not using ID-targeted
         )
@@ -798,10 +904,11 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
             f"aiohttp's connector limit (default 100) is the real ceiling."
         )
         sys.exit(1)
-    if max_concurrent_reads > 100:
+    if connection_pool.limit and max_concurrent_reads > connection_pool.limit:
         logger.warning(
-            f"--max-concurrent-reads={max_concurrent_reads} is above aiohttp's default "
-            f"TCPConnector limit (100). Effective concurrency may be lower than requested."
+            f"--max-concurrent-reads={max_concurrent_reads} is above the HTTP connection "
+            f"pool limit ({connection_pool.limit}, see --http-pool-limit). Effective "
+            f"concurrency may be lower than requested."
         )
     raw_threshold = kwargs.get("transient_failure_threshold_pct")
     if raw_threshold is None:
@@ -831,6 +938,11 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         refresh_destination_state_before_apply=refresh_destination_state_before_apply,
         max_workers=max_workers,
         max_workers_per_type=max_workers_per_type,
+        worker_scheduler=worker_scheduler,
+        apply_priority=apply_priority,
+        skip_unchanged=skip_unchanged,
+        cache_dependency_graph=cache_dependency_graph,
+        adaptive_concurrency=adaptive_concurrency,
         cleanup=cleanup,
         create_global_downtime=create_global_downtime,
         validate=validate,
@@ -848,6 +960,7 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
         id_payload=id_payload,
         max_concurrent_reads=max_concurrent_reads,
         transient_failure_threshold_pct=transient_failure_threshold_pct,
+        streaming_import=bool(kwargs.get("streaming_import", False)),
         destination_logs_intake_url=destination_logs_intake_url,
     )
 
@@ -939,6 +1052,7 @@ def build_config(cmd: Command, **kwargs: Optional[Any]) -> Configuration:
     config.resources = resources
     config.resources_arg = resources_arg
     config.resource_per_file = resource_per_file
+    config.state_layout = state_layout
     if cmd == Command.PRUNE:
         config.prune_force = kwargs.get("force", False)
         config.prune_dry_run = kwargs.get("dry_run", False)
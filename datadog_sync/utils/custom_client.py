@@ -10,7 +10,7 @@ import time
 import logging
 import platform
 from dataclasses import dataclass
-from typing import Awaitable, Dict, List, Optional, Callable
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Callable, Tuple
 from urllib.parse import urlparse
 
 import aiohttp
@@ -18,6 +18,17 @@ import certifi
 
 from collections import Counter as _StdCounter
 from datadog_sync.constants import DDR_Status, LOGGER_NAME, Metrics
+from datadog_sync.utils.adaptive_concurrency import (
+    OUTCOME_NEUTRAL,
+    OUTCOME_OK,
+    OUTCOME_OVERLOADED,
+    OUTCOME_THROTTLED,
+    AdaptiveConcurrency,
+    RequestSample,
+)
+from datadog_sync.utils.json_body import OFFLOAD_THRESHOLD_BYTES, DecodeStats, body_text, decode_body
+from datadog_sync.utils.metrics_buffer import MetricsBuffer
+from datadog_sync.utils.rate_limit import RateLimitBuckets
 from datadog_sync.utils.resource_utils import CustomClientHTTPError
 
 log = logging.getLogger(LOGGER_NAME)
@@ -64,6 +75,32 @@ def _overload_sleep_duration(retry_count: int, retry_after_hdr: Optional[str]) -
     return _OVERLOAD_BACKOFF_SCHEDULE[idx]
 
 
+def _adaptive_outcome(status: int) -> str:
+    if status == 429:
+        return OUTCOME_THROTTLED
+    if status in _OVERLOAD_STATUSES:
+        return OUTCOME_OVERLOADED
+    return OUTCOME_NEUTRAL
+
+
+def _request_endpoint(func: Callable, args) -> Tuple[str, str]:
+    """(method, path) of a request_with_retry call: `get`/`_post_raw` -> get/post."""
+    method = func.__name__.lstrip("_").split("_")[0]
+    path = next((a for a in args[1:] if isinstance(a, str)), "")
+    return method, path
+
+
+async def _start_adaptive_sample(client, method: str, path: str) -> Optional[RequestSample]:
+    """Acquire the --adaptive-concurrency endpoint slot for one HTTP attempt.
+
+    None when the client (or a test double) has no controller attached.
+    """
+    adaptive = getattr(client, "adaptive_concurrency", None)
+    if not isinstance(adaptive, AdaptiveConcurrency):
+        return None
+    return await adaptive.start_request(urlparse(client.url_object._default).netloc, method, path)
+
+
 def request_with_retry(func: Awaitable) -> Awaitable:
     async def wrapper(*args, **kwargs):
         retry = True
@@ -73,77 +110,107 @@ def request_with_retry(func: Awaitable) -> Awaitable:
         err_text = None
         max_retries = 3
 
+        client = args[0]
+        method, path = _request_endpoint(func, args)
+        rate_limits = getattr(client, "rate_limits", None)
+        if not isinstance(rate_limits, RateLimitBuckets):
+            rate_limits = None
+        decode_stats = getattr(client, "decode_stats", None)
+        if not isinstance(decode_stats, DecodeStats):
+            decode_stats = None
+        offload_threshold = getattr(client, "json_offload_threshold", OFFLOAD_THRESHOLD_BYTES)
+
         while retry and timeout > time.time() and retry_count <= max_retries:
-            async with await func(*args, **kwargs) as resp:
-                err_text = await resp.text()
-                try:
-                    resp.raise_for_status()
+            if rate_limits is not None:
+                # Wait for a token of the endpoint's x-ratelimit bucket before
+                # taking an --adaptive-concurrency slot, so paced requests do
+                # not hold a slot while idle.
+                await rate_limits.acquire(method, path)
+            sample = await _start_adaptive_sample(client, method, path)
+            try:
+                async with await func(*args, **kwargs) as resp:
+                    if rate_limits is not None:
+                        rate_limits.observe(method, path, resp.headers)
+                    # Read once; the text form is only built on error paths.
+                    body = await resp.read()
                     try:
-                        return await resp.json()
-                    except aiohttp.ContentTypeError:
-                        return await resp.text()
-                except aiohttp.ClientResponseError as e:
-                    if e.status == 429 and "x-ratelimit-reset" in e.headers:
-                        try:
-                            sleep_duration = int(e.headers["x-ratelimit-reset"])
-                        except ValueError:
+                        resp.raise_for_status()
+                        if sample is not None:
+                            sample.finish(OUTCOME_OK)
+                        return await decode_body(resp, body, offload_threshold, decode_stats)
+                    except aiohttp.ClientResponseError as e:
+                        if sample is not None:
+                            sample.finish(_adaptive_outcome(e.status))
+                        err_text = body_text(resp, body)
+                        if e.status == 429 and "x-ratelimit-reset" in e.headers:
+                            try:
+                                sleep_duration = int(e.headers["x-ratelimit-reset"])
+                            except ValueError:
+                                sleep_duration = retry_count * default_backoff
+                            if (sleep_duration + time.time()) > timeout:
+                                log.warning(f"{e}. retry timeout has or will exceed timeout duration")
+                                raise CustomClientHTTPError(e, message=err_text)
+                            log.warning(f"{e}. retrying request after {sleep_duration}s")
+                            await asyncio.sleep(sleep_duration)
+                            retry_count += 1
+                            log.debug(f"retry count: {retry_count}")
+                            continue
+                        elif e.status in _OVERLOAD_STATUSES:
+                            # Edge/proxy timeouts and gateway overload: back off
+                            # substantially longer than the 5s * retry_count
+                            # baseline used for other 5xx. Honor Retry-After if the
+                            # server sent one; otherwise use the fixed schedule.
+                            # Increment the per-status counter so operators can
+                            # dashboard "is the fix working?" long-term via
+                            # client.overload_status_counter, rather than
+                            # log-grep.
+                            try:
+                                args[0].overload_status_counter[e.status] += 1
+                            except AttributeError:
+                                # Older CustomClient instances or test doubles.
+                                pass
+                            # Cap at the schedule length rather than max_retries.
+                            # This keeps every bucket in _OVERLOAD_BACKOFF_SCHEDULE
+                            # reachable: with a 3-element schedule and retry_count
+                            # starting at 0, we sleep schedule[0], schedule[1],
+                            # schedule[2] on successive retries before giving up
+                            # (subject to the retry_timeout total budget).
+                            if retry_count >= len(_OVERLOAD_BACKOFF_SCHEDULE):
+                                log.warning("retry count has exceeded overload backoff schedule length")
+                                raise CustomClientHTTPError(e, message=err_text)
+                            sleep_duration = _overload_sleep_duration(retry_count, e.headers.get("Retry-After"))
+                            if (sleep_duration + time.time()) > timeout:
+                                log.warning(
+                                    f"{e}. overload backoff ({sleep_duration}s) exceeds retry timeout budget; giving up"
+                                )
+                                raise CustomClientHTTPError(e, message=err_text)
+                            log.warning(f"{e}. upstream overloaded; backing off {sleep_duration}s before retry")
+                            await asyncio.sleep(sleep_duration)
+                            retry_count += 1
+                            log.debug(f"retry count: {retry_count}")
+                            continue
+                        elif e.status >= 500 or e.status == 429:
                             sleep_duration = retry_count * default_backoff
-                        if (sleep_duration + time.time()) > timeout:
-                            log.warning(f"{e}. retry timeout has or will exceed timeout duration")
-                            raise CustomClientHTTPError(e, message=err_text)
-                        log.warning(f"{e}. retrying request after {sleep_duration}s")
-                        await asyncio.sleep(sleep_duration)
-                        retry_count += 1
-                        log.debug(f"retry count: {retry_count}")
-                        continue
-                    elif e.status in _OVERLOAD_STATUSES:
-                        # Edge/proxy timeouts and gateway overload: back off
-                        # substantially longer than the 5s * retry_count
-                        # baseline used for other 5xx. Honor Retry-After if the
-                        # server sent one; otherwise use the fixed schedule.
-                        # Increment the per-status counter so operators can
-                        # dashboard "is the fix working?" long-term via
-                        # client.overload_status_counter, rather than
-                        # log-grep.
-                        try:
-                            args[0].overload_status_counter[e.status] += 1
-                        except AttributeError:
-                            # Older CustomClient instances or test doubles.
-                            pass
-                        # Cap at the schedule length rather than max_retries.
-                        # This keeps every bucket in _OVERLOAD_BACKOFF_SCHEDULE
-                        # reachable: with a 3-element schedule and retry_count
-                        # starting at 0, we sleep schedule[0], schedule[1],
-                        # schedule[2] on successive retries before giving up
-                        # (subject to the retry_timeout total budget).
-                        if retry_count >= len(_OVERLOAD_BACKOFF_SCHEDULE):
-                            log.warning("retry count has exceeded overload backoff schedule length")
-                            raise CustomClientHTTPError(e, message=err_text)
-                        sleep_duration = _overload_sleep_duration(retry_count, e.headers.get("Retry-After"))
-                        if (sleep_duration + time.time()) > timeout:
-                            log.warning(
-                                f"{e}. overload backoff ({sleep_duration}s) exceeds retry timeout budget; giving up"
-                            )
-                            raise CustomClientHTTPError(e, message=err_text)
-                        log.warning(f"{e}. upstream overloaded; backing off {sleep_duration}s before retry")
-                        await asyncio.sleep(sleep_duration)
-                        retry_count += 1
-                        log.debug(f"retry count: {retry_count}")
-                        continue
-                    elif e.status >= 500 or e.status == 429:
-                        sleep_duration = retry_count * default_backoff
-                        if (sleep_duration + time.time()) > timeout:
-                            log.warning("retry timeout has or will exceed timeout duration")
-                            raise CustomClientHTTPError(e, message=err_text)
-                        if retry_count + 1 >= max_retries:
-                            log.warning("retry count has or will exceed retry maximum")
-                            raise CustomClientHTTPError(e, message=err_text)
-                        log.warning(f"{e}. retrying request after {sleep_duration}s")
-                        await asyncio.sleep(retry_count * default_backoff)
-                        retry_count += 1
-                        log.debug(f"retry count: {retry_count}")
-                        continue
-                    raise CustomClientHTTPError(e, message=err_text)
+                            if (sleep_duration + time.time()) > timeout:
+                                log.warning("retry timeout has or will exceed timeout duration")
+                                raise CustomClientHTTPError(e, message=err_text)
+                            if retry_count + 1 >= max_retries:
+                                log.warning("retry count has or will exceed retry maximum")
+                                raise CustomClientHTTPError(e, message=err_text)
+                            log.warning(f"{e}. retrying request after {sleep_duration}s")
+                            await asyncio.sleep(retry_count * default_backoff)
+                            retry_count += 1
+                            log.debug(f"retry count: {retry_count}")
+                            continue
+                        raise CustomClientHTTPError(e, message=err_text)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Transport failure or stalled body: treat as overload.
+                if sample is not None:
+                    sample.finish(OUTCOME_OVERLOADED)
+                raise
+            finally:
+                if sample is not None:
+                    sample.finish(None)
         raise Exception(f"retry limit exceeded timeout: {timeout} retry_count: {retry_count} error: {err_text}")
 
     return wrapper
@@ -160,10 +227,19 @@ class CustomClient:
         *,
         verify_ssl: bool = True,
         trust_env: bool = False,
+        adaptive_concurrency: Optional[AdaptiveConcurrency] = None,
+        rate_limit_pacing: bool = True,
+        connection_pool: Optional["ConnectionPoolConfig"] = None,
     ) -> None:
         self.url_object = UrlObject.from_str(host)
         self.timeout = timeout
         self.session = None
+        # Unauthenticated session for presigned URLs and log intake, created on
+        # first use by external_session() and reused for the whole run.
+        self._external_session: Optional[aiohttp.ClientSession] = None
+        self.connection_pool = connection_pool or ConnectionPoolConfig()
+        self.connection_stats = ConnectionStats()
+        self.external_connection_stats = ConnectionStats()
         self.retry_timeout = retry_timeout
         self.default_pagination = PaginationConfig()
         self.auth = auth
@@ -176,6 +252,18 @@ class CustomClient:
         # an in-memory counter rather than emitting a metric inline to avoid
         # recursive-request risk during a proxy overload storm.
         self.overload_status_counter: _StdCounter = _StdCounter()
+        # --adaptive-concurrency: per-endpoint AIMD limiters held around each
+        # HTTP attempt in request_with_retry. None = no gating.
+        self.adaptive_concurrency = adaptive_concurrency
+        # --rate-limit-pacing: token buckets learned from x-ratelimit-*
+        # response headers, awaited before each request. One per client since
+        # the quota is per org. None = only react to 429s.
+        self.rate_limits: Optional[RateLimitBuckets] = (
+            RateLimitBuckets(urlparse(self.url_object._default).netloc) if rate_limit_pacing else None
+        )
+        # request_with_retry parses JSON bodies above this size off the event loop.
+        self.json_offload_threshold = OFFLOAD_THRESHOLD_BYTES
+        self.decode_stats = DecodeStats()
 
         # Metrics only work with API keys, not JWT
         # If JWT is present, metrics are not available
@@ -185,19 +273,34 @@ class CustomClient:
             and auth.get("apiKeyAuth")
             and auth.get("appKeyAuth")
         )
+        # send_metric() buffers here; flushed periodically and at _end_session.
+        self.metrics_buffer: Optional[MetricsBuffer] = MetricsBuffer(self) if self.metrics_available else None
+
+    def _ssl_context(self):
+        return ssl.create_default_context(cafile=certifi.where()) if self.verify_ssl else False
+
+    def _new_pooled_session(self, stats: "ConnectionStats", **kwargs) -> aiohttp.ClientSession:
+        pool = self.connection_pool
+        connector = aiohttp.TCPConnector(
+            ssl=self._ssl_context(),
+            limit=pool.limit,
+            limit_per_host=pool.limit_per_host,
+            ttl_dns_cache=pool.ttl_dns_cache,
+            keepalive_timeout=pool.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(
+            connector=connector, trust_env=self.trust_env, trace_configs=[stats.trace_config()], **kwargs
+        )
 
     async def _init_session(self):
-        if self.verify_ssl:
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            self.session = aiohttp.ClientSession(
-                connector=aiohttp.TCPConnector(ssl=ssl_context), trust_env=self.trust_env
-            )
-        else:
+        if not self.verify_ssl:
             log.warning(
                 "WARNING: SSL certificate verification is disabled. "
                 "This is insecure and should only be used in trusted environments."
             )
-            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=False), trust_env=self.trust_env)
+        self.session = self._new_pooled_session(self.connection_stats)
+        if self.metrics_buffer is not None:
+            self.metrics_buffer.start()
 
         headers = build_default_headers(self.auth)
         self.session.headers.update(headers)
@@ -217,11 +320,36 @@ class CustomClient:
                     "Provide --source-api-key/--source-app-key to enable metrics."
                 )
 
+    def external_session(self) -> aiohttp.ClientSession:
+        """Shared pooled session without Datadog auth headers.
+
+        For requests that must not carry API/app keys (presigned upload and
+        download URLs, the logs intake) but should still reuse connections
+        across calls instead of paying a TCP + TLS handshake each time.
+        """
+        if self._external_session is None or self._external_session.closed:
+            self._external_session = self._new_pooled_session(
+                self.external_connection_stats, headers={"User-Agent": _get_user_agent()}
+            )
+        return self._external_session
+
     async def _end_session(self):
-        try:
-            await self.session.close()
-        except Exception:
-            pass
+        if self.metrics_buffer is not None and self.session is not None:
+            await self.metrics_buffer.close()
+        if self.rate_limits is not None:
+            self.rate_limits.emit_summary()
+        host = urlparse(self.url_object._default).netloc
+        self.connection_stats.emit_summary(host, "api")
+        self.decode_stats.emit_summary(host)
+        if self._external_session is not None:
+            self.external_connection_stats.emit_summary(host, "external")
+        for session in (self.session, self._external_session):
+            if session is None:
+                continue
+            try:
+                await session.close()
+            except Exception:
+                pass
 
     def _client_timeout(self) -> aiohttp.ClientTimeout:
         """Return a ClientTimeout with no hard total cap but a per-read socket deadline.
@@ -266,22 +394,43 @@ class CustomClient:
         return session.post(url, json=body, timeout=self._client_timeout())
 
     async def post_unauthenticated(self, url: str, payload: dict) -> None:
-        ssl_ctx = ssl.create_default_context(cafile=certifi.where()) if self.verify_ssl else False
-        async with aiohttp.ClientSession(
-            connector=aiohttp.TCPConnector(ssl=ssl_ctx),
-            headers={"Content-Type": "application/json", "User-Agent": _get_user_agent()},
-            trust_env=self.trust_env,
-        ) as session:
-            await self._post_raw(session, url, payload)
+        # json= sets Content-Type: application/json.
+        await self._post_raw(self.external_session(), url, payload)
 
     def paginated_request(self, func: Awaitable) -> Awaitable:
+        async def wrapper(*args, **kwargs):
+            resources = []
+            async for page in self.iter_pages(func)(*args, **kwargs):
+                resources.extend(page)
+            return resources
+
+        return wrapper
+
+    def iter_pages(self, func: Awaitable) -> Callable[..., AsyncIterator[List]]:
+        """Async-generator form of paginated_request: yields each page's
+        resources as soon as it arrives, so callers can start work on the
+        first page while later ones are still being fetched and never hold
+        more than the pages they have not consumed yet.
+
+        Same arguments, pagination_config handling and 5xx isolation /
+        truncation semantics as paginated_request. In parallel mode
+        (PaginationConfig.max_concurrent_pages) the pages are fetched
+        together and yielded as a single batch.
+        """
+
         async def wrapper(*args, **kwargs):
             pagination_config = kwargs.pop("pagination_config", self.default_pagination)
 
+            if pagination_config.max_concurrent_pages > 1 and pagination_config.total_count_func:
+                resources = await self._paginate_concurrently(func, args, kwargs, pagination_config)
+                if resources is not None:
+                    yield resources
+                    return
+
             page_size = pagination_config.page_size
             page_number = pagination_config.page_number
             remaining = 1
-            resources = []
+            collected = 0
             kwargs["params"] = kwargs.get("params", {}) or {}
             idx = 0
             original_page_size = page_size
@@ -308,15 +457,15 @@ class CustomClient:
                 try:
                     # call the actual awaitable function
                     resp = await func(*args, **kwargs)
-                    resp_len = 0
 
-                    # add resources from the page to our list
+                    # hand the page's resources to the caller
                     if pagination_config.response_list_accessor:
-                        resources.extend(resp[pagination_config.response_list_accessor])
-                        resp_len = len(resp[pagination_config.response_list_accessor])
+                        page = resp[pagination_config.response_list_accessor]
                     else:
-                        resources.extend(resp)
-                        resp_len = len(resp)
+                        page = resp
+                    resp_len = len(page)
+                    collected += resp_len
+                    yield page
 
                     # if it's a partial page then we're done, it's the last page
                     if resp_len < page_size:
@@ -386,7 +535,7 @@ class CustomClient:
                             f"Paginated request TRUNCATED for {args[0]} at "
                             f"{pagination_config.page_number_param}={page_number} "
                             f"{pagination_config.page_size_param}={page_size} "
-                            f"after collecting {len(resources)} resource(s). "
+                            f"after collecting {collected} resource(s). "
                             f"Downstream syncs may show missing-dependency cascades. "
                             f"Error: {err}"
                         )
@@ -396,11 +545,119 @@ class CustomClient:
                 page_number = pagination_config.page_number_func(idx, page_size, page_number)
                 idx += 1
 
-            # return our list of good resources
-            return resources
-
         return wrapper
 
+    async def _paginate_concurrently(
+        self, func: Awaitable, args, kwargs, pagination_config: "PaginationConfig"
+    ) -> Optional[List]:
+        """Parallel mode of paginated_request for offset-addressable endpoints.
+
+        Fetches the first page, reads the total from it, then fetches every
+        remaining page with at most `max_concurrent_pages` in flight and
+        concatenates them in page order. A page failing with a 5xx is split
+        into smaller pages on its own (the serial loop's halving isolation,
+        scoped to that page); any other error truncates the result at the
+        failing page, as the serial loop does.
+
+        Returns None when the first page fails or carries no total, so the
+        caller falls back to the serial loop.
+        """
+        page_size = pagination_config.page_size
+        base_params = kwargs.get("params", {}) or {}
+        start = time.perf_counter()
+
+        async def fetch(offset: int, size: int) -> List:
+            params = {
+                **base_params,
+                pagination_config.page_size_param: size,
+                pagination_config.page_number_param: _page_number_at(pagination_config, offset, size),
+            }
+            resp = await func(*args, **{**kwargs, "params": params})
+            if pagination_config.response_list_accessor:
+                return resp[pagination_config.response_list_accessor]
+            return resp
+
+        try:
+            first_params = {
+                **base_params,
+                pagination_config.page_size_param: page_size,
+                pagination_config.page_number_param: pagination_config.page_number,
+            }
+            first_resp = await func(*args, **{**kwargs, "params": first_params})
+        except CustomClientHTTPError:
+            return None
+        total = pagination_config.total_count_func(first_resp)
+        if total is None:
+            return None
+        first_page = (
+            first_resp[pagination_config.response_list_accessor]
+            if pagination_config.response_list_accessor
+            else first_resp
+        )
+        if len(first_page) < page_size or total <= page_size:
+            return list(first_page)
+
+        async def fetch_isolated(offset: int, size: int) -> List:
+            try:
+                return await fetch(offset, size)
+            except CustomClientHTTPError as err:
+                if err.status_code < 500:
+                    raise
+                if size == 1:
+                    log.warning(
+                        f"Error isolated, skipping resource: fetching {args[0]} at offset {offset} "
+                        f"{pagination_config.page_size_param}: 1"
+                    )
+                    return []
+                log.warning(f"500 error during a paginated request, attempting to isolate (offset {offset})")
+                # Sub-pages must start on a multiple of their size to be
+                # addressable; the last one may overrun and is trimmed.
+                sub_size = size // 2
+                while offset % sub_size:
+                    sub_size -= 1
+                end = offset + size
+                items = []
+                for sub_offset in range(offset, end, sub_size):
+                    sub_items = await fetch_isolated(sub_offset, sub_size)
+                    items.extend(sub_items[: end - sub_offset])
+                return items
+
+        sem = asyncio.Semaphore(pagination_config.max_concurrent_pages)
+
+        async def fetch_page(offset: int) -> List:
+            async with sem:
+                return await fetch_isolated(offset, page_size)
+
+        offsets = list(range(page_size, total, page_size))
+        results = await asyncio.gather(*(fetch_page(offset) for offset in offsets), return_exceptions=True)
+
+        resources = list(first_page)
+        for offset, result in zip(offsets, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, CustomClientHTTPError):
+                    raise result
+                log.error(
+                    f"Paginated request TRUNCATED for {args[0]} at offset {offset} "
+                    f"{pagination_config.page_size_param}={page_size} "
+                    f"after collecting {len(resources)} resource(s). "
+                    f"Downstream syncs may show missing-dependency cascades. "
+                    f"Error: {result}"
+                )
+                break
+            resources.extend(result)
+
+        log.info(
+            "sync-cli-timing phase=paginate_concurrent path=%s total=%d pages=%d concurrency=%d "
+            "resources=%d wall_ms=%d",
+            args[0],
+            total,
+            len(offsets) + 1,
+            pagination_config.max_concurrent_pages,
+            len(resources),
+            (time.perf_counter() - start) * 1000,
+        )
+        return resources
+
     async def send_metric(self, metric: str, tags: List[str] = None) -> None:
         if not self.send_metrics:
             return None
@@ -413,26 +670,9 @@ class CustomClient:
             )
             return None
 
-        path = "/api/v2/series"
-        timestamp = int(datetime.now().timestamp())
-        full_metric = f"{Metrics.PREFIX.value}.{metric}"
-        body = {
-            "series": [
-                {
-                    "metadata": {
-                        "origin": {
-                            "origin_product": Metrics.ORIGIN_PRODUCT.value,
-                        },
-                    },
-                    "metric": full_metric,
-                    "type": 0,
-                    "points": [{"timestamp": timestamp, "value": 1}],
-                    "tags": tags,
-                }
-            ]
-        }
-        # Send metric using API key headers from session
-        await self.post(path, body)
+        # Buffered; posted as batched /api/v2/series payloads by MetricsBuffer
+        # using the API key headers from the session.
+        self.metrics_buffer.add(f"{Metrics.PREFIX.value}.{metric}", tags)
 
     async def get_ddr_status(self) -> Dict:
         path = "/api/v2/hamr"
@@ -501,6 +741,89 @@ def page_number_func(idx, page_size, page_number):
     return page_number + 1
 
 
+# Page fan-out for PaginationConfigs that opt into parallel mode.
+CONCURRENT_PAGES = 8
+
+
+def total_count_func(resp) -> Optional[int]:
+    try:
+        return int(resp["meta"]["page"]["total_count"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def _page_number_at(pagination_config: "PaginationConfig", offset: int, page_size: int):
+    """Page-number param addressing the page of `page_size` items starting at
+    `offset` (a multiple of page_size), by replaying page_number_func the way
+    the serial loop advances it."""
+    page_number = pagination_config.page_number
+    for idx in range(offset // page_size):
+        page_number = pagination_config.page_number_func(idx, page_size, page_number)
+    return page_number
+
+
+@dataclass
+class ConnectionPoolConfig(object):
+    """aiohttp.TCPConnector pool settings shared by every session of a client.
+
+    limit / limit_per_host: max open connections in total / per host
+    (0 = unlimited). ttl_dns_cache: seconds to cache DNS lookups.
+    keepalive_timeout: seconds an idle connection stays pooled for reuse.
+    """
+
+    limit: int = 100
+    limit_per_host: int = 0
+    ttl_dns_cache: Optional[int] = 300
+    keepalive_timeout: float = 30
+
+
+class ConnectionStats(object):
+    """Connection reuse counters collected through an aiohttp TraceConfig.
+
+    Every new connection to an https URL is one TCP + TLS handshake; reused
+    connections skip both.
+    """
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.tls_handshakes = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(self._on_request_start)
+        trace_config.on_connection_create_end.append(self._on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuseconn)
+        return trace_config
+
+    async def _on_request_start(self, session, ctx, params) -> None:
+        self.requests += 1
+        ctx.https = params.url.scheme == "https"
+
+    async def _on_connection_create_end(self, session, ctx, params) -> None:
+        self.new_connections += 1
+        if getattr(ctx, "https", False):
+            self.tls_handshakes += 1
+
+    async def _on_connection_reuseconn(self, session, ctx, params) -> None:
+        self.reused_connections += 1
+
+    def emit_summary(self, host: str, session: str) -> None:
+        connections = self.new_connections + self.reused_connections
+        log.info(
+            "sync-cli-timing phase=http_connections host=%s session=%s requests=%d new=%d reused=%d "
+            "tls_handshakes=%d reuse_pct=%.1f",
+            host,
+            session,
+            self.requests,
+            self.new_connections,
+            self.reused_connections,
+            self.tls_handshakes,
+            100.0 * self.reused_connections / connections if connections else 0.0,
+        )
+
+
 @dataclass
 class PaginationConfig(object):
     page_size: Optional[int] = 100
@@ -510,6 +833,12 @@ class PaginationConfig(object):
     remaining_func: Optional[Callable] = remaining_func
     page_number_func: Optional[Callable] = page_number_func
     response_list_accessor: Optional[str] = "data"
+    # Parallel mode: with max_concurrent_pages > 1 and a total_count_func
+    # (response -> total item count, or None), pages after the first are
+    # fetched concurrently once the total is known. Requires the
+    # page_number_param to address any page directly (page or offset based).
+    max_concurrent_pages: int = 1
+    total_count_func: Optional[Callable] = None
 
 
 @dataclass
@@ -0,0 +1,193 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+from __future__ import annotations
+import heapq
+from collections import defaultdict, deque
+from graphlib import CycleError
+from typing import Callable, Dict, Hashable, List, Optional, Set
+
+from datadog_sync.constants import APPLY_PRIORITY_CRITICAL_PATH, APPLY_PRIORITY_DEPENDENTS
+
+
+class DependencyDispatcher:
+    """Push-based topological dispatcher for the apply and cleanup graphs.
+
+    Drop-in for the `done()` / `is_active()` surface of graphlib's
+    TopologicalSorter, but instead of a feeder coroutine polling
+    `get_ready()`, every node is handed to `on_ready` exactly once, the moment
+    its last dependency is marked done. In-degrees and a reverse adjacency
+    (dependents) index are built once, so total scheduling cost is O(V+E)
+    regardless of how long the API calls in between take.
+
+    `graph` uses the TopologicalSorter convention: node -> set of nodes it
+    depends on. Nodes that only appear as dependencies are scheduled too.
+
+    `on_ready` may call `done()` re-entrantly (e.g. to skip a node without
+    running it); newly ready nodes are then queued and drained iteratively,
+    so long skip chains do not recurse. A node whose `on_ready` raises is
+    marked done as if it had failed, and the first such error is re-raised
+    once the ready nodes are drained.
+
+    With `priority` (node -> score, higher first; see compute_priorities),
+    ready nodes wait in a heap and at most `capacity` are outstanding at
+    once, so a freed worker always picks the best ready node instead of
+    whatever was released first. Without it, ready nodes are released
+    immediately in FIFO order.
+    """
+
+    def __init__(
+        self,
+        graph: Dict[Hashable, Set[Hashable]],
+        on_ready: Callable[[Hashable], None],
+        priority: Optional[Dict[Hashable, int]] = None,
+        capacity: Optional[int] = None,
+    ) -> None:
+        self._on_ready = on_ready
+        self._priority = priority
+        self._capacity = capacity
+        self._in_degree: Dict[Hashable, int] = {}
+        self._dependents: Dict[Hashable, List[Hashable]] = defaultdict(list)
+        for node, deps in graph.items():
+            self._in_degree.setdefault(node, 0)
+            for dep in deps:
+                self._in_degree.setdefault(dep, 0)
+            # Dedupe so a repeated edge cannot double-decrement.
+            for dep in set(deps):
+                self._in_degree[node] += 1
+                self._dependents[dep].append(node)
+        self._check_acyclic()
+
+        self._remaining: int = len(self._in_degree)
+        self._dispatched: Set[Hashable] = set()
+        # deque of nodes (FIFO) or heap of (-priority, seq, node).
+        self._ready = deque() if priority is None else []
+        self._seq: int = 0
+        self._draining: bool = False
+        self._started: bool = False
+
+    def _push_ready(self, node: Hashable) -> None:
+        if self._priority is None:
+            self._ready.append(node)
+            return
+        self._seq += 1
+        heapq.heappush(self._ready, (-self._priority.get(node, 0), self._seq, node))
+
+    def _pop_ready(self) -> Hashable:
+        if self._priority is None:
+            return self._ready.popleft()
+        return heapq.heappop(self._ready)[2]
+
+    def _check_acyclic(self) -> None:
+        in_degree = dict(self._in_degree)
+        queue = deque(n for n, d in in_degree.items() if d == 0)
+        visited = 0
+        while queue:
+            node = queue.popleft()
+            visited += 1
+            for dependent in self._dependents.get(node, ()):
+                in_degree[dependent] -= 1
+                if in_degree[dependent] == 0:
+                    queue.append(dependent)
+        if visited != len(in_degree):
+            raise CycleError("nodes are in a cycle", [n for n, d in in_degree.items() if d > 0])
+
+    def start(self) -> None:
+        """Dispatch every node with no dependencies. Call once, after the
+        consumer's work queue exists."""
+        if self._started:
+            raise ValueError("start() called more than once")
+        self._started = True
+        for node, degree in self._in_degree.items():
+            if degree == 0:
+                self._push_ready(node)
+        self._drain()
+
+    def is_active(self) -> bool:
+        return self._remaining > 0
+
+    def done(self, *nodes: Hashable) -> None:
+        for node in nodes:
+            if node not in self._dispatched:
+                if node not in self._in_degree:
+                    raise ValueError(f"node {node!r} was not added to the dispatcher")
+                raise ValueError(f"node {node!r} was not dispatched or was already marked done")
+            self._settle(node)
+        self._drain()
+
+    def _settle(self, node: Hashable) -> None:
+        self._dispatched.discard(node)
+        self._remaining -= 1
+        for dependent in self._dependents.get(node, ()):
+            self._in_degree[dependent] -= 1
+            if self._in_degree[dependent] == 0:
+                self._push_ready(dependent)
+
+    def _drain(self) -> None:
+        if self._draining:
+            return
+        self._draining = True
+        error: Optional[BaseException] = None
+        try:
+            while self._ready and (self._capacity is None or len(self._dispatched) < self._capacity):
+                node = self._pop_ready()
+                self._dispatched.add(node)
+                try:
+                    self._on_ready(node)
+                except Exception as e:
+                    # The consumer never got the node, so nothing else marks
+                    # it done: settle it like a failed apply and keep draining,
+                    # or it and its dependents keep is_active() true forever.
+                    if node in self._dispatched:
+                        self._settle(node)
+                    if error is None:
+                        error = e
+        finally:
+            self._draining = False
+        if error is not None:
+            raise error
+
+
+def compute_priorities(graph: Dict[Hashable, Set[Hashable]], strategy: str) -> Dict[Hashable, int]:
+    """Score every node of a dependency graph for DependencyDispatcher.
+
+    - critical-path: number of nodes on the longest chain of dependents
+      starting at the node (itself included), so the head of a deep
+      private_location -> test -> monitor -> SLO -> dashboard chain outranks
+      thousands of leaves.
+    - dependents: number of direct dependents.
+
+    Both are O(V+E). `graph` must be acyclic.
+    """
+    dependents: Dict[Hashable, List[Hashable]] = defaultdict(list)
+    in_degree: Dict[Hashable, int] = {}
+    for node, deps in graph.items():
+        in_degree.setdefault(node, 0)
+        for dep in set(deps):
+            in_degree.setdefault(dep, 0)
+            in_degree[node] += 1
+            dependents[dep].append(node)
+
+    if strategy == APPLY_PRIORITY_DEPENDENTS:
+        return {node: len(dependents.get(node, ())) for node in in_degree}
+    if strategy != APPLY_PRIORITY_CRITICAL_PATH:
+        raise ValueError(f"unknown priority strategy: {strategy}")
+
+    order = []
+    queue = deque(n for n, d in in_degree.items() if d == 0)
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for dependent in dependents.get(node, ()):
+            in_degree[dependent] -= 1
+            if in_degree[dependent] == 0:
+                queue.append(dependent)
+    if len(order) != len(in_degree):
+        raise CycleError("nodes are in a cycle", [n for n, d in in_degree.items() if d > 0])
+
+    depth: Dict[Hashable, int] = {}
+    for node in reversed(order):
+        depth[node] = 1 + max((depth[d] for d in dependents.get(node, ())), default=0)
+    return depth
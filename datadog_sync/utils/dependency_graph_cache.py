@@ -0,0 +1,87 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+from __future__ import annotations
+import hashlib
+import json
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, Optional, Set, Tuple
+
+from datadog_sync.utils.resource_utils import content_hash
+
+if TYPE_CHECKING:
+    from datadog_sync.utils.state import State
+    from datadog_sync.utils.storage.dependency_cache import Edges
+
+
+class DependencyGraphCache:
+    """Dependency graph edges reused across runs (--cache-dependency-graph).
+
+    An edge set of get_dependency_graph() is the failed connections of one
+    source resource: what connect_id() could not find in the destination.
+    That depends on the resource's content and on which IDs the destination
+    holds for the types it connects to, so a cached edge set is reused only
+    when both hash as they did when it was computed. The destination side
+    is one digest per resource type, over the sorted destination IDs of
+    every type in its resource_connections; the cache of a type whose
+    digest changed is rebuilt whole.
+
+    Needs the connected types fully loaded to digest them, so it is not
+    used with --minimize-reads.
+    """
+
+    def __init__(self, state: State, resources: Dict) -> None:
+        self._state = state
+        self._resources = resources
+        self._id_digests: Dict[str, str] = {}
+        self._destination_digests: Dict[str, str] = {}
+        self._edges: Dict[str, Edges] = defaultdict(dict)
+        self.hits = 0
+        self.misses = 0
+
+    def destination_digest(self, resource_type: str) -> str:
+        digest = self._destination_digests.get(resource_type)
+        if digest is None:
+            connected = sorted(self._resources[resource_type].resource_config.resource_connections or {})
+            parts = [[dep_type, self._ids_digest(dep_type)] for dep_type in connected]
+            digest = self._destination_digests[resource_type] = _digest(json.dumps(parts))
+        return digest
+
+    def _ids_digest(self, resource_type: str) -> str:
+        digest = self._id_digests.get(resource_type)
+        if digest is None:
+            ids = sorted(str(_id) for _id in self._state.destination[resource_type])
+            digest = self._id_digests[resource_type] = _digest("\0".join(ids))
+        return digest
+
+    def lookup(self, resource_type: str, _id: str, resource: Dict) -> Tuple[Optional[str], Optional[Set]]:
+        """(content hash of resource, its cached edges); the edges are None on a miss."""
+        resource_hash = content_hash(resource)
+        if resource_hash is not None:
+            digest, cached = self._state.dependency_cache(resource_type)
+            entry = cached.get(_id)
+            if (
+                isinstance(entry, list)
+                and len(entry) == 2
+                and entry[0] == resource_hash
+                and digest == self.destination_digest(resource_type)
+            ):
+                self.hits += 1
+                return resource_hash, {tuple(edge) for edge in entry[1]}
+        self.misses += 1
+        return resource_hash, None
+
+    def record(self, resource_type: str, _id: str, resource_hash: Optional[str], edges: Set) -> None:
+        if resource_hash is not None:
+            self._edges[resource_type][_id] = [resource_hash, [list(edge) for edge in sorted(edges, key=repr)]]
+
+    def save(self) -> None:
+        """Hand this run's edges to state; dump_state writes them."""
+        for resource_type, edges in self._edges.items():
+            self._state.record_dependency_cache(resource_type, self.destination_digest(resource_type), edges)
+
+
+def _digest(data: str) -> str:
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
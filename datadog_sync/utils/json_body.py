@@ -0,0 +1,150 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Single-read response body decoding for request_with_retry.
+
+aiohttp's resp.text() followed by resp.json() decodes every body twice and
+parses it on the event loop thread, where a multi-megabyte dashboard or
+synthetics payload stalls every other worker for the length of the parse.
+decode_body() reads the bytes once, parses JSON with the fastest available
+backend (orjson when installed, else the stdlib) and hands bodies larger than
+OFFLOAD_THRESHOLD_BYTES to the default thread pool. The text form is only
+built for non-JSON responses and error messages (body_text).
+
+orjson rejects some bodies json.loads accepts (NaN/Infinity, integers wider
+than 64 bits); those are parsed again with json.loads, so what parses does
+not depend on whether orjson is installed.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Callable, Dict, Optional
+
+from datadog_sync.constants import LOGGER_NAME
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+# Bodies above this size are parsed in a worker thread. Below it the executor
+# hop costs more than the parse itself.
+OFFLOAD_THRESHOLD_BYTES = 256 * 1024
+
+# Same match aiohttp's resp.json() uses for its content-type check.
+_JSON_CONTENT_TYPE_RE = re.compile(r"^application/(?:[\w.+-]+?\+)?json")
+
+
+def _orjson_loads() -> Optional[Callable[[bytes], Any]]:
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson.loads
+
+
+# name -> loads(bytes). Every backend must raise a ValueError subclass on
+# malformed input, as json.loads does.
+JSON_BACKENDS: Dict[str, Callable[[bytes], Any]] = {"json": json.loads}
+_orjson = _orjson_loads()
+if _orjson is not None:
+    JSON_BACKENDS["orjson"] = _orjson
+
+_backend_name = "orjson" if "orjson" in JSON_BACKENDS else "json"
+
+
+def set_json_backend(name: str, loads: Optional[Callable[[bytes], Any]] = None) -> None:
+    """Select (and optionally register) the JSON backend used by decode_body."""
+    global _backend_name
+    if loads is not None:
+        JSON_BACKENDS[name] = loads
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"unknown JSON backend {name!r}; available: {sorted(JSON_BACKENDS)}")
+    _backend_name = name
+
+
+def json_backend() -> str:
+    return _backend_name
+
+
+def _loads(loads: Callable[[bytes], Any], body: bytes) -> Any:
+    """loads(body), retried with json.loads when another backend rejects it."""
+    try:
+        return loads(body)
+    except ValueError:
+        if loads is json.loads:
+            raise
+        return json.loads(body)
+
+
+class DecodeStats:
+    """Per-client decode counters, logged as phase=json_decode."""
+
+    def __init__(self) -> None:
+        self.bodies = 0
+        self.bytes = 0
+        self.offloaded = 0
+        self.inline_ns = 0
+        self.max_inline_ns = 0
+
+    def record(self, size: int, offloaded: bool, inline_ns: int = 0) -> None:
+        self.bodies += 1
+        self.bytes += size
+        if offloaded:
+            self.offloaded += 1
+        else:
+            self.inline_ns += inline_ns
+            self.max_inline_ns = max(self.max_inline_ns, inline_ns)
+
+    def emit_summary(self, host: str) -> None:
+        if not self.bodies:
+            return
+        log.info(
+            "sync-cli-timing phase=json_decode host=%s backend=%s bodies=%d bytes=%d offloaded=%d "
+            "inline_ms=%d max_inline_ms=%.1f",
+            host,
+            _backend_name,
+            self.bodies,
+            self.bytes,
+            self.offloaded,
+            self.inline_ns // 1_000_000,
+            self.max_inline_ns / 1_000_000,
+        )
+
+
+def is_json_response(resp) -> bool:
+    return bool(_JSON_CONTENT_TYPE_RE.match(resp.content_type or ""))
+
+
+def body_text(resp, body: bytes) -> str:
+    """Text form of an already-read body, for non-JSON responses and errors."""
+    return body.decode(resp.charset or "utf-8", errors="replace")
+
+
+async def decode_body(
+    resp,
+    body: bytes,
+    offload_threshold: int = OFFLOAD_THRESHOLD_BYTES,
+    stats: Optional[DecodeStats] = None,
+) -> Any:
+    """Equivalent of `await resp.json()` falling back to `await resp.text()` on
+    a non-JSON content type, over bytes that have already been read."""
+    if not is_json_response(resp):
+        return body_text(resp, body)
+    if not body.strip():
+        return None
+    loads = JSON_BACKENDS[_backend_name]
+    if len(body) > offload_threshold:
+        result = await asyncio.get_running_loop().run_in_executor(None, _loads, loads, body)
+        if stats is not None:
+            stats.record(len(body), offloaded=True)
+        return result
+    start_ns = time.perf_counter_ns()
+    result = _loads(loads, body)
+    if stats is not None:
+        stats.record(len(body), offloaded=False, inline_ns=time.perf_counter_ns() - start_ns)
+    return result
@@ -0,0 +1,155 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""In-process aggregation for CustomClient.send_metric.
+
+Every synced resource emits a sync-cli action metric to both clients. Posting
+each as its own single-point /api/v2/series request puts two extra HTTP
+round-trips in _apply_resource_cb and competes with the sync for the same
+rate limits. MetricsBuffer instead keeps one point per (metric, type, tags,
+second) in memory and a background task posts them every FLUSH_INTERVAL_S as
+multi-series, multi-point payloads. Count points falling in the same second
+are summed; for any other type the last value wins, as the intake would do
+with points sent one by one. The buffer is flushed one last time when
+the client's session ends (CustomClient._end_session, reached from
+Configuration.exit_async and after a KeyboardInterrupt).
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from datadog_sync.constants import LOGGER_NAME, Metrics
+
+if TYPE_CHECKING:
+    from datadog_sync.utils.custom_client import CustomClient
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+SERIES_PATH = "/api/v2/series"
+FLUSH_INTERVAL_S = 10.0
+# Series per POST; keeps payloads well under the intake's 5MB body limit.
+MAX_SERIES_PER_PAYLOAD = 500
+# /api/v2/series metric types. send_metric posts unspecified.
+METRIC_TYPE_UNSPECIFIED = 0
+METRIC_TYPE_COUNT = 1
+
+
+class MetricsBuffer:
+    """Buffered metric points for one CustomClient, flushed in batches."""
+
+    def __init__(
+        self,
+        client: CustomClient,
+        flush_interval_s: float = FLUSH_INTERVAL_S,
+        max_series_per_payload: int = MAX_SERIES_PER_PAYLOAD,
+    ) -> None:
+        self.client = client
+        self.flush_interval_s = flush_interval_s
+        self.max_series_per_payload = max_series_per_payload
+        # (metric, type, tags) -> timestamp -> value
+        self._series: Dict[Tuple[str, int, Tuple[str, ...]], Dict[int, float]] = defaultdict(dict)
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.points_added = 0
+        self.payloads_sent = 0
+        self.payloads_failed = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._series)
+
+    def add(
+        self,
+        metric: str,
+        tags: Optional[List[str]] = None,
+        value: float = 1,
+        timestamp: Optional[int] = None,
+        metric_type: int = METRIC_TYPE_UNSPECIFIED,
+    ):
+        """Record a point. No I/O; safe to call from the apply hot path."""
+        if timestamp is None:
+            timestamp = int(time.time())
+        points = self._series[(metric, metric_type, tuple(tags or ()))]
+        if metric_type == METRIC_TYPE_COUNT:
+            points[timestamp] = points.get(timestamp, 0) + value
+        else:
+            points[timestamp] = value
+        self.points_added += 1
+
+    def start(self) -> None:
+        """Start the periodic flusher on the running loop."""
+        self._flush_lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            # Shielded: close() cancelling this loop mid-POST must not drop
+            # the batch already swapped out of the buffer.
+            await asyncio.shield(self.flush())
+
+    def _build_payloads(self, series: Dict[Tuple[str, int, Tuple[str, ...]], Dict[int, float]]) -> List[Dict]:
+        entries = [
+            {
+                "metadata": {
+                    "origin": {
+                        "origin_product": Metrics.ORIGIN_PRODUCT.value,
+                    },
+                },
+                "metric": metric,
+                "type": metric_type,
+                "points": [{"timestamp": ts, "value": value} for ts, value in sorted(points.items())],
+                "tags": list(tags),
+            }
+            for (metric, metric_type, tags), points in series.items()
+        ]
+        return [
+            {"series": entries[i : i + self.max_series_per_payload]}
+            for i in range(0, len(entries), self.max_series_per_payload)
+        ]
+
+    async def flush(self) -> None:
+        """Post everything buffered so far. Failures are logged and dropped,
+        as for the unbuffered send_metric."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            if not self._series:
+                return
+            # Swap before awaiting so points recorded during the POSTs land
+            # in the next flush.
+            series, self._series = self._series, defaultdict(dict)
+            for body in self._build_payloads(series):
+                try:
+                    await self.client.post(SERIES_PATH, body)
+                    self.payloads_sent += 1
+                except Exception as e:
+                    self.payloads_failed += 1
+                    log.debug(f"Failed to flush {len(body['series'])} metric series: {e}")
+
+    async def close(self) -> None:
+        """Stop the periodic flusher and flush what is left."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        if self.points_added:
+            log.info(
+                "sync-cli-timing phase=metrics_flush host=%s points=%d payloads=%d failed_payloads=%d",
+                urlparse(self.client.url_object._default).netloc,
+                self.points_added,
+                self.payloads_sent,
+                self.payloads_failed,
+            )
@@ -0,0 +1,153 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Client-side pacing from Datadog's x-ratelimit-* response headers.
+
+Every API response carries the org-wide quota of the rate-limit bucket the
+endpoint belongs to:
+
+    x-ratelimit-name       bucket name, shared by several endpoints
+    x-ratelimit-limit      requests allowed per period
+    x-ratelimit-period     period length in seconds
+    x-ratelimit-remaining  requests left in the current period
+    x-ratelimit-reset      seconds until the period resets
+
+RateLimitBuckets learns which endpoint maps to which bucket and keeps one
+TokenBucket per bucket name, refilled at limit/period and clamped to the
+server's `remaining`. request_with_retry awaits a token before sending, so
+100 workers queue behind one shared bucket instead of each sending, getting
+a 429 and sleeping x-ratelimit-reset on its own. Endpoints whose bucket is
+not known yet (first request) are sent unpaced.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections.abc import Mapping
+from typing import Dict, Optional
+
+from datadog_sync.constants import LOGGER_NAME
+from datadog_sync.utils.adaptive_concurrency import endpoint_template
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+def _header_number(headers: Mapping, name: str) -> Optional[float]:
+    value = headers.get(name)
+    if not isinstance(value, str):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+class TokenBucket:
+    """Token bucket for one x-ratelimit-name, shared by every endpoint in it."""
+
+    def __init__(self, name: str, limit: float, period: float) -> None:
+        self.name = name
+        self.limit = limit
+        self.period = period
+        self.tokens = limit
+        self._updated_at = time.monotonic()
+        # Set when the server reports remaining=0: no tokens until reset.
+        self._blocked_until = 0.0
+        self._lock = asyncio.Lock()
+        self.waits = 0
+        self.wait_s = 0.0
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.limit, self.tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def update(self, limit: float, period: float, remaining: Optional[float], reset: Optional[float]) -> None:
+        """Reconcile with the quota reported on a response."""
+        now = time.monotonic()
+        self._refill(now)
+        self.limit = limit
+        self.period = period
+        if remaining is not None:
+            # The server's count wins when it is lower: other processes (or
+            # the other half of a concurrent sync) share the org quota.
+            self.tokens = min(self.tokens, remaining)
+            if remaining <= 0 and reset is not None:
+                self._blocked_until = max(self._blocked_until, now + reset)
+
+    async def acquire(self) -> None:
+        # The lock queues waiters FIFO so a burst of workers drains one token
+        # at a time instead of all waking together.
+        async with self._lock:
+            waited = 0.0
+            while True:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    break
+                else:
+                    delay = (1 - self.tokens) / self.rate
+                waited += delay
+                await asyncio.sleep(delay)
+            if waited:
+                self.waits += 1
+                self.wait_s += waited
+
+
+class RateLimitBuckets:
+    """Per-org (per CustomClient) registry of TokenBuckets."""
+
+    def __init__(self, host: str = "") -> None:
+        self.host = host
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._endpoint_bucket: Dict[str, str] = {}
+
+    def bucket_for(self, method: str, path: str) -> Optional[TokenBucket]:
+        name = self._endpoint_bucket.get(endpoint_template(method, path))
+        return self._buckets.get(name) if name is not None else None
+
+    async def acquire(self, method: str, path: str) -> None:
+        bucket = self.bucket_for(method, path)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def observe(self, method: str, path: str, headers: Mapping) -> None:
+        if not isinstance(headers, Mapping):
+            # Test doubles without real response headers.
+            return
+        name = headers.get("x-ratelimit-name")
+        limit = _header_number(headers, "x-ratelimit-limit")
+        period = _header_number(headers, "x-ratelimit-period")
+        if not isinstance(name, str) or not limit or not period:
+            return
+        remaining = _header_number(headers, "x-ratelimit-remaining")
+        reset = _header_number(headers, "x-ratelimit-reset")
+
+        self._endpoint_bucket[endpoint_template(method, path)] = name
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = self._buckets[name] = TokenBucket(name, limit, period)
+        bucket.update(limit, period, remaining, reset)
+
+    def emit_summary(self) -> None:
+        for name in sorted(self._buckets):
+            bucket = self._buckets[name]
+            log.info(
+                "sync-cli-timing phase=rate_limit_pacing host=%s bucket=%s limit=%d period_s=%d waits=%d wait_s=%.2f",
+                self.host,
+                name,
+                bucket.limit,
+                bucket.period,
+                bucket.waits,
+                bucket.wait_s,
+            )
@@ -5,6 +5,8 @@
 
 from __future__ import annotations
 import asyncio
+import hashlib
+import marshal
 import re
 import logging
 from copy import deepcopy
@@ -218,9 +220,205 @@ def find_attr(keys_list_str: str, resource_to_connect: str, r_obj: Any, connect_
 
 
 def prep_resource(resource_config, resource):
-    remove_excluded_attr(resource_config, resource)
-    remove_non_nullable_attributes(resource_config, resource)
-    remove_non_nullable_list_vals(resource_config, resource)
+    normalization_plan(resource_config).apply(resource)
+
+
+def prepped_copy(resource_config, resource):
+    """prep_resource() applied to a copy of resource, which is left untouched.
+
+    Only the containers prep_resource() would change are copied; the rest of
+    the copy shares its subtrees with resource, so treat it as read-only
+    beyond what prep_resource() did.
+    """
+    return normalization_plan(resource_config).applied_copy(resource)
+
+
+def copy_on_write_apply(resource_config) -> bool:
+    """Whether apply may start from connection_copy() (see ResourceConfig.copy_on_write_apply)."""
+    return getattr(resource_config, "copy_on_write_apply", False) is True
+
+
+def connection_copy(resource_config, resource):
+    """A copy of resource that connect_id() may remap in place, resource being left untouched.
+
+    The containers on the resource_connections paths are copied and the
+    value at the end of each path deep-copied; everything else is shared
+    with resource. That covers what find_attr() hands to connect_id(): the
+    container holding a connection (r_obj) and the connection itself
+    (r_obj[key]).
+    """
+    owned: Dict[int, Any] = {}
+    resource = _own_root(resource, owned)
+    for paths in (resource_config.resource_connections or {}).values():
+        for path in paths:
+            if not path:
+                continue
+            keys = path.split(".")
+            last = len(keys) - 1
+            stack = [(resource, 0)]
+            while stack:
+                node, depth = stack.pop()
+                if isinstance(node, list):
+                    stack.extend((_own(node, i, owned), depth) for i in range(len(node)))
+                elif isinstance(node, dict) and keys[depth] in node:
+                    if depth < last:
+                        stack.append((_own(node, keys[depth], owned), depth + 1))
+                    elif isinstance(node[keys[depth]], (dict, list)):
+                        node[keys[depth]] = deepcopy(node[keys[depth]])
+    return resource
+
+
+def _own_root(resource, owned: Dict[int, Any]):
+    if isinstance(resource, (dict, list)) and id(resource) not in owned:
+        resource = resource.copy()
+        owned[id(resource)] = resource
+    return resource
+
+
+def _own(container, key, owned: Dict[int, Any]):
+    """container[key], swapped for a shallow copy the first time it is reached.
+
+    owned maps the id of every copy made to the copy, which also keeps the
+    ids from being reused while the walk is in progress.
+    """
+    child = container[key]
+    if isinstance(child, (dict, list)) and id(child) not in owned:
+        child = child.copy()
+        container[key] = child
+        owned[id(child)] = child
+    return child
+
+
+class NormalizationPlan:
+    """The prep_resource() steps of one ResourceConfig, with every path pre-split.
+
+    apply() does exactly what remove_excluded_attr, remove_non_nullable_attributes
+    and remove_non_nullable_list_vals do, in the same order, but walks each
+    path with an explicit stack instead of recursing and re-parsing it.
+    applied_copy() does the same to a copy that only duplicates the
+    containers on those paths.
+    """
+
+    __slots__ = ("sources", "excluded", "non_nullable", "list_vals")
+
+    def __init__(self, resource_config) -> None:
+        excluded_attributes = resource_config.excluded_attributes
+        non_nullable_attr = resource_config.non_nullable_attr
+        null_values = resource_config.null_values
+        non_nullable_list_vals = resource_config.non_nullable_list_vals
+        # The attributes the plan was compiled from; a reassigned one means a recompile.
+        self.sources = (excluded_attributes, non_nullable_attr, null_values, non_nullable_list_vals)
+        self.excluded: Tuple[Tuple[str, ...], ...] = ()
+        if excluded_attributes:
+            self.excluded = tuple(tuple(re.findall("\\['(.*?)'\\]", key)) for key in excluded_attributes)
+        # (path, whether null_values has an entry for the leaf, that entry)
+        self.non_nullable: Tuple[Tuple[Tuple[str, ...], bool, Any], ...] = ()
+        if non_nullable_attr:
+            compiled = []
+            for key in non_nullable_attr:
+                path = tuple(key.split("."))
+                has_nulls = bool(null_values) and path[-1] in null_values
+                compiled.append((path, has_nulls, null_values[path[-1]] if has_nulls else None))
+            self.non_nullable = tuple(compiled)
+        self.list_vals: Tuple[Tuple[Tuple[str, ...], Any], ...] = ()
+        if non_nullable_list_vals:
+            self.list_vals = tuple((tuple(key.split(".")), val) for key, val in non_nullable_list_vals)
+
+    def compiled_from(self, resource_config) -> bool:
+        current = (
+            resource_config.excluded_attributes,
+            resource_config.non_nullable_attr,
+            resource_config.null_values,
+            resource_config.non_nullable_list_vals,
+        )
+        return all(a is b for a, b in zip(self.sources, current))
+
+    def apply(self, resource, owned: Optional[Dict[int, Any]] = None) -> None:
+        # With owned, every container is copied (see _own) before it is
+        # changed or walked through; resource itself must already be a copy.
+        for path in self.excluded:
+            self._drop_attr(path, resource, owned)
+        for path, has_nulls, nulls in self.non_nullable:
+            self._drop_null_attr(path, has_nulls, nulls, resource, owned)
+        for path, val in self.list_vals:
+            self._drop_list_val(path, val, resource, owned)
+
+    def applied_copy(self, resource):
+        owned: Dict[int, Any] = {}
+        resource = _own_root(resource, owned)
+        self.apply(resource, owned)
+        return resource
+
+    @staticmethod
+    def _drop_attr(path, resource, owned=None) -> None:
+        # del_attr: lists are descended into at every level.
+        last = len(path) - 1
+        stack = [(resource, 0)]
+        while stack:
+            node, depth = stack.pop()
+            if isinstance(node, list):
+                if owned is None:
+                    stack.extend((item, depth) for item in node)
+                else:
+                    stack.extend((_own(node, i, owned), depth) for i in range(len(node)))
+                continue
+            key = path[depth]
+            if depth == last:
+                node.pop(key, None)
+            elif key in node:
+                stack.append((node[key] if owned is None else _own(node, key, owned), depth + 1))
+
+    @staticmethod
+    def _drop_null_attr(path, has_nulls, nulls, resource, owned=None) -> None:
+        # del_null_attr: a list is unwrapped one level at each step.
+        last = len(path) - 1
+        stack = [(resource, 0)]
+        while stack:
+            node, depth = stack.pop()
+            key = path[depth]
+            if not isinstance(node, list):
+                items = (node,)
+            elif owned is None:
+                items = node
+            else:
+                items = [_own(node, i, owned) for i in range(len(node))]
+            for item in items:
+                if depth == last:
+                    # the nulls get converted to "something", this converts them back
+                    if has_nulls and key in item and item[key] in nulls:
+                        item[key] = None
+                    if key in item and item[key] is None:
+                        item.pop(key, None)
+                elif key in item and item[key] is not None:
+                    stack.append((item[key] if owned is None else _own(item, key, owned), depth + 1))
+
+    @staticmethod
+    def _drop_list_val(path, val, resource, owned=None) -> None:
+        # del_list_val
+        key = None
+        for key in path:
+            resource = resource[key] if owned is None else _own(resource, key, owned)
+        if not isinstance(resource, list):
+            log.error(f"resource: {resource} is not a list")
+        try:
+            index_of_val = resource.index(val)
+            resource.pop(index_of_val)
+            log.debug(f"Removed {val} from list {key}")
+        except ValueError as err:
+            log.debug(f"{val} not in list {key}, err: {err}")
+
+
+def normalization_plan(resource_config) -> NormalizationPlan:
+    """The NormalizationPlan of resource_config, compiled on first use and kept on it.
+
+    Recompiled if one of the attributes it reads has been reassigned; the
+    lists and dicts themselves are not expected to change in place.
+    """
+    plan = getattr(resource_config, "_normalization_plan", None)
+    if not isinstance(plan, NormalizationPlan) or not plan.compiled_from(resource_config):
+        plan = NormalizationPlan(resource_config)
+        resource_config._normalization_plan = plan
+    return plan
 
 
 def remove_excluded_attr(resource_config, resource):
@@ -292,6 +490,9 @@ def del_null_attr(resource_config, k_list, resources):
 
 
 def check_diff(resource_config, resource, state):
+    if resources_match(resource_config, resource, state):
+        # Same fingerprint: DeepDiff would report nothing, so skip it.
+        return {}
     diff = DeepDiff(
         resource,
         state,
@@ -302,6 +503,162 @@ def check_diff(resource_config, resource, state):
     return diff
 
 
+class _Unfingerprintable(Exception):
+    pass
+
+
+class FingerprintSpec:
+    """What check_diff() ignores for one ResourceConfig, compiled for fingerprinting.
+
+    Two resources with the same fingerprint are ones DeepDiff reports no
+    differences for: dicts are compared key by key minus the excluded paths
+    (exclude_paths and excluded_attributes, plus exclude_regex_paths), and
+    lists as multisets under ignore_order. Values are typed, so 1, 1.0 and
+    True never collide. The converse does not hold (DeepDiff also ignores
+    repeated list items), so a mismatch only means DeepDiff has to run.
+    """
+
+    # deep_diff_config keys the fingerprint knows how to honor; any other
+    # (custom_operators, ...) turns the fast path off for the config.
+    SUPPORTED_OPTIONS = frozenset(("ignore_order", "exclude_paths", "exclude_regex_paths"))
+
+    __slots__ = ("sources", "enabled", "ignore_order", "excluded", "regexes")
+
+    def __init__(self, resource_config) -> None:
+        excluded_attributes = resource_config.excluded_attributes
+        deep_diff_config = resource_config.deep_diff_config or {}
+        self.sources = (excluded_attributes, resource_config.deep_diff_config)
+        self.enabled = set(deep_diff_config) <= self.SUPPORTED_OPTIONS
+        self.ignore_order = bool(deep_diff_config.get("ignore_order", False))
+        # Excluded paths as a trie of dict keys; None marks an excluded leaf.
+        # DeepDiff matches them exactly, so they never apply below a list.
+        self.excluded: Dict[str, Any] = {}
+        for key in list(excluded_attributes or []) + list(deep_diff_config.get("exclude_paths") or []):
+            node = self.excluded
+            path = re.findall("\\['(.*?)'\\]", key)
+            for i, part in enumerate(path):
+                if i == len(path) - 1:
+                    node[part] = None
+                elif node.get(part, {}) is not None:
+                    node = node.setdefault(part, {})
+                else:
+                    break
+        self.regexes = [re.compile(r) for r in deep_diff_config.get("exclude_regex_paths") or []]
+
+    def compiled_from(self, resource_config) -> bool:
+        current = (resource_config.excluded_attributes, resource_config.deep_diff_config)
+        return all(a is b for a, b in zip(self.sources, current))
+
+    def fingerprint(self, resource, diffable_only: bool = True) -> Optional[str]:
+        if diffable_only and not self.enabled:
+            return None
+        try:
+            return self._digest(resource, self.excluded, "root" if self.regexes else None).hex()
+        except (_Unfingerprintable, TypeError, RecursionError):
+            return None
+
+    def _digest(self, node, excluded, path) -> bytes:
+        # excluded is the trie node for this dict path (or None below a list);
+        # path is DeepDiff's path string, only tracked for exclude_regex_paths.
+        kind = type(node)
+        if kind is dict:
+            parts = [b"d"]
+            for key in sorted(node):
+                if type(key) is not str:
+                    raise _Unfingerprintable()
+                sub = excluded
+                if excluded:
+                    if key in excluded and excluded[key] is None:
+                        continue
+                    sub = excluded.get(key)
+                child = None
+                if path is not None:
+                    child = f"{path}[{key!r}]"
+                    if any(r.search(child) for r in self.regexes):
+                        continue
+                parts.append(self._digest(key, None, None))
+                parts.append(self._digest(node[key], sub, child))
+            return _hash(b"".join(parts))
+        if kind is list:
+            items = [self._digest(item, None, None if path is None else f"{path}[{i}]") for i, item in enumerate(node)]
+            if self.ignore_order:
+                items.sort()
+            return _hash(b"l" + b"".join(items))
+        if kind is str:
+            return _hash(b"s" + node.encode("utf-8", "surrogatepass"))
+        if kind is bool:
+            return _hash(b"b1" if node else b"b0")
+        if kind is int:
+            return _hash(b"i" + str(node).encode())
+        if kind is float:
+            if node != node:
+                # NaN never equals itself in DeepDiff.
+                raise _Unfingerprintable()
+            return _hash(b"f" + repr(node).encode())
+        if node is None:
+            return _hash(b"n")
+        raise _Unfingerprintable()
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def fingerprint_spec(resource_config) -> FingerprintSpec:
+    """The FingerprintSpec of resource_config, compiled on first use and kept on it."""
+    spec = getattr(resource_config, "_fingerprint_spec", None)
+    if not isinstance(spec, FingerprintSpec) or not spec.compiled_from(resource_config):
+        spec = FingerprintSpec(resource_config)
+        resource_config._fingerprint_spec = spec
+    return spec
+
+
+def resource_fingerprint(resource_config, resource) -> Optional[str]:
+    """Order-insensitive structural hash of resource as check_diff() compares it.
+
+    None when the config's deep_diff_config has options the fingerprint
+    cannot honor, or the resource holds values it cannot hash.
+    """
+    return fingerprint_spec(resource_config).fingerprint(resource)
+
+
+def source_fingerprint(resource_config, resource) -> Optional[str]:
+    """Structural hash of resource for --skip-unchanged.
+
+    Like resource_fingerprint(), but only ever compared with itself, so it
+    is available whatever the config's deep_diff_config holds.
+    """
+    return fingerprint_spec(resource_config).fingerprint(resource, diffable_only=False)
+
+
+def content_hash(resource) -> Optional[str]:
+    """Hash of resource's exact content (--cache-dependency-graph); None if it cannot be serialized.
+
+    marshal is several times faster than json.dumps for this. Format
+    version 2 predates back-references, so how objects happen to be shared
+    does not change the bytes. Equal content may still serialize differently
+    (key order), which only costs a cache miss; different content never
+    serializes the same.
+    """
+    try:
+        data = marshal.dumps(resource, 2)
+    except ValueError:
+        return None
+    return _hash(data).hex()
+
+
+def resources_match(resource_config, resource, state) -> bool:
+    """True if check_diff() would find no differences, known from fingerprints alone.
+
+    False means "unknown": DeepDiff has to decide.
+    """
+    spec = fingerprint_spec(resource_config)
+    if not spec.enabled:
+        return False
+    left = spec.fingerprint(resource)
+    return left is not None and left == spec.fingerprint(state)
+
+
 def init_topological_sorter(
     graph: Dict[Tuple[str, str], Set[Tuple[str, str]]],
 ) -> TopologicalSorter:
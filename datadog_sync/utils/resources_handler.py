@@ -12,24 +12,31 @@ from asyncio import Semaphore
 from collections import defaultdict
 from copy import deepcopy
 from time import sleep
-from typing import Dict, TYPE_CHECKING, List, Optional, Set, Tuple
+from typing import Dict, TYPE_CHECKING, List, Optional, Set, Tuple, Union
 
 from click import UsageError, confirm
 from pprint import pformat
 
-from datadog_sync.constants import LOGGER_NAME, TRUE, FALSE, FORCE, Command, Origin, Status
+from datadog_sync.constants import APPLY_PRIORITY_NONE, LOGGER_NAME, TRUE, FALSE, FORCE, Command, Origin, Status
 from datadog_sync.utils.resource_utils import (
     CustomClientHTTPError,
     FilteredResource,
     ResourceConnectionError,
     SkipResource,
     check_diff,
+    connection_copy,
+    copy_on_write_apply,
     create_global_downtime,
     find_attr,
     format_exc_for_log,
     prep_resource,
+    prepped_copy,
     init_topological_sorter,
+    source_fingerprint,
 )
+from datadog_sync.utils.adaptive_concurrency import AdaptiveConcurrency, current_type_limiter
+from datadog_sync.utils.dependency_dispatcher import DependencyDispatcher, compute_priorities
+from datadog_sync.utils.dependency_graph_cache import DependencyGraphCache
 from datadog_sync.utils.sync_report import ResourceOutcome
 from datadog_sync.utils.workers import Workers
 
@@ -186,10 +193,20 @@ def _list_time_filter_passes(r_class, config, resource) -> bool:
 class ResourcesHandler:
     def __init__(self, config: Configuration) -> None:
         self.config = config
-        self.sorter: Optional[TopologicalSorter] = None
-        self.cleanup_sorter: Optional[TopologicalSorter] = None
+        # TopologicalSorter under --worker-scheduler=polling (fed by
+        # run_sorter/run_cleanup_sorter), DependencyDispatcher otherwise.
+        # Workers only ever call done()/is_active() on either.
+        self.sorter: Optional[Union[TopologicalSorter, DependencyDispatcher]] = None
+        self.cleanup_sorter: Optional[Union[TopologicalSorter, DependencyDispatcher]] = None
         self.worker: Optional[Workers] = None
         self._dependency_graph: Optional[Dict[Tuple[str, str], Set[Tuple[str, str]]]] = None
+        # --skip-unchanged: connected source fingerprints of the graph nodes,
+        # and the nodes get_dependency_graph dropped as unchanged.
+        self._source_fingerprints: Dict[Tuple[str, str], Optional[str]] = {}
+        self._unchanged: Set[Tuple[str, str]] = set()
+        # Whether applies record/forget fingerprints: with --skip-unchanged,
+        # or when an earlier run stored some that applies may invalidate.
+        self._track_fingerprints = False
 
     @staticmethod
     def _sanitize_reason(err: Exception) -> Tuple[str, str]:
@@ -330,21 +347,30 @@ class ResourcesHandler:
                                 "Manual intervention required to break the cycle."
                             )
 
-                        # Initialize cleanup sorter
-                        self.cleanup_sorter = init_topological_sorter(cleanup_graph)
-
-                        # Initialize workers with cleanup sorter stop condition
+                        # Initialize cleanup sorter and workers with its stop condition.
+                        # Event-driven workers get a push dispatcher seeded after
+                        # init_workers (which swaps in a fresh work queue); the
+                        # polling scheduler keeps the run_cleanup_sorter feeder.
+                        if self.worker.event_driven:
+                            self.cleanup_sorter = DependencyDispatcher(cleanup_graph, self._dispatch_cleanup_node)
+                        else:
+                            self.cleanup_sorter = init_topological_sorter(cleanup_graph)
                         await self.worker.init_workers(
                             self._cleanup_worker, lambda: not self.cleanup_sorter.is_active(), None
                         )
+                        if self.worker.event_driven:
+                            self.cleanup_sorter.start()
+                            feeders = []
+                        else:
+                            feeders = [self.run_cleanup_sorter()]
 
                         # Run cleanup with ordering
                         if self.config.show_progress_bar:
                             await self.worker.schedule_workers_with_pbar(
-                                total=len(cleanup_graph), additional_coros=[self.run_cleanup_sorter()]
+                                total=len(cleanup_graph), additional_coros=feeders
                             )
                         else:
-                            await self.worker.schedule_workers(additional_coros=[self.run_cleanup_sorter()])
+                            await self.worker.schedule_workers(additional_coros=feeders)
 
                         self.config.logger.info("finished cleaning up resources")
 
@@ -386,18 +412,36 @@ class ResourcesHandler:
         if self.config.create_global_downtime:
             await create_global_downtime(self.config)
 
-        self._maybe_refresh_destination_state(resource_types)
+        await self._maybe_refresh_destination_state(resource_types)
 
-        # initalize topological sorters
-        self.sorter = init_topological_sorter(self._dependency_graph)
+        self._start_tracking_fingerprints(resource_types)
+
+        # initalize topological sorters. Under the event-driven scheduler,
+        # _apply_resource_cb's sorter.done() pushes newly unblocked dependents
+        # straight onto the work queue; no feeder coroutine is needed.
+        if self.worker.event_driven:
+            priority, capacity = self._apply_priorities()
+            self.sorter = DependencyDispatcher(
+                self._dependency_graph, self._dispatch_apply_node, priority=priority, capacity=capacity
+            )
+        else:
+            if self.config.apply_priority != APPLY_PRIORITY_NONE:
+                self.config.logger.warning("--apply-priority is ignored with --worker-scheduler=polling")
+            self.sorter = init_topological_sorter(self._dependency_graph)
         await self.worker.init_workers(self._apply_resource_cb, lambda: not self.sorter.is_active(), None)
+        if self.worker.event_driven:
+            self.sorter.start()
+            feeders = []
+        else:
+            feeders = [self.run_sorter()]
         if self.config.show_progress_bar:
             await self.worker.schedule_workers_with_pbar(
-                total=len(self._dependency_graph), additional_coros=[self.run_sorter()]
+                total=len(self._dependency_graph), additional_coros=feeders
             )
         else:
-            await self.worker.schedule_workers(additional_coros=[self.run_sorter()])
+            await self.worker.schedule_workers(additional_coros=feeders)
         self.worker.counter.filtered = filtered_count
+        self.worker.counter.skipped += len(self._unchanged)
         self.config.logger.info(f"finished syncing resource items: {self.worker.counter}.")
 
         # Persist state BEFORE emitting the summary logs. If the logger backend
@@ -422,7 +466,29 @@ class ResourcesHandler:
                 "sync summary emission failed: %s. State was already persisted.", e
             )
 
-    def _maybe_refresh_destination_state(self, resource_types) -> None:
+    def _apply_priorities(self) -> Tuple[Optional[Dict[Tuple[str, str], int]], Optional[int]]:
+        """Node scores and outstanding-node cap for --apply-priority.
+
+        (None, None) keeps plain FIFO release. Otherwise at most max_workers
+        nodes are handed to the work queue at a time, so each freed worker
+        takes the highest-scoring ready node rather than whatever was
+        released first.
+        """
+        strategy = self.config.apply_priority
+        if strategy == APPLY_PRIORITY_NONE:
+            return None, None
+        start_ns = time.perf_counter_ns()
+        priority = compute_priorities(self._dependency_graph, strategy)
+        _timing_log.info(
+            "sync-cli-timing phase=apply_priority strategy=%s nodes=%d max_priority=%d wall_ms=%d",
+            strategy,
+            len(priority),
+            max(priority.values(), default=0),
+            (time.perf_counter_ns() - start_ns) // 1_000_000,
+        )
+        return priority, self.config.max_workers
+
+    async def _maybe_refresh_destination_state(self, resource_types) -> None:
         """Optional refresh of state.destination before workers dispatch.
 
         Guarded by ``--refresh-destination-state-before-apply``. Motivating
@@ -433,13 +499,14 @@ class ResourcesHandler:
         then miss ids that are on disk but not in memory. This refresh picks
         up those late-arriving blobs. See State.reload_destination for
         insert-if-absent semantics. Never fails apply — logs and proceeds
-        with the pre-refresh state on error.
+        with the pre-refresh state on error. The storage read runs off the
+        event loop.
         """
         if not self.config.refresh_destination_state_before_apply:
             return
         refresh_start = time.perf_counter()
         try:
-            added = self.config.state.reload_destination(sorted(resource_types))
+            added = await self.config.state.reload_destination_async(sorted(resource_types))
             total_new = sum(added.values())
             self.config.logger.info(
                 "sync-cli-timing phase=reload_destination types=%d new_entries=%d wall_ms=%d",
@@ -469,14 +536,32 @@ class ResourcesHandler:
         lock_acquired = False
         sem = None
         sem_acquired = False
+        type_limiter_token = None
 
         try:
             r_class = self.config.resources[resource_type]
-            resource = deepcopy(self.config.state.source[resource_type][_id])
+            # With copy_on_write_apply the hooks only remap connections, so
+            # the working copy shares everything else with source state until
+            # a create or update needs a resource of its own.
+            shared = copy_on_write_apply(r_class.resource_config)
+            if shared:
+                resource = connection_copy(r_class.resource_config, self.config.state.source[resource_type][_id])
+            else:
+                resource = deepcopy(self.config.state.source[resource_type][_id])
+            adaptive = self.config.adaptive_concurrency
 
             if not r_class.resource_config.concurrent:
                 await r_class.resource_config.async_lock.acquire()
                 lock_acquired = True
+            elif isinstance(adaptive, AdaptiveConcurrency):
+                # --adaptive-concurrency: an AIMD limiter capped at the static
+                # max_concurrent stands in for the fixed semaphore. The
+                # ContextVar lets request_with_retry feed 429/overload
+                # responses from this apply back into the same limiter.
+                sem = adaptive.type_limiter(resource_type, r_class.resource_config.max_concurrent)
+                await sem.acquire()
+                sem_acquired = True
+                type_limiter_token = current_type_limiter.set(sem)
             elif isinstance(getattr(r_class.resource_config, "async_semaphore", None), Semaphore):
                 # Per-resource-type concurrency cap (see ResourceConfig.max_concurrent).
                 # Acquire the semaphore only for concurrent-safe types — if
@@ -500,16 +585,21 @@ class ResourcesHandler:
             if empty_binding_escalation:
                 success_metric_tags.append("risk:empty_restriction_policy")
 
-            prep_resource(r_class.resource_config, resource)
+            if shared:
+                resource = prepped_copy(r_class.resource_config, resource)
+            else:
+                prep_resource(r_class.resource_config, resource)
             if _id in self.config.state.destination[resource_type]:
-                destination_copy = deepcopy(self.config.state.destination[resource_type][_id])
-                prep_resource(r_class.resource_config, destination_copy)
+                destination_copy = prepped_copy(
+                    r_class.resource_config, self.config.state.destination[resource_type][_id]
+                )
                 diff = check_diff(r_class.resource_config, resource, destination_copy)
                 if not diff:
+                    self._note_applied(resource_type, _id)
                     raise SkipResource(_id, resource_type, "No differences detected.")
 
                 self.config.logger.debug(f"Running update for {resource_type} with {_id}")
-                await r_class._update_resource(_id, resource)
+                await r_class._update_resource(_id, deepcopy(resource) if shared else resource)
                 if empty_binding_escalation:
                     self.worker.counter.record_empty_binding_escalation(resource_type=resource_type, _id=_id)
                 await r_class._send_action_metrics(
@@ -522,7 +612,7 @@ class ResourcesHandler:
                 self._emit(resource_type, _id, "sync", "success", "update")
             else:
                 self.config.logger.debug(f"Running create for {resource_type} with id: {_id}")
-                await r_class._create_resource(_id, resource)
+                await r_class._create_resource(_id, deepcopy(resource) if shared else resource)
                 if empty_binding_escalation:
                     self.worker.counter.record_empty_binding_escalation(resource_type=resource_type, _id=_id)
                 await r_class._send_action_metrics(
@@ -534,6 +624,7 @@ class ResourcesHandler:
                 self.config.logger.debug(f"finished create for {resource_type} with id: {_id}")
                 self._emit(resource_type, _id, "sync", "success", "create")
 
+            self._note_applied(resource_type, _id)
             self.worker.counter.increment_success()
 
         except SkipResource as e:
@@ -543,6 +634,7 @@ class ResourcesHandler:
             self._emit(resource_type, _id, "sync", "skipped", reason=_reason, failure_class=_fc)
             await r_class._send_action_metrics(Command.SYNC.value, _id, Status.SKIPPED.value, tags=["reason:unknown"])
         except ResourceConnectionError as e:
+            self._forget_applied(resource_type, _id)
             self.config.logger.error(
                 f"missing connections: {str(e)}",
                 resource_type=resource_type,
@@ -569,6 +661,7 @@ class ResourcesHandler:
                 self.worker.counter.record_empty_binding_risk(resource_type=resource_type, _id=_id)
             await r_class._send_action_metrics(Command.SYNC.value, _id, Status.SKIPPED.value, tags=extra_tags)
         except Exception as e:
+            self._forget_applied(resource_type, _id)
             # Track the source id in the counter's failed-ids bucket so
             # apply_resources can emit a targeted per-type summary at the
             # end of the run.
@@ -587,6 +680,8 @@ class ResourcesHandler:
                 # Only release if acquire() actually returned; guards against
                 # cancellation mid-await inflating the semaphore's slot count.
                 sem.release()
+            if type_limiter_token is not None:
+                current_type_limiter.reset(type_limiter_token)
 
     async def diffs(self) -> None:
         self._dependency_graph, _, _ = self.get_dependency_graph()
@@ -652,10 +747,10 @@ class ResourcesHandler:
                 try:
                     if _id in self.config.state.destination[resource_type]:
                         # We have to compare the prepared versions to deal w/ non-nullable attributes
-                        destination_copy = deepcopy(self.config.state.destination[resource_type][_id])
-                        resource_copy = deepcopy(resource)
-                        prep_resource(r_class.resource_config, destination_copy)
-                        prep_resource(r_class.resource_config, resource_copy)
+                        destination_copy = prepped_copy(
+                            r_class.resource_config, self.config.state.destination[resource_type][_id]
+                        )
+                        resource_copy = prepped_copy(r_class.resource_config, resource)
                         diff = check_diff(r_class.resource_config, destination_copy, resource_copy)
                         if diff:
                             self.config.logger.info(
@@ -699,6 +794,10 @@ class ResourcesHandler:
     async def import_resources_without_saving(self) -> None:
         self.config.state.clear_source_authoritative(self.config.resources_arg)
 
+        if self._streaming_import_enabled():
+            await self._import_resources_streaming()
+            return
+
         # Get all resources for each resource type
         tmp_storage = defaultdict(list)
         api_discovery_start_ns = time.perf_counter_ns()
@@ -738,7 +837,9 @@ class ResourcesHandler:
             await self.worker.schedule_workers_with_pbar(total=total)
         else:
             await self.worker.schedule_workers()
-        import_failures = self.worker.counter.failure
+        self._finish_import(get_failures, self.worker.counter.failure, total, per_resource_start_ns)
+
+    def _finish_import(self, get_failures: int, import_failures: int, total: int, per_resource_start_ns: int) -> None:
         if get_failures == 0 and import_failures == 0:
             # Only types WITHOUT an id-file scoping are authoritative after this
             # import — types with id_payload only fetched the requested subset,
@@ -783,6 +884,90 @@ class ResourcesHandler:
                 self.config.logger.warning(f"failed to dump_state before fatal exit: {e}")
             sys.exit(1)
 
+    def _streaming_import_enabled(self) -> bool:
+        # --id-file already fetches per ID, and the polling scheduler cannot
+        # tell an idle pool from one whose producers are still listing.
+        return (
+            getattr(self.config, "streaming_import", False) is True
+            and not self.config.id_payload
+            and self.worker.event_driven
+        )
+
+    async def _import_resources_streaming(self) -> None:
+        """--streaming-import: overlap listing with per-resource imports.
+
+        One producer per resource type walks r_class.iter_resources() and
+        queues each listed item for _import_resource as soon as its page
+        arrives. `slots` bounds listed-but-not-yet-imported items, so peak
+        memory is a few pages per producer rather than the whole org listing.
+        """
+        producers_done = False
+        list_failures = []
+        slots = asyncio.Semaphore(max(1, self.config.max_workers) * 2)
+        listers = asyncio.Semaphore(max(1, min(len(self.config.resources_arg), self.config.max_workers)))
+
+        async def import_cb(q_item) -> None:
+            try:
+                await self._import_resource(q_item)
+            finally:
+                slots.release()
+
+        async def produce(resource_type: str) -> None:
+            async with listers:
+                if not await self._stream_resources_of_type(resource_type, slots):
+                    list_failures.append(resource_type)
+
+        async def produce_all() -> None:
+            nonlocal producers_done
+            try:
+                await asyncio.gather(*(produce(rt) for rt in self.config.resources_arg))
+            finally:
+                producers_done = True
+
+        self.config.logger.info("getting and importing resources (streaming)")
+        start_ns = time.perf_counter_ns()
+        await self.worker.init_workers(import_cb, lambda: producers_done and self.worker.queue_drained(), None)
+        if self.config.show_progress_bar:
+            await self.worker.schedule_workers_with_pbar(total=None, additional_coros=[produce_all()])
+        else:
+            await self.worker.schedule_workers(additional_coros=[produce_all()])
+
+        counter = self.worker.counter
+        # The counter also holds one failure per type that failed to list.
+        total = counter.successes + counter.failure + counter.skipped + counter.filtered - len(list_failures)
+        self.config.logger.info(f"Finished getting resources. {len(list_failures)} resource type(s) failed to list")
+        _timing_log.info(
+            "sync-cli-timing phase=api_discovery resource_types=%d successes=%d failures=%d wall_ms=%d streaming=true",
+            len(self.config.resources_arg),
+            len(self.config.resources_arg) - len(list_failures),
+            len(list_failures),
+            (time.perf_counter_ns() - start_ns) // 1_000_000,
+        )
+        self._finish_import(len(list_failures), counter.failure, total, start_ns)
+
+    async def _stream_resources_of_type(self, resource_type: str, slots: asyncio.Semaphore) -> bool:
+        """Queue every listed resource of one type for import. False when the
+        listing failed (reported like _import_get_resources_cb's legacy path)."""
+        self.config.logger.info("getting resources", resource_type=resource_type)
+        r_class = self.config.resources[resource_type]
+        self.config.state.clear_source_type(resource_type)
+        try:
+            async for page in r_class.iter_resources(self.config.source_client):
+                for resource in page:
+                    await slots.acquire()
+                    self.worker.work_queue.put_nowait((resource_type, resource))
+            return True
+        except (asyncio.TimeoutError, TimeoutError):
+            self.worker.counter.increment_failure()
+            self._emit(resource_type, "", "import", "failure", reason="TimeoutError", failure_class="http_timeout")
+            self.config.logger.error(f"TimeoutError while getting resources {resource_type}")
+        except Exception as e:
+            self.worker.counter.increment_failure()
+            _reason, _fc = self._sanitize_reason(e)
+            self._emit(resource_type, "", "import", "failure", reason=_reason, failure_class=_fc)
+            self.config.logger.error(f"Error while getting resources {resource_type}: {str(e)}")
+        return False
+
     async def _import_get_resources_cb(self, resource_type: str, tmp_storage) -> None:
         self.config.logger.info("getting resources", resource_type=resource_type)
 
@@ -1068,7 +1253,7 @@ class ResourcesHandler:
         r_class = self.config.resources[resource_type]
         if not r_class.resource_config.resource_connections:
             return deps
-        resource = deepcopy(self.config.state.source[resource_type][_id])
+        resource = self.config.state.source[resource_type][_id]
         for dep_type, paths in r_class.resource_config.resource_connections.items():
             for path in paths:
                 if not path:
@@ -1227,7 +1412,7 @@ class ResourcesHandler:
             )
             return
 
-        failed_connections, missing_deps = self._resource_connections(resource_type, _id)
+        failed_connections, missing_deps = await self._resource_connections_async(resource_type, _id)
         self._dependency_graph[q_item] = failed_connections
         for missing_id in missing_deps:
             self.worker.work_queue.put_nowait(missing_id)
@@ -1283,61 +1468,73 @@ class ResourcesHandler:
         except Exception as e:
             self.config.logger.warning(f"error while running pre-apply hook: {str(e)}", resource_type=resource_type)
 
+    def _skip_apply_node(self, node: Tuple[str, str]) -> bool:
+        """True if an apply-graph node must be marked done without being run."""
+        if node[1] not in self.config.state.source[node[0]]:
+            # at this point, we already attempted to import missing resources
+            # so mark the node as complete and continue
+            return True
+        if (
+            self.config.state._minimize_reads
+            and node[0] not in self.config.resources_arg
+            and node[1] in self.config.state.destination[node[0]]
+        ):
+            # --minimize-reads + out-of-scope dep whose destination
+            # is already resolved: safe to skip, and unsafe NOT to.
+            #
+            # In minimize-reads mode, only resources_arg types are
+            # fully loaded up-front. Cross-type dependencies (e.g.
+            # a dashboard's monitor references) get their
+            # destination state populated one-at-a-time via
+            # state.ensure_resource_loaded inside
+            # _resource_connections. That call loads the dep
+            # itself but is NOT recursive — the dep's OWN
+            # references (e.g. a monitor's restricted_roles →
+            # roles) are not lazy-loaded.
+            #
+            # If we dispatched such a dep to _apply_resource_cb,
+            # its connect_resources() would look up its own
+            # references in an empty state.destination and raise
+            # "missing connections" — a spurious error, since the
+            # parent that needs this dep only needs the dep's
+            # destination-side mapping (a lookup), not a
+            # re-application. Skipping keeps the parent's remap
+            # working while avoiding the spurious error.
+            #
+            # We deliberately DO NOT skip:
+            #   * when _minimize_reads is False — the full load
+            #     populated every type's state, so the dep's
+            #     connect_resources() would succeed; skipping
+            #     would regress full-load runs whose tests /
+            #     users expect transitive nodes to be applied.
+            #   * when destination[node[0]][node[1]] is absent —
+            #     that is the --force-missing-dependencies flow,
+            #     where _force_missing_dep_import_cb added the
+            #     dep to the graph precisely so run_sorter would
+            #     create it before its parents. Skipping there
+            #     would leave the parent's connect_resources()
+            #     to fail.
+            self.config.logger.debug(
+                "run_sorter: skipping dep-only node %s:%s "
+                "(minimize-reads; type not in resources_arg; destination already resolved)",
+                node[0],
+                node[1],
+            )
+            return True
+        return False
+
+    def _dispatch_apply_node(self, node: Tuple[str, str]) -> None:
+        """DependencyDispatcher on_ready callback for the apply graph."""
+        if self._skip_apply_node(node):
+            self.sorter.done(node)
+            return
+        self.worker.work_queue.put_nowait(node)
+
     async def run_sorter(self):
         loop = asyncio.get_event_loop()
         while await loop.run_in_executor(None, self.sorter.is_active):
             for node in self.sorter.get_ready():
-                if node[1] not in self.config.state.source[node[0]]:
-                    # at this point, we already attempted to import missing resources
-                    # so mark the node as complete and continue
-                    self.sorter.done(node)
-                    continue
-                if (
-                    self.config.state._minimize_reads
-                    and node[0] not in self.config.resources_arg
-                    and node[1] in self.config.state.destination[node[0]]
-                ):
-                    # --minimize-reads + out-of-scope dep whose destination
-                    # is already resolved: safe to skip, and unsafe NOT to.
-                    #
-                    # In minimize-reads mode, only resources_arg types are
-                    # fully loaded up-front. Cross-type dependencies (e.g.
-                    # a dashboard's monitor references) get their
-                    # destination state populated one-at-a-time via
-                    # state.ensure_resource_loaded inside
-                    # _resource_connections. That call loads the dep
-                    # itself but is NOT recursive — the dep's OWN
-                    # references (e.g. a monitor's restricted_roles →
-                    # roles) are not lazy-loaded.
-                    #
-                    # If we dispatched such a dep to _apply_resource_cb,
-                    # its connect_resources() would look up its own
-                    # references in an empty state.destination and raise
-                    # "missing connections" — a spurious error, since the
-                    # parent that needs this dep only needs the dep's
-                    # destination-side mapping (a lookup), not a
-                    # re-application. Skipping keeps the parent's remap
-                    # working while avoiding the spurious error.
-                    #
-                    # We deliberately DO NOT skip:
-                    #   * when _minimize_reads is False — the full load
-                    #     populated every type's state, so the dep's
-                    #     connect_resources() would succeed; skipping
-                    #     would regress full-load runs whose tests /
-                    #     users expect transitive nodes to be applied.
-                    #   * when destination[node[0]][node[1]] is absent —
-                    #     that is the --force-missing-dependencies flow,
-                    #     where _force_missing_dep_import_cb added the
-                    #     dep to the graph precisely so run_sorter would
-                    #     create it before its parents. Skipping there
-                    #     would leave the parent's connect_resources()
-                    #     to fail.
-                    self.config.logger.debug(
-                        "run_sorter: skipping dep-only node %s:%s "
-                        "(minimize-reads; type not in resources_arg; destination already resolved)",
-                        node[0],
-                        node[1],
-                    )
+                if self._skip_apply_node(node):
                     self.sorter.done(node)
                     continue
                 await self.worker.work_queue.put(node)
@@ -1372,6 +1569,16 @@ class ResourcesHandler:
 
             await asyncio.sleep(0)
 
+    def _dispatch_cleanup_node(self, node: Tuple[str, str]) -> None:
+        """DependencyDispatcher on_ready callback for the cleanup graph.
+        Same skip rule as run_cleanup_sorter()."""
+        resource_type, _id = node
+        if _id not in self.config.state.destination[resource_type]:
+            self.config.logger.debug(f"Resource {resource_type}:{_id} already deleted, marking as done")
+            self.cleanup_sorter.done(node)
+            return
+        self.worker.work_queue.put_nowait(node)
+
     def get_dependency_graph(
         self,
     ) -> Tuple[Dict[Tuple[str, str], Set[Tuple[str, str]]], Set[Tuple[str, str]], int]:
@@ -1383,6 +1590,10 @@ class ResourcesHandler:
         dependency_graph = {}
         missing_resources = set()
         filtered_out = set()
+        skip_unchanged = getattr(self.config, "skip_unchanged", False) is True
+        self._source_fingerprints = {}
+        graph_cache = None if skip_unchanged else self._dependency_graph_cache()
+        start = time.perf_counter()
 
         for (resource_type, _id), resource in self.config.state.get_all_resources(self.config.resources_arg).items():
             r_class = self.config.resources[resource_type]
@@ -1390,9 +1601,35 @@ class ResourcesHandler:
                 filtered_out.add((resource_type, _id))
                 continue
 
-            deps, missing = self._resource_connections(resource_type, _id)
-            dependency_graph[(resource_type, _id)] = deps
-            missing_resources.update(missing)
+            if skip_unchanged:
+                failed, connected = self._connect_source_copy(resource_type, _id)
+                self._source_fingerprints[(resource_type, _id)] = source_fingerprint(r_class.resource_config, connected)
+                dependency_graph[(resource_type, _id)] = failed
+            elif graph_cache:
+                resource_hash, failed = graph_cache.lookup(resource_type, _id, resource)
+                if failed is None:
+                    failed = self._failed_connections(resource_type, _id)
+                graph_cache.record(resource_type, _id, resource_hash, failed)
+                dependency_graph[(resource_type, _id)] = failed
+            else:
+                dependency_graph[(resource_type, _id)] = self._failed_connections(resource_type, _id)
+
+        if graph_cache:
+            graph_cache.save()
+            _timing_log.info(
+                "sync-cli-timing phase=dependency_cache resources=%d cache_hits=%d cache_misses=%d wall_ms=%d",
+                graph_cache.hits + graph_cache.misses,
+                graph_cache.hits,
+                graph_cache.misses,
+                int((time.perf_counter() - start) * 1000),
+            )
+
+        # With --minimize-reads, load every dependency found above in one
+        # batched, concurrent sweep instead of one storage round-trip per
+        # dependency (see _resource_connections).
+        self.config.state.ensure_resources_loaded(sorted({dep for deps in dependency_graph.values() for dep in deps}))
+        for deps in dependency_graph.values():
+            missing_resources.update(self._missing_connections(deps))
 
         # Emit filtered outcomes so --json consumers see which resources were excluded.
         for resource_type, _id in filtered_out:
@@ -1406,8 +1643,87 @@ class ResourcesHandler:
             for key in dependency_graph:
                 dependency_graph[key] = dependency_graph[key] - filtered_out
 
+        self._unchanged = self._drop_unchanged(dependency_graph) if skip_unchanged else set()
+
         return dependency_graph, missing_resources, len(filtered_out)
 
+    def _dependency_graph_cache(self) -> Optional[DependencyGraphCache]:
+        """The cache of get_dependency_graph() edges, or None when --cache-dependency-graph is off.
+
+        Also off under --minimize-reads (see DependencyGraphCache). Not asked
+        for with --skip-unchanged, which connects every resource anyway to
+        fingerprint it.
+        """
+        if getattr(self.config, "cache_dependency_graph", False) is not True:
+            return None
+        if self.config.state._minimize_reads:
+            self.config.logger.info("--cache-dependency-graph is not used with --minimize-reads")
+            return None
+        return DependencyGraphCache(self.config.state, self.config.resources)
+
+    def _drop_unchanged(self, dependency_graph: Dict[Tuple[str, str], Set[Tuple[str, str]]]) -> Set[Tuple[str, str]]:
+        """--skip-unchanged: remove from the graph the nodes already applied as they are now.
+
+        A node is unchanged when its connected source (dependency IDs remapped
+        to the destination's) has the fingerprint recorded when it was last
+        applied, none of its dependencies is waiting to be created, and its
+        destination entry still exists. Its destination entry stays in state,
+        so dependents still resolve it.
+        """
+        start = time.perf_counter()
+        state = self.config.state
+        unchanged = set()
+        # applied_fingerprints() is an empty map, read from nowhere, for the
+        # types without stored fingerprints: nothing of those is dropped.
+        for node, deps in dependency_graph.items():
+            resource_type, _id = node
+            fingerprint = self._source_fingerprints.get(node)
+            if (
+                not deps
+                and fingerprint is not None
+                and state.applied_fingerprints(resource_type).get(_id) == fingerprint
+                and _id in state.destination[resource_type]
+            ):
+                unchanged.add(node)
+        for node in unchanged:
+            del dependency_graph[node]
+            self._emit(node[0], node[1], "sync", "skipped", reason="Source unchanged since last successful sync.")
+        _timing_log.info(
+            "sync-cli-timing phase=skip_unchanged resources=%d unchanged=%d wall_ms=%d",
+            len(dependency_graph) + len(unchanged),
+            len(unchanged),
+            int((time.perf_counter() - start) * 1000),
+        )
+        return unchanged
+
+    def _start_tracking_fingerprints(self, resource_types: Set[str]) -> None:
+        """Decide whether applies record fingerprints, and if so read the ones workers update.
+
+        Only with --skip-unchanged, or when fingerprints an apply could
+        invalidate are stored; otherwise no run pays for reading them.
+        """
+        state = self.config.state
+        self._track_fingerprints = self.config.skip_unchanged is True or bool(state.fingerprinted_types())
+        if self._track_fingerprints:
+            for resource_type in sorted(resource_types):
+                state.applied_fingerprints(resource_type)
+
+    def _note_applied(self, resource_type: str, _id: str) -> None:
+        """Record what was just applied for _id, so --skip-unchanged can skip it next time.
+
+        Without a fingerprint for it (--skip-unchanged off, or an unhashable
+        resource) the recorded one is dropped instead: it no longer describes
+        what the destination holds.
+        """
+        if self._track_fingerprints:
+            fingerprint = self._source_fingerprints.get((resource_type, _id))
+            self.config.state.record_applied_fingerprint(resource_type, _id, fingerprint)
+
+    def _forget_applied(self, resource_type: str, _id: str) -> None:
+        """Drop the fingerprint recorded for _id after a failed apply."""
+        if self._track_fingerprints:
+            self.config.state.record_applied_fingerprint(resource_type, _id, None)
+
     def _resource_connections(self, resource_type: str, _id: str) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
         """Returns the failed connections and missing resources for a given resource.
         Failed connections are all dependencies of given resource that is not in destination state.
@@ -1420,48 +1736,80 @@ class ResourcesHandler:
         Returns:
             Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]: failed_connections, missing_resources
         """
+        failed_connections = self._failed_connections(resource_type, _id)
+        # With --minimize-reads, dependency types may not be in the
+        # initial scoped load. Lazily load each dependency
+        # (source+destination) so the source check below is accurate,
+        # and so connect_resources() in _apply_resource_cb() can
+        # successfully remap the ID in the destination.
+        for resource_to_connect, f_id in failed_connections:
+            self.config.state.ensure_resource_loaded(resource_to_connect, f_id)
+        return failed_connections, self._missing_connections(failed_connections)
+
+    async def _resource_connections_async(
+        self, resource_type: str, _id: str
+    ) -> Tuple[Set[Tuple[str, str]], Set[Tuple[str, str]]]:
+        """_resource_connections() for worker coroutines.
+
+        The --minimize-reads loads that connect_id and the dependency check
+        ask for are deferred and awaited off the event loop, so a slow
+        storage read doesn't stall the other workers' API calls.
+        """
+        state = self.config.state
+        with state.deferring_loads() as deferred:
+            failed_connections = self._failed_connections(resource_type, _id)
+        if deferred:
+            # connect_id needed entries that weren't loaded yet; look again once they are.
+            await state.load_deferred_async(deferred)
+            failed_connections = self._failed_connections(resource_type, _id)
+        await state.ensure_resources_loaded_async(failed_connections)
+        return failed_connections, self._missing_connections(failed_connections)
+
+    def _failed_connections(self, resource_type: str, _id: str) -> Set[Tuple[str, str]]:
+        """All dependencies of the given resource that connect_id could not resolve in destination state."""
+        return self._connect_source_copy(resource_type, _id)[0]
+
+    def _connect_source_copy(self, resource_type: str, _id: str) -> Tuple[Set[Tuple[str, str]], Dict]:
+        """_failed_connections(), plus the source resource with its connections remapped.
+
+        The resource returned is a copy, unless the type has no connections
+        to remap: then it is the source state entry itself, not to be mutated.
+        """
         failed_connections = set()
-        missing_resources = set()
 
         if not self.config.resources[resource_type].resource_config.resource_connections:
-            return failed_connections, missing_resources
-
-        resource = deepcopy(self.config.state.source[resource_type][_id])
-        if self.config.resources[resource_type].resource_config.resource_connections:
-            for resource_to_connect, v in self.config.resources[
-                resource_type
-            ].resource_config.resource_connections.items():
-                for attr_connection in v:
-                    failed = find_attr(
-                        attr_connection,
+            return failed_connections, self.config.state.source[resource_type][_id]
+
+        resource = connection_copy(
+            self.config.resources[resource_type].resource_config, self.config.state.source[resource_type][_id]
+        )
+        for resource_to_connect, v in self.config.resources[resource_type].resource_config.resource_connections.items():
+            for attr_connection in v:
+                failed = find_attr(
+                    attr_connection,
+                    resource_to_connect,
+                    resource,
+                    self.config.resources[resource_type].connect_id,
+                )
+                if failed:
+                    for f_id in failed:
+                        failed_connections.add((resource_to_connect, f_id))
+
+        return failed_connections, resource
+
+    def _missing_connections(self, failed_connections: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+        """The failed connections that have not been imported yet in source state."""
+        missing_resources = set()
+        for resource_to_connect, f_id in failed_connections:
+            if f_id not in self.config.state.source[resource_to_connect]:
+                if self.config.state._minimize_reads:
+                    self.config.logger.warning(
+                        "minimize-reads: dependency %s.%s not found in storage; ID remapping may be incomplete",
                         resource_to_connect,
-                        resource,
-                        self.config.resources[resource_type].connect_id,
+                        f_id,
                     )
-                    if failed:
-                        # After retrieving all of the failed connections, we check if
-                        # the resources are imported. Otherwise append to missing with its type.
-                        for f_id in failed:
-                            # With --minimize-reads, dependency types may not be in the
-                            # initial scoped load. Lazily load this specific dependency
-                            # (source+destination) so the source check below is accurate,
-                            # and so connect_resources() in _apply_resource_cb() can
-                            # successfully remap the ID in the destination.
-                            self.config.state.ensure_resource_loaded(resource_to_connect, f_id)
-
-                            if f_id not in self.config.state.source[resource_to_connect]:
-                                if self.config.state._minimize_reads:
-                                    self.config.logger.warning(
-                                        "minimize-reads: dependency %s.%s not found in storage; "
-                                        "ID remapping may be incomplete",
-                                        resource_to_connect,
-                                        f_id,
-                                    )
-                                missing_resources.add((resource_to_connect, f_id))
-
-                            failed_connections.add((resource_to_connect, f_id))
-
-        return failed_connections, missing_resources
+                missing_resources.add((resource_to_connect, f_id))
+        return missing_resources
 
     def get_cleanup_dependency_graph(
         self, cleanup_resources: Dict[Tuple[str, str], str | None]
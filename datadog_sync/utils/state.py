@@ -2,22 +2,314 @@
 # under the 3-clause BSD style license (see LICENSE).
 # This product includes software developed at Datadog (https://www.datadoghq.com/).
 # Copyright 2019 Datadog, Inc.
+import asyncio
+import contextlib
+import json
 import logging
 import os
 import time
-from typing import Any, Dict, List, Set, Tuple
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
-from datadog_sync.constants import LOGGER_NAME, Origin, RESOURCE_PER_FILE
+from datadog_sync.constants import LOGGER_NAME, Origin, RESOURCE_PER_FILE, STATE_LAYOUT_PACK
+from datadog_sync.utils.resource_utils import content_hash
 from datadog_sync.utils.storage._base_storage import (
     BaseStorage,
     StorageData,
     build_storage_backend,
 )
+from datadog_sync.utils.storage.applied_fingerprints import (
+    decode_fingerprints,
+    decode_fingerprints_index,
+    encode_fingerprints,
+    encode_fingerprints_index,
+    fingerprints_index_key,
+    fingerprints_key,
+)
+from datadog_sync.utils.storage.dependency_cache import (
+    Edges,
+    decode_dependency_cache,
+    dependency_cache_key,
+    encode_dependency_cache,
+)
+from datadog_sync.utils.storage.state_pack import PackedResources
 from datadog_sync.utils.storage.storage_types import StorageType
 
 log = logging.getLogger(LOGGER_NAME)
 
 
+class _DirtyKeys:
+    """(resource_type, id) pairs changed on one side of the state since the last dump.
+
+    ``deleted`` is the subset whose last change was a removal. ``loaded`` is
+    only kept with debug logging on: the content hash of every entry as it
+    was read or last dumped, which dump_state checks to find entries changed
+    in place without being re-assigned.
+    """
+
+    __slots__ = ("changed", "deleted", "loaded")
+
+    def __init__(self, verify: bool = False) -> None:
+        self.changed: Set[Tuple[str, str]] = set()
+        self.deleted: Set[Tuple[str, str]] = set()
+        self.loaded: Optional[Dict[Tuple[str, str], Optional[str]]] = {} if verify else None
+
+    def mark(self, resource_type: str, _id: str, deleted: bool = False) -> None:
+        key = (resource_type, _id)
+        self.changed.add(key)
+        if deleted:
+            self.deleted.add(key)
+        else:
+            self.deleted.discard(key)
+
+    def remember(self, resource_type: str, _id: str, resource: Any) -> None:
+        if self.loaded is not None:
+            self.loaded[(resource_type, _id)] = content_hash(resource)
+
+    def clear(self) -> None:
+        self.changed.clear()
+        self.deleted.clear()
+
+
+class _DeferredLoads:
+    """Storage reads requested inside State.deferring_loads(), not yet performed."""
+
+    __slots__ = ("types", "keys")
+
+    def __init__(self) -> None:
+        self.types: Set[str] = set()
+        self.keys: Set[Tuple[str, str]] = set()
+
+    def __bool__(self) -> bool:
+        return bool(self.types or self.keys)
+
+
+class _TrackedResources(dict):
+    """Per-type resource dict that records top-level writes and removals.
+
+    Only assignments, pops and deletes of whole entries are seen: code that
+    mutates a stored resource in place must re-assign it to have it persisted
+    by a dirty dump. With debug logging on, dump_state finds (and writes)
+    such entries and logs a warning naming them. clear() records nothing; cleared IDs that are not set
+    again keep their files, which stale-file pruning owns.
+    """
+
+    __slots__ = ("_dirty", "_resource_type")
+
+    def __init__(self, dirty: _DirtyKeys, resource_type: str, resources: Optional[Dict] = None) -> None:
+        super().__init__(resources or {})
+        self._dirty = dirty
+        self._resource_type = resource_type
+
+    def __setitem__(self, _id, resource) -> None:
+        super().__setitem__(_id, resource)
+        self._dirty.mark(self._resource_type, _id)
+
+    def __delitem__(self, _id) -> None:
+        super().__delitem__(_id)
+        self._dirty.mark(self._resource_type, _id, deleted=True)
+
+    def pop(self, _id, *default):
+        if _id in self:
+            self._dirty.mark(self._resource_type, _id, deleted=True)
+        return super().pop(_id, *default)
+
+    def popitem(self):
+        _id, resource = super().popitem()
+        self._dirty.mark(self._resource_type, _id, deleted=True)
+        return _id, resource
+
+    def setdefault(self, _id, default=None):
+        if _id not in self:
+            self[_id] = default
+        return self[_id]
+
+    def update(self, *args, **kwargs) -> None:
+        for _id, resource in dict(*args, **kwargs).items():
+            self[_id] = resource
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def __reduce__(self):
+        # Copies and pickles are plain dicts, detached from the tracker.
+        return dict, (dict(self),)
+
+
+class _PendingBlock:
+    """Placeholder value for every ID of one not yet decompressed pack block."""
+
+    __slots__ = ("block",)
+
+    def __init__(self, block: int) -> None:
+        self.block = block
+
+
+class _PendingEntry:
+    """Placeholder value holding one entry's NDJSON line, decompressed but not parsed."""
+
+    __slots__ = ("line",)
+
+    def __init__(self, line: str) -> None:
+        self.line = line
+
+
+class _LazyResources(_TrackedResources):
+    """_TrackedResources over a pack whose entries are decoded on first access.
+
+    Every ID is a real key from the start, so ``in``, keys(), len() and
+    iteration never decode. Reading a value decompresses its block once
+    (keeping the other entries as unparsed lines) and parses only that
+    entry. items(), values(), comparisons and copies decode the rest of the
+    type first. __iter__ is overridden so that dict(x) and {**x} go through
+    __getitem__ rather than copying placeholders.
+    """
+
+    __slots__ = ("_packed", "_pending")
+
+    def __init__(self, dirty: _DirtyKeys, resource_type: str, packed: PackedResources) -> None:
+        super().__init__(dirty, resource_type)
+        placeholders = [_PendingBlock(block) for block in range(len(packed.blocks))]
+        for _id, block in packed.ids.items():
+            dict.__setitem__(self, _id, placeholders[block])
+        self._packed = packed
+        # block -> placeholder, for the blocks not decompressed yet.
+        self._pending: Dict[int, _PendingBlock] = dict(enumerate(placeholders))
+
+    def _expand(self, block: int) -> None:
+        pending = self._pending.pop(block, None)
+        if pending is None:
+            return
+        try:
+            lines = self._packed.block_lines(block)
+        except (OSError, EOFError, zlib.error, ValueError) as e:
+            log.warning(f"invalid pack block {block} in {self._resource_type} state: {e}")
+            lines = {}
+        for _id, line in lines.items():
+            if dict.get(self, _id) is pending:
+                dict.__setitem__(self, _id, _PendingEntry(line))
+        if not self._pending:
+            self._packed.release()
+
+    def _resolve(self, _id, value):
+        if type(value) is _PendingBlock:
+            self._expand(value.block)
+            value = dict.__getitem__(self, _id)
+            if type(value) is _PendingBlock:
+                # The index placed _id in a block that does not hold it.
+                dict.__delitem__(self, _id)
+                raise KeyError(_id)
+        if type(value) is _PendingEntry:
+            try:
+                value = json.loads(value.line)[_id]
+            except (ValueError, KeyError) as e:
+                log.warning(f"invalid entry {_id} in {self._resource_type} pack: {e}")
+                dict.__delitem__(self, _id)
+                raise KeyError(_id)
+            dict.__setitem__(self, _id, value)
+            self._dirty.remember(self._resource_type, _id, value)
+        return value
+
+    def _decode_all(self) -> None:
+        for _id, value in list(dict.items(self)):
+            if type(value) is _PendingBlock or type(value) is _PendingEntry:
+                try:
+                    self._resolve(_id, dict.__getitem__(self, _id))
+                except KeyError:
+                    pass
+
+    def __getitem__(self, _id):
+        return self._resolve(_id, dict.__getitem__(self, _id))
+
+    def get(self, _id, default=None):
+        try:
+            return self[_id]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        return dict.__iter__(self)
+
+    def items(self):
+        self._decode_all()
+        return dict.items(self)
+
+    def values(self):
+        self._decode_all()
+        return dict.values(self)
+
+    def copy(self) -> Dict:
+        self._decode_all()
+        return dict.copy(self)
+
+    def pop(self, _id, *default):
+        if _id in self:
+            self[_id]
+        return super().pop(_id, *default)
+
+    def popitem(self):
+        self._decode_all()
+        return super().popitem()
+
+    def __eq__(self, other):
+        self._decode_all()
+        if isinstance(other, _LazyResources):
+            other._decode_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __or__(self, other):
+        self._decode_all()
+        return dict.__or__(self, other)
+
+    def __ror__(self, other):
+        self._decode_all()
+        return dict.__ror__(self, other)
+
+    def __repr__(self) -> str:
+        self._decode_all()
+        return dict.__repr__(self)
+
+
+class _TrackedState(dict):
+    """resource_type -> _TrackedResources, created on first access like defaultdict(dict)."""
+
+    __slots__ = ("_dirty",)
+
+    def __init__(self, dirty: _DirtyKeys, data: Optional[Dict[str, Dict]] = None) -> None:
+        super().__init__()
+        self._dirty = dirty
+        for resource_type, resources in (data or {}).items():
+            if isinstance(resources, PackedResources):
+                tracked = _LazyResources(dirty, resource_type, resources)
+            else:
+                tracked = _TrackedResources(dirty, resource_type, resources)
+            super().__setitem__(resource_type, tracked)
+
+    def __missing__(self, resource_type: str) -> _TrackedResources:
+        resources = _TrackedResources(self._dirty, resource_type)
+        super().__setitem__(resource_type, resources)
+        return resources
+
+    def __setitem__(self, resource_type: str, resources: Dict) -> None:
+        # Whole-type assignment: every assigned entry counts as written.
+        tracked = _TrackedResources(self._dirty, resource_type)
+        tracked.update(resources)
+        super().__setitem__(resource_type, tracked)
+
+    def __reduce__(self):
+        return dict, ({k: dict(v) for k, v in self.items()},)
+
+
+def _sides(origin: Origin) -> List[Origin]:
+    return [side for side in (Origin.SOURCE, Origin.DESTINATION) if origin in (side, Origin.ALL)]
+
+
 class State:
     def __init__(self, type_: StorageType = StorageType.LOCAL_FILE, **kwargs: object) -> None:
         init_start = time.perf_counter()
@@ -26,10 +318,32 @@ class State:
         self._minimize_reads = self._resource_types is not None or self._exact_ids is not None
         self._ensure_attempted: set = set()  # tracks IDs attempted by ensure_resource_loaded
         self._bulk_loaded_types: set = set()  # tracks types bulk-loaded by ensure_resource_type_loaded
+        # In-flight async loads, so concurrent workers wait on one read
+        # rather than see a type or entry before it is merged.
+        self._bulk_loads: Dict[str, asyncio.Future] = {}
+        self._key_loads: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._deferred: Optional[_DeferredLoads] = None  # see deferring_loads()
         self._authoritative_source_types: Set[str] = set()
+        # Per type, {id: fingerprint of the source last applied}; read on
+        # first use (see applied_fingerprints()), written by dump_state.
+        self._applied_fingerprints: Dict[str, Dict[str, str]] = {}
+        self._fingerprints_dirty: Set[str] = set()
+        # Types with stored fingerprints, from their index; None until read.
+        self._fingerprinted_types: Optional[Set[str]] = None
+        # Per type, (destination_digest, edges) of the dependency graph
+        # cache; read on first use (see dependency_cache()), written by dump_state.
+        self._dependency_caches: Dict[str, Tuple[Optional[str], Edges]] = {}
+        self._dependency_cache_dirty: Set[str] = set()
         resource_per_file = kwargs.get(RESOURCE_PER_FILE, False)
         self._storage: BaseStorage = build_storage_backend(type_, **kwargs)
-        self._data: StorageData = StorageData()
+        # Entries changed since the last load/dump, per side. Under
+        # resource_per_file dump_state writes (or deletes) only these.
+        verify = log.isEnabledFor(logging.DEBUG)
+        self._dirty: Dict[Origin, _DirtyKeys] = {
+            Origin.SOURCE: _DirtyKeys(verify),
+            Origin.DESTINATION: _DirtyKeys(verify),
+        }
+        self._data: StorageData = self._track(StorageData())
         self.load_state()
         log.info(
             "sync-cli-timing phase=state_init storage_type=%s resource_per_file=%s minimize_reads=%s wall_ms=%d",
@@ -62,18 +376,58 @@ class State:
         if self._exact_ids is not None:
             # ID-targeted: fetch only specified resources by constructing keys directly
             strategy = "id_targeted"
-            self._data = self._storage.get_by_ids(origin, self._exact_ids)
+            data = self._storage.get_by_ids(origin, self._exact_ids)
         else:
             # Type-scoped (resource_types set) or full load (resource_types=None)
             strategy = "type_scoped" if self._resource_types is not None else "full"
-            self._data = self._storage.get(origin, resource_types=self._resource_types)
+            if self._lazy_load_enabled():
+                data = self._storage.get_lazy(origin, resource_types=self._resource_types)
+            else:
+                data = self._storage.get(origin, resource_types=self._resource_types)
+        self._data = self._track(data)
         log.info(
-            "sync-cli-timing phase=load_state origin=%s strategy=%s wall_ms=%d",
+            "sync-cli-timing phase=load_state origin=%s strategy=%s lazy=%d wall_ms=%d",
             origin.value,
             strategy,
+            any(isinstance(v, _LazyResources) for v in (*self._data.source.values(), *self._data.destination.values())),
             int((time.perf_counter() - load_start) * 1000),
         )
 
+    def _lazy_load_enabled(self) -> bool:
+        """Packed state is loaded lazily (one decode per block, on first access)."""
+        return hasattr(self._storage, "get_lazy")
+
+    def _track(self, data: StorageData) -> StorageData:
+        """Wrap freshly loaded data in dirty-tracking dicts; nothing starts dirty."""
+        for dirty in self._dirty.values():
+            dirty.clear()
+        tracked = StorageData(
+            source=_TrackedState(self._dirty[Origin.SOURCE], data.source),
+            destination=_TrackedState(self._dirty[Origin.DESTINATION], data.destination),
+        )
+        self._remember_loaded(tracked, [Origin.SOURCE, Origin.DESTINATION])
+        return tracked
+
+    def _remember_loaded(self, data: StorageData, sides: List[Origin]) -> None:
+        """Hash the decoded entries of `sides` for the in-place change check (debug logging only)."""
+        for side in sides:
+            dirty = self._dirty[side]
+            if dirty.loaded is None:
+                continue
+            dirty.loaded.clear()
+            live = data.source if side == Origin.SOURCE else data.destination
+            for resource_type, resources in live.items():
+                for _id, resource in dict.items(resources):
+                    if not isinstance(resource, (_PendingBlock, _PendingEntry)):
+                        dirty.remember(resource_type, _id, resource)
+
+    def _insert_loaded(self, side: Dict[str, Dict], resource_type: str, _id: str, resource: Dict[str, Any]) -> None:
+        """Insert an entry read from storage without marking it dirty."""
+        dict.__setitem__(side[resource_type], _id, resource)
+        self._dirty[Origin.SOURCE if side is self._data.source else Origin.DESTINATION].remember(
+            resource_type, _id, resource
+        )
+
     def set_source(self, resource_type: str, _id: str, resource: Dict[str, Any]) -> None:
         """Append/overwrite one resource in the in-memory source state.
 
@@ -116,11 +470,52 @@ class State:
         Fully synchronous — safe to call from concurrent asyncio workers
         without locking (Python GIL protects set/dict operations).
         """
-        if not self._minimize_reads or resource_type in self._bulk_loaded_types:
+        if not self._minimize_reads:
+            return
+        if self._deferred is not None and (
+            resource_type not in self._bulk_loaded_types or resource_type in self._bulk_loads
+        ):
+            self._deferred.types.add(resource_type)
+            return
+        if resource_type in self._bulk_loaded_types:
             return
         self._bulk_loaded_types.add(resource_type)
         log.debug("minimize-reads: bulk-loading %s for full-scan lookups", resource_type)
-        data = self._storage.get(Origin.ALL, resource_types=[resource_type])
+        self._merge_bulk_loaded(resource_type, self._storage.get(Origin.ALL, resource_types=[resource_type]))
+
+    async def ensure_resource_type_loaded_async(self, resource_type: str) -> None:
+        """ensure_resource_type_loaded() without blocking the event loop.
+
+        The storage read runs on the executor; merging into state happens
+        back on the loop, so workers never see a half-merged type.
+        Concurrent callers for the same type share one read and all return
+        once it is merged; after that the synchronous form is a no-op, so
+        connect_id overrides can call it freely.
+        """
+        if not self._minimize_reads:
+            return
+        pending = self._bulk_loads.get(resource_type)
+        if pending is None:
+            if resource_type in self._bulk_loaded_types:
+                return
+            self._bulk_loaded_types.add(resource_type)
+            pending = asyncio.ensure_future(self._bulk_load_async(resource_type))
+            self._bulk_loads[resource_type] = pending
+            pending.add_done_callback(lambda _: self._bulk_loads.pop(resource_type, None))
+            # Shielded so a cancelled first caller doesn't abort the load the
+            # others are waiting on. Only this caller sees a failed read, as
+            # with the synchronous form.
+            await asyncio.shield(pending)
+            return
+        with contextlib.suppress(Exception):
+            await asyncio.shield(pending)
+
+    async def _bulk_load_async(self, resource_type: str) -> None:
+        log.debug("minimize-reads: bulk-loading %s for full-scan lookups", resource_type)
+        data = await self._storage.get_async(Origin.ALL, resource_types=[resource_type])
+        self._merge_bulk_loaded(resource_type, data)
+
+    def _merge_bulk_loaded(self, resource_type: str, data: StorageData) -> None:
         src_loaded = data.source.get(resource_type, {})
         dst_loaded = data.destination.get(resource_type, {})
         if not src_loaded and not dst_loaded:
@@ -133,10 +528,10 @@ class State:
         # or loaded earlier by ensure_resource_loaded.
         for key, val in src_loaded.items():
             if key not in self._data.source[resource_type]:
-                self._data.source[resource_type][key] = val
+                self._insert_loaded(self._data.source, resource_type, key, val)
         for key, val in dst_loaded.items():
             if key not in self._data.destination[resource_type]:
-                self._data.destination[resource_type][key] = val
+                self._insert_loaded(self._data.destination, resource_type, key, val)
         # Populate _ensure_attempted so subsequent ensure_resource_loaded() calls
         # for bulk-loaded keys are no-ops (avoids redundant per-resource I/O).
         for key in src_loaded:
@@ -166,15 +561,126 @@ class State:
         if not self._minimize_reads:
             return
         key = (resource_type, resource_id)
+        if self._deferred is not None and (key not in self._ensure_attempted or key in self._key_loads):
+            self._deferred.keys.add(key)
+            return
         if key in self._ensure_attempted:
             return
         self._ensure_attempted.add(key)
         log.debug(f"minimize-reads: lazy-loading dep {resource_type}.{resource_id}")
         src, dst = self._storage.get_single(resource_type, resource_id)
         if src is not None:
-            self._data.source[resource_type][resource_id] = src
+            self._insert_loaded(self._data.source, resource_type, resource_id, src)
         if dst is not None:
-            self._data.destination[resource_type][resource_id] = dst
+            self._insert_loaded(self._data.destination, resource_type, resource_id, dst)
+
+    def ensure_resources_loaded(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, int]:
+        """Batched ensure_resource_loaded() for many (resource_type, id) pairs.
+
+        Same contract per pair (idempotent, minimize-reads only, appends,
+        missing files stay absent), but each type is read with one
+        storage.get_many() call, which fetches concurrently. Used to
+        prefetch every cross-type dependency found while building the
+        dependency graph in a single sweep.
+
+        Returns resource_type -> number of IDs requested from storage.
+        """
+        if not self._minimize_reads:
+            return {}
+        start = time.perf_counter()
+        by_type = self._claim_keys(keys)
+        loaded_source = loaded_destination = 0
+        for resource_type, ids in by_type.items():
+            src, dst = self._merge_many_loaded(resource_type, self._storage.get_many(resource_type, ids))
+            loaded_source += src
+            loaded_destination += dst
+        if by_type:
+            log.info(
+                "sync-cli-timing phase=prefetch_dependencies types=%d requested=%d loaded_source=%d "
+                "loaded_destination=%d wall_ms=%d",
+                len(by_type),
+                sum(len(ids) for ids in by_type.values()),
+                loaded_source,
+                loaded_destination,
+                int((time.perf_counter() - start) * 1000),
+            )
+        return {resource_type: len(ids) for resource_type, ids in by_type.items()}
+
+    async def ensure_resources_loaded_async(self, keys: Iterable[Tuple[str, str]]) -> None:
+        """ensure_resources_loaded() with the reads off the event loop.
+
+        Types are read concurrently. Keys already being read by another
+        worker are waited for rather than skipped, so on return every
+        requested entry that exists in storage is in state.
+        """
+        if not self._minimize_reads:
+            return
+        keys = list(keys)
+        in_flight = {self._key_loads[key] for key in keys if key in self._key_loads}
+        started = []
+        for resource_type, ids in self._claim_keys(keys).items():
+            load = asyncio.ensure_future(self._load_many_async(resource_type, ids))
+            for _id in ids:
+                self._key_loads[(resource_type, _id)] = load
+            load.add_done_callback(self._forget_key_load)
+            started.append(load)
+        for load in in_flight:
+            # Another worker's read; a failure there is that worker's error.
+            with contextlib.suppress(Exception):
+                await asyncio.shield(load)
+        if started:
+            await asyncio.shield(asyncio.gather(*started))
+
+    async def _load_many_async(self, resource_type: str, ids: List[str]) -> None:
+        self._merge_many_loaded(resource_type, await self._storage.get_many_async(resource_type, ids))
+
+    def _forget_key_load(self, load: asyncio.Future) -> None:
+        for key in [key for key, pending in self._key_loads.items() if pending is load]:
+            del self._key_loads[key]
+
+    def _claim_keys(self, keys: Iterable[Tuple[str, str]]) -> Dict[str, List[str]]:
+        """Mark the not yet attempted keys as attempted; returns them grouped by type."""
+        by_type: Dict[str, List[str]] = {}
+        for key in keys:
+            if key in self._ensure_attempted:
+                continue
+            self._ensure_attempted.add(key)
+            by_type.setdefault(key[0], []).append(key[1])
+        return by_type
+
+    def _merge_many_loaded(self, resource_type: str, loaded: Tuple[Dict, Dict]) -> Tuple[int, int]:
+        """Insert-if-absent, so entries written while the read was in flight win."""
+        src, dst = loaded
+        for side, entries in ((self._data.source, src), (self._data.destination, dst)):
+            for _id, resource in entries.items():
+                if _id not in side[resource_type]:
+                    self._insert_loaded(side, resource_type, _id, resource)
+        return len(src), len(dst)
+
+    @contextlib.contextmanager
+    def deferring_loads(self) -> Iterator[_DeferredLoads]:
+        """Collect, instead of perform, the lazy loads requested inside the block.
+
+        ensure_resource_type_loaded() and ensure_resource_loaded() calls made
+        in the block record what they would read (or are waiting on from
+        another worker) and return at once. Meant for synchronous code run
+        from a worker coroutine, such as connect_id: run it here, await
+        load_deferred_async() if anything was recorded, then run it again.
+        The block must not await.
+        """
+        deferred = _DeferredLoads()
+        self._deferred = deferred
+        try:
+            yield deferred
+        finally:
+            self._deferred = None
+
+    async def load_deferred_async(self, deferred: _DeferredLoads) -> None:
+        """Perform the loads recorded by deferring_loads(), concurrently and off the event loop."""
+        await asyncio.gather(
+            *(self.ensure_resource_type_loaded_async(resource_type) for resource_type in sorted(deferred.types)),
+            self.ensure_resources_loaded_async(sorted(deferred.keys)),
+        )
 
     def reload_destination(self, resource_types: List[str]) -> Dict[str, int]:
         """Re-read destination-side blobs from storage for the given types.
@@ -208,20 +714,36 @@ class State:
         on every apply is wasteful when there is no wrapper-orchestration
         race to worry about).
         """
-        added: Dict[str, int] = {}
         if not resource_types:
-            return added
+            return {}
         # Dedup while preserving order: duplicate types would otherwise
         # produce a second pass finding every key already present, overwriting
         # added[rt] with 0.
         unique_types = list(dict.fromkeys(resource_types))
-        refreshed = self._storage.get(Origin.DESTINATION, resource_types=unique_types)
+        return self._merge_reloaded_destination(
+            unique_types, self._storage.get(Origin.DESTINATION, resource_types=unique_types)
+        )
+
+    async def reload_destination_async(self, resource_types: List[str]) -> Dict[str, int]:
+        """reload_destination() with the storage read off the event loop.
+
+        Same insert-if-absent merge, done back on the loop once the read
+        returns, so entries written by workers while it was in flight win.
+        """
+        if not resource_types:
+            return {}
+        unique_types = list(dict.fromkeys(resource_types))
+        refreshed = await self._storage.get_async(Origin.DESTINATION, resource_types=unique_types)
+        return self._merge_reloaded_destination(unique_types, refreshed)
+
+    def _merge_reloaded_destination(self, unique_types: List[str], refreshed: StorageData) -> Dict[str, int]:
+        added: Dict[str, int] = {}
         for rt in unique_types:
             dst_loaded = refreshed.destination.get(rt, {})
             n_new = 0
             for key, val in dst_loaded.items():
                 if key not in self._data.destination[rt]:
-                    self._data.destination[rt][key] = val
+                    self._insert_loaded(self._data.destination, rt, key, val)
                     n_new += 1
                 # Populate _ensure_attempted for every dst key (new or pre-existing)
                 # so a later ensure_resource_loaded(rt, key) is a no-op instead of
@@ -230,20 +752,288 @@ class State:
             added[rt] = n_new
         return added
 
+    def fingerprinted_types(self) -> Set[str]:
+        """The resource types that have stored fingerprints, read from their index on first use."""
+        if self._fingerprinted_types is None:
+            blobs = getattr(self._storage, "blobs", self._storage)
+            key = fingerprints_index_key(self._storage.destination_resources_path)
+            try:
+                raw = blobs.read_blob(key)
+            except Exception as e:
+                log.warning(f"cannot read fingerprints index: {e}")
+                raw = None
+            self._fingerprinted_types = decode_fingerprints_index(raw, key)
+        return self._fingerprinted_types
+
+    def applied_fingerprints(self, resource_type: str) -> Dict[str, str]:
+        """{id: fingerprint} of the source resources last applied successfully (--skip-unchanged).
+
+        Read from the destination side of storage on first use, if the
+        fingerprints index lists the type; otherwise, or if the object is
+        missing or unreadable, it is an empty map.
+        """
+        loaded = self._applied_fingerprints.get(resource_type)
+        if loaded is None and resource_type not in self.fingerprinted_types():
+            loaded = self._applied_fingerprints[resource_type] = {}
+        elif loaded is None:
+            blobs = getattr(self._storage, "blobs", self._storage)
+            key = fingerprints_key(self._storage.destination_resources_path, resource_type)
+            try:
+                raw = blobs.read_blob(key)
+            except Exception as e:
+                log.warning(f"cannot read fingerprints for {resource_type}: {e}")
+                raw = None
+            loaded = self._applied_fingerprints[resource_type] = decode_fingerprints(raw, key)
+        return loaded
+
+    def record_applied_fingerprint(self, resource_type: str, _id: str, fingerprint: Optional[str]) -> None:
+        """Remember the fingerprint of the source just applied for _id; None forgets it."""
+        fingerprints = self.applied_fingerprints(resource_type)
+        if fingerprint is None:
+            if fingerprints.pop(_id, None) is None:
+                return
+        elif fingerprints.get(_id) == fingerprint:
+            return
+        else:
+            fingerprints[_id] = fingerprint
+        self._fingerprints_dirty.add(resource_type)
+
+    def _put_applied_fingerprints(self) -> int:
+        """Write the fingerprints of every type with a change; returns the type count.
+
+        Best-effort like stale-file pruning: a failed write is logged and
+        retried by the next dump, and meanwhile only costs skipped work.
+        """
+        blobs = getattr(self._storage, "blobs", self._storage)
+        written = 0
+        for resource_type in sorted(self._fingerprints_dirty):
+            key = fingerprints_key(self._storage.destination_resources_path, resource_type)
+            try:
+                blobs.write_blob(key, encode_fingerprints(dict(self._applied_fingerprints[resource_type])))
+            except Exception as e:
+                log.warning(f"cannot write fingerprints for {resource_type}: {e}")
+                continue
+            self._fingerprints_dirty.discard(resource_type)
+            written += 1
+        self._put_fingerprints_index()
+        return written
+
+    def _put_fingerprints_index(self) -> None:
+        """List the types whose stored fingerprints are current: untouched this run, or just written non-empty."""
+        fingerprinted = self.fingerprinted_types()
+        types = {t for t in fingerprinted if t not in self._applied_fingerprints}
+        types.update(
+            t
+            for t, fingerprints in self._applied_fingerprints.items()
+            if fingerprints and t not in self._fingerprints_dirty
+        )
+        if types == fingerprinted:
+            return
+        blobs = getattr(self._storage, "blobs", self._storage)
+        try:
+            blobs.write_blob(
+                fingerprints_index_key(self._storage.destination_resources_path), encode_fingerprints_index(types)
+            )
+        except Exception as e:
+            log.warning(f"cannot write fingerprints index: {e}")
+            return
+        self._fingerprinted_types = types
+
+    def dependency_cache(self, resource_type: str) -> Tuple[Optional[str], Edges]:
+        """(destination_digest, edges) cached for resource_type (--cache-dependency-graph).
+
+        Read from the destination side of storage on first use; a missing or
+        unreadable object is just an empty cache.
+        """
+        loaded = self._dependency_caches.get(resource_type)
+        if loaded is None:
+            blobs = getattr(self._storage, "blobs", self._storage)
+            key = dependency_cache_key(self._storage.destination_resources_path, resource_type)
+            try:
+                raw = blobs.read_blob(key)
+            except Exception as e:
+                log.warning(f"cannot read dependency cache for {resource_type}: {e}")
+                raw = None
+            loaded = self._dependency_caches[resource_type] = decode_dependency_cache(raw, key)
+        return loaded
+
+    def record_dependency_cache(self, resource_type: str, destination_digest: Optional[str], edges: Edges) -> None:
+        """Cache the edges just computed for resource_type.
+
+        Entries computed against the same destination digest are kept for
+        the IDs not in edges (filtered out or outside --resources this run)
+        as long as they are still in source state; any other digest
+        replaces the cache.
+        """
+        digest, cached = self.dependency_cache(resource_type)
+        if digest == destination_digest:
+            source = self._data.source.get(resource_type) or {}
+            merged = {_id: entry for _id, entry in cached.items() if _id not in edges and _id in source}
+            merged.update(edges)
+            if merged == cached:
+                return
+            edges = merged
+        self._dependency_caches[resource_type] = (destination_digest, edges)
+        self._dependency_cache_dirty.add(resource_type)
+
+    def _put_dependency_caches(self) -> int:
+        """Write the dependency cache of every type with a change; returns the type count (best-effort)."""
+        blobs = getattr(self._storage, "blobs", self._storage)
+        written = 0
+        for resource_type in sorted(self._dependency_cache_dirty):
+            key = dependency_cache_key(self._storage.destination_resources_path, resource_type)
+            try:
+                blobs.write_blob(key, encode_dependency_cache(*self._dependency_caches[resource_type]))
+            except Exception as e:
+                log.warning(f"cannot write dependency cache for {resource_type}: {e}")
+                continue
+            self._dependency_cache_dirty.discard(resource_type)
+            written += 1
+        return written
+
     def dump_state(self, origin: Origin = Origin.ALL) -> None:
         dump_start = time.perf_counter()
-        self._storage.put(origin, self._data)
+        put_mode = self._dirty_put_mode()
+        if put_mode != "full":
+            self._mark_changed_in_place(origin)
+        if put_mode == "dirty":
+            written, deleted = self._put_dirty(origin)
+        elif put_mode == "dirty_types":
+            written, deleted = self._put_dirty_types(origin), 0
+        else:
+            put_mode = "full"
+            self._storage.put(origin, self._data)
+            written, deleted = 0, 0
+        for side in _sides(origin):
+            self._dirty[side].clear()
+        self._remember_loaded(self._data, _sides(origin))
         pruned = self._prune_stale_files_after_put(origin)
+        fingerprint_types = 0
+        if origin in (Origin.DESTINATION, Origin.ALL) and self._fingerprints_dirty:
+            fingerprint_types = self._put_applied_fingerprints()
+        dependency_cache_types = 0
+        if origin in (Origin.DESTINATION, Origin.ALL) and self._dependency_cache_dirty:
+            dependency_cache_types = self._put_dependency_caches()
         log.info(
-            "sync-cli-timing phase=dump_state origin=%s prune_status=%s "
-            "pruned_source=%d pruned_destination=%d wall_ms=%d",
+            "sync-cli-timing phase=dump_state origin=%s put_mode=%s dirty_written=%d dirty_deleted=%d "
+            "fingerprint_types=%d dependency_cache_types=%d prune_status=%s pruned_source=%d "
+            "pruned_destination=%d wall_ms=%d",
             origin.value,
+            put_mode,
+            written,
+            deleted,
+            fingerprint_types,
+            dependency_cache_types,
             pruned.get("status", "ok"),
             pruned.get(Origin.SOURCE, 0),
             pruned.get(Origin.DESTINATION, 0),
             int((time.perf_counter() - dump_start) * 1000),
         )
 
+    def _dirty_put_mode(self) -> str:
+        """How much of the state dump_state has to hand to storage.put().
+
+        - "dirty": only the entries changed since the last load/dump
+          (--resource-per-file, one file per entry).
+        - "dirty_types": every entry of the types with a change (packed
+          layout, one pack per type).
+        - "full": everything (monolithic {type}.json or untracked data).
+        """
+        if not isinstance(self._data.source, _TrackedState):
+            return "full"
+        if getattr(self._storage, "resource_per_file", False):
+            return "dirty"
+        if getattr(self._storage, "state_layout", None) == STATE_LAYOUT_PACK:
+            return "dirty_types"
+        return "full"
+
+    def _mark_changed_in_place(self, origin: Origin) -> None:
+        """Mark dirty the loaded entries whose content changed although nothing re-assigned them.
+
+        A dirty dump would otherwise leave them unwritten. Only runs with
+        debug logging on (see _DirtyKeys.loaded); each one found is a bug in
+        the code that changed it, so it is logged as a warning.
+        """
+        for side in _sides(origin):
+            dirty = self._dirty[side]
+            if dirty.loaded is None:
+                continue
+            live = self._data.source if side == Origin.SOURCE else self._data.destination
+            for (resource_type, _id), loaded_hash in dirty.loaded.items():
+                if loaded_hash is None or (resource_type, _id) in dirty.changed:
+                    continue
+                resource = dict.get(dict.get(live, resource_type, {}), _id)
+                if resource is None or content_hash(resource) == loaded_hash:
+                    continue
+                log.warning(
+                    f"{side.value} state entry {resource_type}.{_id} was changed in place without being "
+                    "re-assigned; writing it anyway"
+                )
+                dirty.mark(resource_type, _id)
+
+    def _put_dirty_types(self, origin: Origin) -> int:
+        """Rewrite the whole type for every type with a changed entry; returns the type count."""
+        changed = StorageData()
+        rewritten = 0
+        for side in _sides(origin):
+            live = self._data.source if side == Origin.SOURCE else self._data.destination
+            out = changed.source if side == Origin.SOURCE else changed.destination
+            for resource_type in {resource_type for resource_type, _ in self._dirty[side].changed}:
+                out[resource_type] = live.get(resource_type, {})
+                rewritten += 1
+        if rewritten:
+            self._storage.put(origin, changed)
+        return rewritten
+
+    def _put_dirty(self, origin: Origin) -> Tuple[int, int]:
+        """Write the changed entries of `origin` and delete the files of removed ones.
+
+        Returns (entries written, files deleted). Deletes are best-effort like
+        stale-file pruning: failures are logged, never raised.
+        """
+        changed = StorageData()
+        removed: Dict[Origin, Set[str]] = {}
+        written = 0
+        for side in _sides(origin):
+            live = self._data.source if side == Origin.SOURCE else self._data.destination
+            out = changed.source if side == Origin.SOURCE else changed.destination
+            dirty = self._dirty[side]
+            by_type: Dict[str, List[str]] = {}
+            for resource_type, _id in dirty.changed:
+                by_type.setdefault(resource_type, []).append(_id)
+            for resource_type, ids in by_type.items():
+                resources = live.get(resource_type, {})
+                present = [_id for _id in ids if _id in resources]
+                if present:
+                    skip = BaseStorage._check_id_collisions(resources, resource_type)
+                    for _id in present:
+                        if _id not in skip:
+                            out[resource_type][_id] = resources[_id]
+                            written += 1
+                gone = [_id for _id in ids if _id not in resources and (resource_type, _id) in dirty.deleted]
+                if gone:
+                    # A live ID that sanitizes to the same filename still owns the file.
+                    live_names = {BaseStorage._sanitize_id_for_filename(_id) for _id in resources}
+                    for _id in gone:
+                        safe = BaseStorage._sanitize_id_for_filename(_id)
+                        if safe not in live_names:
+                            removed.setdefault(side, set()).add(f"{resource_type}.{safe}.json")
+        if written:
+            self._storage.put(origin, changed)
+        deleted = 0
+        for side, filenames in removed.items():
+            try:
+                results = self._storage.delete_many(side, filenames)
+            except Exception as e:
+                log.warning("dump_state failed to delete removed %s files: %s", side.value, e)
+                continue
+            for fn, status in results.items():
+                if status == "ok":
+                    deleted += 1
+                else:
+                    log.debug("dump_state: failed to delete %s/%s: %s", side.value, fn, status)
+        return written, deleted
+
     def _prune_stale_files_after_put(self, origin: Origin) -> Dict[Any, Any]:
         """Delete per-resource cache files whose IDs are no longer in-memory.
 
@@ -3,11 +3,19 @@
 # This product includes software developed at Datadog (https://www.datadoghq.com/).
 # Copyright 2019 Datadog, Inc.
 
+import asyncio
+import base64
+import binascii
+import hashlib
+import json
 import logging
+import threading
+import time
 from abc import ABC, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from datadog_sync.constants import (
     DESTINATION_PATH_DEFAULT,
@@ -17,9 +25,10 @@ from datadog_sync.constants import (
     RESOURCE_PER_FILE,
     SOURCE_PATH_DEFAULT,
     SOURCE_PATH_PARAM,
+    STATE_LAYOUT,
+    STATE_LAYOUT_PACK,
 )
 
-
 log = logging.getLogger(LOGGER_NAME)
 
 
@@ -29,7 +38,16 @@ def build_storage_backend(type_, **kwargs) -> "BaseStorage":
     Shared by State and ImportState so the per-backend init logic does not
     drift across the two state classes. Imports the backend modules lazily
     so this module stays importable in environments that lack one cloud SDK.
+
+    With state_layout="pack" the backend is wrapped in a PackStorage, which
+    keeps one compressed pack per type and ignores resource_per_file.
     """
+    if kwargs.get(STATE_LAYOUT) == STATE_LAYOUT_PACK:
+        from datadog_sync.utils.storage.state_pack import PackStorage
+
+        blob_kwargs = {k: v for k, v in kwargs.items() if k not in (STATE_LAYOUT, RESOURCE_PER_FILE)}
+        return PackStorage(build_storage_backend(type_, **blob_kwargs))
+
     # Lazy imports avoid a hard dependency on every cloud SDK at module-load
     # time; users who only need LocalFile shouldn't need boto3 / google-cloud
     # / azure-storage-blob installed.
@@ -80,6 +98,286 @@ def build_storage_backend(type_, **kwargs) -> "BaseStorage":
     raise NotImplementedError(f"Storage type {type_} not implemented")
 
 
+# Blob downloads kept in flight by the cloud backends' _list_and_load. 10
+# matches the default HTTP connection pool of boto3 and of the requests
+# transport used by google-cloud-storage, so the default never has threads
+# waiting on (or discarding) pooled connections.
+DOWNLOAD_CONCURRENCY_DEFAULT = 10
+
+
+# Same reasoning for the uploads put() keeps in flight.
+UPLOAD_CONCURRENCY_DEFAULT = 10
+
+
+def download_concurrency_from_config(config: Optional[Dict], key: str) -> int:
+    value = (config or {}).get(key)
+    return max(1, int(value)) if value else DOWNLOAD_CONCURRENCY_DEFAULT
+
+
+def upload_concurrency_from_config(config: Optional[Dict], key: str) -> int:
+    value = (config or {}).get(key)
+    return max(1, int(value)) if value else UPLOAD_CONCURRENCY_DEFAULT
+
+
+class BlobDownloadPipeline:
+    """Bounded, ordered download stage for _list_and_load.
+
+    The listing loop submit()s each blob as soon as its page arrives. Up to
+    `concurrency` downloads run in a thread pool, and at most 2 * concurrency
+    are queued ahead of the oldest unfinished one. Results are merged into
+    `result` on the calling thread in listing order, so a type's later files
+    override earlier ones exactly as the sequential loop did.
+
+    fetch(name, resource_type) returns the parsed file, or None for a
+    per-blob transient error (already logged by the backend). Any exception it
+    raises cancels the remaining downloads and propagates out of submit() or
+    finish().
+    """
+
+    def __init__(self, fetch: Callable[[str, str], Optional[Dict]], result: Dict, concurrency: int) -> None:
+        self.fetch = fetch
+        self.result = result
+        self.concurrency = max(1, concurrency)
+        self.blobs_downloaded = 0
+        self.transient_errors = 0
+        # Summed per-blob download time, across threads.
+        self.download_ns = 0
+        self._stage_start_ns: Optional[int] = None
+        self._stage_ns = 0
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[str, Future]] = deque()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.concurrency > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="state-download")
+
+    @property
+    def effective_concurrency(self) -> float:
+        """Average number of downloads in flight while the stage was active."""
+        return self.download_ns / self._stage_ns if self._stage_ns else 0.0
+
+    def _timed_fetch(self, name: str, resource_type: str) -> Optional[Dict]:
+        start_ns = time.perf_counter_ns()
+        try:
+            return self.fetch(name, resource_type)
+        finally:
+            elapsed = time.perf_counter_ns() - start_ns
+            with self._lock:
+                self.download_ns += elapsed
+
+    def _merge(self, resource_type: str, payload: Optional[Dict]) -> None:
+        if payload is None:
+            self.transient_errors += 1
+            return
+        self.result[resource_type].update(payload)
+        self.blobs_downloaded += 1
+
+    def _drain_one(self) -> None:
+        resource_type, future = self._pending.popleft()
+        self._merge(resource_type, future.result())
+
+    def submit(self, name: str, resource_type: str) -> None:
+        if self._stage_start_ns is None:
+            self._stage_start_ns = time.perf_counter_ns()
+        if self._executor is None:
+            self._merge(resource_type, self._timed_fetch(name, resource_type))
+            return
+        while len(self._pending) >= 2 * self.concurrency:
+            self._drain_one()
+        self._pending.append((resource_type, self._executor.submit(self._timed_fetch, name, resource_type)))
+
+    def finish(self) -> None:
+        """Wait for and merge every submitted download."""
+        while self._pending:
+            self._drain_one()
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+        if self._stage_start_ns is not None:
+            self._stage_ns = time.perf_counter_ns() - self._stage_start_ns
+
+    def __enter__(self) -> "BlobDownloadPipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class ContentManifest:
+    """Storage key -> MD5 digest of the bytes currently stored under it.
+
+    Filled from listing metadata where the backend exposes an MD5 (S3 ETag,
+    GCS md5Hash, Azure Content-MD5), from bodies read back, and from this
+    process's own writes. BlobWritePipeline skips a write whose body hashes to
+    the recorded digest. A key with no entry is always written, so a missing
+    or non-MD5 digest (multipart or SSE-KMS ETags) only costs the upload.
+
+    Digests are kept as raw 16-byte values; dict operations are atomic under
+    the GIL, so the pipeline threads record into it without a lock.
+    """
+
+    def __init__(self) -> None:
+        self._digests: Dict[str, bytes] = {}
+
+    @staticmethod
+    def digest(body: Any) -> bytes:
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        return hashlib.md5(body, usedforsecurity=False).digest()
+
+    def record(self, key: str, digest: Optional[bytes]) -> None:
+        if digest:
+            self._digests[key] = digest
+
+    def forget(self, key: str) -> None:
+        self._digests.pop(key, None)
+
+    def matches(self, key: str, digest: bytes) -> bool:
+        return self._digests.get(key) == digest
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+def md5_from_etag(etag: Any) -> Optional[bytes]:
+    """S3 ETag -> MD5 digest; None for multipart/encrypted ETags that are not an MD5."""
+    if not isinstance(etag, str):
+        return None
+    etag = etag.strip('"')
+    if len(etag) != 32:
+        return None
+    try:
+        return bytes.fromhex(etag)
+    except ValueError:
+        return None
+
+
+def md5_from_base64(value: Any) -> Optional[bytes]:
+    """GCS md5Hash (base64 str) or Azure Content-MD5 (bytearray) -> MD5 digest."""
+    if isinstance(value, (bytes, bytearray)):
+        return bytes(value) if len(value) == 16 else None
+    if not isinstance(value, str):
+        return None
+    try:
+        digest = base64.b64decode(value, validate=True)
+    except (binascii.Error, ValueError):
+        return None
+    return digest if len(digest) == 16 else None
+
+
+class BlobWritePipeline:
+    """Bounded writer pool for put().
+
+    put() serializes each file on the calling thread and submit()s it; up to
+    `concurrency` writes run in a thread pool with at most 2 * concurrency
+    serialized bodies waiting. The first failed write is re-raised from
+    submit() or finish().
+
+    With a `manifest`, a body whose MD5 matches what the key already holds is
+    counted in `skipped` instead of being written, and every completed write
+    records its digest.
+
+    close() (also reached when a KeyboardInterrupt unwinds put()) drops the
+    writes that have not started and waits for the running ones, so an
+    interrupted dump never leaves a half-written file behind it.
+    """
+
+    def __init__(
+        self, write: Callable[[str, Any], None], concurrency: int, manifest: Optional[ContentManifest] = None
+    ) -> None:
+        self.write = write
+        self.concurrency = max(1, concurrency)
+        self.manifest = manifest
+        # label ("source"/"destination") -> files written / skipped as unchanged
+        self.written: Dict[str, int] = defaultdict(int)
+        self.skipped: Dict[str, int] = defaultdict(int)
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+        self._pending: Set[Future] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        if self.concurrency > 1:
+            self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="state-upload")
+
+    @property
+    def blobs_written(self) -> int:
+        return sum(self.written.values())
+
+    @property
+    def blobs_skipped(self) -> int:
+        return sum(self.skipped.values())
+
+    def _counted_write(self, key: str, body: Any, label: str, digest: Optional[bytes] = None) -> None:
+        self.write(key, body)
+        if digest is not None:
+            self.manifest.record(key, digest)
+        with self._lock:
+            self.written[label] += 1
+            self.bytes_written += len(body)
+
+    def _reap(self, done: Iterable[Future]) -> None:
+        for future in done:
+            self._pending.discard(future)
+            future.result()
+
+    def submit(self, key: str, body: Any, label: str) -> None:
+        digest = None
+        if self.manifest is not None:
+            digest = self.manifest.digest(body)
+            if self.manifest.matches(key, digest):
+                self.skipped[label] += 1
+                return
+        if self._executor is None:
+            self._counted_write(key, body, label, digest)
+            return
+        while len(self._pending) >= 2 * self.concurrency:
+            done, _ = wait(self._pending, return_when=FIRST_COMPLETED)
+            self._reap(done)
+        self._pending.add(self._executor.submit(self._counted_write, key, body, label, digest))
+
+    def finish(self) -> None:
+        """Wait for every submitted write; raise the first failure."""
+        if self._pending:
+            done, _ = wait(self._pending)
+            self._reap(done)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+    def __enter__(self) -> "BlobWritePipeline":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def log_put_summary(backend: str, origin, pipeline: BlobWritePipeline, aborted: int, call_start_ns: int) -> None:
+    wall_ns = time.perf_counter_ns() - call_start_ns
+    wall_s = wall_ns / 1_000_000_000
+    log.info(
+        "sync-cli-timing phase=put backend=%s origin=%s "
+        "blobs_written_source=%d blobs_written_destination=%d "
+        "blobs_skipped_source=%d blobs_skipped_destination=%d aborted=%d wall_ms=%d "
+        "bytes_written=%d write_concurrency=%d blobs_per_s=%.1f mb_per_s=%.2f",
+        backend,
+        origin.value,
+        pipeline.written["source"],
+        pipeline.written["destination"],
+        pipeline.skipped["source"],
+        pipeline.skipped["destination"],
+        aborted,
+        wall_ns // 1_000_000,
+        pipeline.bytes_written,
+        pipeline.concurrency,
+        pipeline.blobs_written / wall_s if wall_s else 0.0,
+        pipeline.bytes_written / 1024 / 1024 / wall_s if wall_s else 0.0,
+    )
+
+
 @dataclass
 class StorageData:
     source: Dict[str, Any] = field(default_factory=lambda: defaultdict(dict))
@@ -89,6 +387,22 @@ class StorageData:
 class BaseStorage(ABC):
     """Base class for storage"""
 
+    # Overridden per instance by the cloud backends from
+    # --{aws,gcs,azure}-{download,upload}-concurrency.
+    download_concurrency: int = DOWNLOAD_CONCURRENCY_DEFAULT
+    upload_concurrency: int = UPLOAD_CONCURRENCY_DEFAULT
+    # On-disk read-through cache (blob_cache.BlobCache) of the cloud backends,
+    # set from the --state-cache-* options.
+    blob_cache = None
+
+    @property
+    def content_manifest(self) -> ContentManifest:
+        # Created lazily: subclasses do not share an __init__ with BaseStorage.
+        manifest = self.__dict__.get("_content_manifest")
+        if manifest is None:
+            manifest = self._content_manifest = ContentManifest()
+        return manifest
+
     @staticmethod
     def _sanitize_id_for_filename(resource_id: str) -> str:
         """Replace ':' with '.' for cross-platform filename safety.
@@ -134,6 +448,23 @@ class BaseStorage(ABC):
                 seen[safe] = _id
         return skip
 
+    def _iter_state_files(self, base_path: str, data_by_type: Dict[str, Dict]) -> Iterator[Tuple[str, str]]:
+        """Yield (key, serialized JSON) for every file put() writes under base_path.
+
+        One {type}.json per type, or one {type}.{safe_id}.json per resource
+        under resource_per_file (colliding IDs skipped, see _check_id_collisions).
+        """
+        for resource_type, resource_data in data_by_type.items():
+            base_key = f"{base_path}/{resource_type}"
+            if getattr(self, "resource_per_file", False):
+                skip_ids = self._check_id_collisions(resource_data, resource_type)
+                for _id, resource in resource_data.items():
+                    if _id in skip_ids:
+                        continue
+                    yield f"{base_key}.{self._sanitize_id_for_filename(_id)}.json", json.dumps({_id: resource})
+            else:
+                yield f"{base_key}.json", json.dumps(resource_data)
+
     @staticmethod
     def _is_per_resource_filename(resource_type: str, filename: str) -> bool:
         """Return True for <resource_type>.<id>.json, excluding <resource_type>.json."""
@@ -166,14 +497,37 @@ class BaseStorage(ABC):
             raise ValueError("get_by_ids() requires --resource-per-file. Re-run with --resource-per-file enabled.")
         data = StorageData()
         for resource_type, ids in exact_ids.items():
-            for resource_id in ids:
-                src, dst = self.get_single(resource_type, resource_id)
-                if origin in [Origin.SOURCE, Origin.ALL] and src is not None:
-                    data.source[resource_type][resource_id] = src
-                if origin in [Origin.DESTINATION, Origin.ALL] and dst is not None:
-                    data.destination[resource_type][resource_id] = dst
+            src, dst = self.get_many(resource_type, ids)
+            if origin in [Origin.SOURCE, Origin.ALL] and src:
+                data.source[resource_type].update(src)
+            if origin in [Origin.DESTINATION, Origin.ALL] and dst:
+                data.destination[resource_type].update(dst)
         return data
 
+    def get_many(self, resource_type: str, resource_ids: Iterable[str]) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """Load several resources of one type; the batched form of get_single().
+
+        Returns ({id: source_entry}, {id: destination_entry}) in request order,
+        leaving out IDs whose file does not exist. The default runs get_single()
+        on up to download_concurrency threads; backends with a cheaper batch
+        read override it.
+        """
+        ids = list(dict.fromkeys(resource_ids))
+        source: Dict[str, Dict] = {}
+        destination: Dict[str, Dict] = {}
+        workers = min(max(1, self.download_concurrency), len(ids))
+        if workers <= 1:
+            results = [self.get_single(resource_type, _id) for _id in ids]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(lambda _id: self.get_single(resource_type, _id), ids))
+        for _id, (src, dst) in zip(ids, results):
+            if src is not None:
+                source[_id] = src
+            if dst is not None:
+                destination[_id] = dst
+        return source, destination
+
     @abstractmethod
     def get_single(self, resource_type: str, resource_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Load one resource's source and destination state.
@@ -194,6 +548,50 @@ class BaseStorage(ABC):
         """Write resources into storage"""
         pass
 
+    # Awaitable forms of the state I/O calls, for use from coroutines. Each
+    # runs the blocking call on the default executor so a slow backend never
+    # stalls the event loop (and the API workers sharing it); backends with
+    # native async clients may override them.
+
+    async def get_async(self, origin, resource_types=None) -> StorageData:
+        return await asyncio.to_thread(self.get, origin, resource_types)
+
+    async def get_single_async(self, resource_type: str, resource_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        return await asyncio.to_thread(self.get_single, resource_type, resource_id)
+
+    async def get_many_async(
+        self, resource_type: str, resource_ids: Iterable[str]
+    ) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        return await asyncio.to_thread(self.get_many, resource_type, list(resource_ids))
+
+    async def put_async(self, origin, data: StorageData) -> None:
+        await asyncio.to_thread(self.put, origin, data)
+
+    async def delete_many_async(self, origin: Origin, filenames: Iterable[str]) -> Dict[str, str]:
+        return await asyncio.to_thread(self.delete_many, origin, list(filenames))
+
+    # Byte-level blob access, used by the packed layout (state_pack.PackStorage).
+    # Keys are full paths/object keys, as built from source/destination_resources_path.
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        """Return the bytes stored under key, or None if it does not exist."""
+        raise NotImplementedError(f"{type(self).__name__} does not implement read_blob")
+
+    def read_blob_range(self, key: str, offset: int, length: int) -> Optional[bytes]:
+        """Return `length` bytes of key starting at `offset`, or None if it does not exist."""
+        raise NotImplementedError(f"{type(self).__name__} does not implement read_blob_range")
+
+    def map_blob(self, key: str) -> Optional[Any]:
+        """Like read_blob, but may return a read-only memory map (bytes-like, sliceable) instead of a copy."""
+        return self.read_blob(key)
+
+    def write_blob(self, key: str, body: bytes) -> None:
+        raise NotImplementedError(f"{type(self).__name__} does not implement write_blob")
+
+    def list_blob_names(self, base_path: str) -> List[str]:
+        """Names (no path) of the objects directly under base_path."""
+        raise NotImplementedError(f"{type(self).__name__} does not implement list_blob_names")
+
     def list_filenames(self, origin: Origin, resource_type: str) -> Set[str]:
         """Return full filenames (no path) under <base>/<resource_type>.*.json for the origin.
 
@@ -217,3 +615,56 @@ class BaseStorage(ABC):
             except Exception as e:
                 results[fn] = f"error: {type(e).__name__}: {e}"
         return results
+
+    def _delete_in_batches(
+        self,
+        origin: Origin,
+        filenames: Iterable[str],
+        batch_size: int,
+        delete_batch: Callable[[List[str]], Dict[str, str]],
+    ) -> Dict[str, str]:
+        """delete_many() on top of a bulk-delete API.
+
+        `delete_batch` deletes up to `batch_size` object keys in one request
+        and returns {key: "ok" | "error: ..."}; keys it leaves out count as
+        deleted. Batches run on up to upload_concurrency threads, and a batch
+        that raises marks each of its files with that error.
+        """
+        names = list(dict.fromkeys(filenames))
+        call_start_ns = time.perf_counter_ns()
+        base = self._path_for(origin)
+        keys = {f"{base}/{fn}": fn for fn in names}
+        key_list = list(keys)
+        batches = [key_list[i : i + batch_size] for i in range(0, len(key_list), batch_size)]
+
+        def run(batch: List[str]) -> Dict[str, str]:
+            try:
+                return delete_batch(batch)
+            except Exception as e:
+                return {key: f"error: {type(e).__name__}: {e}" for key in batch}
+
+        workers = min(max(1, self.upload_concurrency), len(batches))
+        if workers <= 1:
+            outcomes = [run(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                outcomes = list(executor.map(run, batches))
+
+        results: Dict[str, str] = {}
+        for batch, outcome in zip(batches, outcomes):
+            for key in batch:
+                status = outcome.get(key, "ok")
+                results[keys[key]] = status
+                if status == "ok":
+                    self.content_manifest.forget(key)
+        if batches:
+            log.info(
+                "sync-cli-timing phase=delete_many backend=%s origin=%s files=%d batches=%d failed=%d wall_ms=%d",
+                type(self).__name__,
+                origin.value,
+                len(names),
+                len(batches),
+                sum(1 for status in results.values() if status != "ok"),
+                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+            )
+        return results
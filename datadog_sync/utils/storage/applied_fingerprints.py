@@ -0,0 +1,95 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Fingerprints of the last successfully applied source resources (--skip-unchanged).
+
+One object per resource type, next to the destination state:
+``{destination_resources_path}/{type}.fingerprints.gz``, gzip-compressed JSON
+``{"version", "cli_version", "fingerprints": {id: fingerprint}}``. The suffix
+is not ``.json``, so the state loaders, prune and convert-state never pick it
+up. A file written by another CLI version reads as empty: how a resource is
+connected and normalized may have changed, so nothing recorded by it can be
+trusted to mean "already applied".
+
+``{destination_resources_path}/_index.fingerprints.gz`` lists the types
+that have fingerprints, so a run reads one small object to learn whether
+there are any, rather than one per type.
+"""
+
+import gzip
+import json
+import logging
+import zlib
+from typing import Dict, Iterable, Optional, Set
+
+from datadog_sync.constants import LOGGER_NAME
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+FINGERPRINTS_SUFFIX = ".fingerprints.gz"
+FINGERPRINTS_VERSION = 1
+FINGERPRINTS_INDEX = f"_index{FINGERPRINTS_SUFFIX}"
+
+
+def cli_version() -> Optional[str]:
+    try:
+        from datadog_sync.version import __version__ as version
+    except (ModuleNotFoundError, ImportError):
+        version = None
+    return version
+
+
+def fingerprints_key(base_path: str, resource_type: str) -> str:
+    return f"{base_path}/{resource_type}{FINGERPRINTS_SUFFIX}"
+
+
+def encode_fingerprints(fingerprints: Dict[str, str]) -> bytes:
+    payload = {"version": FINGERPRINTS_VERSION, "cli_version": cli_version(), "fingerprints": fingerprints}
+    return gzip.compress(json.dumps(payload, sort_keys=True).encode("utf-8"), mtime=0)
+
+
+def decode_fingerprints(raw: Optional[bytes], key: str) -> Dict[str, str]:
+    """The {id: fingerprint} map stored in raw; empty if absent, unreadable or from another version."""
+    if raw is None:
+        return {}
+    try:
+        payload = json.loads(gzip.decompress(raw))
+    except (OSError, EOFError, zlib.error, ValueError) as e:
+        log.warning(f"ignoring invalid fingerprints file {key}: {e}")
+        return {}
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != FINGERPRINTS_VERSION
+        or payload.get("cli_version") != cli_version()
+    ):
+        log.info(f"ignoring fingerprints file {key} written by another version")
+        return {}
+    fingerprints = payload.get("fingerprints")
+    return fingerprints if isinstance(fingerprints, dict) else {}
+
+
+def fingerprints_index_key(base_path: str) -> str:
+    return f"{base_path}/{FINGERPRINTS_INDEX}"
+
+
+def encode_fingerprints_index(resource_types: Iterable[str]) -> bytes:
+    payload = {"version": FINGERPRINTS_VERSION, "types": sorted(resource_types)}
+    return gzip.compress(json.dumps(payload).encode("utf-8"), mtime=0)
+
+
+def decode_fingerprints_index(raw: Optional[bytes], key: str) -> Set[str]:
+    """The resource types listed in raw; empty if absent or unreadable."""
+    if raw is None:
+        return set()
+    try:
+        payload = json.loads(gzip.decompress(raw))
+    except (OSError, EOFError, zlib.error, ValueError) as e:
+        log.warning(f"ignoring invalid fingerprints index {key}: {e}")
+        return set()
+    if not isinstance(payload, dict) or payload.get("version") != FINGERPRINTS_VERSION:
+        return set()
+    types = payload.get("types")
+    return {t for t in types if isinstance(t, str)} if isinstance(types, list) else set()
@@ -7,9 +7,10 @@ import json
 import logging
 import time
 from collections import defaultdict
-from typing import Dict, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 import boto3
+from botocore.config import Config as BotocoreConfig
 from botocore.exceptions import ClientError
 
 from datadog_sync.constants import (
@@ -18,11 +19,24 @@ from datadog_sync.constants import (
     LOGGER_NAME,
     SOURCE_PATH_DEFAULT,
 )
-from datadog_sync.utils.storage._base_storage import BaseStorage, StorageData
+from datadog_sync.utils.storage._base_storage import (
+    BaseStorage,
+    BlobDownloadPipeline,
+    BlobWritePipeline,
+    StorageData,
+    download_concurrency_from_config,
+    log_put_summary,
+    md5_from_etag,
+    upload_concurrency_from_config,
+)
+from datadog_sync.utils.storage.blob_cache import CacheCounter, blob_cache_from_config
 
 
 log = logging.getLogger(LOGGER_NAME)
 
+# DeleteObjects accepts at most 1000 keys per request.
+S3_DELETE_BATCH_SIZE = 1000
+
 
 class AWSS3Bucket(BaseStorage):
     def __init__(
@@ -43,7 +57,15 @@ class AWSS3Bucket(BaseStorage):
         self.resource_per_file = resource_per_file
         if not config:
             raise ValueError("No S3 configuration passed in")
-        elif config.get("aws_region_name", None):
+        self.download_concurrency = download_concurrency_from_config(config, "aws_download_concurrency")
+        self.upload_concurrency = upload_concurrency_from_config(config, "aws_upload_concurrency")
+        # botocore keeps 10 pooled connections by default; grow the pool so
+        # every download/upload thread gets one.
+        client_kwargs = {}
+        pool_size = max(self.download_concurrency, self.upload_concurrency)
+        if pool_size > 10:
+            client_kwargs["config"] = BotocoreConfig(max_pool_connections=pool_size)
+        if config.get("aws_region_name", None):
             log.info("AWS S3 configured with command line parameters or env vars")
             self.client = boto3.client(
                 "s3",
@@ -51,14 +73,16 @@ class AWSS3Bucket(BaseStorage):
                 aws_access_key_id=config.get("aws_access_key_id", ""),
                 aws_secret_access_key=config.get("aws_secret_access_key", ""),
                 aws_session_token=config.get("aws_session_token", ""),
+                **client_kwargs,
             )
         elif config.get("aws_bucket_name", None):
             log.info("AWS S3 configured without command line parameters")
-            self.client = boto3.client("s3")
+            self.client = boto3.client("s3", **client_kwargs)
 
         self.bucket_name = config.get("aws_bucket_name", "")
         if not self.bucket_name:
             raise ValueError("AWS S3 bucket name is required")
+        self.blob_cache = blob_cache_from_config(config, f"s3:{self.bucket_name}")
 
     def get(self, origin: Origin, resource_types=None) -> StorageData:
         log.info("AWS S3 get called")
@@ -89,150 +113,160 @@ class AWSS3Bucket(BaseStorage):
         call_start_ns = time.perf_counter_ns()
         result = defaultdict(dict)
         list_ns = 0
-        download_ns = 0
         pages_listed = 0
         objects_listed = 0
-        objects_downloaded = 0
-        transient_errors = 0
         aborted = 1
+        # key -> listed ETag, the cache version of the object.
+        etags: Dict[str, Optional[str]] = {}
+        cache_counter = CacheCounter(self.blob_cache)
+        pipeline = BlobDownloadPipeline(
+            lambda key, resource_type: self._load_object(key, resource_type, label, etags.get(key)),
+            result,
+            self.download_concurrency,
+        )
         try:
-            # Scoped: iterate one type at a time using tight prefix "{base}/{type}."
-            # Unscoped: single broad listing — existing behavior
-            prefixes = (
-                [f"{base_prefix}/{rt}." for rt in resource_types] if resource_types is not None else [base_prefix]
-            )
-            for prefix in prefixes:
-                continuation_token = None
-                while True:
-                    list_kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
-                    if continuation_token:
-                        list_kwargs["ContinuationToken"] = continuation_token
-
-                    list_start_ns = time.perf_counter_ns()
-                    response = self.client.list_objects_v2(**list_kwargs)
-                    list_ns += time.perf_counter_ns() - list_start_ns
-                    pages_listed += 1
-
-                    if "Contents" in response:
-                        for item in response["Contents"]:
-                            key = item["Key"]
-                            objects_listed += 1
-                            if not key.endswith(".json"):
-                                continue
-                            resource_type = key.split(".")[0].split("/")[-1]
-                            dl_start_ns = time.perf_counter_ns()
-                            try:
-                                obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
-                                result[resource_type].update(json.load(obj["Body"]))
-                                objects_downloaded += 1
-                            except json.decoder.JSONDecodeError:
-                                log.warning(f"invalid json in aws {label} resource file: {resource_type}")
-                                transient_errors += 1
-                            except ClientError as e:
-                                # NoSuchKey: race-delete between list and get. Count
-                                # alongside the GCS/Azure equivalent, warn, continue.
-                                # Other ClientErrors (auth, throttling) escape to the
-                                # outer try/finally and are logged as aborted=1.
-                                if e.response.get("Error", {}).get("Code") == "NoSuchKey":
-                                    log.warning(f"aws {label} resource file not found (may have been deleted): {key}")
-                                    transient_errors += 1
-                                else:
-                                    raise
-                            download_ns += time.perf_counter_ns() - dl_start_ns
-
-                    if response.get("IsTruncated"):
-                        continuation_token = response.get("NextContinuationToken")
-                    else:
-                        break
+            with pipeline:
+                # Scoped: iterate one type at a time using tight prefix "{base}/{type}."
+                # Unscoped: single broad listing — existing behavior
+                prefixes = (
+                    [f"{base_prefix}/{rt}." for rt in resource_types] if resource_types is not None else [base_prefix]
+                )
+                for prefix in prefixes:
+                    continuation_token = None
+                    while True:
+                        list_kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
+                        if continuation_token:
+                            list_kwargs["ContinuationToken"] = continuation_token
+
+                        list_start_ns = time.perf_counter_ns()
+                        response = self.client.list_objects_v2(**list_kwargs)
+                        list_ns += time.perf_counter_ns() - list_start_ns
+                        pages_listed += 1
+
+                        if "Contents" in response:
+                            for item in response["Contents"]:
+                                key = item["Key"]
+                                objects_listed += 1
+                                if not key.endswith(".json"):
+                                    continue
+                                self.content_manifest.record(key, md5_from_etag(item.get("ETag")))
+                                etags[key] = item.get("ETag")
+                                pipeline.submit(key, key.split(".")[0].split("/")[-1])
+
+                        if response.get("IsTruncated"):
+                            continuation_token = response.get("NextContinuationToken")
+                        else:
+                            break
+                pipeline.finish()
             aborted = 0
         finally:
             log.info(
                 "sync-cli-timing phase=list_and_load backend=aws_s3 label=%s pages_listed=%d "
                 "blobs_listed=%d blobs_downloaded=%d transient_errors=%d aborted=%d "
-                "list_ms=%d download_ms=%d wall_ms=%d",
+                "list_ms=%d download_ms=%d wall_ms=%d download_concurrency=%d effective_concurrency=%.1f %s",
                 label,
                 pages_listed,
                 objects_listed,
-                objects_downloaded,
-                transient_errors,
+                pipeline.blobs_downloaded,
+                pipeline.transient_errors,
                 aborted,
                 list_ns // 1_000_000,
-                download_ns // 1_000_000,
+                pipeline.download_ns // 1_000_000,
                 (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+                pipeline.concurrency,
+                pipeline.effective_concurrency,
+                cache_counter.log_fields(),
             )
         return result
 
+    def _load_object(self, key: str, resource_type: str, label: str, etag: Optional[str] = None) -> Optional[Dict]:
+        """Download one listed object for _list_and_load; None on a per-object
+        transient error. Runs on a BlobDownloadPipeline thread.
+
+        With the state cache on, an object whose listed ETag is cached is
+        read from local disk instead."""
+        try:
+            if self.blob_cache is None:
+                obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
+                return json.load(obj["Body"])
+            body = self.blob_cache.get(key, etag)
+            if body is None:
+                obj = self.client.get_object(Bucket=self.bucket_name, Key=key)
+                body = obj["Body"].read()
+                # Cache under the ETag of what was downloaded, not what was listed.
+                self.blob_cache.put(key, obj.get("ETag"), body)
+            return json.loads(body)
+        except json.decoder.JSONDecodeError:
+            log.warning(f"invalid json in aws {label} resource file: {resource_type}")
+            return None
+        except ClientError as e:
+            # NoSuchKey: race-delete between list and get. Count
+            # alongside the GCS/Azure equivalent, warn, continue.
+            # Other ClientErrors (auth, throttling) escape to the
+            # outer try/finally and are logged as aborted=1.
+            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                log.warning(f"aws {label} resource file not found (may have been deleted): {key}")
+                self.content_manifest.forget(key)
+                return None
+            raise
+
     def put(self, origin: Origin, data: StorageData) -> None:
         log.info("AWS S3 put called")
         call_start_ns = time.perf_counter_ns()
-        blobs_written_source = 0
-        blobs_written_destination = 0
         aborted = 1
+        pipeline = BlobWritePipeline(self._upload_blob, self.upload_concurrency, self.content_manifest)
         try:
-            if origin in [Origin.SOURCE, Origin.ALL]:
-                for resource_type, resource_data in data.source.items():
-                    base_key = f"{self.source_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            binary_data = bytes(json.dumps({_id: resource}), "UTF-8")
-                            self.client.put_object(
-                                Body=binary_data,
-                                Bucket=self.bucket_name,
-                                Key=key,
-                            )
-                            blobs_written_source += 1
-                    else:
-                        key = f"{base_key}.json"
-                        binary_data = bytes(json.dumps(resource_data), "UTF-8")
-                        self.client.put_object(
-                            Body=binary_data,
-                            Bucket=self.bucket_name,
-                            Key=key,
-                        )
-                        blobs_written_source += 1
-
-            if origin in [Origin.DESTINATION, Origin.ALL]:
-                for resource_type, resource_data in data.destination.items():
-                    base_key = f"{self.destination_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            binary_data = bytes(json.dumps({_id: resource}), "UTF-8")
-                            self.client.put_object(
-                                Body=binary_data,
-                                Bucket=self.bucket_name,
-                                Key=key,
-                            )
-                            blobs_written_destination += 1
-                    else:
-                        key = f"{base_key}.json"
-                        binary_data = bytes(json.dumps(resource_data), "UTF-8")
-                        self.client.put_object(
-                            Body=binary_data,
-                            Bucket=self.bucket_name,
-                            Key=key,
-                        )
-                        blobs_written_destination += 1
+            with pipeline:
+                if origin in [Origin.SOURCE, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.source_resources_path, data.source):
+                        pipeline.submit(key, bytes(body, "UTF-8"), "source")
+                if origin in [Origin.DESTINATION, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.destination_resources_path, data.destination):
+                        pipeline.submit(key, bytes(body, "UTF-8"), "destination")
+                pipeline.finish()
             aborted = 0
         finally:
-            log.info(
-                "sync-cli-timing phase=put backend=aws_s3 origin=%s "
-                "blobs_written_source=%d blobs_written_destination=%d aborted=%d wall_ms=%d",
-                origin.value,
-                blobs_written_source,
-                blobs_written_destination,
-                aborted,
-                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
-            )
+            log_put_summary("aws_s3", origin, pipeline, aborted, call_start_ns)
+
+    def _upload_blob(self, key: str, body: bytes) -> None:
+        """Write one state file for put(). Runs on a BlobWritePipeline thread."""
+        self.client.put_object(Body=body, Bucket=self.bucket_name, Key=key)
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        return self._read_object(key)
+
+    def read_blob_range(self, key: str, offset: int, length: int) -> Optional[bytes]:
+        return self._read_object(key, Range=f"bytes={offset}-{offset + length - 1}")
+
+    def _read_object(self, key: str, **kwargs) -> Optional[bytes]:
+        try:
+            return self.client.get_object(Bucket=self.bucket_name, Key=key, **kwargs)["Body"].read()
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") == "NoSuchKey":
+                return None
+            raise
+
+    def write_blob(self, key: str, body: bytes) -> None:
+        self.client.put_object(Body=body, Bucket=self.bucket_name, Key=key)
+
+    def list_blob_names(self, base_path: str) -> List[str]:
+        prefix = f"{base_path}/"
+        names: List[str] = []
+        continuation_token = None
+        while True:
+            kwargs = {"Bucket": self.bucket_name, "Prefix": prefix}
+            if continuation_token:
+                kwargs["ContinuationToken"] = continuation_token
+            response = self.client.list_objects_v2(**kwargs)
+            for item in response.get("Contents", []):
+                name = item["Key"][len(prefix) :]
+                if name and "/" not in name:
+                    names.append(name)
+            if response.get("IsTruncated"):
+                continuation_token = response.get("NextContinuationToken")
+            else:
+                break
+        return names
 
     def _path_for(self, origin: Origin) -> str:
         if origin == Origin.SOURCE:
@@ -265,18 +299,33 @@ class AWSS3Bucket(BaseStorage):
 
     def delete(self, origin: Origin, filename: str) -> None:
         # S3 delete_object is idempotent — succeeds even if the key is absent.
-        self.client.delete_object(
-            Bucket=self.bucket_name,
-            Key=f"{self._path_for(origin)}/{filename}",
+        key = f"{self._path_for(origin)}/{filename}"
+        self.client.delete_object(Bucket=self.bucket_name, Key=key)
+        self.content_manifest.forget(key)
+
+    def delete_many(self, origin: Origin, filenames: Iterable[str]) -> Dict[str, str]:
+        """One DeleteObjects request per S3_DELETE_BATCH_SIZE files, run concurrently."""
+        return self._delete_in_batches(origin, filenames, S3_DELETE_BATCH_SIZE, self._delete_objects)
+
+    def _delete_objects(self, keys: List[str]) -> Dict[str, str]:
+        # Quiet mode reports only the keys that failed. Like delete_object,
+        # deleting an absent key succeeds.
+        response = self.client.delete_objects(
+            Bucket=self.bucket_name, Delete={"Objects": [{"Key": key} for key in keys], "Quiet": True}
         )
+        return {
+            error["Key"]: f"error: {error.get('Code')}: {error.get('Message')}" for error in response.get("Errors", [])
+        }
 
     def _try_get_object(self, key: str) -> Optional[Dict]:
         """Fetch and parse one S3 object. Returns None on NotFound."""
         try:
             response = self.client.get_object(Bucket=self.bucket_name, Key=key)
+            self.content_manifest.record(key, md5_from_etag(response.get("ETag")))
             return json.load(response["Body"])
         except ClientError as e:
             if e.response["Error"]["Code"] == "NoSuchKey":
+                self.content_manifest.forget(key)
                 return None
             raise
         except json.decoder.JSONDecodeError:
@@ -7,7 +7,7 @@ import json
 import logging
 import time
 from collections import defaultdict
-from typing import Dict, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from azure.core.exceptions import ResourceNotFoundError
 from azure.storage.blob import BlobServiceClient, ContainerClient
@@ -19,11 +19,24 @@ from datadog_sync.constants import (
     LOGGER_NAME,
     SOURCE_PATH_DEFAULT,
 )
-from datadog_sync.utils.storage._base_storage import BaseStorage, StorageData
+from datadog_sync.utils.storage._base_storage import (
+    BaseStorage,
+    BlobDownloadPipeline,
+    BlobWritePipeline,
+    StorageData,
+    download_concurrency_from_config,
+    log_put_summary,
+    md5_from_base64,
+    upload_concurrency_from_config,
+)
+from datadog_sync.utils.storage.blob_cache import CacheCounter, blob_cache_from_config
 
 
 log = logging.getLogger(LOGGER_NAME)
 
+# Sub-requests per Blob Batch request (the service maximum).
+AZURE_DELETE_BATCH_SIZE = 256
+
 
 class AzureBlobContainer(BaseStorage):
     def __init__(
@@ -40,6 +53,8 @@ class AzureBlobContainer(BaseStorage):
         self.resource_per_file = resource_per_file
         if not config:
             raise ValueError("No Azure configuration passed in")
+        self.download_concurrency = download_concurrency_from_config(config, "azure_download_concurrency")
+        self.upload_concurrency = upload_concurrency_from_config(config, "azure_upload_concurrency")
 
         container_name = config.get("azure_container_name", "")
         if not container_name:
@@ -66,6 +81,7 @@ class AzureBlobContainer(BaseStorage):
             self.container_client = blob_service_client.get_container_client(container_name)
         else:
             raise ValueError("Azure storage requires at least a connection string or storage account name")
+        self.blob_cache = blob_cache_from_config(config, f"azure:{account_name or ''}:{container_name}")
 
     def get(self, origin: Origin, resource_types=None) -> StorageData:
         log.info("Azure Blob Storage get called")
@@ -96,145 +112,143 @@ class AzureBlobContainer(BaseStorage):
         call_start_ns = time.perf_counter_ns()
         result = defaultdict(dict)
         list_ns = 0
-        download_ns = 0
         pages_listed = 0
         blobs_listed = 0
-        blobs_downloaded = 0
-        transient_errors = 0
         aborted = 1
+        # name -> listed ETag, the cache version of the blob.
+        etags: Dict[str, Optional[str]] = {}
+        cache_counter = CacheCounter(self.blob_cache)
+        pipeline = BlobDownloadPipeline(
+            lambda name, resource_type: self._load_blob(name, resource_type, label, etags.get(name)),
+            result,
+            self.download_concurrency,
+        )
         try:
-            prefixes = (
-                [f"{base_prefix}/{rt}." for rt in resource_types] if resource_types is not None else [base_prefix]
-            )
-            for prefix in prefixes:
-                iterator = self.container_client.list_blobs(name_starts_with=prefix)
-                by_page = getattr(iterator, "by_page", None)
-                if by_page is not None:
-                    list_resume_ns = time.perf_counter_ns()
-                    for page in by_page():
-                        pages_listed += 1
-                        list_ns += time.perf_counter_ns() - list_resume_ns
-                        for blob in page:
-                            blobs_listed += 1
-                            if not blob.name.endswith(".json"):
-                                continue
-                            resource_type = blob.name.split(".")[0].split("/")[-1]
-                            dl_start_ns = time.perf_counter_ns()
-                            try:
-                                content = self.container_client.download_blob(blob.name).readall().decode("utf-8")
-                                result[resource_type].update(json.loads(content))
-                                blobs_downloaded += 1
-                            except json.decoder.JSONDecodeError:
-                                log.warning(f"invalid json in azure {label} resource file: {resource_type}")
-                                transient_errors += 1
-                            except ResourceNotFoundError:
-                                # Race-delete between list_blobs and download_blob.
-                                # Matches GCS NotFound / AWS NoSuchKey handling.
-                                log.warning(
-                                    f"azure {label} resource file not found (may have been deleted): {blob.name}"
-                                )
-                                transient_errors += 1
-                            download_ns += time.perf_counter_ns() - dl_start_ns
+            with pipeline:
+                prefixes = (
+                    [f"{base_prefix}/{rt}." for rt in resource_types] if resource_types is not None else [base_prefix]
+                )
+                for prefix in prefixes:
+                    iterator = self.container_client.list_blobs(name_starts_with=prefix)
+                    by_page = getattr(iterator, "by_page", None)
+                    if by_page is not None:
                         list_resume_ns = time.perf_counter_ns()
-                else:
-                    # Test-mock fallback: flat-list iterator with no by_page accessor.
-                    pages_listed += 1
-                    list_resume_ns = time.perf_counter_ns()
-                    for blob in iterator:
-                        list_ns += time.perf_counter_ns() - list_resume_ns
-                        blobs_listed += 1
-                        if not blob.name.endswith(".json"):
+                        for page in by_page():
+                            pages_listed += 1
+                            list_ns += time.perf_counter_ns() - list_resume_ns
+                            for blob in page:
+                                blobs_listed += 1
+                                if not blob.name.endswith(".json"):
+                                    continue
+                                self._record_listed_md5(blob)
+                                etags[blob.name] = getattr(blob, "etag", None)
+                                pipeline.submit(blob.name, blob.name.split(".")[0].split("/")[-1])
                             list_resume_ns = time.perf_counter_ns()
-                            continue
-                        resource_type = blob.name.split(".")[0].split("/")[-1]
-                        dl_start_ns = time.perf_counter_ns()
-                        try:
-                            content = self.container_client.download_blob(blob.name).readall().decode("utf-8")
-                            result[resource_type].update(json.loads(content))
-                            blobs_downloaded += 1
-                        except json.decoder.JSONDecodeError:
-                            log.warning(f"invalid json in azure {label} resource file: {resource_type}")
-                            transient_errors += 1
-                        except ResourceNotFoundError:
-                            # Race-delete between list_blobs and download_blob.
-                            # Matches GCS NotFound / AWS NoSuchKey handling.
-                            log.warning(f"azure {label} resource file not found (may have been deleted): {blob.name}")
-                            transient_errors += 1
-                        download_ns += time.perf_counter_ns() - dl_start_ns
+                    else:
+                        # Test-mock fallback: flat-list iterator with no by_page accessor.
+                        pages_listed += 1
                         list_resume_ns = time.perf_counter_ns()
+                        for blob in iterator:
+                            list_ns += time.perf_counter_ns() - list_resume_ns
+                            blobs_listed += 1
+                            if blob.name.endswith(".json"):
+                                self._record_listed_md5(blob)
+                                etags[blob.name] = getattr(blob, "etag", None)
+                                pipeline.submit(blob.name, blob.name.split(".")[0].split("/")[-1])
+                            list_resume_ns = time.perf_counter_ns()
+                pipeline.finish()
             aborted = 0
         finally:
             log.info(
                 "sync-cli-timing phase=list_and_load backend=azure_blob label=%s pages_listed=%d "
                 "blobs_listed=%d blobs_downloaded=%d transient_errors=%d aborted=%d "
-                "list_ms=%d download_ms=%d wall_ms=%d",
+                "list_ms=%d download_ms=%d wall_ms=%d download_concurrency=%d effective_concurrency=%.1f %s",
                 label,
                 pages_listed,
                 blobs_listed,
-                blobs_downloaded,
-                transient_errors,
+                pipeline.blobs_downloaded,
+                pipeline.transient_errors,
                 aborted,
                 list_ns // 1_000_000,
-                download_ns // 1_000_000,
+                pipeline.download_ns // 1_000_000,
                 (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+                pipeline.concurrency,
+                pipeline.effective_concurrency,
+                cache_counter.log_fields(),
             )
         return result
 
+    def _load_blob(self, name: str, resource_type: str, label: str, etag: Optional[str] = None) -> Optional[Dict]:
+        """Download one listed blob for _list_and_load; None on a per-blob
+        transient error. Runs on a BlobDownloadPipeline thread.
+
+        With the state cache on, a blob whose listed ETag is cached is read
+        from local disk instead."""
+        try:
+            if self.blob_cache is None:
+                return json.loads(self.container_client.download_blob(name).readall().decode("utf-8"))
+            body = self.blob_cache.get(name, etag)
+            if body is None:
+                downloader = self.container_client.download_blob(name)
+                body = downloader.readall()
+                # Cache under the ETag of what was downloaded, not what was listed.
+                self.blob_cache.put(name, getattr(downloader.properties, "etag", None), body)
+            return json.loads(body.decode("utf-8"))
+        except json.decoder.JSONDecodeError:
+            log.warning(f"invalid json in azure {label} resource file: {resource_type}")
+            return None
+        except ResourceNotFoundError:
+            # Race-delete between list_blobs and download_blob.
+            # Matches GCS NotFound / AWS NoSuchKey handling.
+            log.warning(f"azure {label} resource file not found (may have been deleted): {name}")
+            self.content_manifest.forget(name)
+            return None
+
+    def _record_listed_md5(self, blob) -> None:
+        content_settings = getattr(blob, "content_settings", None)
+        self.content_manifest.record(blob.name, md5_from_base64(getattr(content_settings, "content_md5", None)))
+
     def put(self, origin: Origin, data: StorageData) -> None:
         log.info("Azure Blob Storage put called")
         call_start_ns = time.perf_counter_ns()
-        blobs_written_source = 0
-        blobs_written_destination = 0
         aborted = 1
+        pipeline = BlobWritePipeline(self._upload_blob, self.upload_concurrency, self.content_manifest)
         try:
-            if origin in [Origin.SOURCE, Origin.ALL]:
-                for resource_type, resource_data in data.source.items():
-                    base_key = f"{self.source_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            self.container_client.upload_blob(
-                                name=key, data=json.dumps({_id: resource}), overwrite=True
-                            )
-                            blobs_written_source += 1
-                    else:
-                        key = f"{base_key}.json"
-                        self.container_client.upload_blob(name=key, data=json.dumps(resource_data), overwrite=True)
-                        blobs_written_source += 1
-
-            if origin in [Origin.DESTINATION, Origin.ALL]:
-                for resource_type, resource_data in data.destination.items():
-                    base_key = f"{self.destination_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            self.container_client.upload_blob(
-                                name=key, data=json.dumps({_id: resource}), overwrite=True
-                            )
-                            blobs_written_destination += 1
-                    else:
-                        key = f"{base_key}.json"
-                        self.container_client.upload_blob(name=key, data=json.dumps(resource_data), overwrite=True)
-                        blobs_written_destination += 1
+            with pipeline:
+                if origin in [Origin.SOURCE, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.source_resources_path, data.source):
+                        pipeline.submit(key, body, "source")
+                if origin in [Origin.DESTINATION, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.destination_resources_path, data.destination):
+                        pipeline.submit(key, body, "destination")
+                pipeline.finish()
             aborted = 0
         finally:
-            log.info(
-                "sync-cli-timing phase=put backend=azure_blob origin=%s "
-                "blobs_written_source=%d blobs_written_destination=%d aborted=%d wall_ms=%d",
-                origin.value,
-                blobs_written_source,
-                blobs_written_destination,
-                aborted,
-                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
-            )
+            log_put_summary("azure_blob", origin, pipeline, aborted, call_start_ns)
+
+    def _upload_blob(self, key: str, body: str) -> None:
+        """Write one state file for put(). Runs on a BlobWritePipeline thread."""
+        self.container_client.upload_blob(name=key, data=body, overwrite=True)
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        try:
+            return self.container_client.download_blob(key).readall()
+        except ResourceNotFoundError:
+            return None
+
+    def read_blob_range(self, key: str, offset: int, length: int) -> Optional[bytes]:
+        try:
+            return self.container_client.download_blob(key, offset=offset, length=length).readall()
+        except ResourceNotFoundError:
+            return None
+
+    def write_blob(self, key: str, body: bytes) -> None:
+        self.container_client.upload_blob(name=key, data=body, overwrite=True)
+
+    def list_blob_names(self, base_path: str) -> List[str]:
+        prefix = f"{base_path}/"
+        names = (blob.name[len(prefix) :] for blob in self.container_client.list_blobs(name_starts_with=prefix))
+        return [name for name in names if name and "/" not in name]
 
     def _path_for(self, origin: Origin) -> str:
         if origin == Origin.SOURCE:
@@ -259,13 +273,29 @@ class AzureBlobContainer(BaseStorage):
             self.container_client.delete_blob(key)
         except ResourceNotFoundError:
             pass  # idempotent
+        self.content_manifest.forget(key)
+
+    def delete_many(self, origin: Origin, filenames: Iterable[str]) -> Dict[str, str]:
+        """One delete_blobs batch per AZURE_DELETE_BATCH_SIZE files, run concurrently."""
+        return self._delete_in_batches(origin, filenames, AZURE_DELETE_BATCH_SIZE, self._delete_blob_batch)
+
+    def _delete_blob_batch(self, keys: List[str]) -> Dict[str, str]:
+        responses = self.container_client.delete_blobs(*keys, raise_on_any_failure=False)
+        # One sub-response per blob, in order; 404 is an already-deleted blob.
+        return {
+            key: f"error: HTTP {response.status_code}: {response.reason}"
+            for key, response in zip(keys, responses)
+            if not (200 <= response.status_code < 300 or response.status_code == 404)
+        }
 
     def _try_get_blob(self, key: str) -> Optional[Dict]:
         """Fetch and parse one Azure blob. Returns None on ResourceNotFoundError."""
         try:
-            content = self.container_client.download_blob(key).readall().decode("utf-8")
-            return json.loads(content)
+            raw = self.container_client.download_blob(key).readall()
+            self.content_manifest.record(key, self.content_manifest.digest(raw))
+            return json.loads(raw.decode("utf-8"))
         except ResourceNotFoundError:
+            self.content_manifest.forget(key)
             return None
         except json.decoder.JSONDecodeError:
             log.warning(f"invalid json in azure resource file: {key}")
@@ -0,0 +1,168 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""On-disk read-through cache for the cloud backends' state blobs.
+
+Entries are keyed by (namespace, object key, version), where the version is
+what the listing reports for the object (S3 ETag, GCS generation, Azure
+ETag). A changed object lists with a new version and so never matches a
+stale entry; superseded entries simply age out of the LRU. Entry files are
+named by the hash of the key, so several processes can share a directory:
+a file evicted by another process is just a miss.
+"""
+
+import contextlib
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from datadog_sync.constants import LOGGER_NAME
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+STATE_CACHE_DIR = "state_cache_dir"
+STATE_CACHE_MAX_BYTES = "state_cache_max_bytes"
+STATE_CACHE_MAX_MB_DEFAULT = 512
+
+_ENTRY_SUFFIX = ".blob"
+
+
+def default_state_cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "datadog-sync-cli", "state")
+
+
+class BlobCache:
+    def __init__(self, directory: str, max_bytes: int, namespace: str) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # entry file name -> size, least recently used first.
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+        # Cached blobs are raw state, possibly sensitive: owner-only.
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        self._scan()
+
+    def _scan(self) -> None:
+        found = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(_ENTRY_SUFFIX) and entry.is_file():
+                    st = entry.stat()
+                    found.append((st.st_mtime, entry.name, st.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = size
+            self._total += size
+
+    def _name(self, key: str, version: str) -> str:
+        digest = hashlib.sha256(f"{self.namespace}\0{key}\0{version}".encode("utf-8")).hexdigest()
+        return digest + _ENTRY_SUFFIX
+
+    def get(self, key: str, version: Optional[Any]) -> Optional[bytes]:
+        """The cached body of `key` at `version`, or None (a miss)."""
+        if version is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        name = self._name(key, str(version))
+        path = os.path.join(self.directory, name)
+        try:
+            with open(path, "rb") as f:
+                body = f.read()
+            with contextlib.suppress(OSError):
+                os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+                self._drop(name)
+            return None
+        with self._lock:
+            self.hits += 1
+            if name in self._entries:
+                self._entries.move_to_end(name)
+        return body
+
+    def put(self, key: str, version: Optional[Any], body: bytes) -> None:
+        """Store `body` as `key` at `version`; never raises (the cache is best-effort)."""
+        if version is None or len(body) > self.max_bytes:
+            return
+        name = self._name(key, str(version))
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with os.fdopen(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+                f.write(body)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.debug(f"state cache write failed for {key}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            return
+        with self._lock:
+            self._drop(name)
+            self._entries[name] = len(body)
+            self._total += len(body)
+            self._evict()
+
+    def _drop(self, name: str) -> None:
+        size = self._entries.pop(name, None)
+        if size is not None:
+            self._total -= size
+
+    def _evict(self) -> None:
+        while self._total > self.max_bytes and self._entries:
+            name, size = self._entries.popitem(last=False)
+            self._total -= size
+            with contextlib.suppress(OSError):
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class CacheCounter:
+    """Hits/misses of one BlobCache during one list_and_load call."""
+
+    def __init__(self, cache: Optional[BlobCache]) -> None:
+        self._cache = cache
+        self._start = cache.stats() if cache is not None else {"hits": 0, "misses": 0}
+
+    def delta(self) -> Dict[str, int]:
+        now = self._cache.stats() if self._cache is not None else self._start
+        return {k: now[k] - self._start[k] for k in now}
+
+    def log_fields(self) -> str:
+        delta = self.delta()
+        lookups = delta["hits"] + delta["misses"]
+        return "cache_hits=%d cache_misses=%d cache_hit_rate=%.2f" % (
+            delta["hits"],
+            delta["misses"],
+            delta["hits"] / lookups if lookups else 0.0,
+        )
+
+
+def blob_cache_from_config(config: Optional[Dict], namespace: str) -> Optional[BlobCache]:
+    """The cache configured by build_storage_settings(), or None when it is off.
+
+    Off when the config has no cache directory: backends built directly, or
+    --disable-state-cache.
+    """
+    if not config or not config.get(STATE_CACHE_DIR):
+        return None
+    max_bytes = config.get(STATE_CACHE_MAX_BYTES) or STATE_CACHE_MAX_MB_DEFAULT * 1024 * 1024
+    try:
+        return BlobCache(config[STATE_CACHE_DIR], int(max_bytes), namespace)
+    except OSError as e:
+        log.warning(f"state cache disabled, cannot use {config[STATE_CACHE_DIR]}: {e}")
+        return None
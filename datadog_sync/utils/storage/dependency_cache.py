@@ -0,0 +1,69 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Dependency graph edges computed by earlier runs (--cache-dependency-graph).
+
+One object per resource type, next to the destination state:
+``{destination_resources_path}/{type}.dependencies.gz``, gzip-compressed JSON
+``{"version", "cli_version", "destination_digest", "edges": {id: [content_hash,
+[[dep_type, dep_id], ...]]}}``. An edge list holds the failed connections
+of the source resource whose content hashed to content_hash, computed while
+the destination held the IDs digested in destination_digest. Like the
+applied fingerprints, a file written by another CLI version reads as empty.
+"""
+
+import gzip
+import json
+import logging
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from datadog_sync.constants import LOGGER_NAME
+from datadog_sync.utils.storage.applied_fingerprints import cli_version
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+DEPENDENCY_CACHE_SUFFIX = ".dependencies.gz"
+DEPENDENCY_CACHE_VERSION = 1
+
+# id -> [content_hash, [[dep_type, dep_id], ...]]
+Edges = Dict[str, List]
+
+
+def dependency_cache_key(base_path: str, resource_type: str) -> str:
+    return f"{base_path}/{resource_type}{DEPENDENCY_CACHE_SUFFIX}"
+
+
+def encode_dependency_cache(destination_digest: Optional[str], edges: Edges) -> bytes:
+    payload = {
+        "version": DEPENDENCY_CACHE_VERSION,
+        "cli_version": cli_version(),
+        "destination_digest": destination_digest,
+        "edges": edges,
+    }
+    return gzip.compress(json.dumps(payload, sort_keys=True).encode("utf-8"), mtime=0)
+
+
+def decode_dependency_cache(raw: Optional[bytes], key: str) -> Tuple[Optional[str], Edges]:
+    """The (destination_digest, edges) stored in raw; (None, {}) if absent, unreadable or from another version."""
+    if raw is None:
+        return None, {}
+    try:
+        payload = json.loads(gzip.decompress(raw))
+    except (OSError, EOFError, zlib.error, ValueError) as e:
+        log.warning(f"ignoring invalid dependency cache {key}: {e}")
+        return None, {}
+    if (
+        not isinstance(payload, dict)
+        or payload.get("version") != DEPENDENCY_CACHE_VERSION
+        or payload.get("cli_version") != cli_version()
+    ):
+        log.info(f"ignoring dependency cache {key} written by another version")
+        return None, {}
+    edges = payload.get("edges")
+    if not isinstance(edges, dict):
+        return None, {}
+    return payload.get("destination_digest"), edges
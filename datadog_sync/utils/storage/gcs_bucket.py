@@ -7,7 +7,7 @@ import json
 import logging
 import time
 from collections import defaultdict
-from typing import Dict, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from google.api_core.exceptions import NotFound
 from google.cloud import storage as gcs_storage
@@ -18,11 +18,24 @@ from datadog_sync.constants import (
     LOGGER_NAME,
     SOURCE_PATH_DEFAULT,
 )
-from datadog_sync.utils.storage._base_storage import BaseStorage, StorageData
+from datadog_sync.utils.storage._base_storage import (
+    BaseStorage,
+    BlobDownloadPipeline,
+    BlobWritePipeline,
+    StorageData,
+    download_concurrency_from_config,
+    log_put_summary,
+    md5_from_base64,
+    upload_concurrency_from_config,
+)
+from datadog_sync.utils.storage.blob_cache import CacheCounter, blob_cache_from_config
 
 
 log = logging.getLogger(LOGGER_NAME)
 
+# Calls per JSON API batch request; GCS rejects batches larger than 100.
+GCS_DELETE_BATCH_SIZE = 100
+
 
 class GCSBucket(BaseStorage):
     def __init__(
@@ -39,6 +52,8 @@ class GCSBucket(BaseStorage):
         self.resource_per_file = resource_per_file
         if not config:
             raise ValueError("No GCS configuration passed in")
+        self.download_concurrency = download_concurrency_from_config(config, "gcs_download_concurrency")
+        self.upload_concurrency = upload_concurrency_from_config(config, "gcs_upload_concurrency")
 
         key_file = config.get("gcs_service_account_key_file", None)
         if key_file:
@@ -52,6 +67,7 @@ class GCSBucket(BaseStorage):
         if not bucket_name:
             raise ValueError("GCS bucket name is required")
         self.bucket = self.client.bucket(bucket_name)
+        self.blob_cache = blob_cache_from_config(config, f"gcs:{bucket_name}")
 
     def get(self, origin: Origin, resource_types=None) -> StorageData:
         log.info("GCS get called")
@@ -94,143 +110,136 @@ class GCSBucket(BaseStorage):
         result = defaultdict(dict)
         prefixes = [f"{base_prefix}/{rt}." for rt in resource_types] if resource_types is not None else [base_prefix]
         list_ns = 0
-        download_ns = 0
         pages_listed = 0
         blobs_listed = 0
-        blobs_downloaded = 0
-        transient_errors = 0
         aborted = 1
+        # name -> listed generation, the cache version of the blob.
+        generations: Dict[str, Optional[int]] = {}
+        cache_counter = CacheCounter(self.blob_cache)
+        pipeline = BlobDownloadPipeline(
+            lambda name, resource_type: self._load_blob(name, resource_type, label, generations.get(name)),
+            result,
+            self.download_concurrency,
+        )
         try:
-            for prefix in prefixes:
-                iterator = self.bucket.list_blobs(prefix=prefix)
-                pages_iter = getattr(iterator, "pages", None)
-                if pages_iter is not None:
-                    # Real HTTPIterator: iterate page-by-page for accurate page count.
-                    list_resume_ns = time.perf_counter_ns()
-                    for page in pages_iter:
-                        pages_listed += 1
-                        list_ns += time.perf_counter_ns() - list_resume_ns
-                        for blob in page:
-                            blobs_listed += 1
-                            if not blob.name.endswith(".json"):
-                                continue
-                            resource_type = blob.name.split(".")[0].split("/")[-1]
-                            dl_start_ns = time.perf_counter_ns()
-                            try:
-                                content = self.bucket.blob(blob.name).download_as_text()
-                                result[resource_type].update(json.loads(content))
-                                blobs_downloaded += 1
-                            except json.decoder.JSONDecodeError:
-                                log.warning(f"invalid json in gcs {label} resource file: {resource_type}")
-                                transient_errors += 1
-                            except NotFound:
-                                log.warning(f"gcs {label} resource file not found (may have been deleted): {blob.name}")
-                                transient_errors += 1
-                            download_ns += time.perf_counter_ns() - dl_start_ns
+            with pipeline:
+                for prefix in prefixes:
+                    iterator = self.bucket.list_blobs(prefix=prefix)
+                    pages_iter = getattr(iterator, "pages", None)
+                    if pages_iter is not None:
+                        # Real HTTPIterator: iterate page-by-page for accurate page count.
                         list_resume_ns = time.perf_counter_ns()
-                else:
-                    # Test-mock fallback: flat-list iterator with no pages accessor.
-                    # Treat the whole iterator as one page; per-blob download timing
-                    # is still accurate.
-                    pages_listed += 1
-                    list_resume_ns = time.perf_counter_ns()
-                    for blob in iterator:
-                        list_ns += time.perf_counter_ns() - list_resume_ns
-                        blobs_listed += 1
-                        if not blob.name.endswith(".json"):
+                        for page in pages_iter:
+                            pages_listed += 1
+                            list_ns += time.perf_counter_ns() - list_resume_ns
+                            for blob in page:
+                                blobs_listed += 1
+                                if not blob.name.endswith(".json"):
+                                    continue
+                                self.content_manifest.record(blob.name, md5_from_base64(blob.md5_hash))
+                                generations[blob.name] = getattr(blob, "generation", None)
+                                pipeline.submit(blob.name, blob.name.split(".")[0].split("/")[-1])
                             list_resume_ns = time.perf_counter_ns()
-                            continue
-                        resource_type = blob.name.split(".")[0].split("/")[-1]
-                        dl_start_ns = time.perf_counter_ns()
-                        try:
-                            content = self.bucket.blob(blob.name).download_as_text()
-                            result[resource_type].update(json.loads(content))
-                            blobs_downloaded += 1
-                        except json.decoder.JSONDecodeError:
-                            log.warning(f"invalid json in gcs {label} resource file: {resource_type}")
-                            transient_errors += 1
-                        except NotFound:
-                            log.warning(f"gcs {label} resource file not found (may have been deleted): {blob.name}")
-                            transient_errors += 1
-                        download_ns += time.perf_counter_ns() - dl_start_ns
+                    else:
+                        # Test-mock fallback: flat-list iterator with no pages accessor.
+                        # Treat the whole iterator as one page.
+                        pages_listed += 1
                         list_resume_ns = time.perf_counter_ns()
+                        for blob in iterator:
+                            list_ns += time.perf_counter_ns() - list_resume_ns
+                            blobs_listed += 1
+                            if blob.name.endswith(".json"):
+                                self.content_manifest.record(blob.name, md5_from_base64(blob.md5_hash))
+                                generations[blob.name] = getattr(blob, "generation", None)
+                                pipeline.submit(blob.name, blob.name.split(".")[0].split("/")[-1])
+                            list_resume_ns = time.perf_counter_ns()
+                pipeline.finish()
             aborted = 0
         finally:
             log.info(
                 "sync-cli-timing phase=list_and_load backend=gcs label=%s pages_listed=%d "
                 "blobs_listed=%d blobs_downloaded=%d transient_errors=%d aborted=%d "
-                "list_ms=%d download_ms=%d wall_ms=%d",
+                "list_ms=%d download_ms=%d wall_ms=%d download_concurrency=%d effective_concurrency=%.1f %s",
                 label,
                 pages_listed,
                 blobs_listed,
-                blobs_downloaded,
-                transient_errors,
+                pipeline.blobs_downloaded,
+                pipeline.transient_errors,
                 aborted,
                 list_ns // 1_000_000,
-                download_ns // 1_000_000,
+                pipeline.download_ns // 1_000_000,
                 (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+                pipeline.concurrency,
+                pipeline.effective_concurrency,
+                cache_counter.log_fields(),
             )
         return result
 
+    def _load_blob(self, name: str, resource_type: str, label: str, generation: Optional[int] = None) -> Optional[Dict]:
+        """Download one listed blob for _list_and_load; None on a per-blob
+        transient error. Runs on a BlobDownloadPipeline thread.
+
+        With the state cache on, a blob whose listed generation is cached is
+        read from local disk; otherwise that exact generation is downloaded
+        and cached."""
+        try:
+            if self.blob_cache is None or generation is None:
+                return json.loads(self.bucket.blob(name).download_as_text())
+            body = self.blob_cache.get(name, generation)
+            if body is None:
+                body = self.bucket.blob(name, generation=generation).download_as_bytes()
+                self.blob_cache.put(name, generation, body)
+            return json.loads(body)
+        except json.decoder.JSONDecodeError:
+            log.warning(f"invalid json in gcs {label} resource file: {resource_type}")
+            return None
+        except NotFound:
+            log.warning(f"gcs {label} resource file not found (may have been deleted): {name}")
+            self.content_manifest.forget(name)
+            return None
+
     def put(self, origin: Origin, data: StorageData) -> None:
         log.info("GCS put called")
         call_start_ns = time.perf_counter_ns()
-        blobs_written_source = 0
-        blobs_written_destination = 0
         aborted = 1
+        pipeline = BlobWritePipeline(self._upload_blob, self.upload_concurrency, self.content_manifest)
         try:
-            if origin in [Origin.SOURCE, Origin.ALL]:
-                for resource_type, resource_data in data.source.items():
-                    base_key = f"{self.source_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            self.bucket.blob(key).upload_from_string(
-                                json.dumps({_id: resource}), content_type="application/json"
-                            )
-                            blobs_written_source += 1
-                    else:
-                        key = f"{base_key}.json"
-                        self.bucket.blob(key).upload_from_string(
-                            json.dumps(resource_data), content_type="application/json"
-                        )
-                        blobs_written_source += 1
-
-            if origin in [Origin.DESTINATION, Origin.ALL]:
-                for resource_type, resource_data in data.destination.items():
-                    base_key = f"{self.destination_resources_path}/{resource_type}"
-                    if self.resource_per_file:
-                        skip_ids = self._check_id_collisions(resource_data, resource_type)
-                        for _id, resource in resource_data.items():
-                            if _id in skip_ids:
-                                continue
-                            safe_id = self._sanitize_id_for_filename(_id)
-                            key = f"{base_key}.{safe_id}.json"
-                            self.bucket.blob(key).upload_from_string(
-                                json.dumps({_id: resource}), content_type="application/json"
-                            )
-                            blobs_written_destination += 1
-                    else:
-                        key = f"{base_key}.json"
-                        self.bucket.blob(key).upload_from_string(
-                            json.dumps(resource_data), content_type="application/json"
-                        )
-                        blobs_written_destination += 1
+            with pipeline:
+                if origin in [Origin.SOURCE, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.source_resources_path, data.source):
+                        pipeline.submit(key, body, "source")
+                if origin in [Origin.DESTINATION, Origin.ALL]:
+                    for key, body in self._iter_state_files(self.destination_resources_path, data.destination):
+                        pipeline.submit(key, body, "destination")
+                pipeline.finish()
             aborted = 0
         finally:
-            log.info(
-                "sync-cli-timing phase=put backend=gcs origin=%s "
-                "blobs_written_source=%d blobs_written_destination=%d aborted=%d wall_ms=%d",
-                origin.value,
-                blobs_written_source,
-                blobs_written_destination,
-                aborted,
-                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
-            )
+            log_put_summary("gcs", origin, pipeline, aborted, call_start_ns)
+
+    def _upload_blob(self, key: str, body: str) -> None:
+        """Write one state file for put(). Runs on a BlobWritePipeline thread."""
+        self.bucket.blob(key).upload_from_string(body, content_type="application/json")
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        try:
+            return self.bucket.blob(key).download_as_bytes()
+        except NotFound:
+            return None
+
+    def read_blob_range(self, key: str, offset: int, length: int) -> Optional[bytes]:
+        try:
+            # `end` is inclusive.
+            return self.bucket.blob(key).download_as_bytes(start=offset, end=offset + length - 1)
+        except NotFound:
+            return None
+
+    def write_blob(self, key: str, body: bytes) -> None:
+        self.bucket.blob(key).upload_from_string(body, content_type="application/octet-stream")
+
+    def list_blob_names(self, base_path: str) -> List[str]:
+        prefix = f"{base_path}/"
+        names = (blob.name[len(prefix) :] for blob in self.bucket.list_blobs(prefix=prefix))
+        return [name for name in names if name and "/" not in name]
 
     def _path_for(self, origin: Origin) -> str:
         if origin == Origin.SOURCE:
@@ -255,13 +264,33 @@ class GCSBucket(BaseStorage):
             self.bucket.blob(key).delete()
         except NotFound:
             pass  # idempotent
+        self.content_manifest.forget(key)
+
+    def delete_many(self, origin: Origin, filenames: Iterable[str]) -> Dict[str, str]:
+        """One batch request per GCS_DELETE_BATCH_SIZE files, run concurrently."""
+        return self._delete_in_batches(origin, filenames, GCS_DELETE_BATCH_SIZE, self._delete_blob_batch)
+
+    def _delete_blob_batch(self, keys: List[str]) -> Dict[str, str]:
+        batch = self.client.batch(raise_exception=False)
+        with batch:
+            for key in keys:
+                self.bucket.delete_blob(key)
+        # Batch.finish() keeps one sub-response per deferred call, in order.
+        # 404 is an already-deleted blob, which delete() treats as success.
+        return {
+            key: f"error: HTTP {response.status_code}"
+            for key, response in zip(keys, batch._responses)
+            if not (200 <= response.status_code < 300 or response.status_code == 404)
+        }
 
     def _try_get_blob(self, key: str) -> Optional[Dict]:
         """Fetch and parse one GCS blob. Returns None on NotFound."""
         try:
             content = self.bucket.blob(key).download_as_text()
+            self.content_manifest.record(key, self.content_manifest.digest(content))
             return json.loads(content)
         except NotFound:
+            self.content_manifest.forget(key)
             return None
         except json.decoder.JSONDecodeError:
             log.warning(f"invalid json in gcs resource file: {key}")
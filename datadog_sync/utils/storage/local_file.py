@@ -3,11 +3,14 @@
 # This product includes software developed at Datadog (https://www.datadoghq.com/).
 # Copyright 2019 Datadog, Inc.
 
+import contextlib
 import json
 import logging
+import mmap
 import os
+import threading
 import time
-from typing import Dict, Optional, Set, Tuple
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from datadog_sync.constants import (
     Origin,
@@ -15,11 +18,16 @@ from datadog_sync.constants import (
     LOGGER_NAME,
     SOURCE_PATH_DEFAULT,
 )
-from datadog_sync.utils.storage._base_storage import BaseStorage, StorageData
+from datadog_sync.utils.storage._base_storage import BaseStorage, BlobWritePipeline, StorageData, log_put_summary
 
 
 log = logging.getLogger(LOGGER_NAME)
 
+# Per-file writes kept in flight by put() under resource_per_file. Each file
+# is serialized up front and written with a single write() and no fsync, so
+# the threads mostly overlap open/close syscalls.
+LOCAL_WRITE_CONCURRENCY = 8
+
 
 class LocalFile(BaseStorage):
     def __init__(
@@ -49,11 +57,13 @@ class LocalFile(BaseStorage):
         """Helper that loads one prefix and emits a `list_and_load` log line
         matching the cloud-backend schema (label, pages_listed, blobs_listed,
         blobs_downloaded, transient_errors, aborted, list_ms, download_ms,
-        wall_ms). The log is emitted from a finally block so it fires even when
-        os.listdir / open / json.load raises and the exception propagates out.
+        wall_ms, download_concurrency, effective_concurrency). The log is
+        emitted from a finally block so it fires even when os.listdir / open /
+        json.load raises and the exception propagates out.
 
         For local files, pages_listed=1 (single os.listdir call), list_ms is
-        the os.listdir wall-clock, download_ms sums the per-file open+json.load.
+        the os.listdir wall-clock, download_ms sums the per-file open+json.load
+        and files are read sequentially (download_concurrency=1).
         """
         call_start_ns = time.perf_counter_ns()
         list_ns = 0
@@ -75,20 +85,23 @@ class LocalFile(BaseStorage):
                     if resource_types is not None and resource_type not in resource_types:
                         continue
                     dl_start_ns = time.perf_counter_ns()
-                    with open(f"{base_path}/{file}", "r", encoding="utf-8") as input_file:
-                        try:
-                            target[resource_type].update(json.load(input_file))
-                            files_loaded += 1
-                        except json.decoder.JSONDecodeError:
-                            log.warning(f"invalid json in {label} resource file: {file}")
-                            transient_errors += 1
+                    path = f"{base_path}/{file}"
+                    with open(path, "rb") as input_file:
+                        raw = input_file.read()
+                    try:
+                        target[resource_type].update(json.loads(raw.decode("utf-8")))
+                        files_loaded += 1
+                        self.content_manifest.record(path, self.content_manifest.digest(raw))
+                    except json.decoder.JSONDecodeError:
+                        log.warning(f"invalid json in {label} resource file: {file}")
+                        transient_errors += 1
                     download_ns += time.perf_counter_ns() - dl_start_ns
             aborted = 0
         finally:
             log.info(
                 "sync-cli-timing phase=list_and_load backend=local_file label=%s pages_listed=1 "
                 "blobs_listed=%d blobs_downloaded=%d transient_errors=%d aborted=%d "
-                "list_ms=%d download_ms=%d wall_ms=%d",
+                "list_ms=%d download_ms=%d wall_ms=%d download_concurrency=1 effective_concurrency=%.1f",
                 label,
                 files_listed,
                 files_loaded,
@@ -97,76 +110,91 @@ class LocalFile(BaseStorage):
                 list_ns // 1_000_000,
                 download_ns // 1_000_000,
                 (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+                1.0 if download_ns else 0.0,
             )
 
     def put(self, origin: Origin, data: StorageData) -> None:
         call_start_ns = time.perf_counter_ns()
-        blobs_written_source = 0
-        blobs_written_destination = 0
         aborted = 1
+        pipeline = BlobWritePipeline(
+            self._write_file, LOCAL_WRITE_CONCURRENCY if self.resource_per_file else 1, self.content_manifest
+        )
         try:
-            if origin in [Origin.SOURCE, Origin.ALL]:
-                os.makedirs(self.source_resources_path, exist_ok=True)
-                blobs_written_source = self.write_resources_file(Origin.SOURCE, data)
-
-            if origin in [Origin.DESTINATION, Origin.ALL]:
-                os.makedirs(self.destination_resources_path, exist_ok=True)
-                blobs_written_destination = self.write_resources_file(origin, data)
+            with pipeline:
+                if origin in [Origin.SOURCE, Origin.ALL]:
+                    os.makedirs(self.source_resources_path, exist_ok=True)
+                    self.write_resources_file(Origin.SOURCE, data, pipeline)
+
+                if origin in [Origin.DESTINATION, Origin.ALL]:
+                    os.makedirs(self.destination_resources_path, exist_ok=True)
+                    self.write_resources_file(Origin.DESTINATION, data, pipeline)
+                pipeline.finish()
             aborted = 0
         finally:
-            log.info(
-                "sync-cli-timing phase=put backend=local_file origin=%s "
-                "blobs_written_source=%d blobs_written_destination=%d aborted=%d wall_ms=%d",
-                origin.value,
-                blobs_written_source,
-                blobs_written_destination,
-                aborted,
-                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
-            )
+            log_put_summary("local_file", origin, pipeline, aborted, call_start_ns)
 
-    def write_resources_file(self, origin: Origin, data: StorageData) -> int:
-        """Write the requested origin's data to disk. Returns the count of
-        files written so callers can include it in their timing log.
+    def write_resources_file(self, origin: Origin, data: StorageData, pipeline: BlobWritePipeline) -> int:
+        """Queue the requested origin's files on `pipeline` (drained by put()).
+        Returns the count of files queued.
         """
-        written = 0
+        queued = 0
         if origin in [Origin.SOURCE, Origin.ALL]:
-            for resource_type, value in data.source.items():
-                base_filename = f"{self.source_resources_path}/{resource_type}"
-                if self.resource_per_file:
-                    skip_ids = self._check_id_collisions(value, resource_type)
-                    for _id, resource in value.items():
-                        if _id in skip_ids:
-                            continue
-                        safe_id = self._sanitize_id_for_filename(_id)
-                        filename = f"{base_filename}.{safe_id}.json"
-                        with open(filename, "w+", encoding="utf-8") as out_file:
-                            json.dump({_id: resource}, out_file)
-                        written += 1
-                else:
-                    filename = f"{base_filename}.json"
-                    with open(filename, "w+", encoding="utf-8") as out_file:
-                        json.dump(value, out_file)
-                    written += 1
-
+            for path, body in self._iter_state_files(self.source_resources_path, data.source):
+                pipeline.submit(path, body, "source")
+                queued += 1
         if origin in [Origin.DESTINATION, Origin.ALL]:
-            for resource_type, value in data.destination.items():
-                base_filename = f"{self.destination_resources_path}/{resource_type}"
-                if self.resource_per_file:
-                    skip_ids = self._check_id_collisions(value, resource_type)
-                    for _id, resource in value.items():
-                        if _id in skip_ids:
-                            continue
-                        safe_id = self._sanitize_id_for_filename(_id)
-                        filename = f"{base_filename}.{safe_id}.json"
-                        with open(filename, "w+", encoding="utf-8") as out_file:
-                            json.dump({_id: resource}, out_file)
-                        written += 1
-                else:
-                    filename = f"{base_filename}.json"
-                    with open(filename, "w+", encoding="utf-8") as out_file:
-                        json.dump(value, out_file)
-                    written += 1
-        return written
+            for path, body in self._iter_state_files(self.destination_resources_path, data.destination):
+                pipeline.submit(path, body, "destination")
+                queued += 1
+        return queued
+
+    @staticmethod
+    def _write_file(path: str, body: str) -> None:
+        with open(path, "w", encoding="utf-8") as out_file:
+            out_file.write(body)
+
+    def read_blob(self, key: str) -> Optional[bytes]:
+        try:
+            with open(key, "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def read_blob_range(self, key: str, offset: int, length: int) -> Optional[bytes]:
+        try:
+            with open(key, "rb") as f:
+                f.seek(offset)
+                return f.read(length)
+        except FileNotFoundError:
+            return None
+
+    def map_blob(self, key: str) -> Optional[Any]:
+        try:
+            with open(key, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return b""
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except FileNotFoundError:
+            return None
+
+    def write_blob(self, key: str, body: bytes) -> None:
+        # Write then rename: a reader still holding a map_blob() mapping of the
+        # old file keeps its inode instead of seeing it truncated underneath.
+        os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+        tmp = f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(body)
+            os.replace(tmp, key)
+        except BaseException:
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
+            raise
+
+    def list_blob_names(self, base_path: str) -> List[str]:
+        if not os.path.isdir(base_path):
+            return []
+        return [f for f in os.listdir(base_path) if os.path.isfile(os.path.join(base_path, f))]
 
     def _path_for(self, origin: Origin) -> str:
         if origin == Origin.SOURCE:
@@ -187,6 +215,7 @@ class LocalFile(BaseStorage):
             os.remove(path)
         except FileNotFoundError:
             pass  # idempotent
+        self.content_manifest.forget(path)
 
     def get_single(self, resource_type: str, resource_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
         """Load one resource's source and destination state by ID.
@@ -0,0 +1,113 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Rewrite stored state from one --state-layout to another (convert-state)."""
+
+import logging
+import time
+from typing import Any, Dict, List
+
+from datadog_sync.constants import (
+    LOGGER_NAME,
+    Origin,
+    RESOURCE_PER_FILE,
+    STATE_LAYOUT,
+    STATE_LAYOUT_JSON,
+    STATE_LAYOUT_PACK,
+    STATE_LAYOUT_RESOURCE_PER_FILE,
+)
+from datadog_sync.utils.storage._base_storage import BaseStorage, StorageData, build_storage_backend
+from datadog_sync.utils.storage.state_pack import PACK_INDEX_SUFFIX, PACK_SUFFIX
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+
+def is_layout_filename(layout: str, filename: str) -> bool:
+    """True if `filename` is a state object written by `layout`.
+
+    Resource types never contain dots, so `{type}.json` and
+    `{type}.{id}.json` are told apart by the dot count.
+    """
+    if layout == STATE_LAYOUT_PACK:
+        return filename.endswith(PACK_SUFFIX) or filename.endswith(PACK_INDEX_SUFFIX)
+    if not filename.endswith(".json"):
+        return False
+    if layout == STATE_LAYOUT_JSON:
+        return filename.count(".") == 1
+    return filename.count(".") >= 2
+
+
+def _backend(type_, layout: str, **kwargs: Any) -> BaseStorage:
+    kwargs[STATE_LAYOUT] = layout
+    kwargs[RESOURCE_PER_FILE] = layout == STATE_LAYOUT_RESOURCE_PER_FILE
+    return build_storage_backend(type_, **kwargs)
+
+
+def _counts(data: StorageData) -> Dict[str, Dict[str, int]]:
+    return {
+        label: {rt: len(resources) for rt, resources in by_type.items() if resources}
+        for label, by_type in (("source", data.source), ("destination", data.destination))
+    }
+
+
+def convert_state_layout(type_, from_layout: str, to_layout: str, remove_old: bool = False, **kwargs: Any) -> Dict:
+    """Load every state object written in `from_layout` and write it back in `to_layout`.
+
+    `kwargs` are the build_storage_backend() arguments (paths and backend
+    config). With remove_old, the old layout's objects are deleted once the
+    new layout has been read back and holds the same resources; on a mismatch
+    nothing is deleted and a ValueError is raised.
+    """
+    call_start_ns = time.perf_counter_ns()
+    old = _backend(type_, from_layout, **kwargs)
+    new = _backend(type_, to_layout, **kwargs)
+    blobs = getattr(old, "blobs", old)
+
+    # List before writing: the JSON layouts share the .json suffix, so the
+    # new layout's files must not be mistaken for old ones.
+    stale: Dict[Origin, List[str]] = {}
+    if remove_old:
+        for side, base_path in (
+            (Origin.SOURCE, old.source_resources_path),
+            (Origin.DESTINATION, old.destination_resources_path),
+        ):
+            stale[side] = sorted(n for n in blobs.list_blob_names(base_path) if is_layout_filename(from_layout, n))
+
+    data = old.get(Origin.ALL)
+    counts = _counts(data)
+    new.put(Origin.ALL, data)
+
+    removed = 0
+    if remove_old:
+        written = _counts(new.get(Origin.ALL))
+        if written != counts:
+            raise ValueError(
+                f"{to_layout} state does not match {from_layout} state after conversion "
+                f"(expected {counts}, read back {written}); old state was kept"
+            )
+        for side, filenames in stale.items():
+            results = old.delete_many(side, filenames)
+            failed = {fn: r for fn, r in results.items() if r != "ok"}
+            for fn, result in failed.items():
+                log.warning(f"failed to delete {fn}: {result}")
+            removed += len(results) - len(failed)
+
+    summary = {
+        "resources_source": sum(counts["source"].values()),
+        "resources_destination": sum(counts["destination"].values()),
+        "removed": removed,
+    }
+    log.info(
+        "sync-cli-timing phase=convert_state from=%s to=%s resources_source=%d resources_destination=%d "
+        "removed=%d wall_ms=%d",
+        from_layout,
+        to_layout,
+        summary["resources_source"],
+        summary["resources_destination"],
+        removed,
+        (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+    )
+    return summary
@@ -0,0 +1,388 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Packed state layout (--state-layout pack).
+
+Each resource type is stored as two objects per side:
+
+- ``{type}.pack.gz``: NDJSON, one ``{id: resource}`` line per resource (the
+  same payload as a per-resource file), cut into blocks of about
+  PACK_BLOCK_BYTES and gzip-compressed block by block. Concatenated gzip
+  members are a valid gzip stream, so the whole pack still decompresses with
+  ``gzip.decompress`` / ``zcat``.
+- ``{type}.pack.idx``: gzip-compressed JSON ``{"version", "pack_bytes",
+  "blocks": [[offset, length], ...], "ids": {id: block}}``.
+
+Loading a type is one object read and one decompress instead of one JSON file
+per resource; get_single() reads the index once and then a single block with
+a ranged read. Neither suffix ends in ``.json``, so the JSON layouts' loaders
+never pick these objects up.
+"""
+
+import gzip
+import json
+import logging
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from datadog_sync.constants import LOGGER_NAME, Origin, STATE_LAYOUT_PACK
+from datadog_sync.utils.storage._base_storage import (
+    BaseStorage,
+    BlobDownloadPipeline,
+    BlobWritePipeline,
+    StorageData,
+    log_put_summary,
+)
+
+
+log = logging.getLogger(LOGGER_NAME)
+
+PACK_SUFFIX = ".pack.gz"
+PACK_INDEX_SUFFIX = ".pack.idx"
+PACK_INDEX_VERSION = 1
+
+# Uncompressed bytes per gzip block. Large enough to compress well, small
+# enough that a get_single() ranged read stays a few KiB.
+PACK_BLOCK_BYTES = 64 * 1024
+
+
+def encode_pack(resources: Dict[str, Any]) -> Tuple[bytes, bytes]:
+    """Serialize one resource type into (pack, index) bytes."""
+    blocks: List[List[int]] = []
+    ids: Dict[str, int] = {}
+    chunks: List[bytes] = []
+    lines: List[bytes] = []
+    pending = 0
+    offset = 0
+
+    def flush() -> None:
+        nonlocal pending, offset
+        chunk = gzip.compress(b"".join(lines), compresslevel=6, mtime=0)
+        chunks.append(chunk)
+        blocks.append([offset, len(chunk)])
+        offset += len(chunk)
+        lines.clear()
+        pending = 0
+
+    for _id, resource in resources.items():
+        line = (json.dumps({_id: resource}) + "\n").encode("utf-8")
+        ids[_id] = len(blocks)
+        lines.append(line)
+        pending += len(line)
+        if pending >= PACK_BLOCK_BYTES:
+            flush()
+    if lines:
+        flush()
+
+    index = {"version": PACK_INDEX_VERSION, "pack_bytes": offset, "blocks": blocks, "ids": ids}
+    return b"".join(chunks), gzip.compress(json.dumps(index).encode("utf-8"), mtime=0)
+
+
+def decode_block(raw: bytes) -> Dict[str, Any]:
+    """Decode a whole pack or any run of its blocks into {id: resource}."""
+    resources: Dict[str, Any] = {}
+    if not raw:
+        return resources
+    for line in gzip.decompress(raw).splitlines():
+        if line:
+            resources.update(json.loads(line))
+    return resources
+
+
+def find_in_block(raw: bytes, _id: str) -> Optional[Dict]:
+    """Decode only the line for `_id` from a block; encode_pack() starts it with the JSON key."""
+    return find_many_in_block(raw, [_id]).get(_id)
+
+
+def find_many_in_block(raw: bytes, ids: List[str]) -> Dict[str, Any]:
+    """Decode only the lines for `ids` from a block."""
+    wanted = set(ids)
+    found: Dict[str, Any] = {}
+    for line in gzip.decompress(raw).decode("utf-8").splitlines():
+        # Lines are '{"<id>": {...}}': scan just the key string.
+        if line and json.decoder.scanstring(line, 2)[0] in wanted:
+            found.update(json.loads(line))
+    return found
+
+
+class PackIndex:
+    def __init__(self, raw: bytes) -> None:
+        index = json.loads(gzip.decompress(raw))
+        if index.get("version") != PACK_INDEX_VERSION:
+            raise ValueError(f"unsupported pack index version {index.get('version')!r}")
+        self.pack_bytes: int = index["pack_bytes"]
+        self.blocks: List[List[int]] = index["blocks"]
+        self.ids: Dict[str, int] = index["ids"]
+
+    def locate(self, _id: str) -> Optional[Tuple[int, int]]:
+        """(offset, length) of the block holding `_id`, or None."""
+        block = self.ids.get(_id)
+        if block is None:
+            return None
+        offset, length = self.blocks[block]
+        return offset, length
+
+
+class PackedResources:
+    """One resource type's pack kept undecoded (mapped or in memory) for lazy state.
+
+    ``ids`` maps every ID to its block; block(i) decodes one block on demand.
+    """
+
+    __slots__ = ("_pack", "blocks", "ids")
+
+    def __init__(self, pack: Any, index: PackIndex) -> None:
+        self._pack = pack
+        self.blocks = index.blocks
+        self.ids = index.ids
+
+    def block(self, block: int) -> Dict[str, Any]:
+        offset, length = self.blocks[block]
+        return decode_block(self._pack[offset : offset + length])
+
+    def block_lines(self, block: int) -> Dict[str, str]:
+        """Decompress one block into {id: undecoded NDJSON line}; only the keys are parsed."""
+        offset, length = self.blocks[block]
+        lines: Dict[str, str] = {}
+        for line in gzip.decompress(self._pack[offset : offset + length]).decode("utf-8").splitlines():
+            if line:
+                # Lines are '{"<id>": {...}}': scan just the key string.
+                _id, _ = json.decoder.scanstring(line, 2)
+                lines[_id] = line
+        return lines
+
+    def release(self) -> None:
+        """Drop the pack bytes once every block has been decoded."""
+        close = getattr(self._pack, "close", None)
+        if close is not None:
+            close()
+        self._pack = b""
+
+
+class PackStorage(BaseStorage):
+    """Packed layout over any backend's blob primitives.
+
+    ``blobs`` is a LocalFile / AWSS3Bucket / GCSBucket / AzureBlobContainer
+    built with resource_per_file=False; only its read_blob, read_blob_range,
+    write_blob, list_blob_names and delete methods are used.
+    """
+
+    state_layout = STATE_LAYOUT_PACK
+    resource_per_file = False
+
+    def __init__(self, blobs: BaseStorage) -> None:
+        super().__init__()
+        self.blobs = blobs
+        self.source_resources_path = blobs.source_resources_path
+        self.destination_resources_path = blobs.destination_resources_path
+        self.download_concurrency = blobs.download_concurrency
+        self.upload_concurrency = blobs.upload_concurrency
+        # index key -> parsed index, for repeated get_single() calls.
+        self._indexes: Dict[str, Optional[PackIndex]] = {}
+
+    def _path_for(self, origin: Origin) -> str:
+        if origin == Origin.SOURCE:
+            return self.source_resources_path
+        if origin == Origin.DESTINATION:
+            return self.destination_resources_path
+        raise ValueError(f"_path_for() requires SOURCE or DESTINATION, got {origin}")
+
+    def get(self, origin: Origin, resource_types=None) -> StorageData:
+        data = StorageData()
+        if origin in [Origin.SOURCE, Origin.ALL]:
+            self._load_packs(self.source_resources_path, data.source, resource_types, "source")
+        if origin in [Origin.DESTINATION, Origin.ALL]:
+            self._load_packs(self.destination_resources_path, data.destination, resource_types, "destination")
+        return data
+
+    def _load_packs(self, base_path: str, target: Dict, resource_types, label: str) -> None:
+        call_start_ns = time.perf_counter_ns()
+        bytes_read = [0]
+        lock = threading.Lock()
+        aborted = 1
+
+        def fetch(key: str, resource_type: str) -> Optional[Dict]:
+            raw = self.blobs.read_blob(key)
+            if raw is None:
+                return {}
+            self.content_manifest.record(key, self.content_manifest.digest(raw))
+            with lock:
+                bytes_read[0] += len(raw)
+            try:
+                return decode_block(raw)
+            except (OSError, EOFError, zlib.error, ValueError) as e:
+                log.warning(f"invalid pack in {label} state: {key}: {e}")
+                return None
+
+        pipeline = BlobDownloadPipeline(fetch, target, self.download_concurrency)
+        try:
+            with pipeline:
+                if resource_types is None:
+                    names = [n for n in self.blobs.list_blob_names(base_path) if n.endswith(PACK_SUFFIX)]
+                    resource_types = [n[: -len(PACK_SUFFIX)] for n in sorted(names)]
+                for resource_type in resource_types:
+                    pipeline.submit(f"{base_path}/{resource_type}{PACK_SUFFIX}", resource_type)
+                pipeline.finish()
+            aborted = 0
+        finally:
+            log.info(
+                "sync-cli-timing phase=list_and_load backend=pack label=%s packs_loaded=%d resources=%d "
+                "bytes_read=%d transient_errors=%d aborted=%d wall_ms=%d download_concurrency=%d",
+                label,
+                pipeline.blobs_downloaded,
+                sum(len(v) for v in target.values()),
+                bytes_read[0],
+                pipeline.transient_errors,
+                aborted,
+                (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+                pipeline.concurrency,
+            )
+
+    def get_lazy(self, origin: Origin, resource_types=None) -> StorageData:
+        """Like get(), but each type is a PackedResources that decodes blocks on first access.
+
+        Packs are memory-mapped where the backend supports it (LocalFile) and
+        otherwise held compressed. A pack whose size does not match its index
+        is decoded eagerly instead.
+        """
+        data = StorageData()
+        if origin in [Origin.SOURCE, Origin.ALL]:
+            self._map_packs(self.source_resources_path, data.source, resource_types, "source")
+        if origin in [Origin.DESTINATION, Origin.ALL]:
+            self._map_packs(self.destination_resources_path, data.destination, resource_types, "destination")
+        return data
+
+    def _map_packs(self, base_path: str, target: Dict, resource_types, label: str) -> None:
+        call_start_ns = time.perf_counter_ns()
+        if resource_types is None:
+            names = [n for n in self.blobs.list_blob_names(base_path) if n.endswith(PACK_SUFFIX)]
+            resource_types = [n[: -len(PACK_SUFFIX)] for n in sorted(names)]
+
+        def fetch(resource_type: str) -> Any:
+            pack_key = f"{base_path}/{resource_type}{PACK_SUFFIX}"
+            index = self._index(f"{base_path}/{resource_type}{PACK_INDEX_SUFFIX}")
+            pack = self.blobs.map_blob(pack_key)
+            if index is None or pack is None:
+                return None
+            if len(pack) == index.pack_bytes:
+                return PackedResources(pack, index)
+            log.warning(f"pack {pack_key} does not match its index; decoding it eagerly")
+            try:
+                return decode_block(pack[:])
+            except (OSError, EOFError, zlib.error, ValueError) as e:
+                log.warning(f"invalid pack in {label} state: {pack_key}: {e}")
+                return None
+
+        with ThreadPoolExecutor(max_workers=max(1, self.download_concurrency)) as executor:
+            for resource_type, packed in zip(resource_types, executor.map(fetch, resource_types)):
+                if packed is not None:
+                    target[resource_type] = packed
+        log.info(
+            "sync-cli-timing phase=list_and_load backend=pack label=%s lazy=1 packs_mapped=%d resources=%d wall_ms=%d",
+            label,
+            sum(isinstance(v, PackedResources) for v in target.values()),
+            sum(len(v.ids) if isinstance(v, PackedResources) else len(v) for v in target.values()),
+            (time.perf_counter_ns() - call_start_ns) // 1_000_000,
+        )
+
+    def put(self, origin: Origin, data: StorageData) -> None:
+        call_start_ns = time.perf_counter_ns()
+        aborted = 1
+        pipeline = BlobWritePipeline(self.blobs.write_blob, self.upload_concurrency, self.content_manifest)
+        try:
+            with pipeline:
+                for side, label, by_type in (
+                    (Origin.SOURCE, "source", data.source),
+                    (Origin.DESTINATION, "destination", data.destination),
+                ):
+                    if origin not in (side, Origin.ALL):
+                        continue
+                    base_path = self._path_for(side)
+                    for resource_type, resources in by_type.items():
+                        pack, index = encode_pack(resources)
+                        index_key = f"{base_path}/{resource_type}{PACK_INDEX_SUFFIX}"
+                        self._indexes.pop(index_key, None)
+                        pipeline.submit(f"{base_path}/{resource_type}{PACK_SUFFIX}", pack, label)
+                        pipeline.submit(index_key, index, label)
+                pipeline.finish()
+            aborted = 0
+        finally:
+            log_put_summary("pack", origin, pipeline, aborted, call_start_ns)
+
+    def _index(self, index_key: str) -> Optional[PackIndex]:
+        if index_key not in self._indexes:
+            raw = self.blobs.read_blob(index_key)
+            index = None
+            if raw is not None:
+                try:
+                    index = PackIndex(raw)
+                except (OSError, EOFError, zlib.error, ValueError, KeyError) as e:
+                    log.warning(f"invalid pack index {index_key}: {e}")
+            self._indexes[index_key] = index
+        return self._indexes[index_key]
+
+    def _get_one(self, base_path: str, resource_type: str, resource_id: str) -> Optional[Dict]:
+        index = self._index(f"{base_path}/{resource_type}{PACK_INDEX_SUFFIX}")
+        location = index.locate(resource_id) if index is not None else None
+        if location is None:
+            return None
+        pack_key = f"{base_path}/{resource_type}{PACK_SUFFIX}"
+        try:
+            return find_in_block(self.blobs.read_blob_range(pack_key, *location) or b"", resource_id)
+        except (OSError, EOFError, zlib.error, ValueError):
+            # The pack was rewritten after the index was read; fall back to a full read.
+            return decode_block(self.blobs.read_blob(pack_key) or b"").get(resource_id)
+
+    def _get_batch(self, base_path: str, resource_type: str, ids: List[str]) -> Dict[str, Any]:
+        index = self._index(f"{base_path}/{resource_type}{PACK_INDEX_SUFFIX}")
+        if index is None:
+            return {}
+        by_block: Dict[Tuple[int, int], List[str]] = {}
+        for _id in ids:
+            location = index.locate(_id)
+            if location is not None:
+                by_block.setdefault(location, []).append(_id)
+        if not by_block:
+            return {}
+        pack_key = f"{base_path}/{resource_type}{PACK_SUFFIX}"
+
+        def fetch(location: Tuple[int, int]) -> Dict[str, Any]:
+            return find_many_in_block(self.blobs.read_blob_range(pack_key, *location) or b"", by_block[location])
+
+        found: Dict[str, Any] = {}
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(self.download_concurrency, len(by_block)))) as executor:
+                for block in executor.map(fetch, list(by_block)):
+                    found.update(block)
+        except (OSError, EOFError, zlib.error, ValueError):
+            # The pack was rewritten after the index was read; fall back to a full read.
+            resources = decode_block(self.blobs.read_blob(pack_key) or b"")
+            found = {_id: resources[_id] for _id in ids if _id in resources}
+        return {_id: found[_id] for _id in ids if _id in found}
+
+    def get_many(self, resource_type: str, resource_ids) -> Tuple[Dict[str, Dict], Dict[str, Dict]]:
+        """One ranged read per pack block holding a requested ID, per side."""
+        ids = list(dict.fromkeys(resource_ids))
+        return (
+            self._get_batch(self.source_resources_path, resource_type, ids),
+            self._get_batch(self.destination_resources_path, resource_type, ids),
+        )
+
+    def get_single(self, resource_type: str, resource_id: str) -> Tuple[Optional[Dict], Optional[Dict]]:
+        return (
+            self._get_one(self.source_resources_path, resource_type, resource_id),
+            self._get_one(self.destination_resources_path, resource_type, resource_id),
+        )
+
+    def list_filenames(self, origin: Origin, resource_type: str) -> Set[str]:
+        # Packs are rewritten whole, so there are never per-resource files to prune.
+        return set()
+
+    def delete(self, origin: Origin, filename: str) -> None:
+        self.blobs.delete(origin, filename)
+        self.content_manifest.forget(f"{self._path_for(origin)}/{filename}")
@@ -4,7 +4,7 @@
 # Copyright 2019 Datadog, Inc.
 
 from __future__ import annotations
-from asyncio import AbstractEventLoop, Future, Queue, QueueEmpty, Task, gather, get_event_loop, sleep
+from asyncio import AbstractEventLoop, Event, Future, Queue, QueueEmpty, Task, gather, get_event_loop, sleep
 
 from collections import defaultdict
 from dataclasses import dataclass, field
@@ -14,9 +14,20 @@ from typing import Awaitable, Callable, Dict, List, Optional
 from tqdm.asyncio import tqdm
 from tqdm.contrib.logging import logging_redirect_tqdm
 
+from datadog_sync.constants import WORKER_SCHEDULER_POLLING
 from datadog_sync.utils.configuration import Configuration
 
 
+# Queue sentinel handed to each parked worker once the event-driven scheduler
+# decides to shut down. Never passed to the worker callback.
+_SHUTDOWN = object()
+
+# Progress-bar redraw interval for the event-driven scheduler. tqdm already
+# rate-limits its own output; this only bounds how stale the elapsed/rate
+# columns get while every worker is parked on a slow API call.
+_PBAR_REFRESH_INTERVAL_S = 0.1
+
+
 class Workers:
     def __init__(self, config: Configuration) -> None:
         self.config: Configuration = config
@@ -33,6 +44,16 @@ class Workers:
         self._shutdown_workers: bool = False
         self._cb: Optional[Awaitable] = None
         self._cancel_cb: Callable = self.work_queue.empty
+        # --worker-scheduler. The event-driven scheduler parks workers on
+        # `await work_queue.get()` and re-evaluates the cancel condition only
+        # when something can change it (a task finishing, an additional coro
+        # returning, or an explicit notify()), instead of the legacy polling
+        # scheduler's get_nowait()/sleep(0) spin plus a run_in_executor hop per
+        # cancel check. An idle pool therefore costs ~0 CPU and no thread-pool
+        # thread. "polling" keeps the legacy loop as an escape hatch.
+        self._event_driven: bool = getattr(config, "worker_scheduler", None) != WORKER_SCHEDULER_POLLING
+        self._wakeup: Event = Event()
+        self._in_flight: int = 0
 
     async def init_workers(
         self, cb: Awaitable, cancel_cb: Optional[Callable], worker_count: Optional[int], *args, **kwargs
@@ -46,13 +67,20 @@ class Workers:
         self._cb = cb
         if cancel_cb:
             self._cancel_cb = cancel_cb
+        elif self._event_driven:
+            # The polling scheduler's default (queue.empty) can fire while a
+            # callback is still running and about to enqueue follow-up work;
+            # it only gets away with that because its workers keep draining.
+            # Parked workers cannot, so also require nothing in flight.
+            self._cancel_cb = self.queue_drained
         await self._create_workers(max_workers, *args, **kwargs)
 
     async def _create_workers(self, max_workers: int, *args, **kwargs) -> Awaitable[None]:
+        worker = self._event_worker if self._event_driven else self._worker
         for _ in range(max_workers):
-            self.workers.append(self._worker(*args, **kwargs))
+            self.workers.append(worker(*args, **kwargs))
         self._running_workers_count = max_workers
-        self.workers.append(self._cancel_worker())
+        self.workers.append(self._event_cancel_worker() if self._event_driven else self._cancel_worker())
 
     async def _worker(self, *args, **kwargs) -> Awaitable[None]:
         while not self._shutdown_workers or (self._shutdown_workers and not self.work_queue.empty()):
@@ -75,12 +103,68 @@ class Workers:
             await sleep(0)
         self._running_workers_count -= 1
 
+    async def _event_worker(self, *args, **kwargs) -> Awaitable[None]:
+        while True:
+            t = await self.work_queue.get()
+            if t is _SHUTDOWN:
+                self.work_queue.task_done()
+                break
+            self._in_flight += 1
+            try:
+                await self._cb(t, *args, **kwargs)
+            except Exception as e:
+                self.config.logger.debug(format_exc())
+                self.config.logger.error(f"Error processing task: {e}")
+            finally:
+                self._in_flight -= 1
+                self.work_queue.task_done()
+                if self.pbar:
+                    self.pbar.update()
+                self._wakeup.set()
+        self._running_workers_count -= 1
+
     async def _cancel_worker(self) -> None:
         while True:
             if await self._loop.run_in_executor(None, self._cancel_cb):
                 self._shutdown_workers = True
                 break
 
+    async def _event_cancel_worker(self) -> None:
+        # Clear-then-check with no await in between, so a wakeup set by a
+        # task finishing after the check is never lost.
+        while True:
+            self._wakeup.clear()
+            if self._cancel_cb():
+                break
+            await self._wakeup.wait()
+        self._shutdown_workers = True
+        for _ in range(self._running_workers_count):
+            self.work_queue.put_nowait(_SHUTDOWN)
+
+    @property
+    def event_driven(self) -> bool:
+        return self._event_driven
+
+    def queue_drained(self) -> bool:
+        """Nothing queued and no callback running."""
+        return self._in_flight == 0 and self.work_queue.empty()
+
+    def notify(self) -> None:
+        """Ask the event-driven scheduler to re-evaluate its cancel condition.
+
+        Producers that change the cancel condition outside a worker callback
+        (e.g. marking nodes done without enqueuing them) call this. Worker
+        completions and additional coros returning already notify. No-op
+        under the polling scheduler, which re-checks continuously.
+        """
+        self._wakeup.set()
+
+    async def _notify_when_done(self, coro: Awaitable) -> Awaitable:
+        try:
+            return await coro
+        finally:
+            self.notify()
+
     async def _reset(self) -> Awaitable[None]:
         self.workers.clear()
         self.work_queue = Queue()
@@ -88,13 +172,22 @@ class Workers:
         self._shutdown_workers = False
         self.pbar = None
         self._running_workers_count = 0
+        self._wakeup = Event()
+        self._in_flight = 0
 
     async def _refresh_pbar(self) -> Awaitable[None]:
+        if self._event_driven:
+            while self._running_workers_count > 0 and self.pbar:
+                self.pbar.refresh()
+                await sleep(_PBAR_REFRESH_INTERVAL_S)
+            return
         while self._running_workers_count > 0 and self.pbar:
             await self._loop.run_in_executor(None, self.pbar.display)
 
     async def schedule_workers(self, additional_coros: List = []) -> Future:
         self._shutdown_workers = False
+        if self._event_driven:
+            additional_coros = [self._notify_when_done(c) for c in additional_coros]
         return await gather(*self.workers, *additional_coros, return_exceptions=True)
 
     async def schedule_workers_with_pbar(self, total, additional_coros: List = []) -> Future:
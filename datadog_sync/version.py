@@ -0,0 +1,6 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2020-Present Datadog, Inc.
+
+__version__ = "0.1.dev1"
@@ -0,0 +1,154 @@
+"""Allocation benchmark for the copy-on-write apply path.
+
+Runs the copying half of _apply_resource_cb over synthetic dashboards
+already in sync with the destination: copy the source entry, remap its
+connections, prep it and a copy of the destination entry. "deepcopy" copies
+both entries whole, as models without copy_on_write_apply do, "cow" uses
+connection_copy()/prepped_copy(). check_diff, which costs the same either
+way, only runs once afterwards to confirm the copies still compare equal.
+Each mode runs in its own process so peak RSS is its own. Reports
+tracemalloc peak, the memory blocks held by the working copies of one
+--window of in-flight resources, and wall time.
+
+Usage: python scripts/benchmarks/bench_copy_on_write.py [--resources 10000] [--widgets 40] [--window 100]
+"""
+
+import argparse
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from copy import deepcopy
+
+from datadog_sync.models import Dashboards
+from datadog_sync.utils.resource_utils import (
+    check_diff,
+    connection_copy,
+    find_attr,
+    prep_resource,
+    prepped_copy,
+)
+
+
+def synthetic_dashboard(rng, i, widgets):
+    def widget(n):
+        definition = {
+            "type": "timeseries",
+            "title": f"widget {n}",
+            "requests": [
+                {"q": f"avg:metric.{n}{{env:prod}} by {{host}}", "display_type": "line", "style": {"palette": "dog"}}
+                for _ in range(rng.randint(1, 3))
+            ],
+            "markers": [],
+        }
+        if n % 5 == 0:
+            definition = {"type": "slo", "slo_id": f"slo-{n}", "view_type": "detail", "time_windows": ["7d"]}
+        return {"id": n, "definition": definition, "layout": {"x": n % 12, "y": n, "width": 4, "height": 2}}
+
+    source = {
+        "id": f"abc-{i}",
+        "title": f"dashboard {i}",
+        "description": "",
+        "layout_type": "ordered",
+        "author_handle": "someone@example.com",
+        "created_at": "2024-01-01T00:00:00Z",
+        "modified_at": "2024-01-02T00:00:00Z",
+        "url": f"/dashboard/abc-{i}",
+        "restricted_roles": ["role-1"],
+        "template_variables": [{"name": "env", "prefix": "env", "default": "prod"}],
+        "widgets": [widget(n) for n in range(widgets)],
+    }
+    destination = deepcopy(source)
+    destination["id"] = f"dst-{i}"
+    for w in destination["widgets"]:
+        if "slo_id" in w["definition"]:
+            w["definition"]["slo_id"] = "dst-" + w["definition"]["slo_id"]
+    destination["restricted_roles"] = ["dst-role-1"]
+    return source, destination
+
+
+def remap(key, r_obj, resource_to_connect):
+    # What Dashboards.connect_id does once the ids are in destination state.
+    value = r_obj[key]
+    r_obj[key] = [f"dst-{v}" for v in value] if isinstance(value, list) else f"dst-{value}"
+    return None
+
+
+def connect(resource_config, resource):
+    for resource_to_connect, paths in resource_config.resource_connections.items():
+        for path in paths:
+            find_attr(path, resource_to_connect, resource, remap)
+
+
+def apply_deepcopy(resource_config, source, destination):
+    resource = deepcopy(source)
+    connect(resource_config, resource)
+    prep_resource(resource_config, resource)
+    destination_copy = deepcopy(destination)
+    prep_resource(resource_config, destination_copy)
+    return resource, destination_copy
+
+
+def apply_cow(resource_config, source, destination):
+    resource = connection_copy(resource_config, source)
+    connect(resource_config, resource)
+    resource = prepped_copy(resource_config, resource)
+    destination_copy = prepped_copy(resource_config, destination)
+    return resource, destination_copy
+
+
+def run_mode(mode, resources, widgets, window):
+    apply = apply_deepcopy if mode == "deepcopy" else apply_cow
+    resource_config = Dashboards.resource_config
+    rng = random.Random(1)
+    fixture = [synthetic_dashboard(rng, i, widgets) for i in range(resources)]
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    in_flight = []
+    held_blocks = 0
+    for source, destination in fixture:
+        in_flight.append(apply(resource_config, source, destination))
+        if len(in_flight) == window:
+            if not held_blocks:
+                held_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics("filename"))
+            in_flight.clear()
+    wall_s = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert not check_diff(resource_config, *apply(resource_config, *fixture[0]))
+    return {
+        "mode": mode,
+        "wall_s": round(wall_s, 2),
+        "peak_mib": round((peak - baseline) / 2**20, 1),
+        "window_blocks": held_blocks,
+        "maxrss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--resources", type=int, default=10000)
+    parser.add_argument("--widgets", type=int, default=40)
+    parser.add_argument("--window", type=int, default=100, help="resources in flight at once")
+    parser.add_argument("--mode", choices=["deepcopy", "cow"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, args.resources, args.widgets, args.window)))
+        return
+    for mode in ("deepcopy", "cow"):
+        out = subprocess.run(
+            [sys.executable, __file__, "--mode", mode] + sys.argv[1:], check=True, capture_output=True, text=True
+        )
+        result = json.loads(out.stdout)
+        print(" ".join(f"{k}={v}" for k, v in result.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""Event-loop stall benchmark for response body decoding.
+
+Replays the dashboard GET bodies recorded in the integration cassettes, with
+their widget lists tiled up to --target-mb to stand in for the multi-megabyte
+dashboards seen in large orgs, and decodes them while a 1ms ticker runs on
+the same loop. The ticker's lateness is the time every other worker would
+have been stalled. Parsers that hold the GIL still delay the loop while they
+run in a thread, so offload shortens the worst stall rather than removing it.
+
+Compared paths:
+- legacy: resp.text() then resp.json() (two decodes, stdlib json on the loop)
+- decode_body: one read, the configured backend, thread offload above the
+  threshold
+
+Usage: python scripts/benchmarks/bench_json_decode.py [--target-mb 4] [--bodies 20]
+"""
+
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from types import SimpleNamespace
+
+import yaml
+
+from datadog_sync.utils import json_body
+
+CASSETTES = os.path.join(
+    os.path.dirname(__file__), "..", "..", "tests", "integration", "resources", "cassettes", "test_dashboards", "*.yaml"
+)
+
+
+def _recorded_dashboards():
+    dashboards = {}
+    for path in glob.glob(CASSETTES):
+        with open(path) as f:
+            cassette = yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader))
+        for interaction in cassette.get("interactions", []):
+            req, resp = interaction["request"], interaction["response"]
+            if req["method"] != "GET" or "/api/v1/dashboard/" not in req["uri"]:
+                continue
+            try:
+                body = json.loads(resp["body"]["string"])
+            except (TypeError, ValueError):
+                continue
+            if body.get("widgets"):
+                dashboards[body["id"]] = body
+    return list(dashboards.values())
+
+
+def _inflate(dashboard, target_bytes):
+    widgets = dashboard["widgets"]
+    copies = max(1, int(target_bytes // len(json.dumps(widgets))))
+    return json.dumps(dict(dashboard, widgets=widgets * copies)).encode()
+
+
+async def _ticker(stop, lateness):
+    interval = 0.001
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lateness.append(time.perf_counter() - start - interval)
+
+
+async def _decode_legacy(body):
+    text = body.decode("utf-8")  # resp.text()
+    return json.loads(body.decode("utf-8")) if text else None  # resp.json() decodes again
+
+
+def _decode_new(offload_threshold):
+    async def decode(body):
+        resp = SimpleNamespace(content_type="application/json", charset=None)
+        return await json_body.decode_body(resp, body, offload_threshold)
+
+    return decode
+
+
+async def _run(decode, bodies):
+    stop = asyncio.Event()
+    lateness = []
+    ticker = asyncio.create_task(_ticker(stop, lateness))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    for body in bodies:
+        await decode(body)
+        await asyncio.sleep(0)
+    wall = time.perf_counter() - start
+    stop.set()
+    await ticker
+    return wall, max(lateness), sum(1 for late in lateness if late > 0.01)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--target-mb", type=float, default=4.0)
+    parser.add_argument("--bodies", type=int, default=20)
+    args = parser.parse_args()
+
+    recorded = _recorded_dashboards()
+    if not recorded:
+        raise SystemExit("no recorded dashboard bodies found under " + CASSETTES)
+    bodies = [_inflate(recorded[i % len(recorded)], args.target_mb * 1024 * 1024) for i in range(args.bodies)]
+    total_mb = sum(len(b) for b in bodies) / 1024 / 1024
+    print(f"{len(bodies)} bodies from {len(recorded)} recorded dashboards, {total_mb:.1f} MB total")
+
+    runs = [("legacy text+json", _decode_legacy, None)]
+    for backend in sorted(json_body.JSON_BACKENDS):
+        runs.append((f"decode_body[{backend}] inline", _decode_new(float("inf")), backend))
+        runs.append((f"decode_body[{backend}] offload", _decode_new(json_body.OFFLOAD_THRESHOLD_BYTES), backend))
+    default_backend = json_body.json_backend()
+    for label, decode, backend in runs:
+        if backend:
+            json_body.set_json_backend(backend)
+        wall, max_stall, long_stalls = asyncio.run(_run(decode, bodies))
+        print(
+            f"{label:<32} wall={wall * 1000:8.1f}ms  max_stall={max_stall * 1000:7.1f}ms  "
+            f"stalls_over_10ms={long_stalls}"
+        )
+    json_body.set_json_backend(default_backend)
+
+
+if __name__ == "__main__":
+    main()
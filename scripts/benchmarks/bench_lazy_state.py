@@ -0,0 +1,66 @@
+"""Memory benchmark for lazily decoded packed state.
+
+Writes synthetic state (see bench_state_layouts.py) in the pack layout, then
+loads it with State twice, eagerly (State._lazy_load_enabled patched off) and
+lazily, and reads a fraction of the source entries the way a scoped sync
+would. Reports tracemalloc peak and retained memory plus wall time. Mapped
+pack pages are file-backed, so they do not show up in the Python heap.
+
+Usage: python scripts/benchmarks/bench_lazy_state.py [--resources 100000] [--touch 0.01]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import patch
+
+from bench_state_layouts import synthetic_state
+
+from datadog_sync.constants import Origin
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage._base_storage import build_storage_backend
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def run(kwargs, lazy, touch):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with patch.object(State, "_lazy_load_enabled", return_value=lazy):
+        state = State(type_=StorageType.LOCAL_FILE, **kwargs)
+    monitors = state.source["monitors"]
+    ids = random.Random(1).sample(list(monitors), int(len(monitors) * touch))
+    for _id in ids:
+        _ = monitors[_id]
+    wall_s = time.perf_counter() - start
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return retained, peak, wall_s, len(ids)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resources", type=int, default=100000)
+    parser.add_argument("--touch", type=float, default=0.01, help="fraction of monitors read after loading")
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        kwargs = dict(
+            source_resources_path=os.path.join(tmp, "source"),
+            destination_resources_path=os.path.join(tmp, "destination"),
+            state_layout="pack",
+        )
+        build_storage_backend(StorageType.LOCAL_FILE, **kwargs).put(Origin.ALL, synthetic_state(args.resources))
+        print(f"{'mode':<6} {'touched':>8} {'retained_MiB':>13} {'peak_MiB':>9} {'wall_s':>7}")
+        for lazy in (False, True):
+            retained, peak, wall_s, touched = run(kwargs, lazy, args.touch)
+            mode = "lazy" if lazy else "eager"
+            print(f"{mode:<6} {touched:>8} {retained / 2**20:>13.1f} {peak / 2**20:>9.1f} {wall_s:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Size and load-time benchmark for the --state-layout options.
+
+Writes the same synthetic state (monitor- and dashboard-shaped resources)
+with each layout to a temporary LocalFile directory, then reports the object
+count, bytes on disk, put() and get() wall time, and the mean get_single()
+latency. Object count is what dominates cloud-backend load time (one GET per
+object), so it is reported alongside the local timings.
+
+Usage: python scripts/benchmarks/bench_state_layouts.py [--resources 20000] [--singles 200]
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+
+from datadog_sync.constants import STATE_LAYOUTS, STATE_LAYOUT_RESOURCE_PER_FILE, Origin
+from datadog_sync.utils.storage._base_storage import StorageData, build_storage_backend
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def synthetic_state(n, seed=7):
+    rng = random.Random(seed)
+    data = StorageData()
+    for i in range(n):
+        _id = str(10_000_000 + i)
+        resource_type = "monitors" if i % 4 else "dashboards"
+        if resource_type == "monitors":
+            data.source["monitors"][_id] = {
+                "id": int(_id),
+                "name": f"[{rng.choice(['prod', 'staging'])}] high latency on service-{i % 300}",
+                "type": "query alert",
+                "query": f"avg(last_5m):avg:trace.http.request.duration{{service:service-{i % 300}}} > {rng.random()}",
+                "message": "@slack-alerts latency is above threshold " * 3,
+                "tags": [f"team:{i % 40}", f"service:service-{i % 300}", "env:prod"],
+                "options": {"thresholds": {"critical": 1.5, "warning": 1.0}, "notify_no_data": False},
+            }
+        else:
+            data.source["dashboards"][_id] = {
+                "id": _id,
+                "title": f"Service {i % 300} overview",
+                "widgets": [
+                    {"definition": {"type": "timeseries", "requests": [{"q": f"avg:metric.{w}{{*}}"}]}}
+                    for w in range(rng.randint(3, 12))
+                ],
+            }
+        data.destination[resource_type][_id] = {"id": f"d-{_id}"}
+    return data
+
+
+def _disk_usage(path):
+    files = [os.path.join(root, f) for root, _, names in os.walk(path) for f in names]
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def run(layout, data, singles):
+    with tempfile.TemporaryDirectory() as tmp:
+        kwargs = dict(
+            source_resources_path=os.path.join(tmp, "source"),
+            destination_resources_path=os.path.join(tmp, "destination"),
+            resource_per_file=layout == STATE_LAYOUT_RESOURCE_PER_FILE,
+            state_layout=layout,
+        )
+        start = time.perf_counter()
+        build_storage_backend(StorageType.LOCAL_FILE, **kwargs).put(Origin.ALL, data)
+        put_s = time.perf_counter() - start
+        objects, size = _disk_usage(tmp)
+
+        start = time.perf_counter()
+        loaded = build_storage_backend(StorageType.LOCAL_FILE, **kwargs).get(Origin.ALL)
+        get_s = time.perf_counter() - start
+        assert sum(map(len, loaded.source.values())) == sum(map(len, data.source.values()))
+
+        ids = random.Random(1).sample(list(data.source["monitors"]), singles)
+        reader = build_storage_backend(StorageType.LOCAL_FILE, **kwargs)
+        start = time.perf_counter()
+        for _id in ids:
+            reader.get_single("monitors", _id)
+        single_ms = (time.perf_counter() - start) * 1000 / singles
+    return objects, size, put_s, get_s, single_ms
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resources", type=int, default=20000)
+    parser.add_argument("--singles", type=int, default=200)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    data = synthetic_state(args.resources)
+    print(f"{'layout':<18} {'objects':>8} {'MiB':>8} {'put_s':>7} {'get_s':>7} {'single_ms':>10}")
+    for layout in STATE_LAYOUTS:
+        objects, size, put_s, get_s, single_ms = run(layout, data, args.singles)
+        print(f"{layout:<18} {objects:>8} {size / 2**20:>8.2f} {put_s:>7.2f} {get_s:>7.2f} {single_ms:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
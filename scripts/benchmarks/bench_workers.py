@@ -0,0 +1,69 @@
+"""Microbenchmark for the Workers scheduler modes.
+
+Reports, for each --worker-scheduler mode:
+- CPU seconds per 10k no-op tasks (pure scheduling overhead).
+- CPU seconds (all threads) burned while every worker is parked on a slow "API call"
+  (asyncio.sleep), i.e. the idle cost of the pool.
+
+Usage: python scripts/benchmarks/bench_workers.py [--tasks 10000] [--workers 100]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+from types import SimpleNamespace
+
+from datadog_sync.constants import WORKER_SCHEDULERS
+from datadog_sync.utils.workers import Workers
+
+
+def _config(scheduler, max_workers):
+    return SimpleNamespace(
+        max_workers=max_workers, logger=logging.getLogger("bench"), worker_scheduler=scheduler, counter=None
+    )
+
+
+async def _run(scheduler, workers_n, tasks, task_sleep_s):
+    workers = Workers(_config(scheduler, workers_n))
+    completed = [0]
+
+    async def cb(_):
+        if task_sleep_s:
+            await asyncio.sleep(task_sleep_s)
+        completed[0] += 1
+
+    # Completion-count cancel condition, like apply's `not sorter.is_active()`:
+    # the pool must stay up until the last in-flight task returns.
+    await workers.init_workers(cb, lambda: completed[0] == tasks, None)
+    for i in range(tasks):
+        workers.work_queue.put_nowait(i)
+    await workers.schedule_workers()
+
+
+def _measure(scheduler, workers_n, tasks, task_sleep_s):
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    asyncio.run(_run(scheduler, workers_n, tasks, task_sleep_s))
+    return time.process_time() - cpu_start, time.perf_counter() - wall_start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tasks", type=int, default=10_000)
+    parser.add_argument("--workers", type=int, default=100)
+    parser.add_argument("--idle-sleep", type=float, default=0.5, help="Per-task sleep for the idle scenario.")
+    args = parser.parse_args()
+
+    for scheduler in WORKER_SCHEDULERS:
+        cpu_s, wall_s = _measure(scheduler, args.workers, args.tasks, 0)
+        per_10k = cpu_s * 10_000 / args.tasks
+        idle_cpu_s, idle_wall_s = _measure(scheduler, args.workers, args.workers, args.idle_sleep)
+        print(
+            f"scheduler={scheduler:<8} noop_cpu_s_per_10k={per_10k:.3f} noop_wall_s={wall_s:.3f} "
+            f"idle_cpu_s={idle_cpu_s:.3f} idle_wall_s={idle_wall_s:.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
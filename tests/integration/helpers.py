@@ -18,6 +18,8 @@ from datadog_sync.cli import cli
 
 RESOURCE_TO_ADD_RE = re.compile("to be created")
 RESOURCE_SKIPPED_RE = re.compile("skipping resource")
+# Warned by State.dump_state (with debug logging) for entries changed without being re-assigned.
+STATE_CHANGED_IN_PLACE_RE = re.compile("changed in place without being re-assigned")
 RESOURCE_FILE_PATH = "resources/{}/{}.json"
 
 
@@ -390,6 +392,7 @@ class BaseResourcesTestClass:
             ],
         )
         assert 0 == ret.exit_code
+        assert not STATE_CHANGED_IN_PLACE_RE.search(caplog.text)
 
         # Verify files were created as individual files
         combined_file = f"resources/source/{self.resource_type}.json"
@@ -469,6 +472,7 @@ class BaseResourcesTestClass:
             ],
         )
         assert 0 == ret.exit_code
+        assert not STATE_CHANGED_IN_PLACE_RE.search(caplog.text)
 
         # Verify source files stay as individual files
         source_combined_file = f"resources/source/{self.resource_type}.json"
@@ -532,6 +536,7 @@ class BaseResourcesTestClass:
             sync_cmd.append(f"--filter={self.filter}")
         ret = runner.invoke(cli, sync_cmd)
         assert 0 == ret.exit_code
+        assert not STATE_CHANGED_IN_PLACE_RE.search(caplog.text)
         caplog.clear()
 
         # First, load all resources from individual files
@@ -599,6 +604,7 @@ class BaseResourcesTestClass:
             sync_cmd,
         )
         assert 0 == ret.exit_code
+        assert not STATE_CHANGED_IN_PLACE_RE.search(caplog.text)
 
         caplog.clear()
         # Assert diff is no longer produced
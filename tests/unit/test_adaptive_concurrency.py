@@ -0,0 +1,203 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the --adaptive-concurrency AIMD limiters and their wiring into
+request_with_retry."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+
+from datadog_sync.utils.adaptive_concurrency import (
+    OUTCOME_NEUTRAL,
+    OUTCOME_OK,
+    OUTCOME_OVERLOADED,
+    OUTCOME_THROTTLED,
+    AdaptiveConcurrency,
+    AdaptiveLimiter,
+    current_type_limiter,
+    endpoint_template,
+)
+from datadog_sync.utils.custom_client import CustomClient
+from datadog_sync.utils.resource_utils import CustomClientHTTPError
+
+
+def _observe(limiter, outcome, n=1, latency_s=0.01):
+    for _ in range(n):
+        limiter.observe(outcome, latency_s, time.monotonic())
+
+
+def test_initial_limit_is_quarter_of_max():
+    assert AdaptiveLimiter("k", 100).current_limit == 25
+    assert AdaptiveLimiter("k", 2).current_limit == 1
+
+
+def test_acquire_blocks_at_limit_and_release_wakes():
+    async def run():
+        limiter = AdaptiveLimiter("k", 8, initial_limit=2)
+        await limiter.acquire()
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+        limiter.release()
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.in_use == 2
+
+    asyncio.run(run())
+
+
+def test_increase_wakes_waiters():
+    async def run():
+        limiter = AdaptiveLimiter("k", 8, initial_limit=1)
+        await limiter.acquire()
+        waiter = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        _observe(limiter, OUTCOME_OK)
+        await asyncio.wait_for(waiter, timeout=1)
+        assert limiter.current_limit == 2
+
+    asyncio.run(run())
+
+
+def test_slow_start_then_additive_increase():
+    limiter = AdaptiveLimiter("k", 64, initial_limit=4, latency_aware=False)
+    _observe(limiter, OUTCOME_OK, n=4)
+    assert limiter.current_limit == 8
+
+    _observe(limiter, OUTCOME_THROTTLED)
+    assert limiter.current_limit == 4
+    # Congestion avoidance: about +1 per limit successes.
+    _observe(limiter, OUTCOME_OK, n=4)
+    assert limiter.current_limit == 4
+    _observe(limiter, OUTCOME_OK, n=1)
+    assert limiter.current_limit == 5
+
+
+def test_increase_capped_at_max():
+    limiter = AdaptiveLimiter("k", 4, initial_limit=3, latency_aware=False)
+    _observe(limiter, OUTCOME_OK, n=10)
+    assert limiter.current_limit == 4
+    assert limiter.peak_limit == 4
+
+
+def test_throttle_and_overload_halve_limit_once_per_window():
+    limiter = AdaptiveLimiter("k", 64, initial_limit=32)
+    started_before = time.monotonic()
+    limiter.observe(OUTCOME_THROTTLED, 0.01, started_before)
+    assert limiter.current_limit == 16
+    # Same in-flight window: ignored.
+    limiter.observe(OUTCOME_OVERLOADED, 0.01, started_before)
+    assert limiter.current_limit == 16
+    # A request started after the decrease is a new congestion signal.
+    _observe(limiter, OUTCOME_OVERLOADED)
+    assert limiter.current_limit == 8
+    assert (limiter.throttled, limiter.overloaded, limiter.decreases) == (1, 2, 2)
+
+
+def test_decrease_clamped_at_min():
+    limiter = AdaptiveLimiter("k", 8, initial_limit=1)
+    _observe(limiter, OUTCOME_THROTTLED)
+    assert limiter.current_limit == 1
+
+
+def test_neutral_outcome_does_not_move_limit():
+    limiter = AdaptiveLimiter("k", 8, initial_limit=2)
+    _observe(limiter, OUTCOME_NEUTRAL, n=5)
+    assert limiter.current_limit == 2
+
+
+def test_latency_rise_trims_limit():
+    limiter = AdaptiveLimiter("k", 100, initial_limit=50)
+    _observe(limiter, OUTCOME_OK, latency_s=0.01)
+    for _ in range(30):
+        limiter.observe(OUTCOME_OK, 1.0, time.monotonic())
+    assert limiter.current_limit < 50
+    assert limiter.decreases >= 1
+
+
+def test_type_limiter_ignores_latency():
+    limiter = AdaptiveConcurrency(100).type_limiter("monitors", 8)
+    assert limiter.max_limit == 8
+    _observe(limiter, OUTCOME_OK, latency_s=0.01)
+    _observe(limiter, OUTCOME_OK, n=20, latency_s=5.0)
+    assert limiter.current_limit == 8
+
+
+@pytest.mark.parametrize(
+    "method, path, expected",
+    [
+        ("get", "/api/v1/monitor/12345", "GET /api/v1/monitor/{id}"),
+        ("put", "/api/v1/dashboard/abc-def-ghi?x=1", "PUT /api/v1/dashboard/{id}"),
+        ("post", "/api/v2/roles", "POST /api/v2/roles"),
+        ("get", "https://api.datadoghq.com/api/v1/synthetics/tests/x1y", "GET /api/v1/synthetics/tests/{id}"),
+    ],
+)
+def test_endpoint_template(method, path, expected):
+    assert endpoint_template(method, path) == expected
+
+
+def _response(status):
+    resp = MagicMock()
+    resp.status = status
+    resp.content_type = "application/json"
+    resp.charset = None
+    resp.read = AsyncMock(return_value=b'{"data": []}')
+    if status >= 400:
+        resp.raise_for_status = MagicMock(
+            side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=status, headers={})
+        )
+    else:
+        resp.raise_for_status = MagicMock(return_value=None)
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=resp)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def _client(adaptive, status):
+    client = CustomClient(
+        "https://api.datadoghq.com",
+        {"apiKeyAuth": "fake-api", "appKeyAuth": "fake-app"},
+        retry_timeout=1,
+        timeout=30,
+        send_metrics=False,
+        adaptive_concurrency=adaptive,
+    )
+    client.session = MagicMock()
+    client.session.get = MagicMock(return_value=_response(status))
+    return client
+
+
+def test_request_with_retry_feeds_endpoint_and_type_limiters():
+    adaptive = AdaptiveConcurrency(64)
+    type_limiter = adaptive.type_limiter("monitors", 64)
+
+    async def run():
+        token = current_type_limiter.set(type_limiter)
+        try:
+            with pytest.raises(CustomClientHTTPError):
+                await _client(adaptive, 503).get("/api/v1/monitor/123")
+        finally:
+            current_type_limiter.reset(token)
+
+    asyncio.run(run())
+    endpoint = adaptive.limiter("endpoint:api.datadoghq.com GET /api/v1/monitor/{id}")
+    assert endpoint.overloaded == 1
+    assert endpoint.current_limit == 8
+    assert endpoint.in_use == 0
+    assert type_limiter.current_limit == 8
+
+
+def test_request_with_retry_success_releases_slot():
+    adaptive = AdaptiveConcurrency(64)
+    asyncio.run(_client(adaptive, 200).get("/api/v1/monitor/123"))
+    endpoint = adaptive.limiter("endpoint:api.datadoghq.com GET /api/v1/monitor/{id}")
+    assert endpoint.requests == 1
+    assert endpoint.in_use == 0
+    assert endpoint.current_limit == 17
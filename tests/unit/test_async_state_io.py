@@ -0,0 +1,165 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the awaitable storage calls and the State/handler paths that use
+them, so a slow storage read doesn't stall the event loop."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from datadog_sync.constants import Origin
+from datadog_sync.utils.resources_handler import ResourcesHandler
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage._base_storage import StorageData
+from datadog_sync.utils.storage.local_file import LocalFile
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _seed(tmp_path):
+    backend = LocalFile(
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        resource_per_file=True,
+    )
+    data = StorageData()
+    data.source["monitors"] = {"1": {"id": 1, "tests": ["abc", "zzz"]}}
+    data.source["synthetics_tests"] = {"pub#abc": {"public_id": "pub"}, "u1": {"id": "u1"}}
+    data.destination["synthetics_tests"] = {"pub#abc": {"public_id": "dst-pub"}, "u1": {"id": "d1"}}
+    backend.put(Origin.ALL, data)
+
+
+def _state(tmp_path, resource_types=("monitors",)):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        resource_per_file=True,
+        resource_types=list(resource_types),
+    )
+
+
+def _slow(method, delay=0.05):
+    def call(*args, **kwargs):
+        time.sleep(delay)
+        return method(*args, **kwargs)
+
+    return MagicMock(side_effect=call)
+
+
+async def _ticks_during(coro):
+    """Run coro alongside a ticker; returns (coro result, ticks seen meanwhile)."""
+    ticks = 0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal ticks
+        while not done.is_set():
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.ensure_future(ticker())
+    try:
+        return await coro, ticks
+    finally:
+        done.set()
+        await task
+
+
+def test_storage_async_calls_run_off_the_event_loop(tmp_path):
+    _seed(tmp_path)
+    backend = LocalFile(source_resources_path=str(tmp_path / "source"), resource_per_file=True)
+    backend.get = _slow(backend.get)
+    data, ticks = asyncio.run(_ticks_during(backend.get_async(Origin.SOURCE, resource_types=["monitors"])))
+    assert data.source["monitors"]["1"]["id"] == 1
+    assert ticks >= 3
+
+    src, _ = asyncio.run(backend.get_many_async("synthetics_tests", iter(["u1", "missing"])))
+    assert src == {"u1": {"id": "u1"}}
+    assert asyncio.run(backend.get_single_async("monitors", "1"))[0]["id"] == 1
+    assert asyncio.run(backend.delete_many_async(Origin.SOURCE, iter(["monitors.1.json"]))) == {"monitors.1.json": "ok"}
+
+
+def test_concurrent_type_loads_share_one_read(tmp_path):
+    _seed(tmp_path)
+    state = _state(tmp_path)
+    state._storage.get = _slow(state._storage.get)
+
+    async def run():
+        await asyncio.gather(*(state.ensure_resource_type_loaded_async("synthetics_tests") for _ in range(5)))
+
+    asyncio.run(run())
+    assert state._storage.get.call_count == 1
+    assert set(state.destination["synthetics_tests"]) == {"pub#abc", "u1"}
+    state.ensure_resource_type_loaded("synthetics_tests")
+    assert state._storage.get.call_count == 1
+
+
+def test_async_loads_never_overwrite_live_entries(tmp_path):
+    _seed(tmp_path)
+    state = _state(tmp_path)
+    state.destination["synthetics_tests"]["u1"] = {"id": "written-this-run"}
+
+    added = asyncio.run(state.reload_destination_async(["synthetics_tests", "synthetics_tests"]))
+    assert added == {"synthetics_tests": 1}
+    assert state.destination["synthetics_tests"]["u1"] == {"id": "written-this-run"}
+
+    state = _state(tmp_path)
+    state.destination["synthetics_tests"]["u1"] = {"id": "written-this-run"}
+    asyncio.run(state.ensure_resources_loaded_async([("synthetics_tests", "u1"), ("synthetics_tests", "nope")]))
+    assert state.source["synthetics_tests"]["u1"] == {"id": "u1"}
+    assert state.destination["synthetics_tests"]["u1"] == {"id": "written-this-run"}
+    assert "nope" not in state.source["synthetics_tests"]
+
+
+def test_deferred_loads_are_recorded_not_read(tmp_path):
+    _seed(tmp_path)
+    state = _state(tmp_path)
+    with patch.object(state._storage, "get") as get, patch.object(state._storage, "get_single") as get_single:
+        with state.deferring_loads() as deferred:
+            state.ensure_resource_type_loaded("synthetics_tests")
+            state.ensure_resource_loaded("synthetics_tests", "u1")
+        get.assert_not_called()
+        get_single.assert_not_called()
+    assert deferred.types == {"synthetics_tests"} and deferred.keys == {("synthetics_tests", "u1")}
+
+    asyncio.run(state.load_deferred_async(deferred))
+    assert state.source["synthetics_tests"]["u1"] == {"id": "u1"}
+    assert "pub#abc" in state.destination["synthetics_tests"]
+
+
+def _handler(state):
+    def connect_id(key, r_obj, resource_to_connect):
+        state.ensure_resource_type_loaded(resource_to_connect)
+        tests = state.destination[resource_to_connect]
+        return [_id for _id in r_obj[key] if not any(k.endswith(_id) for k in tests)]
+
+    monitors = SimpleNamespace(
+        resource_config=SimpleNamespace(resource_connections={"synthetics_tests": ["tests"]}),
+        connect_id=connect_id,
+    )
+    handler = ResourcesHandler.__new__(ResourcesHandler)
+    handler.config = MagicMock()
+    handler.config.state = state
+    handler.config.resources = {"monitors": monitors}
+    return handler
+
+
+def test_worker_connections_load_off_the_event_loop(tmp_path):
+    _seed(tmp_path)
+    state = _state(tmp_path)
+    state._storage.get = _slow(state._storage.get)
+    handler = _handler(state)
+
+    (failed, missing), ticks = asyncio.run(_ticks_during(handler._resource_connections_async("monitors", "1")))
+
+    # The full-scan load connect_id asked for ran on the executor, then the
+    # connections were computed again against the loaded type.
+    assert ticks >= 3
+    assert failed == {("synthetics_tests", "zzz")}
+    assert missing == {("synthetics_tests", "zzz")}
+    assert ("synthetics_tests", "zzz") in state._ensure_attempted
+    assert state._storage.get.call_count == 1
@@ -0,0 +1,118 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the on-disk read-through cache in front of the cloud backends."""
+
+import io
+import json
+import logging
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from datadog_sync.constants import LOGGER_NAME
+from datadog_sync.utils.configuration import build_storage_settings
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+from datadog_sync.utils.storage.blob_cache import STATE_CACHE_DIR, BlobCache, blob_cache_from_config
+from datadog_sync.utils.storage.gcs_bucket import GCSBucket
+
+
+def test_hit_requires_the_same_version(tmp_path):
+    cache = BlobCache(str(tmp_path), 1024, "s3:b")
+    cache.put("k", '"v1"', b"body")
+    assert cache.get("k", '"v1"') == b"body"
+    assert cache.get("k", '"v2"') is None
+    assert cache.get("k", None) is None
+    assert BlobCache(str(tmp_path), 1024, "s3:other").get("k", '"v1"') is None
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+
+def test_cache_directory_and_entries_are_owner_only(tmp_path):
+    directory = tmp_path / "cache"
+    cache = BlobCache(str(directory), 1024, "ns")
+    cache.put("k", 1, b"secret")
+    assert directory.stat().st_mode & 0o777 == 0o700
+    assert [entry.stat().st_mode & 0o777 for entry in directory.iterdir()] == [0o600]
+
+
+def test_lru_eviction_keeps_recently_read_entries(tmp_path):
+    cache = BlobCache(str(tmp_path), 30, "ns")
+    for key in ("a", "b", "c"):
+        cache.put(key, 1, b"x" * 10)
+    assert cache.get("a", 1) is not None
+    cache.put("d", 1, b"x" * 10)
+    assert cache.get("b", 1) is None
+    assert all(cache.get(key, 1) for key in ("a", "c", "d"))
+    # Bodies larger than the cap are never stored.
+    cache.put("huge", 1, b"x" * 31)
+    assert len(os.listdir(tmp_path)) == 3
+
+
+def test_entries_survive_a_new_process(tmp_path):
+    BlobCache(str(tmp_path), 100, "ns").put("k", 7, b"persisted")
+    reopened = BlobCache(str(tmp_path), 15, "ns")
+    assert reopened.get("k", 7) == b"persisted"
+    reopened.put("k2", 7, b"0123456789")
+    # The scanned entry counts toward the cap and is evicted first.
+    assert reopened.get("k", 7) is None
+
+
+def test_cache_is_off_without_a_directory(tmp_path):
+    assert blob_cache_from_config({"aws_bucket_name": "b"}, "ns") is None
+    assert blob_cache_from_config({STATE_CACHE_DIR: str(tmp_path)}, "ns") is not None
+
+
+def test_storage_settings_enable_the_cache_for_cloud_backends_only(tmp_path):
+    logger = MagicMock()
+    cloud = dict(storage_type="s3", aws_bucket_name="b", state_cache_dir=str(tmp_path), state_cache_max_mb=2)
+    assert build_storage_settings(logger, **cloud)[3][STATE_CACHE_DIR] == str(tmp_path)
+    assert STATE_CACHE_DIR not in build_storage_settings(logger, **cloud, disable_state_cache=True)[3]
+    assert STATE_CACHE_DIR not in build_storage_settings(logger, storage_type="local")[3]
+
+
+def _s3(client, tmp_path):
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        mock_boto3.client.return_value = client
+        return AWSS3Bucket(config={"aws_bucket_name": "b", STATE_CACHE_DIR: str(tmp_path)})
+
+
+def test_s3_second_load_is_served_from_cache(tmp_path, caplog):
+    etags = {f"resources/source/monitors.{i}.json": f'"etag-{i}"' for i in range(3)}
+    client = MagicMock()
+    client.list_objects_v2.side_effect = lambda **kw: {
+        "Contents": [{"Key": k, "ETag": e} for k, e in etags.items()],
+        "IsTruncated": False,
+    }
+
+    def get_object(Bucket, Key):
+        _id = Key.split(".")[1]
+        return {"Body": io.BytesIO(json.dumps({_id: {"etag": etags[Key]}}).encode()), "ETag": etags[Key]}
+
+    client.get_object.side_effect = get_object
+    first = _s3(client, tmp_path)._list_and_load("resources/source", None, "source")
+    assert client.get_object.call_count == 3
+
+    etags["resources/source/monitors.1.json"] = '"etag-1b"'
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        second = _s3(client, tmp_path)._list_and_load("resources/source", None, "source")
+    assert client.get_object.call_count == 4
+    assert second["monitors"]["0"] == first["monitors"]["0"]
+    assert second["monitors"]["1"] == {"etag": '"etag-1b"'}
+    line = [r.getMessage() for r in caplog.records if "phase=list_and_load" in r.getMessage()][-1]
+    assert "cache_hits=2 cache_misses=1 cache_hit_rate=0.67" in line, line
+
+
+def test_gcs_downloads_the_listed_generation(tmp_path):
+    body = json.dumps({"1": {"id": 1}}).encode()
+    listed = SimpleNamespace(name="resources/source/monitors.1.json", md5_hash=None, generation=42)
+    with patch("datadog_sync.utils.storage.gcs_bucket.gcs_storage") as mock_gcs:
+        bucket = MagicMock()
+        mock_gcs.Client.return_value.bucket.return_value = bucket
+        bucket.list_blobs.return_value = [listed]
+        bucket.blob.return_value.download_as_bytes.return_value = body
+        for _ in range(2):
+            backend = GCSBucket(config={"gcs_bucket_name": "b", STATE_CACHE_DIR: str(tmp_path)})
+            assert backend._list_and_load("resources/source", None, "source")["monitors"] == {"1": {"id": 1}}
+    bucket.blob.assert_called_once_with("resources/source/monitors.1.json", generation=42)
@@ -0,0 +1,108 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for BlobDownloadPipeline, the concurrent download stage of the cloud
+backends' _list_and_load."""
+
+import io
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from datadog_sync.constants import LOGGER_NAME
+from datadog_sync.utils.storage._base_storage import BlobDownloadPipeline
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+
+
+class _SlowFetch:
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, name, resource_type):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if name.startswith("bad"):
+            return None
+        return {"id": name}
+
+
+def test_downloads_run_concurrently_and_merge_in_listing_order():
+    fetch = _SlowFetch()
+    result = defaultdict(dict)
+    with BlobDownloadPipeline(fetch, result, concurrency=4) as pipeline:
+        for i in range(20):
+            pipeline.submit(f"blob{i}", "monitors")
+        pipeline.finish()
+    # Every file writes the same key: the last listed one must win.
+    assert result["monitors"] == {"id": "blob19"}
+    assert pipeline.blobs_downloaded == 20
+    assert 1 < fetch.max_in_flight <= 4
+    assert pipeline.effective_concurrency > 1
+
+
+def test_transient_errors_are_counted():
+    result = defaultdict(dict)
+    with BlobDownloadPipeline(_SlowFetch(0), result, concurrency=2) as pipeline:
+        for name in ("a", "bad1", "b", "bad2"):
+            pipeline.submit(name, "users")
+        pipeline.finish()
+    assert (pipeline.blobs_downloaded, pipeline.transient_errors) == (2, 2)
+
+
+def test_concurrency_one_downloads_inline():
+    calls = []
+    result = defaultdict(dict)
+    with BlobDownloadPipeline(lambda name, rt: calls.append(threading.current_thread()) or {name: 1}, result, 1) as p:
+        p.submit("a", "users")
+        p.finish()
+    assert calls == [threading.main_thread()]
+    assert result["users"] == {"a": 1}
+
+
+def test_fetch_exception_propagates():
+    def fetch(name, resource_type):
+        raise RuntimeError("access denied")
+
+    with pytest.raises(RuntimeError):
+        with BlobDownloadPipeline(fetch, defaultdict(dict), concurrency=2) as pipeline:
+            for i in range(10):
+                pipeline.submit(f"blob{i}", "users")
+            pipeline.finish()
+
+
+def test_s3_list_and_load_uses_configured_concurrency(caplog):
+    keys = [f"resources/source/monitors.{i}.json" for i in range(12)]
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        client = MagicMock()
+        mock_boto3.client.return_value = client
+        client.list_objects_v2.return_value = {"Contents": [{"Key": k} for k in keys], "IsTruncated": False}
+
+        def get_object(Bucket, Key):
+            time.sleep(0.01)
+            _id = Key.split(".")[1]
+            return {"Body": io.BytesIO(json.dumps({_id: {"id": _id}}).encode())}
+
+        client.get_object.side_effect = get_object
+        backend = AWSS3Bucket(config={"aws_bucket_name": "b", "aws_download_concurrency": 6})
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            result = backend._list_and_load("resources/source", None, "source")
+
+    assert sorted(result["monitors"], key=int) == [str(i) for i in range(12)]
+    line = next(r.getMessage() for r in caplog.records if "phase=list_and_load" in r.getMessage())
+    assert "download_concurrency=6" in line
+    effective = float(line.split("effective_concurrency=")[1].split()[0])
+    assert effective > 1
@@ -0,0 +1,116 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for BlobWritePipeline, the concurrent writer pool behind put()."""
+
+import json
+import logging
+import os
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from datadog_sync.constants import LOGGER_NAME, Origin
+from datadog_sync.utils.storage._base_storage import BlobWritePipeline, StorageData
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+from datadog_sync.utils.storage.local_file import LocalFile
+
+
+class _SlowWriter:
+    def __init__(self, delay=0.01, fail_on=None):
+        self.delay = delay
+        self.fail_on = fail_on
+        self.written = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, key, body):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.delay)
+            if key == self.fail_on:
+                raise RuntimeError("access denied")
+            with self._lock:
+                self.written.append(key)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_writes_run_concurrently_and_are_counted_per_label():
+    writer = _SlowWriter()
+    with BlobWritePipeline(writer, concurrency=4) as pipeline:
+        for i in range(10):
+            pipeline.submit(f"src{i}", "xx", "source")
+        for i in range(5):
+            pipeline.submit(f"dst{i}", "xxx", "destination")
+        pipeline.finish()
+    assert sorted(writer.written) == sorted([f"src{i}" for i in range(10)] + [f"dst{i}" for i in range(5)])
+    assert (pipeline.written["source"], pipeline.written["destination"]) == (10, 5)
+    assert pipeline.bytes_written == 10 * 2 + 5 * 3
+    assert 1 < writer.max_in_flight <= 4
+
+
+def test_first_write_failure_is_raised():
+    writer = _SlowWriter(delay=0, fail_on="k3")
+    with pytest.raises(RuntimeError):
+        with BlobWritePipeline(writer, concurrency=2) as pipeline:
+            for i in range(8):
+                pipeline.submit(f"k{i}", "x", "source")
+            pipeline.finish()
+
+
+def test_interrupt_drops_queued_writes_and_finishes_running_ones():
+    writer = _SlowWriter(delay=0.02)
+    with pytest.raises(KeyboardInterrupt):
+        with BlobWritePipeline(writer, concurrency=2) as pipeline:
+            for i in range(4):
+                pipeline.submit(f"k{i}", "x", "source")
+            raise KeyboardInterrupt
+    # close() waited for the started writes and cancelled the rest.
+    assert writer.in_flight == 0
+    assert 0 < len(writer.written) < 4
+    assert pipeline.written["source"] == len(writer.written)
+
+
+def test_s3_put_uploads_concurrently_and_logs_throughput(caplog):
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        client = MagicMock()
+        mock_boto3.client.return_value = client
+        writer = _SlowWriter()
+        client.put_object.side_effect = lambda Body, Bucket, Key: writer(Key, Body)
+        backend = AWSS3Bucket(config={"aws_bucket_name": "b", "aws_upload_concurrency": 5}, resource_per_file=True)
+        data = StorageData()
+        data.source["monitors"] = {str(i): {"id": i} for i in range(20)}
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            backend.put(Origin.SOURCE, data)
+
+    assert len(writer.written) == 20
+    assert 1 < writer.max_in_flight <= 5
+    line = next(r.getMessage() for r in caplog.records if "phase=put" in r.getMessage())
+    for field in ("blobs_written_source=20", "write_concurrency=5", "bytes_written=", "blobs_per_s=", "mb_per_s="):
+        assert field in line, line
+
+
+def test_local_put_writes_every_file_once(tmp_path):
+    backend = LocalFile(
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "destination"),
+        resource_per_file=True,
+    )
+    data = StorageData()
+    data.source["monitors"] = {str(i): {"id": i} for i in range(30)}
+    data.destination["monitors"] = {"0": {"id": "d0"}}
+    backend.put(Origin.ALL, data)
+
+    assert len(os.listdir(tmp_path / "source")) == 30
+    assert os.listdir(tmp_path / "destination") == ["monitors.0.json"]
+    with open(tmp_path / "source" / "monitors.7.json") as f:
+        assert json.load(f) == {"7": {"id": 7}}
@@ -0,0 +1,101 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for CustomClient connection pool settings, the shared unauthenticated
+session and the connection reuse counters."""
+
+import asyncio
+import logging
+from unittest.mock import AsyncMock, patch
+
+from aiohttp import web
+
+from datadog_sync.utils.custom_client import ConnectionPoolConfig, CustomClient
+
+
+def _make_client(**kwargs) -> CustomClient:
+    return CustomClient(
+        "https://api.datadoghq.com",
+        {"apiKeyAuth": "fake-api", "appKeyAuth": "fake-app"},
+        retry_timeout=30,
+        timeout=30,
+        send_metrics=False,
+        **kwargs,
+    )
+
+
+def test_connector_uses_pool_config():
+    pool = ConnectionPoolConfig(limit=7, limit_per_host=3, ttl_dns_cache=60, keepalive_timeout=5)
+    client = _make_client(connection_pool=pool)
+    with (
+        patch("datadog_sync.utils.custom_client.aiohttp.ClientSession"),
+        patch("datadog_sync.utils.custom_client.aiohttp.TCPConnector") as mock_connector_cls,
+    ):
+        asyncio.run(client._init_session())
+    kwargs = mock_connector_cls.call_args.kwargs
+    assert kwargs["limit"] == 7
+    assert kwargs["limit_per_host"] == 3
+    assert kwargs["ttl_dns_cache"] == 60
+    assert kwargs["keepalive_timeout"] == 5
+
+
+def test_external_session_is_shared_and_unauthenticated():
+    async def run():
+        client = _make_client()
+        await client._init_session()
+        first = client.external_session()
+        assert client.external_session() is first
+        assert "DD-API-KEY" not in first.headers
+        assert "DD-API-KEY" in client.session.headers
+        await client._end_session()
+        assert first.closed and client.session.closed
+
+    asyncio.run(run())
+
+
+def test_post_unauthenticated_reuses_external_session():
+    client = _make_client()
+    client._post_raw = AsyncMock()
+
+    async def run():
+        await client.post_unauthenticated("https://example.com/a", {})
+        await client.post_unauthenticated("https://example.com/b", {})
+        sessions = {call.args[0] for call in client._post_raw.call_args_list}
+        await client._end_session()
+        return sessions
+
+    assert len(asyncio.run(run())) == 1
+
+
+def test_connection_stats_count_new_and_reused(caplog):
+    async def handler(request):
+        return web.Response(text="ok")
+
+    async def run():
+        app = web.Application()
+        app.router.add_get("/", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+
+        client = _make_client()
+        session = client.external_session()
+        try:
+            for _ in range(3):
+                async with session.get(f"http://127.0.0.1:{port}/") as resp:
+                    await resp.read()
+        finally:
+            with caplog.at_level(logging.INFO):
+                await client._end_session()
+            await runner.cleanup()
+        return client.external_connection_stats
+
+    stats = asyncio.run(run())
+    assert (stats.requests, stats.new_connections, stats.reused_connections) == (3, 1, 2)
+    # Plain http: no TLS handshake.
+    assert stats.tls_handshakes == 0
+    assert any("phase=http_connections" in r.message and "session=external" in r.message for r in caplog.records)
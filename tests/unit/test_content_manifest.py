@@ -0,0 +1,138 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the content manifest that lets put() skip unchanged uploads."""
+
+import base64
+import hashlib
+import io
+import json
+import logging
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from datadog_sync.constants import LOGGER_NAME, Origin
+from datadog_sync.utils.storage._base_storage import (
+    BlobWritePipeline,
+    ContentManifest,
+    StorageData,
+    md5_from_base64,
+    md5_from_etag,
+)
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+from datadog_sync.utils.storage.gcs_bucket import GCSBucket
+from datadog_sync.utils.storage.local_file import LocalFile
+
+
+def _md5(body):
+    return hashlib.md5(body.encode()).digest()
+
+
+def test_pipeline_skips_bodies_matching_the_manifest():
+    manifest = ContentManifest()
+    manifest.record("a", _md5("same"))
+    manifest.record("b", _md5("old"))
+    written = []
+    with BlobWritePipeline(lambda key, body: written.append(key), 1, manifest) as pipeline:
+        pipeline.submit("a", "same", "source")
+        pipeline.submit("b", "new", "source")
+        pipeline.submit("c", "new", "destination")
+        pipeline.finish()
+    assert written == ["b", "c"]
+    assert (pipeline.skipped["source"], pipeline.written["source"], pipeline.written["destination"]) == (1, 1, 1)
+    # Completed writes are recorded, so a repeat of the same bodies is a no-op.
+    assert manifest.matches("b", _md5("new")) and manifest.matches("c", _md5("new"))
+
+
+def test_listing_digest_helpers():
+    digest = _md5("x")
+    assert md5_from_etag(f'"{digest.hex()}"') == digest
+    assert md5_from_etag(f'"{digest.hex()}-3"') is None  # multipart
+    assert md5_from_etag(None) is None
+    assert md5_from_base64(base64.b64encode(digest).decode()) == digest
+    assert md5_from_base64(bytearray(digest)) == digest
+    assert md5_from_base64("not base64!") is None
+    assert md5_from_base64(MagicMock()) is None
+
+
+def _s3_backend(client):
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        mock_boto3.client.return_value = client
+        return AWSS3Bucket(config={"aws_bucket_name": "b"}, resource_per_file=True)
+
+
+def test_s3_put_skips_objects_whose_etag_matches(caplog):
+    unchanged = json.dumps({"1": {"id": 1}})
+    stale = json.dumps({"2": {"id": 2}})
+    client = MagicMock()
+    client.list_objects_v2.return_value = {
+        "Contents": [
+            {"Key": "resources/source/monitors.1.json", "ETag": f'"{_md5(unchanged).hex()}"'},
+            {"Key": "resources/source/monitors.2.json", "ETag": f'"{_md5(stale).hex()}"'},
+        ],
+        "IsTruncated": False,
+    }
+    client.get_object.side_effect = lambda Bucket, Key: {
+        "Body": io.BytesIO((unchanged if Key.endswith(".1.json") else stale).encode())
+    }
+    backend = _s3_backend(client)
+    data = StorageData(source=backend._list_and_load("resources/source", None, "source"))
+    data.source["monitors"]["2"] = {"id": 2, "name": "changed"}
+    data.source["monitors"]["3"] = {"id": 3}
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        backend.put(Origin.SOURCE, data)
+
+    uploaded = sorted(call.kwargs["Key"] for call in client.put_object.call_args_list)
+    assert uploaded == ["resources/source/monitors.2.json", "resources/source/monitors.3.json"]
+    line = [r.getMessage() for r in caplog.records if "phase=put" in r.getMessage()][-1]
+    assert "blobs_written_source=2" in line and "blobs_skipped_source=1" in line, line
+
+
+def test_s3_delete_forgets_the_digest():
+    client = MagicMock()
+    backend = _s3_backend(client)
+    body = json.dumps({"1": {"id": 1}})
+    backend.content_manifest.record("resources/source/monitors.1.json", _md5(body))
+    backend.delete(Origin.SOURCE, "monitors.1.json")
+
+    data = StorageData()
+    data.source["monitors"]["1"] = {"id": 1}
+    backend.put(Origin.SOURCE, data)
+    client.put_object.assert_called_once()
+
+
+def test_gcs_listing_md5_is_recorded():
+    body = json.dumps({"1": {"id": 1}})
+    listed = SimpleNamespace(name="resources/source/monitors.1.json", md5_hash=base64.b64encode(_md5(body)).decode())
+    with patch("datadog_sync.utils.storage.gcs_bucket.gcs_storage") as mock_gcs:
+        bucket = MagicMock()
+        mock_gcs.Client.return_value.bucket.return_value = bucket
+        bucket.list_blobs.return_value = [listed]
+        bucket.blob.return_value.download_as_text.return_value = body
+        backend = GCSBucket(config={"gcs_bucket_name": "b"}, resource_per_file=True)
+        data = StorageData(source=backend._list_and_load("resources/source", None, "source"))
+        backend.put(Origin.SOURCE, data)
+    bucket.blob.return_value.upload_from_string.assert_not_called()
+
+
+def test_local_put_after_load_rewrites_only_changed_files(tmp_path):
+    kwargs = dict(
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "destination"),
+        resource_per_file=True,
+    )
+    data = StorageData()
+    data.source["monitors"] = {str(i): {"id": i} for i in range(5)}
+    LocalFile(**kwargs).put(Origin.SOURCE, data)
+
+    backend = LocalFile(**kwargs)
+    loaded = backend.get(Origin.SOURCE)
+    loaded.source["monitors"]["4"] = {"id": 4, "name": "changed"}
+    written = []
+    original = backend._write_file
+    with patch.object(backend, "_write_file", side_effect=lambda p, b: written.append(p) or original(p, b)):
+        backend.put(Origin.SOURCE, loaded)
+    assert [p.rsplit("/", 1)[-1] for p in written] == ["monitors.4.json"]
@@ -15,6 +15,7 @@ Verifies that:
 """
 
 import asyncio
+import json
 from unittest.mock import AsyncMock, MagicMock
 
 import aiohttp
@@ -83,8 +84,9 @@ def _mock_session_response(status: int = 200, json_body: dict = None) -> MagicMo
     resp = AsyncMock()
     resp.status = status
     resp.raise_for_status = MagicMock(return_value=None)
-    resp.json = AsyncMock(return_value=json_body or {"data": []})
-    resp.text = AsyncMock(return_value="")
+    resp.content_type = "application/json"
+    resp.charset = None
+    resp.read = AsyncMock(return_value=json.dumps(json_body or {"data": []}).encode())
     resp.__aenter__ = AsyncMock(return_value=resp)
     resp.__aexit__ = AsyncMock(return_value=False)
     cm = MagicMock()
@@ -175,12 +177,12 @@ class TestVerbsUseClientTimeout:
 class TestTimeoutPropagation:
     """asyncio.TimeoutError from a body stall must escape request_with_retry."""
 
-    def _resp_that_raises_on_text(self, exc: Exception) -> MagicMock:
-        """Return a mock response whose .text() raises exc (simulates body stall)."""
+    def _resp_that_raises_on_read(self, exc: Exception) -> MagicMock:
+        """Return a mock response whose .read() raises exc (simulates body stall)."""
         resp = MagicMock()
         resp.status = 200
         resp.raise_for_status = MagicMock(return_value=None)
-        resp.text = AsyncMock(side_effect=exc)
+        resp.read = AsyncMock(side_effect=exc)
         resp.__aenter__ = AsyncMock(return_value=resp)
         resp.__aexit__ = AsyncMock(return_value=False)
         cm = MagicMock()
@@ -189,11 +191,11 @@ class TestTimeoutPropagation:
         return cm
 
     def test_asyncio_timeout_error_propagates(self):
-        """asyncio.TimeoutError from resp.text() must propagate out of get()."""
+        """asyncio.TimeoutError from resp.read() must propagate out of get()."""
         client = _make_client(timeout=120)
         client.session = MagicMock()
         client.session.get = MagicMock(
-            return_value=self._resp_that_raises_on_text(asyncio.TimeoutError("sock_read exceeded"))
+            return_value=self._resp_that_raises_on_read(asyncio.TimeoutError("sock_read exceeded"))
         )
 
         with pytest.raises((asyncio.TimeoutError, TimeoutError)):
@@ -203,7 +205,7 @@ class TestTimeoutPropagation:
         """Built-in TimeoutError must also propagate (covers Python 3.11 alias)."""
         client = _make_client(timeout=120)
         client.session = MagicMock()
-        client.session.get = MagicMock(return_value=self._resp_that_raises_on_text(TimeoutError("timeout")))
+        client.session.get = MagicMock(return_value=self._resp_that_raises_on_read(TimeoutError("timeout")))
 
         with pytest.raises((asyncio.TimeoutError, TimeoutError)):
             asyncio.run(client.get("/api/v1/dashboards"))
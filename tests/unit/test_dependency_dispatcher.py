@@ -0,0 +1,188 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for DependencyDispatcher, the push-based replacement for the
+run_sorter/run_cleanup_sorter polling feeders under the event-driven
+worker scheduler."""
+
+import asyncio
+from collections import defaultdict
+from graphlib import CycleError
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from datadog_sync.constants import APPLY_PRIORITY_CRITICAL_PATH, APPLY_PRIORITY_DEPENDENTS
+from datadog_sync.utils.dependency_dispatcher import DependencyDispatcher, compute_priorities
+from datadog_sync.utils.resources_handler import ResourcesHandler
+from datadog_sync.utils.workers import Workers
+
+
+def test_dispatches_in_dependency_order():
+    graph = {"c": {"a", "b"}, "b": {"a"}, "d": set()}
+    dispatched = []
+    dispatcher = DependencyDispatcher(graph, dispatched.append)
+    dispatcher.start()
+    assert sorted(dispatched) == ["a", "d"]
+
+    dispatcher.done("a")
+    assert dispatched[-1] == "b"
+    dispatcher.done("b", "d")
+    assert dispatched[-1] == "c"
+    assert dispatcher.is_active()
+    dispatcher.done("c")
+    assert not dispatcher.is_active()
+
+
+def test_dependency_only_nodes_are_scheduled():
+    dispatched = []
+    dispatcher = DependencyDispatcher({"child": {"phantom"}}, dispatched.append)
+    dispatcher.start()
+    assert dispatched == ["phantom"]
+
+
+def test_reentrant_done_from_on_ready_does_not_recurse():
+    # A 20k-node chain where every node is skipped by calling done() from
+    # on_ready must complete without hitting the recursion limit.
+    n = 20_000
+    graph = {i: {i - 1} for i in range(1, n)}
+    seen = []
+
+    def on_ready(node):
+        seen.append(node)
+        dispatcher.done(node)
+
+    dispatcher = DependencyDispatcher(graph, on_ready)
+    dispatcher.start()
+    assert seen == list(range(n))
+    assert not dispatcher.is_active()
+
+
+def test_raising_on_ready_marks_the_node_done():
+    # Neither the raising node nor its dependents may keep the dispatcher
+    # active: the workers only stop once is_active() turns false.
+    graph = {"b": {"a"}, "c": {"b"}, "d": set()}
+    dispatched = []
+
+    def on_ready(node):
+        dispatched.append(node)
+        if node == "a":
+            raise RuntimeError("queue full")
+
+    dispatcher = DependencyDispatcher(graph, on_ready)
+    with pytest.raises(RuntimeError):
+        dispatcher.start()
+    assert sorted(dispatched) == ["a", "b", "d"]
+    dispatcher.done("b", "d")
+    assert dispatched[-1] == "c"
+    dispatcher.done("c")
+    assert not dispatcher.is_active()
+
+
+def test_cycle_raises_cycle_error():
+    with pytest.raises(CycleError):
+        DependencyDispatcher({"a": {"b"}, "b": {"a"}}, lambda _: None)
+
+
+def test_done_on_undispatched_node_raises():
+    dispatcher = DependencyDispatcher({"b": {"a"}}, lambda _: None)
+    dispatcher.start()
+    with pytest.raises(ValueError):
+        dispatcher.done("b")
+    dispatcher.done("a")
+    with pytest.raises(ValueError):
+        dispatcher.done("a")
+    with pytest.raises(ValueError):
+        dispatcher.done("unknown")
+
+
+def test_compute_priorities():
+    # a <- b <- c (c depends on b, b on a); a <- x; leaf l.
+    graph = {"b": {"a"}, "c": {"b"}, "x": {"a"}, "l": set()}
+    assert compute_priorities(graph, APPLY_PRIORITY_CRITICAL_PATH) == {"a": 3, "b": 2, "c": 1, "x": 1, "l": 1}
+    assert compute_priorities(graph, APPLY_PRIORITY_DEPENDENTS) == {"a": 2, "b": 1, "c": 0, "x": 0, "l": 0}
+    with pytest.raises(ValueError):
+        compute_priorities(graph, "bogus")
+
+
+def test_priority_with_capacity_releases_best_ready_node_first():
+    graph = {f"leaf{i}": set() for i in range(5)}
+    graph.update({"chain1": {"chain0"}, "chain2": {"chain1"}})
+    dispatched = []
+    dispatcher = DependencyDispatcher(
+        graph, dispatched.append, priority=compute_priorities(graph, APPLY_PRIORITY_CRITICAL_PATH), capacity=2
+    )
+    dispatcher.start()
+    # Only two outstanding; the chain head outranks every leaf.
+    assert dispatched[0] == "chain0"
+    assert len(dispatched) == 2
+
+    dispatcher.done("chain0")
+    # chain1 (depth 2) now outranks the remaining leaves (depth 1).
+    assert dispatched[2] == "chain1"
+    for node in list(dispatched[1:]):
+        dispatcher.done(node)
+    while dispatcher.is_active():
+        pending = [n for n in dispatched if n in dispatcher._dispatched]
+        dispatcher.done(*pending)
+    assert sorted(dispatched) == sorted(set(graph) | {"chain0"})
+
+
+def _make_handler(dep_graph, source_state):
+    handler = ResourcesHandler.__new__(ResourcesHandler)
+    handler.config = MagicMock()
+    handler.config.resources_arg = sorted({rt for rt, _ in dep_graph})
+    handler.config.state = MagicMock()
+    handler.config.state._minimize_reads = False
+    handler.config.state.source = defaultdict(dict)
+    handler.config.state.destination = defaultdict(dict)
+    for rt, ids in source_state.items():
+        handler.config.state.source[rt].update(ids)
+    return handler
+
+
+def test_apply_dispatch_runs_dependents_after_dependencies():
+    graph = {
+        ("dashboards", "d1"): {("monitors", "m1")},
+        ("monitors", "m1"): {("roles", "r1")},
+        ("roles", "r1"): set(),
+    }
+    # d0 depends on a source-absent node: it is marked done without running
+    # and must still release its dependent.
+    graph[("dashboards", "d0")] = {("monitors", "gone")}
+    source = {"dashboards": {"d0": {}, "d1": {}}, "monitors": {"m1": {}}, "roles": {"r1": {}}}
+    handler = _make_handler(graph, source)
+    ran = []
+
+    async def cb(node):
+        await asyncio.sleep(0)
+        ran.append(node)
+        handler.sorter.done(node)
+
+    async def run():
+        handler.worker = Workers(SimpleNamespace(max_workers=4, logger=MagicMock(), worker_scheduler="event"))
+        handler.sorter = DependencyDispatcher(graph, handler._dispatch_apply_node)
+        await handler.worker.init_workers(cb, lambda: not handler.sorter.is_active(), None)
+        handler.sorter.start()
+        await asyncio.wait_for(handler.worker.schedule_workers(), timeout=5)
+
+    asyncio.run(run())
+    assert ("monitors", "gone") not in ran
+    assert ran.index(("roles", "r1")) < ran.index(("monitors", "m1")) < ran.index(("dashboards", "d1"))
+    assert ("dashboards", "d0") in ran
+    assert not handler.sorter.is_active()
+
+
+def test_cleanup_dispatch_skips_already_deleted():
+    graph = {("monitors", "m1"): {("dashboards", "d1")}, ("dashboards", "d1"): set()}
+    handler = _make_handler({}, {})
+    handler.config.state.destination["monitors"]["m1"] = {}
+    queued = []
+    handler.worker = SimpleNamespace(work_queue=SimpleNamespace(put_nowait=queued.append))
+    handler.cleanup_sorter = DependencyDispatcher(graph, handler._dispatch_cleanup_node)
+    handler.cleanup_sorter.start()
+    # d1 is not in destination: marked done immediately, releasing m1.
+    assert queued == [("monitors", "m1")]
@@ -277,8 +277,8 @@ def test_filtered_resources_deps_not_computed(graph_test):
 
     with patch.object(
         ResourcesHandler,
-        "_resource_connections",
-        wraps=handler._resource_connections,
+        "_failed_connections",
+        wraps=handler._failed_connections,
     ) as mock_rc:
         graph, _, _ = handler.get_dependency_graph()
 
@@ -406,3 +406,32 @@ def test_missing_deps_only_from_filtered_resources(graph_test):
 
     assert ("monitors", "mon-99") in missing
     assert ("monitors", "mon-88") not in missing
+
+
+def test_dependencies_are_prefetched_in_one_batch(graph_test):
+    handler, config = graph_test
+    config.filters = {}
+    setup_state(
+        config,
+        {
+            "dashboards": {
+                "dash-1": {"id": "dash-1", "widgets": [{"definition": {"alert_id": "mon-2"}}]},
+                "dash-2": {"id": "dash-2", "widgets": [{"definition": {"alert_id": "mon-1"}}]},
+            },
+        },
+        resources_arg=["dashboards"],
+    )
+
+    def prefetch(keys):
+        # Stands in for storage: mon-1 exists, mon-2 does not.
+        config.state.source["monitors"]["mon-1"] = {"id": "mon-1"}
+
+    with patch.object(config.state, "ensure_resources_loaded", side_effect=prefetch) as batch, patch.object(
+        config.state, "ensure_resource_loaded"
+    ) as single:
+        graph, missing, _ = handler.get_dependency_graph()
+
+    batch.assert_called_once_with([("monitors", "mon-1"), ("monitors", "mon-2")])
+    single.assert_not_called()
+    assert graph[("dashboards", "dash-2")] == {("monitors", "mon-1")}
+    assert missing == {("monitors", "mon-2")}
@@ -0,0 +1,126 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for --cache-dependency-graph: the edges State keeps next to destination
+state, and when get_dependency_graph may reuse them instead of connecting."""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from datadog_sync.utils.base_resource import ResourceConfig
+from datadog_sync.utils.resources_handler import ResourcesHandler
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage.dependency_cache import DEPENDENCY_CACHE_SUFFIX
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _state(tmp_path):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        resource_per_file=True,
+    )
+
+
+def _handler(state):
+    connected = []
+
+    def connect_id(key, r_obj, resource_to_connect):
+        connected.append(r_obj["name"])
+        return [_id for _id in r_obj[key] if _id not in state.destination[resource_to_connect]]
+
+    def r_class(connections):
+        return SimpleNamespace(
+            resource_config=ResourceConfig(base_path="/x", resource_connections=connections),
+            connect_id=connect_id,
+            filter=lambda resource: True,
+        )
+
+    handler = ResourcesHandler.__new__(ResourcesHandler)
+    handler.config = MagicMock(
+        emit_json=False, skip_unchanged=False, cache_dependency_graph=True, resources_arg=["monitors"]
+    )
+    handler.config.state = state
+    handler.config.resources = {"monitors": r_class({"roles": ["roles"]}), "roles": r_class(None)}
+    return handler, connected
+
+
+def _seed(tmp_path):
+    state = _state(tmp_path)
+    state.source["monitors"]["a"] = {"name": "a", "roles": ["r1"]}
+    state.source["monitors"]["b"] = {"name": "b", "roles": ["r2"]}
+    state.source["monitors"]["c"] = {"name": "c", "roles": ["r1", "r2"]}
+    state.source["roles"]["r1"] = {"name": "r1"}
+    state.source["roles"]["r2"] = {"name": "r2"}
+    state.destination["roles"]["r1"] = {"id": "dst-r1"}
+    return state
+
+
+def test_unchanged_resources_reuse_cached_edges(tmp_path):
+    state = _seed(tmp_path)
+    handler, connected = _handler(state)
+    expected, _, _ = handler.get_dependency_graph()
+    assert sorted(connected) == ["a", "b", "c"]
+    assert expected[("monitors", "b")] == {("roles", "r2")}
+    state.dump_state()
+    assert (tmp_path / "dest" / f"monitors{DEPENDENCY_CACHE_SUFFIX}").exists()
+
+    # Next run: same source and destination IDs, nothing is connected again.
+    state = _state(tmp_path)
+    handler, connected = _handler(state)
+    graph, missing, _ = handler.get_dependency_graph()
+    assert graph == expected and connected == []
+    assert missing == set()
+
+    # Only the edited resource is connected again.
+    state.source["monitors"]["a"] = {"name": "a", "roles": ["r2"]}
+    graph, _, _ = handler.get_dependency_graph()
+    assert connected == ["a"] and graph[("monitors", "a")] == {("roles", "r2")}
+    state.dump_state()
+
+    # A new destination ID may resolve cached failures: everything is connected again.
+    state = _state(tmp_path)
+    state.destination["roles"]["r2"] = {"id": "dst-r2"}
+    handler, connected = _handler(state)
+    graph, _, _ = handler.get_dependency_graph()
+    assert sorted(connected) == ["a", "b", "c"]
+    assert all(deps == set() for deps in graph.values())
+
+    # Off: always connects.
+    connected.clear()
+    handler.config.cache_dependency_graph = False
+    handler.get_dependency_graph()
+    assert sorted(connected) == ["a", "b", "c"]
+
+
+def test_cache_is_not_loaded_as_state_and_is_salted_by_version(tmp_path):
+    state = _seed(tmp_path)
+    handler, _ = _handler(state)
+    handler.get_dependency_graph()
+    state.dump_state()
+
+    state = _state(tmp_path)
+    assert set(state.destination["monitors"]) == set()
+    digest, edges = state.dependency_cache("monitors")
+    assert digest is not None and set(edges) == {"a", "b", "c"}
+    assert state.dependency_cache("dashboards") == (None, {})
+
+    with patch("datadog_sync.utils.storage.dependency_cache.cli_version", return_value="other"):
+        assert _state(tmp_path).dependency_cache("monitors") == (None, {})
+
+    # Entries of resources deleted from source are dropped on the next write.
+    state = _state(tmp_path)
+    state.source["monitors"].pop("c")
+    state.record_dependency_cache("monitors", digest, {})
+    assert set(state.dependency_cache("monitors")[1]) == {"a", "b"}
+
+
+def test_cache_dependency_graph_option_reaches_configuration():
+    from datadog_sync.commands.diffs import diffs
+    from datadog_sync.commands.sync import sync
+
+    for command in (sync, diffs):
+        assert any(p.name == "cache_dependency_graph" and p.is_flag for p in command.params)
@@ -0,0 +1,114 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Property tests: a fingerprint match in check_diff must only ever stand in
+for an empty DeepDiff, for every model's excluded_attributes and deep_diff_config."""
+
+import random
+import re
+from copy import deepcopy
+
+import pytest
+from deepdiff import DeepDiff
+
+from datadog_sync import models
+from datadog_sync.utils.base_resource import BaseResource, ResourceConfig
+from datadog_sync.utils.resource_utils import (
+    check_diff,
+    fingerprint_spec,
+    resource_fingerprint,
+    resources_match,
+)
+
+MODELS = sorted(
+    (cls for cls in models.__dict__.values() if isinstance(cls, type) and issubclass(cls, BaseResource)),
+    key=lambda cls: cls.resource_type,
+)
+SEEDS = range(30)
+
+
+def _deep_diff(resource_config, a, b):
+    return DeepDiff(a, b, exclude_paths=resource_config.excluded_attributes, **resource_config.deep_diff_config)
+
+
+def _keys(resource_config):
+    keys = {"name", "tags", "handle", "bucketKey", "id"}
+    for key in resource_config.excluded_attributes or []:
+        keys.update(re.findall("\\['(.*?)'\\]", key))
+    return sorted(keys)
+
+
+def _value(rng, keys, depth=0):
+    roll = rng.random()
+    if depth < 3 and roll < 0.3:
+        return {k: _value(rng, keys, depth + 1) for k in rng.sample(keys, rng.randint(0, 4))}
+    if depth < 3 and roll < 0.5:
+        return [_value(rng, keys, depth + 1) for _ in range(rng.randint(0, 3))]
+    return rng.choice([None, 0, 1, 1.0, True, False, "", "x", "y"])
+
+
+def _mutate(rng, node, keys):
+    """A copy of node with its lists shuffled and, sometimes, one value changed."""
+    if isinstance(node, dict):
+        out = {k: _mutate(rng, v, keys) for k, v in node.items()}
+        if out and rng.random() < 0.15:
+            out[rng.choice(sorted(out))] = _value(rng, keys, 3)
+        return out
+    if isinstance(node, list):
+        out = [_mutate(rng, v, keys) for v in node]
+        rng.shuffle(out)
+        return out
+    return node
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda cls: cls.resource_type)
+def test_fingerprint_match_implies_no_deepdiff(model):
+    resource_config = model.resource_config
+    if "custom_operators" in resource_config.deep_diff_config:
+        # Operators may report differences between equal values; DeepDiff always runs.
+        assert resource_fingerprint(resource_config, {"a": 1}) is None
+        return
+    keys = _keys(resource_config)
+    for seed in SEEDS:
+        rng = random.Random(f"{model.resource_type}:{seed}")
+        resource = {k: _value(rng, keys) for k in keys if rng.random() < 0.7}
+        other = _mutate(rng, deepcopy(resource), keys)
+        if resources_match(resource_config, resource, other):
+            assert not _deep_diff(resource_config, resource, other), f"{model.resource_type} seed={seed}"
+        assert bool(check_diff(resource_config, resource, other)) == bool(_deep_diff(resource_config, resource, other))
+
+
+def test_fingerprint_is_order_insensitive_and_typed():
+    config = ResourceConfig(base_path="/x", excluded_attributes=["id", "meta.modified"])
+    a = {"id": 1, "meta": {"modified": "t1", "k": [1, 2]}, "tags": ["a", "b"]}
+    b = {"id": 2, "meta": {"modified": "t2", "k": [2, 1]}, "tags": ["b", "a"]}
+    assert resource_fingerprint(config, a) == resource_fingerprint(config, b)
+    assert check_diff(config, a, b) == {}
+
+    for changed in ({"meta": {"k": [1, 2.0]}}, {"tags": ["a", "b", "b"]}, {"tags": ["a", True]}):
+        assert resource_fingerprint(config, {**a, **changed}) != resource_fingerprint(config, a)
+
+    # Exact paths only: DeepDiff does not apply them below a list.
+    assert not resources_match(config, {"meta": [{"modified": 1}]}, {"meta": [{"modified": 2}]})
+
+    ordered = ResourceConfig(base_path="/x", deep_diff_config={"ignore_order": False})
+    assert not resources_match(ordered, [1, 2], [2, 1])
+
+
+def test_regex_exclusions_and_unsupported_options():
+    config = ResourceConfig(
+        base_path="/x", deep_diff_config={"ignore_order": True, "exclude_regex_paths": [r".*\['handle'\]"]}
+    )
+    assert resources_match(config, {"u": [{"handle": 1, "n": 1}, {"n": 2}]}, {"u": [{"n": 2}, {"n": 1, "handle": 2}]})
+    assert not resources_match(config, {"n": float("nan")}, {"n": float("nan")})
+
+    custom = ResourceConfig(base_path="/x", deep_diff_config={"ignore_order": True, "custom_operators": []})
+    assert resource_fingerprint(custom, {"a": 1}) is None
+    assert not resources_match(custom, {"a": 1}, {"a": 1})
+
+    spec = fingerprint_spec(config)
+    assert fingerprint_spec(config) is spec
+    config.deep_diff_config = {"ignore_order": False}
+    assert fingerprint_spec(config) is not spec
@@ -524,6 +524,8 @@ EXPECTED_LIST_AND_LOAD_FIELDS = (
     "list_ms=",
     "download_ms=",
     "wall_ms=",
+    "download_concurrency=",
+    "effective_concurrency=",
 )
 
 
@@ -0,0 +1,100 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the single-read body decoding used by request_with_retry."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import aiohttp
+import pytest
+
+from datadog_sync.utils import json_body
+from datadog_sync.utils.custom_client import CustomClient
+from datadog_sync.utils.json_body import DecodeStats, decode_body, set_json_backend
+from datadog_sync.utils.resource_utils import CustomClientHTTPError
+
+
+def _resp(content_type="application/json", charset=None):
+    return SimpleNamespace(content_type=content_type, charset=charset)
+
+
+@pytest.mark.parametrize("content_type", ["application/json", "application/vnd.api+json"])
+def test_json_content_types_are_parsed(content_type):
+    assert asyncio.run(decode_body(_resp(content_type), b'{"a": [1, 2]}')) == {"a": [1, 2]}
+
+
+def test_non_json_content_type_returns_text():
+    assert asyncio.run(decode_body(_resp("text/plain", "latin-1"), "caf\xe9".encode("latin-1"))) == "caf\xe9"
+
+
+def test_empty_json_body_is_none():
+    assert asyncio.run(decode_body(_resp(), b"  ")) is None
+
+
+def test_large_bodies_are_parsed_off_the_event_loop():
+    stats = DecodeStats()
+    small = json.dumps({"widgets": []}).encode()
+    large = json.dumps({"widgets": [{"id": i} for i in range(100)]}).encode()
+
+    async def run():
+        await decode_body(_resp(), small, offload_threshold=len(small), stats=stats)
+        return await decode_body(_resp(), large, offload_threshold=len(small), stats=stats)
+
+    assert asyncio.run(run())["widgets"][99] == {"id": 99}
+    assert (stats.bodies, stats.offloaded) == (2, 1)
+
+
+def test_pluggable_backend():
+    previous = json_body.json_backend()
+    loads = MagicMock(return_value={"custom": True})
+    try:
+        set_json_backend("custom", loads)
+        assert asyncio.run(decode_body(_resp(), b"{}")) == {"custom": True}
+        loads.assert_called_once_with(b"{}")
+    finally:
+        set_json_backend(previous)
+    with pytest.raises(ValueError):
+        set_json_backend("missing")
+
+
+def test_bodies_another_backend_rejects_are_parsed_by_json():
+    def strict(body):
+        if b"NaN" in body or b"1" * 21 in body:
+            raise ValueError("unsupported")
+        return json.loads(body)
+
+    previous = json_body.json_backend()
+    try:
+        set_json_backend("strict", strict)
+        parsed = asyncio.run(decode_body(_resp(), b'{"a": NaN, "b": 111111111111111111111}'))
+        assert parsed["b"] == 111111111111111111111 and parsed["a"] != parsed["a"]
+        with pytest.raises(ValueError):
+            asyncio.run(decode_body(_resp(), b"{broken"))
+    finally:
+        set_json_backend(previous)
+
+
+def test_request_reads_body_once_and_keeps_text_for_errors():
+    resp = MagicMock()
+    resp.content_type = "application/json"
+    resp.charset = None
+    resp.read = AsyncMock(return_value=b'{"errors": ["Forbidden"]}')
+    resp.raise_for_status = MagicMock(side_effect=aiohttp.ClientResponseError(MagicMock(), (), status=403, headers={}))
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=resp)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    client = CustomClient(
+        "https://api.datadoghq.com", {"apiKeyAuth": "k", "appKeyAuth": "a"}, 30, 30, send_metrics=False
+    )
+    client.session = MagicMock()
+    client.session.get = MagicMock(return_value=cm)
+
+    with pytest.raises(CustomClientHTTPError) as exc_info:
+        asyncio.run(client.get("/api/v1/dashboard/abc"))
+    assert "Forbidden" in str(exc_info.value)
+    resp.read.assert_awaited_once()
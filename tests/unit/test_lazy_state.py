@@ -0,0 +1,132 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for lazily decoded packed state: State over --state-layout pack decodes
+a pack block only when one of its entries is read."""
+
+import copy
+import json
+import logging
+from unittest.mock import patch
+
+import pytest
+
+from datadog_sync.constants import LOGGER_NAME, Origin
+from datadog_sync.utils.state import State, _LazyResources, _PendingEntry
+from datadog_sync.utils.storage import state_pack
+from datadog_sync.utils.storage._base_storage import StorageData
+from datadog_sync.utils.storage.local_file import LocalFile
+from datadog_sync.utils.storage.state_pack import PackedResources, PackStorage
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+@pytest.fixture
+def small_blocks(monkeypatch):
+    monkeypatch.setattr(state_pack, "PACK_BLOCK_BYTES", 256)
+
+
+def _seed(tmp_path, n=100):
+    data = StorageData()
+    data.source["monitors"] = {str(i): {"id": i, "name": f"m{i}"} for i in range(n)}
+    data.destination["monitors"] = {str(i): {"id": 1000 + i} for i in range(0, n, 2)}
+    PackStorage(
+        LocalFile(source_resources_path=str(tmp_path / "source"), destination_resources_path=str(tmp_path / "dest"))
+    ).put(Origin.ALL, data)
+    return data
+
+
+def _state(tmp_path):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        state_layout="pack",
+    )
+
+
+def _count_decodes():
+    return patch.object(PackedResources, "block_lines", autospec=True, side_effect=PackedResources.block_lines)
+
+
+def test_keys_and_membership_do_not_decode(tmp_path, small_blocks):
+    _seed(tmp_path)
+    with _count_decodes() as decode:
+        state = _state(tmp_path)
+        monitors = state.source["monitors"]
+        assert isinstance(monitors, _LazyResources)
+        assert len(monitors) == 100 and "42" in monitors and "x" not in monitors
+        assert list(monitors.keys())[:3] == ["0", "1", "2"] and sorted(monitors, key=int)[-1] == "99"
+        assert decode.call_count == 0
+
+        assert monitors["42"] == {"id": 42, "name": "m42"}
+        assert decode.call_count == 1
+        # The rest of the block stays unparsed until read.
+        assert isinstance(dict.__getitem__(monitors, "43"), _PendingEntry)
+        assert monitors.get("43") == {"id": 43, "name": "m43"} and monitors.get("x", "d") == "d"
+
+
+def test_bulk_access_decodes_every_block(tmp_path, small_blocks):
+    data = _seed(tmp_path)
+    state = _state(tmp_path)
+    monitors = state.source["monitors"]
+    assert dict(monitors.items()) == data.source["monitors"]
+    assert monitors == data.source["monitors"]
+    assert state.destination["monitors"] == data.destination["monitors"]
+    assert monitors._packed.blocks and not monitors._pending
+
+
+@pytest.mark.parametrize(
+    "materialize",
+    [dict, lambda m: {**m}, copy.deepcopy, copy.copy, lambda m: m.copy(), lambda m: json.loads(json.dumps(m))],
+)
+def test_copies_never_expose_placeholders(tmp_path, small_blocks, materialize):
+    data = _seed(tmp_path, n=30)
+    assert materialize(_state(tmp_path).source["monitors"]) == data.source["monitors"]
+
+
+def test_writes_and_pops_are_tracked(tmp_path, small_blocks):
+    _seed(tmp_path, n=40)
+    state = _state(tmp_path)
+    monitors = state.source["monitors"]
+    monitors["5"] = {"id": 5, "name": "renamed"}
+    assert monitors.pop("6") == {"id": 6, "name": "m6"}
+    assert monitors.setdefault("7", None) == {"id": 7, "name": "m7"}
+    state.dump_state(Origin.SOURCE)
+
+    reloaded = _state(tmp_path).source["monitors"]
+    assert reloaded["5"]["name"] == "renamed" and "6" not in reloaded and len(reloaded) == 39
+    assert reloaded["39"] == {"id": 39, "name": "m39"}
+
+
+def test_debug_logging_catches_in_place_mutation_of_decoded_entries(tmp_path, small_blocks, caplog):
+    caplog.set_level(logging.DEBUG, logger=LOGGER_NAME)
+    _seed(tmp_path, n=40)
+    state = _state(tmp_path)
+    state.source["monitors"]["5"]["name"] = "renamed"
+    state.dump_state(Origin.SOURCE)
+    assert "source state entry monitors.5 was changed in place" in caplog.text
+    assert _state(tmp_path).source["monitors"]["5"]["name"] == "renamed"
+
+
+def test_pack_rewrite_keeps_mapped_reader_valid(tmp_path, small_blocks):
+    _seed(tmp_path)
+    stale = _state(tmp_path)
+    writer = _state(tmp_path)
+    writer.source["monitors"]["0"] = {"id": 0, "name": "new"}
+    writer.dump_state(Origin.SOURCE)
+    # The old mapping still reads the pack it was opened on.
+    assert stale.source["monitors"]["99"] == {"id": 99, "name": "m99"}
+    assert stale.source["monitors"]["0"]["name"] == "m0"
+
+
+def test_corrupt_block_drops_its_entries(tmp_path, small_blocks):
+    _seed(tmp_path, n=50)
+    state = _state(tmp_path)
+    monitors = state.source["monitors"]
+    with patch.object(PackedResources, "block_lines", side_effect=ValueError("bad")):
+        with pytest.raises(KeyError):
+            monitors["0"]
+    assert "0" not in monitors
+    assert len(monitors.items()) < 49
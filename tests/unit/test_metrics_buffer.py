@@ -0,0 +1,105 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for MetricsBuffer, the batched replacement for one /api/v2/series
+POST per send_metric call."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from datadog_sync.utils.custom_client import CustomClient
+from datadog_sync.utils.metrics_buffer import METRIC_TYPE_COUNT, METRIC_TYPE_UNSPECIFIED, SERIES_PATH, MetricsBuffer
+
+
+def _metrics_client() -> CustomClient:
+    client = CustomClient(
+        "https://api.datadoghq.com",
+        {"apiKeyAuth": "fake-api", "appKeyAuth": "fake-app"},
+        retry_timeout=30,
+        timeout=30,
+        send_metrics=True,
+    )
+    client.post = AsyncMock()
+    return client
+
+
+def _posted_series(client):
+    return [series for call in client.post.call_args_list for series in call.args[1]["series"]]
+
+
+def test_points_group_by_metric_type_tags_and_second():
+    buffer = MetricsBuffer(MagicMock())
+    buffer.add("m", ["a:1"], value=3, timestamp=100)
+    buffer.add("m", ["a:1"], value=5, timestamp=100)
+    buffer.add("m", ["a:1"], timestamp=101)
+    buffer.add("m", ["a:2"], timestamp=100)
+    buffer.add("m", ["a:1"], value=2, timestamp=100, metric_type=METRIC_TYPE_COUNT)
+    buffer.add("m", ["a:1"], value=4, timestamp=100, metric_type=METRIC_TYPE_COUNT)
+    assert buffer.pending == 3
+
+    (payload,) = buffer._build_payloads(buffer._series)
+    by_key = {(s["type"], tuple(s["tags"])): s["points"] for s in payload["series"]}
+    # Only counts are summed; any other type keeps the last value of the second.
+    assert by_key[(METRIC_TYPE_UNSPECIFIED, ("a:1",))] == [
+        {"timestamp": 100, "value": 5},
+        {"timestamp": 101, "value": 1},
+    ]
+    assert by_key[(METRIC_TYPE_UNSPECIFIED, ("a:2",))] == [{"timestamp": 100, "value": 1}]
+    assert by_key[(METRIC_TYPE_COUNT, ("a:1",))] == [{"timestamp": 100, "value": 6}]
+
+
+def test_payloads_split_by_series_count():
+    buffer = MetricsBuffer(MagicMock(), max_series_per_payload=2)
+    for i in range(5):
+        buffer.add("m", [f"id:{i}"])
+    assert [len(p["series"]) for p in buffer._build_payloads(buffer._series)] == [2, 2, 1]
+
+
+def test_send_metric_buffers_until_session_end():
+    client = _metrics_client()
+
+    async def run():
+        await client._init_session()
+        await client.send_metric("action", ["id:1"])
+        await client.send_metric("action", ["id:2"])
+        client.post.assert_not_awaited()
+        await client._end_session()
+
+    asyncio.run(run())
+    client.post.assert_awaited_once()
+    assert client.post.call_args.args[0] == SERIES_PATH
+    assert sorted(s["tags"] for s in _posted_series(client)) == [["id:1"], ["id:2"]]
+    assert all(s["metric"].endswith(".action") for s in _posted_series(client))
+
+
+def test_periodic_flush():
+    client = _metrics_client()
+    buffer = MetricsBuffer(client, flush_interval_s=0.01)
+
+    async def run():
+        buffer.start()
+        buffer.add("m", ["a:1"])
+        await asyncio.sleep(0.05)
+        client.post.assert_awaited_once()
+        await buffer.close()
+
+    asyncio.run(run())
+    client.post.assert_awaited_once()
+
+
+def test_failed_flush_is_dropped_and_counted():
+    client = _metrics_client()
+    client.post = AsyncMock(side_effect=Exception("boom"))
+    buffer = MetricsBuffer(client)
+    buffer.add("m")
+    asyncio.run(buffer.close())
+    assert buffer.payloads_failed == 1
+    assert buffer.pending == 0
+
+
+def test_metrics_disabled_without_api_keys():
+    client = CustomClient("https://api.datadoghq.com", {"jwtAuth": "jwt"}, 30, 30, send_metrics=True)
+    assert client.metrics_buffer is None
+    asyncio.run(client.send_metric("action"))
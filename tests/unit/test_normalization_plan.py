@@ -0,0 +1,233 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Property tests: the compiled NormalizationPlan behind prep_resource must
+produce exactly what the recursive helpers produce, for every model, and its
+copy-on-write variants must never write through to the resource they copy."""
+
+import asyncio
+import random
+import re
+from copy import deepcopy
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from datadog_sync import models
+from datadog_sync.utils.base_resource import BaseResource, ResourceConfig, ResourceConnectionResult
+from datadog_sync.utils.resource_utils import (
+    NormalizationPlan,
+    find_attr,
+    connection_copy,
+    normalization_plan,
+    prep_resource,
+    prepped_copy,
+    remove_excluded_attr,
+    remove_non_nullable_attributes,
+    remove_non_nullable_list_vals,
+)
+from datadog_sync.utils.resources_handler import ResourcesHandler
+
+MODELS = sorted(
+    (cls for cls in models.__dict__.values() if isinstance(cls, type) and issubclass(cls, BaseResource)),
+    key=lambda cls: cls.resource_type,
+)
+SEEDS = range(40)
+
+
+def _legacy(resource_config, resource):
+    remove_excluded_attr(resource_config, resource)
+    remove_non_nullable_attributes(resource_config, resource)
+    remove_non_nullable_list_vals(resource_config, resource)
+
+
+def _paths(resource_config):
+    paths = [re.findall("\\['(.*?)'\\]", key) for key in resource_config.excluded_attributes or []]
+    paths += [key.split(".") for key in resource_config.non_nullable_attr or []]
+    paths += [key.split(".") for key, _ in resource_config.non_nullable_list_vals or []]
+    return [p for p in paths if p]
+
+
+def _leaf(rng, key, resource_config):
+    choices = [None, 0, "", "x", 1.5, [], {}, True, ["a", "b"]]
+    nulls = (resource_config.null_values or {}).get(key)
+    if nulls:
+        choices += list(nulls) * 3
+        if isinstance(nulls, str):
+            choices += [nulls[:3], nulls + "!"]
+    for path, val in resource_config.non_nullable_list_vals or []:
+        if path.split(".")[-1] == key:
+            choices += [[val], ["other", val, val], ["other"]] * 2
+    return deepcopy(rng.choice(choices))
+
+
+def _build(rng, suffixes, resource_config, depth=0):
+    """A dict holding (some of) the given path suffixes, with lists, Nones and noise mixed in."""
+    node = {f"noise{i}": rng.choice([1, "v", None, [1, None]]) for i in range(rng.randint(0, 2))}
+    by_key = {}
+    for path in suffixes:
+        by_key.setdefault(path[0], []).append(path[1:])
+    for key, rests in by_key.items():
+        if rng.random() < 0.15:
+            continue
+        deeper = [rest for rest in rests if rest]
+        if not deeper or (depth > 0 and rng.random() < 0.1):
+            node[key] = _leaf(rng, key, resource_config)
+            continue
+        roll = rng.random()
+        if roll < 0.55:
+            node[key] = _build(rng, deeper, resource_config, depth + 1)
+        elif roll < 0.85:
+            node[key] = [_build(rng, deeper, resource_config, depth + 1) for _ in range(rng.randint(0, 3))]
+        else:
+            node[key] = rng.choice([None, "scalar", 0])
+    return node
+
+
+def _run(fn, resource_config, resource):
+    try:
+        fn(resource_config, resource)
+    except Exception as e:
+        return type(e)
+    return resource
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda cls: cls.resource_type)
+def test_plan_matches_recursive_helpers(model):
+    resource_config = model.resource_config
+    paths = _paths(resource_config)
+    for seed in SEEDS:
+        resource = _build(random.Random(f"{model.resource_type}:{seed}"), paths, resource_config)
+        expected = _run(_legacy, resource_config, deepcopy(resource))
+        actual = _run(prep_resource, resource_config, deepcopy(resource))
+        assert actual == expected, f"{model.resource_type} seed={seed} input={resource!r}"
+
+
+def _run_copy(fn, resource_config, resource):
+    try:
+        return fn(resource_config, resource)
+    except Exception as e:
+        return type(e)
+
+
+@pytest.mark.parametrize("model", MODELS, ids=lambda cls: cls.resource_type)
+def test_prepped_copy_matches_and_leaves_input_alone(model):
+    resource_config = model.resource_config
+    paths = _paths(resource_config)
+    for seed in SEEDS:
+        resource = _build(random.Random(f"{model.resource_type}:{seed}"), paths, resource_config)
+        before = deepcopy(resource)
+        expected = _run(_legacy, resource_config, deepcopy(resource))
+        assert _run_copy(prepped_copy, resource_config, resource) == expected, f"{model.resource_type} seed={seed}"
+        assert resource == before
+
+
+def _remap(key, r_obj, resource_to_connect):
+    # What connect_id implementations do: rewrite r_obj[key] in place or
+    # replace it, and occasionally set a sibling attribute.
+    value = r_obj[key]
+    if isinstance(value, list):
+        for i, item in enumerate(value):
+            if isinstance(item, dict):
+                item["remapped"] = True
+            else:
+                value[i] = f"dst-{item}"
+    elif isinstance(value, dict):
+        value["remapped"] = True
+    else:
+        r_obj[key] = f"dst-{value}"
+    r_obj["connected"] = resource_to_connect
+    return None
+
+
+def _connect_all(resource_config, resource):
+    for resource_to_connect, attrs in resource_config.resource_connections.items():
+        for attr in attrs:
+            if attr:
+                find_attr(attr, resource_to_connect, resource, _remap)
+    return resource
+
+
+@pytest.mark.parametrize(
+    "model", [m for m in MODELS if m.resource_config.resource_connections], ids=lambda cls: cls.resource_type
+)
+def test_connection_copy_isolates_connect_id_writes(model):
+    resource_config = model.resource_config
+    paths = [p.split(".") for attrs in resource_config.resource_connections.values() for p in attrs if p]
+    for seed in SEEDS:
+        resource = _build(random.Random(f"{model.resource_type}:{seed}"), paths, resource_config)
+        before = deepcopy(resource)
+        expected = _run_copy(_connect_all, resource_config, deepcopy(resource))
+        actual = _run_copy(_connect_all, resource_config, connection_copy(resource_config, resource))
+        assert actual == expected, f"{model.resource_type} seed={seed}"
+        assert resource == before
+
+
+@pytest.mark.parametrize("copy_on_write", [True, False])
+def test_copy_on_write_apply_leaves_source_state_alone(mock_config, monkeypatch, copy_on_write):
+    monkeypatch.setattr(models.Dashboards.resource_config, "copy_on_write_apply", copy_on_write)
+    source = {
+        "title": "t",
+        "widgets": [{"definition": {"slo_id": "s1", "title": "w"}}, {"definition": {"alert_id": "m1"}}],
+        "restricted_roles": ["r1"],
+        "template_variables": [{"name": "env"}],
+    }
+    before = deepcopy(source)
+    sent = []
+
+    def connect_resources(_id, resource):
+        _connect_all(models.Dashboards.resource_config, resource)
+        return ResourceConnectionResult()
+
+    async def create_resource(_id, resource):
+        sent.append(deepcopy(resource))
+        resource.pop("widgets")
+        resource["template_variables"][0]["name"] = "created"
+
+    r_class = MagicMock()
+    r_class.resource_config = models.Dashboards.resource_config
+    r_class.connect_resources = connect_resources
+    r_class._pre_resource_action_hook = AsyncMock()
+    r_class._create_resource = create_resource
+    r_class._send_action_metrics = AsyncMock()
+    mock_config.resources = {"dashboards": r_class}
+    mock_config.state.source["dashboards"]["d1"] = source
+
+    handler = ResourcesHandler(mock_config)
+    handler.worker = MagicMock()
+    handler.sorter = MagicMock()
+    handler._emit = MagicMock()
+    asyncio.run(handler._apply_resource_cb(["dashboards", "d1"]))
+
+    handler.worker.counter.increment_success.assert_called_once()
+    assert source == before
+    assert sent[0]["widgets"][0]["definition"] == {
+        "slo_id": "dst-s1",
+        "title": "w",
+        "connected": "service_level_objectives",
+    }
+    assert sent[0]["restricted_roles"] == ["dst-r1"]
+
+
+def test_paths_are_parsed_once_per_config():
+    config = ResourceConfig(
+        base_path="/x",
+        excluded_attributes=["a.b", "c"],
+        non_nullable_attr=["d.e"],
+        null_values={"e": [""]},
+        non_nullable_list_vals=[("f", "v")],
+    )
+    plan = normalization_plan(config)
+    assert plan.excluded == (("a", "b"), ("c",))
+    assert plan.non_nullable == ((("d", "e"), True, [""]),)
+    assert normalization_plan(config) is plan
+
+    resource = {"a": [{"b": 1, "k": 2}], "c": 3, "d": {"e": ""}, "f": ["v", "w"]}
+    prep_resource(config, resource)
+    assert resource == {"a": [{"k": 2}], "d": {}, "f": ["w"]}
+
+    config.non_nullable_list_vals = [("f", "w")]
+    assert normalization_plan(config) is not plan
+    assert isinstance(normalization_plan(config), NormalizationPlan)
@@ -656,7 +656,7 @@ def test_force_missing_dep_bypasses_user_filter(notebooks):
     # Stub the post-success dep-graph bookkeeping the cb does after import.
     # q_item is a tuple in production (used as a dict key in _dependency_graph).
     handler._dependency_graph = {}
-    handler._resource_connections = MagicMock(return_value=([], []))
+    handler._resource_connections_async = AsyncMock(return_value=([], []))
 
     asyncio.run(handler._force_missing_dep_import_cb(("notebooks", "99")))
 
@@ -145,8 +145,11 @@ def test_all_backoff_buckets_reachable_with_large_budget():
         async def __aexit__(self, *a):
             return False
 
-        async def text(self):
-            return "server overloaded"
+        content_type = "text/plain"
+        charset = None
+
+        async def read(self):
+            return b"server overloaded"
 
         def raise_for_status(self):
             import aiohttp
@@ -208,8 +211,11 @@ def test_end_to_end_overload_budget_guard():
         async def __aexit__(self, *a):
             return False
 
-        async def text(self):
-            return "server overloaded"
+        content_type = "text/plain"
+        charset = None
+
+        async def read(self):
+            return b"server overloaded"
 
         def raise_for_status(self):
             import aiohttp
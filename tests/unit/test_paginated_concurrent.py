@@ -0,0 +1,123 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the parallel mode of paginated_request (PaginationConfig
+max_concurrent_pages + total_count_func)."""
+
+import asyncio
+import logging
+
+from datadog_sync.utils.custom_client import CustomClient, PaginationConfig, total_count_func
+from datadog_sync.utils.resource_utils import CustomClientHTTPError
+
+
+class _FakeResp:
+    def __init__(self, status):
+        self.status = status
+        self.message = "error"
+
+
+def _make_client():
+    return CustomClient(
+        host="https://api.datadoghq.com",
+        auth={"apiKeyAuth": "k", "appKeyAuth": "a"},
+        retry_timeout=60,
+        timeout=30,
+        send_metrics=False,
+    )
+
+
+class _FakeApi:
+    """Page-number (users) or offset (notebooks) addressed list endpoint."""
+
+    def __init__(self, n, offset_param=None, bad_ids=(), forbidden_offset=None, with_total=True):
+        self.items = [{"id": i} for i in range(n)]
+        self.offset_param = offset_param
+        self.bad_ids = set(bad_ids)
+        self.forbidden_offset = forbidden_offset
+        self.with_total = with_total
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def get(self, path, params=None, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.001)
+            if self.offset_param:
+                size, offset = params["count"], params["start"]
+            else:
+                size = params["page[size]"]
+                offset = params["page[number]"] * size
+            if offset == self.forbidden_offset:
+                raise CustomClientHTTPError(_FakeResp(403), message="Forbidden")
+            page = self.items[offset : offset + size]
+            if any(item["id"] in self.bad_ids for item in page):
+                raise CustomClientHTTPError(_FakeResp(500), message="server error")
+            resp = {"data": page}
+            if self.with_total:
+                resp["meta"] = {"page": {"total_count": len(self.items)}}
+            return resp
+        finally:
+            self.in_flight -= 1
+
+
+def _paginate(api, cfg):
+    client = _make_client()
+    return asyncio.run(client.paginated_request(api.get)("/api/v2/users", pagination_config=cfg))
+
+
+def _parallel_config(**kwargs):
+    return PaginationConfig(page_size=10, max_concurrent_pages=4, total_count_func=total_count_func, **kwargs)
+
+
+def test_pages_fetched_concurrently_and_in_order():
+    api = _FakeApi(95)
+    resources = _paginate(api, _parallel_config())
+    assert [r["id"] for r in resources] == list(range(95))
+    assert api.calls == 10
+    assert 1 < api.max_in_flight <= 4
+
+
+def test_offset_addressed_endpoint():
+    api = _FakeApi(35, offset_param=True)
+    cfg = _parallel_config(
+        page_size_param="count",
+        page_number_param="start",
+        page_number_func=lambda idx, page_size, page_number: page_size * (idx + 1),
+    )
+    assert [r["id"] for r in _paginate(api, cfg)] == list(range(35))
+
+
+def test_5xx_isolated_within_its_page(caplog):
+    caplog.set_level(logging.WARNING, logger="datadog_sync_cli")
+    api = _FakeApi(40, bad_ids={23})
+    resources = _paginate(api, _parallel_config())
+    assert [r["id"] for r in resources] == [i for i in range(40) if i != 23]
+    assert "TRUNCATED" not in caplog.text
+    assert "Error isolated" in caplog.text
+
+
+def test_non_5xx_truncates_at_failing_page(caplog):
+    caplog.set_level(logging.ERROR, logger="datadog_sync_cli")
+    api = _FakeApi(50, forbidden_offset=20)
+    resources = _paginate(api, _parallel_config())
+    assert [r["id"] for r in resources] == list(range(20))
+    assert "TRUNCATED" in caplog.text
+
+
+def test_missing_total_falls_back_to_serial():
+    api = _FakeApi(25, with_total=False)
+    cfg = _parallel_config(remaining_func=lambda *args: 1)
+    assert [r["id"] for r in _paginate(api, cfg)] == list(range(25))
+    assert api.max_in_flight == 1
+
+
+def test_serial_mode_unchanged_by_default():
+    api = _FakeApi(25)
+    assert [r["id"] for r in _paginate(api, PaginationConfig(page_size=10))] == list(range(25))
+    assert api.max_in_flight == 1
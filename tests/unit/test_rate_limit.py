@@ -0,0 +1,132 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for x-ratelimit-* header pacing (RateLimitBuckets) and its wiring
+into request_with_retry."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+from datadog_sync.utils.custom_client import CustomClient
+from datadog_sync.utils.rate_limit import RateLimitBuckets, TokenBucket
+
+
+def _headers(name="monitors", limit="10", period="10", remaining="10", reset="10"):
+    return {
+        "x-ratelimit-name": name,
+        "x-ratelimit-limit": limit,
+        "x-ratelimit-period": period,
+        "x-ratelimit-remaining": remaining,
+        "x-ratelimit-reset": reset,
+    }
+
+
+def test_unknown_endpoint_is_not_paced():
+    buckets = RateLimitBuckets()
+    assert buckets.bucket_for("get", "/api/v1/monitor/1") is None
+    asyncio.run(asyncio.wait_for(buckets.acquire("get", "/api/v1/monitor/1"), timeout=1))
+
+
+def test_endpoints_share_bucket_by_name():
+    buckets = RateLimitBuckets()
+    buckets.observe("get", "/api/v1/monitor/1", _headers())
+    buckets.observe("post", "/api/v1/monitor", _headers())
+    assert buckets.bucket_for("get", "/api/v1/monitor/2") is buckets.bucket_for("post", "/api/v1/monitor")
+    assert buckets.bucket_for("get", "/api/v1/dashboard/1") is None
+
+
+def test_missing_or_malformed_headers_are_ignored():
+    buckets = RateLimitBuckets()
+    buckets.observe("get", "/api/v1/monitor/1", {})
+    buckets.observe("get", "/api/v1/monitor/1", _headers(limit="n/a"))
+    buckets.observe("get", "/api/v1/monitor/1", MagicMock())
+    assert buckets.bucket_for("get", "/api/v1/monitor/1") is None
+
+
+def test_server_remaining_clamps_tokens():
+    bucket = TokenBucket("b", 100, 10)
+    bucket.update(100, 10, remaining=3, reset=5)
+    assert 3 <= bucket.tokens < 3.5
+
+
+def test_acquire_paces_at_refill_rate():
+    async def run():
+        bucket = TokenBucket("b", 100, 1)
+        bucket.update(100, 1, remaining=0, reset=None)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    # 100/s refill: five tokens take ~50ms, not a full period.
+    assert 0.03 <= elapsed < 0.5
+
+
+def test_exhausted_bucket_waits_for_reset():
+    async def run():
+        bucket = TokenBucket("b", 1000, 1)
+        bucket.update(1000, 1, remaining=0, reset=0.1)
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start, bucket.waits
+
+    elapsed, waits = asyncio.run(run())
+    assert elapsed >= 0.09
+    assert waits == 1
+
+
+def _response(headers):
+    resp = MagicMock()
+    resp.status = 200
+    resp.headers = headers
+    resp.content_type = "application/json"
+    resp.charset = None
+    resp.read = AsyncMock(return_value=b"{}")
+    resp.raise_for_status = MagicMock(return_value=None)
+    cm = MagicMock()
+    cm.__aenter__ = AsyncMock(return_value=resp)
+    cm.__aexit__ = AsyncMock(return_value=False)
+    return cm
+
+
+def _client(**kwargs):
+    client = CustomClient(
+        "https://api.datadoghq.com",
+        {"apiKeyAuth": "fake-api", "appKeyAuth": "fake-app"},
+        retry_timeout=30,
+        timeout=30,
+        send_metrics=False,
+        **kwargs,
+    )
+    client.session = MagicMock()
+    return client
+
+
+def test_request_with_retry_learns_and_waits_on_bucket():
+    client = _client()
+    client.session.get = MagicMock(return_value=_response(_headers(remaining="0", reset="0.1")))
+
+    async def run():
+        await client.get("/api/v1/monitor/1")
+        start = time.monotonic()
+        await client.get("/api/v1/monitor/2")
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
+    assert client.rate_limits.bucket_for("get", "/api/v1/monitor/3").waits == 1
+
+
+def test_rate_limit_pacing_disabled():
+    client = _client(rate_limit_pacing=False)
+    client.session.get = MagicMock(return_value=_response(_headers(remaining="0", reset="60")))
+
+    async def run():
+        await client.get("/api/v1/monitor/1")
+        await asyncio.wait_for(client.get("/api/v1/monitor/2"), timeout=1)
+
+    asyncio.run(run())
+    assert client.rate_limits is None
@@ -10,7 +10,8 @@ regressions in the config flag, the state.reload_destination call, or the
 failure-swallowing behaviour surface even if apply_resources is refactored.
 """
 
-from unittest.mock import MagicMock
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
 
 from datadog_sync.utils.resources_handler import ResourcesHandler
 
@@ -21,18 +22,17 @@ def _make_handler(refresh_enabled: bool, reload_side_effect=None):
     handler.config.refresh_destination_state_before_apply = refresh_enabled
     handler.config.logger = MagicMock()
     state = MagicMock()
+    state.reload_destination_async = AsyncMock(return_value={"monitors": 2, "dashboards": 0})
     if reload_side_effect is not None:
-        state.reload_destination.side_effect = reload_side_effect
-    else:
-        state.reload_destination.return_value = {"monitors": 2, "dashboards": 0}
+        state.reload_destination_async.side_effect = reload_side_effect
     handler.config.state = state
     return handler
 
 
 def test_refresh_skipped_when_flag_off():
     handler = _make_handler(refresh_enabled=False)
-    handler._maybe_refresh_destination_state({"monitors", "dashboards"})
-    handler.config.state.reload_destination.assert_not_called()
+    asyncio.run(handler._maybe_refresh_destination_state({"monitors", "dashboards"}))
+    handler.config.state.reload_destination_async.assert_not_called()
     # No refresh log fires when the flag is off.
     for call in handler.config.logger.info.call_args_list:
         assert "reload_destination" not in call.args[0]
@@ -40,16 +40,16 @@ def test_refresh_skipped_when_flag_off():
 
 def test_refresh_invoked_when_flag_on():
     handler = _make_handler(refresh_enabled=True)
-    handler._maybe_refresh_destination_state({"monitors", "dashboards"})
-    handler.config.state.reload_destination.assert_called_once()
+    asyncio.run(handler._maybe_refresh_destination_state({"monitors", "dashboards"}))
+    handler.config.state.reload_destination_async.assert_awaited_once()
     # Called with a sorted list so log/order is deterministic.
-    args, _ = handler.config.state.reload_destination.call_args
+    args, _ = handler.config.state.reload_destination_async.call_args
     assert args[0] == ["dashboards", "monitors"]
 
 
 def test_refresh_summary_log_emitted():
     handler = _make_handler(refresh_enabled=True)
-    handler._maybe_refresh_destination_state({"monitors", "dashboards"})
+    asyncio.run(handler._maybe_refresh_destination_state({"monitors", "dashboards"}))
     info_msgs = [c.args[0] for c in handler.config.logger.info.call_args_list]
     assert any("phase=reload_destination" in m for m in info_msgs)
 
@@ -57,7 +57,7 @@ def test_refresh_summary_log_emitted():
 def test_refresh_failure_never_raises_and_logs_warning():
     handler = _make_handler(refresh_enabled=True, reload_side_effect=RuntimeError("boom"))
     # MUST NOT raise — apply proceeds with pre-refresh state.
-    handler._maybe_refresh_destination_state({"monitors"})
+    asyncio.run(handler._maybe_refresh_destination_state({"monitors"}))
     # Warning includes exc_info so the traceback isn't lost.
     handler.config.logger.warning.assert_called_once()
     _, kwargs = handler.config.logger.warning.call_args
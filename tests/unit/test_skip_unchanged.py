@@ -0,0 +1,153 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for --skip-unchanged: the fingerprints State keeps next to destination
+state, and the apply-graph nodes they let get_dependency_graph drop."""
+
+import gzip
+import json
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+from datadog_sync.utils.base_resource import ResourceConfig
+from datadog_sync.utils.resources_handler import ResourcesHandler
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage.applied_fingerprints import FINGERPRINTS_INDEX, FINGERPRINTS_SUFFIX
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _state(tmp_path):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        resource_per_file=True,
+    )
+
+
+def test_fingerprints_persist_next_to_destination_state(tmp_path):
+    state = _state(tmp_path)
+    state.destination["monitors"]["1"] = {"id": 10}
+    state.record_applied_fingerprint("monitors", "1", "abc")
+    state.record_applied_fingerprint("monitors", "2", "def")
+    state.record_applied_fingerprint("monitors", "2", None)
+    state.dump_state()
+
+    stored = tmp_path / "dest" / f"monitors{FINGERPRINTS_SUFFIX}"
+    assert json.loads(gzip.decompress(stored.read_bytes()))["fingerprints"] == {"1": "abc"}
+
+    state = _state(tmp_path)
+    assert state.applied_fingerprints("monitors") == {"1": "abc"}
+    # Not a .json object: never loaded as a resource.
+    assert set(state.destination["monitors"]) == {"1"}
+    assert state.applied_fingerprints("dashboards") == {}
+
+    with patch("datadog_sync.utils.storage.applied_fingerprints.cli_version", return_value="other"):
+        assert _state(tmp_path).applied_fingerprints("monitors") == {}
+
+    # One index read tells which types have fingerprints; others are never read.
+    state = _state(tmp_path)
+    with patch.object(state._storage, "read_blob", wraps=state._storage.read_blob) as read_blob:
+        assert state.applied_fingerprints("dashboards") == {}
+        assert state.applied_fingerprints("monitors") == {"1": "abc"}
+    assert [c.args[0].rsplit("/", 1)[1] for c in read_blob.call_args_list] == [
+        FINGERPRINTS_INDEX,
+        f"monitors{FINGERPRINTS_SUFFIX}",
+    ]
+
+    # Forgetting the last fingerprint of a type drops it from the index.
+    state.record_applied_fingerprint("monitors", "1", None)
+    state.dump_state()
+    assert _state(tmp_path).fingerprinted_types() == set()
+
+
+def test_applies_leave_fingerprints_alone_when_none_are_stored(tmp_path):
+    state = _state(tmp_path)
+    handler = _handler(state, {"m": {"name": "m", "roles": []}})
+    handler.config.skip_unchanged = False
+    handler._start_tracking_fingerprints({"monitors"})
+    with patch.object(state, "record_applied_fingerprint") as record:
+        handler._note_applied("monitors", "m")
+        handler._forget_applied("monitors", "m")
+    record.assert_not_called()
+
+    state.record_applied_fingerprint("monitors", "m", "abc")
+    state.dump_state()
+    state = _state(tmp_path)
+    handler.config.state = state
+    handler._start_tracking_fingerprints({"monitors"})
+    handler._forget_applied("monitors", "m")
+    assert state.applied_fingerprints("monitors") == {}
+
+
+def _handler(state, monitors):
+    def connect_id(key, r_obj, resource_to_connect):
+        failed = []
+        for i, _id in enumerate(r_obj[key]):
+            if _id in state.destination[resource_to_connect]:
+                r_obj[key][i] = state.destination[resource_to_connect][_id]["id"]
+            else:
+                failed.append(_id)
+        return failed
+
+    def r_class(connections):
+        return SimpleNamespace(
+            resource_config=ResourceConfig(base_path="/x", resource_connections=connections),
+            connect_id=connect_id,
+            filter=lambda resource: True,
+        )
+
+    for _id, resource in monitors.items():
+        state.source["monitors"][_id] = resource
+    config = MagicMock(emit_json=False, skip_unchanged=True, resources_arg=["monitors"])
+    config.state = state
+    handler = ResourcesHandler(config)
+    # What apply_resources decides under --skip-unchanged.
+    handler._track_fingerprints = True
+    handler.config.resources = {"monitors": r_class({"roles": ["roles"]}), "roles": r_class(None)}
+    return handler
+
+
+def test_unchanged_resources_leave_the_apply_graph(tmp_path):
+    state = _state(tmp_path)
+    state.destination["roles"]["r1"] = {"id": "dst-r1"}
+    handler = _handler(
+        state,
+        {
+            "same": {"name": "a", "roles": ["r1"]},
+            "edited": {"name": "b", "roles": []},
+            "new_dep": {"name": "c", "roles": ["r2"]},
+            "gone": {"name": "d", "roles": []},
+        },
+    )
+
+    graph, _, _ = handler.get_dependency_graph()
+    assert set(graph) == {("monitors", i) for i in ("same", "edited", "new_dep", "gone")}
+    for _, _id in graph:
+        state.destination["monitors"][_id] = {"id": f"dst-{_id}"}
+        handler._note_applied("monitors", _id)
+    del state.destination["monitors"]["gone"]
+    state.source["monitors"]["edited"] = {"name": "b2", "roles": []}
+
+    graph, _, _ = handler.get_dependency_graph()
+    assert set(graph) == {("monitors", "edited"), ("monitors", "new_dep"), ("monitors", "gone")}
+    assert handler._unchanged == {("monitors", "same")}
+
+    # A dependency now mapped to another destination ID changes the connected source.
+    state.destination["roles"]["r1"] = {"id": "dst-r1-recreated"}
+    graph, _, _ = handler.get_dependency_graph()
+    assert ("monitors", "same") in graph
+
+    # Without a fingerprint for it, applying a resource forgets its recorded one.
+    handler.config.skip_unchanged = False
+    handler.get_dependency_graph()
+    handler._note_applied("monitors", "same")
+    assert "same" not in state.applied_fingerprints("monitors")
+
+
+def test_skip_unchanged_option_reaches_configuration():
+    from datadog_sync.commands.sync import sync
+
+    assert any(p.name == "skip_unchanged" and p.is_flag for p in sync.params)
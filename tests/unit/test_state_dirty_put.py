@@ -0,0 +1,172 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for dirty tracking in State: under --resource-per-file dump_state
+writes only the entries changed since the last load/dump."""
+
+import copy
+import json
+import logging
+import os
+from unittest.mock import patch
+
+import pytest
+
+from datadog_sync.constants import LOGGER_NAME, Origin
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _seed(tmp_path, n=50):
+    src = tmp_path / "source"
+    dst = tmp_path / "dest"
+    src.mkdir()
+    dst.mkdir()
+    for i in range(n):
+        (src / f"monitors.{i}.json").write_text(json.dumps({str(i): {"id": i}}))
+        (dst / f"monitors.{i}.json").write_text(json.dumps({str(i): {"id": 1000 + i}}))
+    return src, dst
+
+
+def _state(src, dst, resource_per_file=True, **kwargs):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        resource_per_file=resource_per_file,
+        source_resources_path=str(src),
+        destination_resources_path=str(dst),
+        **kwargs,
+    )
+
+
+def _dump_and_capture_writes(state, origin=Origin.ALL):
+    writes = []
+    original = state._storage._write_file
+    with patch.object(state._storage, "_write_file", side_effect=lambda p, b: writes.append(p) or original(p, b)):
+        state.dump_state(origin)
+    return sorted(os.path.basename(p) for p in writes)
+
+
+def test_only_changed_entries_are_written(tmp_path):
+    src, dst = _seed(tmp_path)
+    state = _state(src, dst)
+
+    state.set_source("monitors", "3", {"id": 3, "name": "renamed"})
+    state.destination["monitors"]["7"] = {"id": 1007, "updated": True}
+    state.destination["monitors"].pop("9", None)
+    state.destination["monitors"]["new"] = {"id": 2000}
+
+    assert _dump_and_capture_writes(state) == ["monitors.3.json", "monitors.7.json", "monitors.new.json"]
+    assert json.loads((src / "monitors.3.json").read_text()) == {"3": {"id": 3, "name": "renamed"}}
+    assert json.loads((dst / "monitors.7.json").read_text())["7"]["updated"] is True
+    assert not (dst / "monitors.9.json").exists()
+    assert len(os.listdir(src)) == 50
+
+
+def test_clean_state_dump_writes_nothing(tmp_path, caplog):
+    src, dst = _seed(tmp_path, n=5)
+    state = _state(src, dst)
+    state.destination["monitors"]["1"] = {"id": 1}
+    assert _dump_and_capture_writes(state) == ["monitors.1.json"]
+
+    with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+        assert _dump_and_capture_writes(state) == []
+    line = [r.getMessage() for r in caplog.records if "phase=dump_state" in r.getMessage()][-1]
+    assert "put_mode=dirty dirty_written=0 dirty_deleted=0" in line
+
+
+def test_entries_read_from_storage_are_not_dirty(tmp_path):
+    src, dst = _seed(tmp_path, n=5)
+    state = _state(src, dst, resource_types=["monitors"])
+    state._data.source["monitors"].clear()
+    state._data.destination["monitors"].clear()
+
+    state.ensure_resource_loaded("monitors", "2")
+    state.reload_destination(["monitors"])
+
+    assert state.source["monitors"]["2"] == {"id": 2}
+    assert _dump_and_capture_writes(state) == []
+
+
+def test_in_place_mutation_needs_reassignment(tmp_path, caplog):
+    caplog.set_level(logging.INFO, logger=LOGGER_NAME)
+    src, dst = _seed(tmp_path, n=3)
+    state = _state(src, dst)
+    resource = state.source["monitors"]["1"]
+    resource["touched"] = True
+    assert _dump_and_capture_writes(state, Origin.SOURCE) == []
+
+    state.source["monitors"]["1"] = resource
+    assert _dump_and_capture_writes(state, Origin.SOURCE) == ["monitors.1.json"]
+
+
+def test_dump_of_one_side_keeps_the_other_dirty(tmp_path):
+    src, dst = _seed(tmp_path, n=3)
+    state = _state(src, dst)
+    state.source["monitors"]["0"] = {"id": 0, "v": 2}
+    state.destination["monitors"]["0"] = {"id": 1000, "v": 2}
+
+    assert _dump_and_capture_writes(state, Origin.SOURCE) == ["monitors.0.json"]
+    assert _dump_and_capture_writes(state, Origin.DESTINATION) == ["monitors.0.json"]
+    assert _dump_and_capture_writes(state) == []
+
+
+def test_failed_put_keeps_entries_dirty(tmp_path):
+    src, dst = _seed(tmp_path, n=3)
+    state = _state(src, dst)
+    state.source["monitors"]["1"] = {"id": 1, "v": 2}
+    with patch.object(state._storage, "put", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            state.dump_state(Origin.SOURCE)
+    assert _dump_and_capture_writes(state, Origin.SOURCE) == ["monitors.1.json"]
+
+
+def _put_entries(state, origin):
+    with patch.object(state._storage, "put") as put:
+        state.dump_state(origin)
+    data = put.call_args[0][1]
+    return {(rt, _id) for rt, resources in data.source.items() for _id in resources}
+
+
+def test_legacy_layout_rewrites_everything(tmp_path):
+    src = tmp_path / "source"
+    dst = tmp_path / "dest"
+    state = _state(src, dst, resource_per_file=False)
+    state.source["monitors"] = {"a": {"id": "a"}}
+    state.source["users"] = {"u": {"id": "u"}}
+    state.dump_state(Origin.SOURCE)
+
+    state.source["monitors"]["b"] = {"id": "b"}
+    assert _put_entries(state, Origin.SOURCE) == {("monitors", "a"), ("monitors", "b"), ("users", "u")}
+
+
+def test_debug_logging_writes_and_reports_in_place_mutations(tmp_path, caplog):
+    caplog.set_level(logging.DEBUG, logger=LOGGER_NAME)
+    src, dst = _seed(tmp_path, n=3)
+    state = _state(src, dst)
+    state.destination["monitors"]["1"]["touched"] = True
+    assert _dump_and_capture_writes(state) == ["monitors.1.json"]
+    assert json.loads((dst / "monitors.1.json").read_text())["1"]["touched"] is True
+    assert "destination state entry monitors.1 was changed in place" in caplog.text
+
+    # Dumped entries are hashed again: nothing left to report.
+    caplog.clear()
+    assert _dump_and_capture_writes(state) == []
+    assert "changed in place" not in caplog.text
+
+    # Entries read in after the load are checked too.
+    state = _state(src, dst, resource_types=["monitors"])
+    state._data.source["monitors"].clear()
+    state.ensure_resource_loaded("monitors", "2")
+    state.source["monitors"]["2"]["touched"] = True
+    assert _dump_and_capture_writes(state, Origin.SOURCE) == ["monitors.2.json"]
+
+
+def test_copies_are_detached_from_tracking(tmp_path):
+    src, dst = _seed(tmp_path, n=2)
+    state = _state(src, dst)
+    snapshot = copy.deepcopy(state.source)
+    snapshot["monitors"]["0"] = {"id": "changed"}
+    assert type(snapshot["monitors"]) is dict
+    assert _dump_and_capture_writes(state) == []
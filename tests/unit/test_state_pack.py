@@ -0,0 +1,182 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the packed state layout (--state-layout pack) and convert-state."""
+
+import gzip
+import json
+import os
+from unittest.mock import MagicMock, patch
+
+import pytest
+from click.testing import CliRunner
+
+from datadog_sync.cli import cli
+from datadog_sync.constants import Command, Origin
+from datadog_sync.utils.configuration import build_config
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage import state_pack
+from datadog_sync.utils.storage._base_storage import StorageData
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+from datadog_sync.utils.storage.local_file import LocalFile
+from datadog_sync.utils.storage.state_pack import PackIndex, PackStorage, decode_block, encode_pack
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _resources(n):
+    return {
+        f"id-{i}": {"id": f"id-{i}", "name": f"monitor {i}", "query": f"avg:system.load.1{{*}} > {i}"} for i in range(n)
+    }
+
+
+def _pack_storage(tmp_path):
+    return PackStorage(
+        LocalFile(source_resources_path=str(tmp_path / "source"), destination_resources_path=str(tmp_path / "dest"))
+    )
+
+
+def test_encode_decode_round_trip_is_one_gzip_stream():
+    resources = _resources(50)
+    pack, raw_index = encode_pack(resources)
+    assert decode_block(pack) == resources
+    # Concatenated members decompress as one stream to the NDJSON lines.
+    assert len(gzip.decompress(pack).splitlines()) == 50
+    index = PackIndex(raw_index)
+    assert index.pack_bytes == len(pack) and set(index.ids) == set(resources)
+
+
+def test_multi_block_index_locates_each_id(monkeypatch):
+    monkeypatch.setattr(state_pack, "PACK_BLOCK_BYTES", 512)
+    resources = _resources(200)
+    pack, raw_index = encode_pack(resources)
+    index = PackIndex(raw_index)
+    assert len(index.blocks) > 5
+    for _id in ("id-0", "id-99", "id-199"):
+        offset, length = index.locate(_id)
+        assert decode_block(pack[offset : offset + length])[_id] == resources[_id]
+    assert index.locate("missing") is None
+
+
+def test_unknown_index_version_is_rejected():
+    with pytest.raises(ValueError):
+        PackIndex(gzip.compress(json.dumps({"version": 99}).encode()))
+
+
+def test_pack_storage_round_trip_and_single_reads(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_pack, "PACK_BLOCK_BYTES", 1024)
+    storage = _pack_storage(tmp_path)
+    data = StorageData()
+    data.source["monitors"] = _resources(100)
+    data.destination["monitors"] = {"id-7": {"id": 7007}}
+    data.source["users"] = {"u": {"id": "u"}}
+    storage.put(Origin.ALL, data)
+
+    assert sorted(os.listdir(tmp_path / "source")) == [
+        "monitors.pack.gz",
+        "monitors.pack.idx",
+        "users.pack.gz",
+        "users.pack.idx",
+    ]
+    loaded = _pack_storage(tmp_path).get(Origin.ALL)
+    assert loaded.source["monitors"] == data.source["monitors"]
+    assert loaded.destination["monitors"] == {"id-7": {"id": 7007}}
+    assert _pack_storage(tmp_path).get(Origin.SOURCE, ["users"]).source == {"users": {"u": {"id": "u"}}}
+
+    reader = _pack_storage(tmp_path)
+    with patch.object(reader.blobs, "read_blob", wraps=reader.blobs.read_blob) as full_reads:
+        assert reader.get_single("monitors", "id-42") == (data.source["monitors"]["id-42"], None)
+        assert reader.get_single("monitors", "id-7") == (data.source["monitors"]["id-7"], {"id": 7007})
+    # Only the two indexes were read whole; the resources came from ranged reads.
+    assert sorted(os.path.basename(c.args[0]) for c in full_reads.call_args_list) == [
+        "monitors.pack.idx",
+        "monitors.pack.idx",
+    ]
+
+
+def test_s3_ranged_read_sends_range_header():
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        client = MagicMock()
+        mock_boto3.client.return_value = client
+        client.get_object.return_value = {"Body": MagicMock(read=lambda: b"xyz")}
+        backend = AWSS3Bucket(config={"aws_bucket_name": "b"})
+        assert backend.read_blob_range("resources/source/monitors.pack.gz", 10, 3) == b"xyz"
+    assert client.get_object.call_args.kwargs["Range"] == "bytes=10-12"
+
+
+def test_state_dump_under_pack_rewrites_only_changed_types(tmp_path):
+    storage = _pack_storage(tmp_path)
+    data = StorageData()
+    data.source["monitors"] = _resources(5)
+    data.source["users"] = {"u": {"id": "u"}}
+    storage.put(Origin.SOURCE, data)
+
+    state = State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        state_layout="pack",
+    )
+    assert state.source["users"] == {"u": {"id": "u"}}
+    state.source["monitors"]["id-1"] = {"id": "id-1", "name": "renamed"}
+    with patch.object(state._storage, "put", wraps=state._storage.put) as put:
+        state.dump_state(Origin.SOURCE)
+    assert list(put.call_args.args[1].source) == ["monitors"]
+    assert _pack_storage(tmp_path).get(Origin.SOURCE).source["monitors"]["id-1"]["name"] == "renamed"
+
+
+def test_pack_layout_rejects_resource_per_file():
+    from click import UsageError
+
+    with pytest.raises(UsageError):
+        build_config(Command.IMPORT, state_layout="pack", resource_per_file=True, source_api_key="k")
+
+
+def _seed_json(tmp_path):
+    src = tmp_path / "source"
+    dst = tmp_path / "dest"
+    src.mkdir()
+    dst.mkdir()
+    (src / "monitors.json").write_text(json.dumps(_resources(3)))
+    (src / "users.json").write_text(json.dumps({"u": {"id": "u"}}))
+    (dst / "monitors.json").write_text(json.dumps({"id-0": {"id": 100}}))
+    return src, dst
+
+
+def _convert(src, dst, *args):
+    return CliRunner().invoke(
+        cli,
+        [
+            "convert-state",
+            f"--source-resources-path={src}",
+            f"--destination-resources-path={dst}",
+            *args,
+        ],
+    )
+
+
+def test_convert_state_between_all_layouts(tmp_path):
+    src, dst = _seed_json(tmp_path)
+    expected = LocalFile(source_resources_path=str(src), destination_resources_path=str(dst)).get(Origin.ALL)
+
+    result = _convert(src, dst, "--from-layout=json", "--to-layout=pack", "--remove-old")
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(src)) == ["monitors.pack.gz", "monitors.pack.idx", "users.pack.gz", "users.pack.idx"]
+
+    result = _convert(src, dst, "--from-layout=pack", "--to-layout=resource-per-file", "--remove-old")
+    assert result.exit_code == 0, result.output
+    assert sorted(os.listdir(dst)) == ["monitors.id-0.json"]
+
+    result = _convert(src, dst, "--from-layout=resource-per-file", "--to-layout=json")
+    assert result.exit_code == 0, result.output
+    # Without --remove-old the per-resource files stay next to the new ones.
+    assert "users.u.json" in os.listdir(src) and "users.json" in os.listdir(src)
+    loaded = LocalFile(source_resources_path=str(src), destination_resources_path=str(dst)).get(Origin.ALL)
+    assert (loaded.source, loaded.destination) == (expected.source, expected.destination)
+
+
+def test_convert_state_same_layout_is_a_usage_error(tmp_path):
+    result = _convert(tmp_path, tmp_path, "--from-layout=pack", "--to-layout=pack")
+    assert result.exit_code != 0
+    assert "must differ" in result.output
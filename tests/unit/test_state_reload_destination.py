@@ -17,7 +17,7 @@ writes.
 from unittest.mock import MagicMock
 
 from datadog_sync.constants import Origin
-from datadog_sync.utils.state import State
+from datadog_sync.utils.state import State, _DirtyKeys
 from datadog_sync.utils.storage._base_storage import StorageData
 
 
@@ -33,6 +33,12 @@ def _make_state_with_stub_storage(source=None, destination=None):
     state._bulk_loaded_types = set()
     state._authoritative_source_types = set()
     state._data = StorageData()
+    state._dirty = {Origin.SOURCE: _DirtyKeys(), Origin.DESTINATION: _DirtyKeys()}
+    state._applied_fingerprints = {}
+    state._fingerprints_dirty = set()
+    state._fingerprinted_types = None
+    state._dependency_caches = {}
+    state._dependency_cache_dirty = set()
     if source:
         for rt, entries in source.items():
             for k, v in entries.items():
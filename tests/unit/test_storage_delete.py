@@ -3,6 +3,7 @@
 # This product includes software developed at Datadog (https://www.datadoghq.com/).
 # Copyright 2019 Datadog, Inc.
 
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -115,21 +116,34 @@ class TestAWSS3Delete:
             Bucket="test-bucket", Key="resources/destination/monitors.abc.json"
         )
 
-    def test_delete_many_loops_per_file(self, mock_s3_client):
+    def test_delete_many_uses_delete_objects_batches(self, mock_s3_client):
         _, mock_client = mock_s3_client
+        mock_client.delete_objects.return_value = {}
         bucket = _make_s3()
-        result = bucket.delete_many(Origin.SOURCE, ["monitors.a.json", "monitors.b.json"])
-        assert result == {"monitors.a.json": "ok", "monitors.b.json": "ok"}
-        assert mock_client.delete_object.call_count == 2
+        filenames = [f"monitors.{i}.json" for i in range(2500)]
+        result = bucket.delete_many(Origin.SOURCE, filenames)
+        assert result == {fn: "ok" for fn in filenames}
+        sizes = sorted(len(c.kwargs["Delete"]["Objects"]) for c in mock_client.delete_objects.call_args_list)
+        assert sizes == [500, 1000, 1000]
+        mock_client.delete_object.assert_not_called()
 
     def test_delete_many_partial_failure(self, mock_s3_client):
         _, mock_client = mock_s3_client
-        mock_client.delete_object.side_effect = [None, Exception("AccessDenied")]
+        mock_client.delete_objects.return_value = {
+            "Errors": [{"Key": "resources/source/monitors.b.json", "Code": "AccessDenied", "Message": "denied"}]
+        }
         bucket = _make_s3()
         result = bucket.delete_many(Origin.SOURCE, ["monitors.a.json", "monitors.b.json"])
         assert result["monitors.a.json"] == "ok"
         assert "AccessDenied" in result["monitors.b.json"]
 
+    def test_delete_many_failed_request_marks_its_batch(self, mock_s3_client):
+        _, mock_client = mock_s3_client
+        mock_client.delete_objects.side_effect = Exception("SlowDown")
+        bucket = _make_s3()
+        result = bucket.delete_many(Origin.DESTINATION, ["monitors.a.json", "monitors.b.json"])
+        assert all("SlowDown" in status for status in result.values()) and len(result) == 2
+
 
 @pytest.fixture
 def mock_gcs_client():
@@ -168,15 +182,29 @@ class TestGCSDelete:
         bucket.delete(Origin.SOURCE, "monitors.missing.json")
 
     def test_delete_many_partial_failure(self, mock_gcs_client):
-        _, _, mock_bucket = mock_gcs_client
-        ok_blob = MagicMock()
-        bad_blob = MagicMock()
-        bad_blob.delete.side_effect = Exception("PermissionDenied")
-        mock_bucket.blob.side_effect = [ok_blob, bad_blob]
+        _, mock_client, mock_bucket = mock_gcs_client
+        batch = mock_client.batch.return_value
+        batch._responses = [
+            SimpleNamespace(status_code=204),
+            SimpleNamespace(status_code=404),
+            SimpleNamespace(status_code=403),
+        ]
         bucket = _make_gcs()
-        result = bucket.delete_many(Origin.SOURCE, ["monitors.a.json", "monitors.b.json"])
+        result = bucket.delete_many(Origin.SOURCE, ["monitors.a.json", "monitors.gone.json", "monitors.b.json"])
         assert result["monitors.a.json"] == "ok"
-        assert "PermissionDenied" in result["monitors.b.json"]
+        assert result["monitors.gone.json"] == "ok"
+        assert "403" in result["monitors.b.json"]
+        mock_client.batch.assert_called_once_with(raise_exception=False)
+        assert mock_bucket.delete_blob.call_count == 3
+
+    def test_delete_many_splits_into_batches_of_100(self, mock_gcs_client):
+        _, mock_client, mock_bucket = mock_gcs_client
+        mock_client.batch.return_value._responses = []
+        bucket = _make_gcs()
+        result = bucket.delete_many(Origin.SOURCE, [f"monitors.{i}.json" for i in range(250)])
+        assert len(result) == 250 and set(result.values()) == {"ok"}
+        assert mock_client.batch.call_count == 3
+        assert mock_bucket.delete_blob.call_count == 250
 
 
 @pytest.fixture
@@ -215,11 +243,20 @@ class TestAzureDelete:
 
     def test_delete_many_partial_failure(self, mock_azure_container):
         _, mock_container = mock_azure_container
-        mock_container.delete_blob.side_effect = [None, Exception("AccessDenied")]
+        mock_container.delete_blobs.return_value = iter(
+            [
+                SimpleNamespace(status_code=202, reason="Accepted"),
+                SimpleNamespace(status_code=403, reason="AccessDenied"),
+            ]
+        )
         bucket = _make_azure()
         result = bucket.delete_many(Origin.SOURCE, ["monitors.a.json", "monitors.b.json"])
         assert result["monitors.a.json"] == "ok"
         assert "AccessDenied" in result["monitors.b.json"]
+        mock_container.delete_blobs.assert_called_once_with(
+            "resources/source/monitors.a.json", "resources/source/monitors.b.json", raise_on_any_failure=False
+        )
+        mock_container.delete_blob.assert_not_called()
 
 
 class TestBaseStorageDefaults:
@@ -0,0 +1,127 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for batched dependency loads: BaseStorage.get_many and
+State.ensure_resources_loaded."""
+
+import io
+import json
+import logging
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+from botocore.exceptions import ClientError
+
+from datadog_sync.constants import LOGGER_NAME, Origin
+from datadog_sync.utils.state import State
+from datadog_sync.utils.storage import state_pack
+from datadog_sync.utils.storage._base_storage import StorageData
+from datadog_sync.utils.storage.aws_s3_bucket import AWSS3Bucket
+from datadog_sync.utils.storage.local_file import LocalFile
+from datadog_sync.utils.storage.state_pack import PackStorage
+from datadog_sync.utils.storage.storage_types import StorageType
+
+
+def _local(tmp_path, **kwargs):
+    return LocalFile(
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        **kwargs,
+    )
+
+
+def _seed(backend):
+    data = StorageData()
+    data.source["monitors"] = {str(i): {"id": i} for i in range(20)}
+    data.destination["monitors"] = {"3": {"id": 1003}, "team:a": {"id": "x"}}
+    data.source["monitors"]["team:a"] = {"id": "team"}
+    backend.put(Origin.ALL, data)
+
+
+def test_get_many_returns_found_entries_in_request_order(tmp_path):
+    backend = _local(tmp_path, resource_per_file=True)
+    _seed(backend)
+    src, dst = backend.get_many("monitors", ["5", "missing", "3", "team:a", "5"])
+    assert list(src) == ["5", "3", "team:a"]
+    assert dst == {"3": {"id": 1003}, "team:a": {"id": "x"}}
+
+
+def test_s3_get_many_fetches_concurrently():
+    in_flight = [0, 0]
+    lock = threading.Lock()
+
+    def get_object(Bucket, Key):
+        with lock:
+            in_flight[0] += 1
+            in_flight[1] = max(in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight[0] -= 1
+        if "/destination/" in Key:
+            raise ClientError({"Error": {"Code": "NoSuchKey"}}, "GetObject")
+        _id = Key.rsplit(".", 2)[1]
+        return {"Body": io.BytesIO(json.dumps({_id: {"id": _id}}).encode())}
+
+    with patch("datadog_sync.utils.storage.aws_s3_bucket.boto3") as mock_boto3:
+        client = MagicMock()
+        client.get_object.side_effect = get_object
+        mock_boto3.client.return_value = client
+        backend = AWSS3Bucket(config={"aws_bucket_name": "b", "aws_download_concurrency": 4}, resource_per_file=True)
+        src, dst = backend.get_many("monitors", [str(i) for i in range(12)])
+    assert list(src) == [str(i) for i in range(12)] and dst == {}
+    assert 1 < in_flight[1] <= 4
+
+
+def test_pack_get_many_reads_each_block_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(state_pack, "PACK_BLOCK_BYTES", 64)
+    backend = PackStorage(_local(tmp_path))
+    _seed(backend)
+    with patch.object(backend.blobs, "read_blob_range", wraps=backend.blobs.read_blob_range) as ranged:
+        src, dst = backend.get_many("monitors", ["1", "2", "3", "19", "team:a", "nope"])
+    assert src == {"1": {"id": 1}, "2": {"id": 2}, "3": {"id": 3}, "19": {"id": 19}, "team:a": {"id": "team"}}
+    assert dst == {"3": {"id": 1003}, "team:a": {"id": "x"}}
+    locations = [c.args[1:] for c in ranged.call_args_list]
+    assert len(locations) == len(set(locations))
+
+
+def _minimize_reads_state(tmp_path):
+    return State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "source"),
+        destination_resources_path=str(tmp_path / "dest"),
+        resource_per_file=True,
+        exact_ids={"dashboards": []},
+    )
+
+
+def test_ensure_resources_loaded_batches_per_type(tmp_path, caplog):
+    _seed(_local(tmp_path, resource_per_file=True))
+    state = _minimize_reads_state(tmp_path)
+    keys = [("monitors", "3"), ("monitors", "4"), ("monitors", "missing")]
+    with patch.object(state._storage, "get_many", wraps=state._storage.get_many) as get_many:
+        with caplog.at_level(logging.INFO, logger=LOGGER_NAME):
+            assert state.ensure_resources_loaded(keys) == {"monitors": 3}
+        # Already attempted, singly or batched: no further reads.
+        assert state.ensure_resources_loaded(keys) == {}
+        state.ensure_resource_loaded("monitors", "4")
+    get_many.assert_called_once()
+    assert state.source["monitors"]["4"] == {"id": 4} and state.destination["monitors"]["3"] == {"id": 1003}
+    assert "missing" not in state.source["monitors"]
+    line = [r.getMessage() for r in caplog.records if "phase=prefetch_dependencies" in r.getMessage()][-1]
+    assert "requested=3 loaded_source=2 loaded_destination=1" in line
+
+
+def test_ensure_resources_loaded_is_a_noop_without_minimize_reads(tmp_path):
+    _seed(_local(tmp_path, resource_per_file=True))
+    state = State(
+        type_=StorageType.LOCAL_FILE,
+        source_resources_path=str(tmp_path / "empty"),
+        destination_resources_path=str(tmp_path / "empty"),
+        resource_per_file=True,
+    )
+    with patch.object(state._storage, "get_many") as get_many:
+        assert state.ensure_resources_loaded([("monitors", "3")]) == {}
+    get_many.assert_not_called()
@@ -0,0 +1,161 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for CustomClient.iter_pages and the --streaming-import path that
+overlaps source listing with per-resource import."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+from datadog_sync.constants import WORKER_SCHEDULER_EVENT
+from datadog_sync.utils.custom_client import CustomClient, PaginationConfig
+from datadog_sync.utils.resources_handler import ResourcesHandler
+from datadog_sync.utils.workers import Workers
+
+
+def _make_client():
+    return CustomClient(
+        host="https://api.datadoghq.com",
+        auth={"apiKeyAuth": "k", "appKeyAuth": "a"},
+        retry_timeout=60,
+        timeout=30,
+        send_metrics=False,
+    )
+
+
+class _PagedApi:
+    def __init__(self, n):
+        self.items = [{"id": i} for i in range(n)]
+        self.calls = 0
+
+    async def get(self, path, params=None, **kwargs):
+        self.calls += 1
+        size = params["page[size]"]
+        offset = params["page[number]"] * size
+        return {"data": self.items[offset : offset + size], "meta": {"page": {"total_count": len(self.items)}}}
+
+
+def test_iter_pages_yields_each_page_before_fetching_the_next():
+    api = _PagedApi(25)
+
+    async def run():
+        seen = []
+        async for page in _make_client().iter_pages(api.get)("/api/v2/users", pagination_config=PaginationConfig(10)):
+            seen.append((api.calls, [r["id"] for r in page]))
+        return seen
+
+    seen = asyncio.run(run())
+    assert [calls for calls, _ in seen] == [1, 2, 3]
+    assert [ids for _, ids in seen] == [list(range(10)), list(range(10, 20)), list(range(20, 25))]
+
+
+def test_paginated_request_collects_iter_pages():
+    api = _PagedApi(25)
+
+    async def run():
+        return await _make_client().paginated_request(api.get)("/api/v2/users", pagination_config=PaginationConfig(10))
+
+    resources = asyncio.run(run())
+    assert [r["id"] for r in resources] == list(range(25))
+
+
+class _StreamingResource:
+    def __init__(self, pages, fail_after=None):
+        self.pages = pages
+        self.fail_after = fail_after
+        self.pages_listed = 0
+
+    async def iter_resources(self, client):
+        for i, page in enumerate(self.pages):
+            if i == self.fail_after:
+                raise Exception("listing failed")
+            self.pages_listed += 1
+            await asyncio.sleep(0.001)
+            yield page
+
+
+def _run_streaming_import(resources, make_import, max_workers=2):
+    """Run import_resources_without_saving with --streaming-import on, with
+    _import_resource replaced by make_import(handler)."""
+    config = MagicMock()
+    config.max_workers = max_workers
+    config.worker_scheduler = WORKER_SCHEDULER_EVENT
+    config.streaming_import = True
+    config.id_payload = None
+    config.show_progress_bar = False
+    config.fatal_error = False
+    config.emit_json = False
+    config.resources = resources
+    config.resources_arg = list(resources)
+    handler = ResourcesHandler(config)
+    handler._import_resource = make_import(handler)
+
+    async def run():
+        handler.worker = Workers(config)
+        await handler.import_resources_without_saving()
+
+    asyncio.run(run())
+    return config
+
+
+def test_streaming_import_overlaps_listing_and_bounds_in_flight():
+    monitors = _StreamingResource([[{"id": f"m{p}-{i}"} for i in range(5)] for p in range(6)])
+    dashboards = _StreamingResource([[{"id": f"d{i}"} for i in range(3)]])
+    imported = []
+    listed_at_first_import = []
+    held = {"active": 0, "max": 0}
+
+    def make_import(handler):
+        async def fake_import(q_item):
+            if not imported:
+                listed_at_first_import.append(monitors.pages_listed)
+            held["active"] += 1
+            held["max"] = max(held["max"], held["active"] + handler.worker.work_queue.qsize())
+            await asyncio.sleep(0.002)
+            imported.append(q_item)
+            held["active"] -= 1
+
+        return fake_import
+
+    config = _run_streaming_import({"monitors": monitors, "dashboards": dashboards}, make_import)
+    assert sorted(r["id"] for _, r in imported) == sorted(
+        [f"m{p}-{i}" for p in range(6) for i in range(5)] + [f"d{i}" for i in range(3)]
+    )
+    # Imports began before the listing finished...
+    assert listed_at_first_import[0] < len(monitors.pages)
+    # ...and listed-but-unimported items never exceeded 2 * max_workers.
+    assert held["max"] <= 4
+    config.state.mark_source_authoritative.assert_called_once_with(["monitors", "dashboards"])
+    assert config.state.clear_source_type.call_count == 2
+
+
+def test_streaming_import_listing_failure_blocks_authoritative_marking():
+    monitors = _StreamingResource([[{"id": "m0"}], [{"id": "m1"}]], fail_after=1)
+    imported = []
+
+    def make_import(handler):
+        async def fake_import(q_item):
+            imported.append(q_item[1]["id"])
+
+        return fake_import
+
+    config = _run_streaming_import({"monitors": monitors}, make_import)
+    assert imported == ["m0"]
+    config.state.mark_source_authoritative.assert_not_called()
+
+
+def test_streaming_import_counts_a_listing_failure():
+    monitors = _StreamingResource([[{"id": "m0"}], [{"id": "m1"}]], fail_after=1)
+    dashboards = _StreamingResource([[{"id": "d0"}]], fail_after=0)
+
+    def make_import(handler):
+        async def fake_import(q_item):
+            handler.worker.counter.increment_success()
+
+        return fake_import
+
+    config = _run_streaming_import({"monitors": monitors, "dashboards": dashboards}, make_import)
+    assert config.counter.failure == 2
+    assert config.counter.successes == 1
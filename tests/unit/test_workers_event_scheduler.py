@@ -0,0 +1,152 @@
+# Unless explicitly stated otherwise all files in this repository are licensed
+# under the 3-clause BSD style license (see LICENSE).
+# This product includes software developed at Datadog (https://www.datadoghq.com/).
+# Copyright 2019 Datadog, Inc.
+
+"""Tests for the event-driven Workers scheduler (--worker-scheduler=event).
+
+Covers: every queued item is processed exactly once, callbacks that enqueue
+follow-up work are drained before shutdown, a custom cancel_cb driven by an
+additional coro terminates the pool, and an idle pool does not spin.
+"""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from datadog_sync.constants import WORKER_SCHEDULER_EVENT, WORKER_SCHEDULER_POLLING
+from datadog_sync.utils.workers import Workers
+
+
+def _config(scheduler=WORKER_SCHEDULER_EVENT, max_workers=4):
+    return SimpleNamespace(max_workers=max_workers, logger=MagicMock(), worker_scheduler=scheduler, counter=None)
+
+
+def test_event_scheduler_processes_every_item_once():
+    seen = []
+
+    async def run():
+        workers = Workers(_config())
+
+        async def cb(item):
+            await asyncio.sleep(0)
+            seen.append(item)
+
+        await workers.init_workers(cb, None, None)
+        for i in range(50):
+            workers.work_queue.put_nowait(i)
+        await asyncio.wait_for(workers.schedule_workers(), timeout=5)
+
+    asyncio.run(run())
+    assert sorted(seen) == list(range(50))
+
+
+def test_event_scheduler_drains_work_enqueued_by_callbacks():
+    # Default cancel condition must wait for in-flight callbacks: the queue is
+    # momentarily empty while item 0 is still running and about to enqueue 1.
+    seen = []
+
+    async def run():
+        workers = Workers(_config(max_workers=2))
+
+        async def cb(item):
+            await asyncio.sleep(0.01)
+            seen.append(item)
+            if item < 5:
+                workers.work_queue.put_nowait(item + 1)
+
+        await workers.init_workers(cb, None, None)
+        workers.work_queue.put_nowait(0)
+        await asyncio.wait_for(workers.schedule_workers(), timeout=5)
+
+    asyncio.run(run())
+    assert seen == [0, 1, 2, 3, 4, 5]
+
+
+def test_event_scheduler_custom_cancel_cb_with_producer_coro():
+    done = []
+
+    async def run():
+        workers = Workers(_config())
+        state = {"produced": 0}
+
+        async def cb(item):
+            done.append(item)
+
+        async def producer():
+            for i in range(10):
+                await workers.work_queue.put(i)
+                state["produced"] += 1
+                await asyncio.sleep(0.001)
+
+        await workers.init_workers(cb, lambda: state["produced"] == 10 and len(done) == 10, None)
+        await asyncio.wait_for(workers.schedule_workers(additional_coros=[producer()]), timeout=5)
+
+    asyncio.run(run())
+    assert sorted(done) == list(range(10))
+
+
+def test_event_scheduler_does_not_poll_cancel_cb_while_idle():
+    calls = {"n": 0}
+
+    async def run():
+        workers = Workers(_config())
+
+        async def cb(item):
+            pass
+
+        async def idle_then_release():
+            await asyncio.sleep(0.1)
+            release["ok"] = True
+
+        def cancel_cb():
+            calls["n"] += 1
+            return release["ok"]
+
+        release = {"ok": False}
+        await workers.init_workers(cb, cancel_cb, None)
+        await asyncio.wait_for(workers.schedule_workers(additional_coros=[idle_then_release()]), timeout=5)
+
+    asyncio.run(run())
+    # Once at start, once when the additional coro returned.
+    assert calls["n"] == 2
+
+
+def test_event_scheduler_callback_error_does_not_stop_pool():
+    seen = []
+
+    async def run():
+        workers = Workers(_config(max_workers=1))
+
+        async def cb(item):
+            if item == 1:
+                raise ValueError("boom")
+            seen.append(item)
+
+        await workers.init_workers(cb, None, None)
+        for i in range(3):
+            workers.work_queue.put_nowait(i)
+        await asyncio.wait_for(workers.schedule_workers(), timeout=5)
+        workers.config.logger.error.assert_called_once()
+
+    asyncio.run(run())
+    assert seen == [0, 2]
+
+
+def test_polling_scheduler_still_selectable():
+    seen = []
+
+    async def run():
+        workers = Workers(_config(scheduler=WORKER_SCHEDULER_POLLING))
+        assert not workers._event_driven
+
+        async def cb(item):
+            seen.append(item)
+
+        await workers.init_workers(cb, None, None)
+        for i in range(5):
+            workers.work_queue.put_nowait(i)
+        await asyncio.wait_for(workers.schedule_workers(), timeout=5)
+
+    asyncio.run(run())
+    assert sorted(seen) == list(range(5))